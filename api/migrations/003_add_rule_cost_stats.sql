@@ -0,0 +1,18 @@
+-- Migration for per-rule execution cost statistics
+CREATE TABLE IF NOT EXISTS rule_cost_stats (
+    rule_id UUID PRIMARY KEY REFERENCES business_rules(id) ON DELETE CASCADE,
+    dataset_id UUID REFERENCES datasets(id) ON DELETE CASCADE,
+    executions INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    total_time FLOAT NOT NULL DEFAULT 0,
+    mean_time FLOAT NOT NULL DEFAULT 0,
+    rows_processed BIGINT NOT NULL DEFAULT 0,
+    rows_violated BIGINT NOT NULL DEFAULT 0,
+    rows_per_sec FLOAT,
+    selectivity FLOAT NOT NULL DEFAULT 0,
+    failure_rate FLOAT NOT NULL DEFAULT 0,
+    last_execution_time FLOAT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_rule_cost_stats_dataset_id ON rule_cost_stats(dataset_id);
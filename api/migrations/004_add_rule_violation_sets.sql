@@ -0,0 +1,14 @@
+-- Migration for compressed per-rule violation row sets
+CREATE TABLE IF NOT EXISTS rule_violation_sets (
+    run_id VARCHAR(32) NOT NULL,
+    rule_id UUID REFERENCES business_rules(id) ON DELETE CASCADE,
+    dataset_id UUID REFERENCES datasets(id) ON DELETE CASCADE,
+    encoding VARCHAR(16) NOT NULL,
+    total_rows BIGINT NOT NULL,
+    violation_count BIGINT NOT NULL DEFAULT 0,
+    payload BYTEA NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, rule_id)
+);
+
+CREATE INDEX idx_rule_violation_sets_dataset_id ON rule_violation_sets(dataset_id);
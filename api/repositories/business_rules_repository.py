@@ -182,6 +182,135 @@ class BusinessRulesRepository:
             logger.error(f"Error fetching rule validations for dataset {dataset_id}: {str(e)}")
             raise
     
+    async def upsert_rule_cost_stats(self, stats: List[Dict[str, Any]]) -> None:
+        """Insert or replace the accumulated execution cost statistics of rules in one statement."""
+        if not stats:
+            return
+
+        columns = 12
+        values = ",\n            ".join(
+            "(" + ", ".join(f"${i * columns + j + 1}" for j in range(columns)) + ", CURRENT_TIMESTAMP)"
+            for i in range(len(stats))
+        )
+        query = f"""
+        INSERT INTO rule_cost_stats (
+            rule_id, dataset_id, executions, failures, total_time, mean_time,
+            rows_processed, rows_violated, rows_per_sec, selectivity,
+            failure_rate, last_execution_time, updated_at
+        )
+        VALUES {values}
+        ON CONFLICT (rule_id) DO UPDATE SET
+            executions = EXCLUDED.executions,
+            failures = EXCLUDED.failures,
+            total_time = EXCLUDED.total_time,
+            mean_time = EXCLUDED.mean_time,
+            rows_processed = EXCLUDED.rows_processed,
+            rows_violated = EXCLUDED.rows_violated,
+            rows_per_sec = EXCLUDED.rows_per_sec,
+            selectivity = EXCLUDED.selectivity,
+            failure_rate = EXCLUDED.failure_rate,
+            last_execution_time = EXCLUDED.last_execution_time,
+            updated_at = CURRENT_TIMESTAMP
+        """
+        params = []
+        for rule_stats in stats:
+            params.extend([
+                rule_stats["rule_id"],
+                rule_stats.get("dataset_id"),
+                rule_stats["executions"],
+                rule_stats["failures"],
+                rule_stats["total_time"],
+                rule_stats["mean_time"],
+                rule_stats["rows_processed"],
+                rule_stats["rows_violated"],
+                rule_stats.get("rows_per_sec"),
+                rule_stats["selectivity"],
+                rule_stats["failure_rate"],
+                rule_stats.get("last_execution_time")
+            ])
+
+        try:
+            await execute_query(query, *params)
+        except Exception as e:
+            logger.error(f"Error saving cost statistics for {len(stats)} rules: {str(e)}")
+            raise
+
+    async def get_rule_cost_stats(self, dataset_id: Any) -> List[Dict[str, Any]]:
+        """Get execution cost statistics for all rules of a dataset, slowest first."""
+        query = """
+        SELECT rcs.rule_id, rcs.dataset_id, rcs.executions, rcs.failures,
+               rcs.total_time, rcs.mean_time, rcs.rows_processed, rcs.rows_violated,
+               rcs.rows_per_sec, rcs.selectivity, rcs.failure_rate,
+               rcs.last_execution_time, rcs.updated_at,
+               br.name, br.severity
+        FROM rule_cost_stats rcs
+        JOIN business_rules br ON rcs.rule_id = br.id
+        WHERE rcs.dataset_id = $1
+        ORDER BY rcs.mean_time DESC
+        """
+
+        try:
+            results = await execute_query(query, dataset_id)
+            return [dict(row) for row in results]
+        except Exception as e:
+            logger.error(f"Error fetching rule cost statistics for dataset {dataset_id}: {str(e)}")
+            raise
+
+    async def save_violation_sets(self, run_id: str, dataset_id: Any,
+                                  violation_sets: List[Dict[str, Any]]) -> None:
+        """Save the compressed violating row sets of a rule run, one per rule."""
+        if not violation_sets:
+            return
+
+        query = """
+        INSERT INTO rule_violation_sets (
+            run_id, rule_id, dataset_id, encoding, total_rows, violation_count, payload
+        )
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        ON CONFLICT (run_id, rule_id) DO NOTHING
+        """
+        queries = [
+            (query, (
+                run_id,
+                violation_set["rule_id"],
+                dataset_id,
+                violation_set["encoding"],
+                violation_set["total_rows"],
+                violation_set["count"],
+                violation_set["payload"]
+            ))
+            for violation_set in violation_sets
+        ]
+
+        try:
+            await execute_transaction(queries)
+        except Exception as e:
+            logger.error(f"Error saving violation sets for run {run_id}: {str(e)}")
+            raise
+
+    async def get_violation_sets(self, run_id: str, rule_id: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Get the compressed violating row sets of a rule run."""
+        params = [run_id]
+        query = """
+        SELECT rvs.run_id, rvs.rule_id, rvs.dataset_id, rvs.encoding, rvs.total_rows,
+               rvs.violation_count, rvs.payload, rvs.created_at,
+               br.name, br.severity, br.message
+        FROM rule_violation_sets rvs
+        JOIN business_rules br ON rvs.rule_id = br.id
+        WHERE rvs.run_id = $1
+        """
+        if rule_id is not None:
+            query += " AND rvs.rule_id = $2"
+            params.append(rule_id)
+        query += " ORDER BY rvs.violation_count DESC"
+
+        try:
+            results = await execute_query(query, *params)
+            return [dict(row) for row in results]
+        except Exception as e:
+            logger.error(f"Error fetching violation sets for run {run_id}: {str(e)}")
+            raise
+
     async def bulk_create_rules(self, rules: List[BusinessRuleCreate]) -> List[Dict[str, Any]]:
         """Create multiple business rules in a transaction."""
         if not rules:
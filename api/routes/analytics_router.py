@@ -16,6 +16,8 @@ from repositories.business_rules_repository import BusinessRulesRepository
 from repositories.monitoring_repository import MonitoringRepository
 from services.analytics_service import (
     get_data_profile, 
+    get_profile_summary,
+    get_profile_report,
     detect_anomalies,
     query_vector_database,
     create_vector_embeddings,
@@ -27,10 +29,12 @@ from services.business_rules_service import (
     create_rule,
     update_rule,
     delete_rule,
-    validate_rules,
-    generate_rules
+    generate_rules,
+    BusinessRulesService,
+    get_business_rules_service
 )
 from routes.auth_router import get_current_user_or_api_key
+from utils.file_utils import load_dataset_to_dataframe
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -97,6 +101,42 @@ async def profile_dataset(
         return await get_data_profile(dataset_id)
     return await get_cached_or_compute(redis, f"profile:{dataset_id}", compute)
 
+@router.get("/{dataset_id}/profile/summary")
+async def profile_dataset_summary(
+    dataset_id: int,
+    current_user = Depends(get_current_user_or_api_key),
+    dataset_repo = Depends(get_dataset_repository)
+):
+    """Return summary statistics at once; the full profile report builds in the background."""
+    dataset = await dataset_repo.get_dataset(dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if dataset.user_id and dataset.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized to access this dataset")
+    try:
+        return await get_profile_summary(dataset_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/{dataset_id}/profile/report/{report_id}")
+async def profile_dataset_report(
+    dataset_id: int,
+    report_id: str,
+    current_user = Depends(get_current_user_or_api_key),
+    dataset_repo = Depends(get_dataset_repository)
+):
+    """Return the status of a background profile report, with the report once complete."""
+    dataset = await dataset_repo.get_dataset(dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if dataset.user_id and dataset.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized to access this dataset")
+    # Reports not started for this dataset (or forgotten since) are not found
+    report = await get_profile_report(dataset_id, report_id)
+    if report["status"] == "unknown":
+        raise HTTPException(status_code=404, detail="Profile report not found")
+    return report
+
 @router.post("/{dataset_id}/process")
 async def process_dataset_data(
     dataset_id: int,
@@ -296,8 +336,10 @@ async def delete_dataset_rule(
 async def validate_dataset_rules(
     dataset_id: int,
     rule_ids: List[int] = Body(None),
+    fail_fast: bool = Query(False, description="Run rules one at a time in cost order and stop at the first failing high-severity rule"),
     current_user = Depends(get_current_user_or_api_key),
-    dataset_repo = Depends(get_dataset_repository)
+    dataset_repo = Depends(get_dataset_repository),
+    business_rules_service: BusinessRulesService = Depends(get_business_rules_service)
 ):
     """Validate business rules against a dataset."""
     # Check dataset exists and user has access
@@ -308,12 +350,125 @@ async def validate_dataset_rules(
     if dataset.user_id and dataset.user_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized to access this dataset")
     
-    # Validate rules
-    result = await validate_rules(dataset_id, rule_ids)
-    if not result["success"]:
-        raise HTTPException(status_code=500, detail=result["error"])
-    
-    return result
+    # Validate rules; "success" is False when any rule fails
+    try:
+        df = await load_dataset_to_dataframe(dataset)
+        return await business_rules_service.execute_rules(dataset_id, df, rule_ids=rule_ids, fail_fast=fail_fast)
+    except Exception as e:
+        logger.error(f"Failed to validate rules: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to validate rules: {str(e)}")
+
+@router.get("/{dataset_id}/rules/stats")
+async def get_dataset_rule_stats(
+    dataset_id: int,
+    slow_threshold: float = Query(1.0, ge=0, description="Mean execution time in seconds above which a rule is flagged as slow"),
+    current_user = Depends(get_current_user_or_api_key),
+    dataset_repo = Depends(get_dataset_repository),
+    business_rules_service: BusinessRulesService = Depends(get_business_rules_service)
+):
+    """Get per-rule execution cost statistics (mean time, rows/sec, selectivity)."""
+    # Check dataset exists and user has access
+    dataset = await dataset_repo.get_dataset(dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    if dataset.user_id and dataset.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized to access this dataset")
+
+    try:
+        stats = await business_rules_service.get_rule_stats(dataset_id)
+    except Exception as e:
+        logger.error(f"Failed to get rule statistics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get rule statistics: {str(e)}")
+
+    for rule_stats in stats:
+        rule_stats["slow"] = rule_stats["mean_time"] > slow_threshold
+
+    return {
+        "success": True,
+        "dataset_id": dataset_id,
+        "rules": stats,
+        "slow_rules": [s["rule_id"] for s in stats if s["slow"]]
+    }
+
+@router.get("/{dataset_id}/rules/runs/{run_id}/violations")
+async def get_rule_run_violations(
+    dataset_id: int,
+    run_id: str,
+    current_user = Depends(get_current_user_or_api_key),
+    dataset_repo = Depends(get_dataset_repository),
+    business_rules_service: BusinessRulesService = Depends(get_business_rules_service)
+):
+    """Get per-rule violation counts for a rule run without materializing any rows."""
+    # Check dataset exists and user has access
+    dataset = await dataset_repo.get_dataset(dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    if dataset.user_id and dataset.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized to access this dataset")
+
+    try:
+        run = await business_rules_service.get_violation_run(run_id)
+    except Exception as e:
+        logger.error(f"Failed to get rule violations: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get rule violations: {str(e)}")
+
+    # Run IDs are only served under the dataset the run was made on
+    if run is None or not run.belongs_to(dataset_id):
+        raise HTTPException(status_code=404, detail="Rule run not found")
+
+    return {
+        "success": True,
+        "dataset_id": dataset_id,
+        **run.summary()
+    }
+
+@router.get("/{dataset_id}/rules/runs/{run_id}/violations/{rule_id}")
+async def get_rule_violations_page(
+    dataset_id: int,
+    run_id: str,
+    rule_id: str,
+    offset: int = Query(0, ge=0, description="Number of violating rows to skip"),
+    limit: int = Query(100, ge=1, le=10000, description="Maximum number of violating rows to return"),
+    columns: Optional[List[str]] = Query(None, description="Columns to include with each violating row"),
+    current_user = Depends(get_current_user_or_api_key),
+    dataset_repo = Depends(get_dataset_repository),
+    business_rules_service: BusinessRulesService = Depends(get_business_rules_service)
+):
+    """Page through the violating rows of one rule, optionally with projected row values."""
+    # Check dataset exists and user has access
+    dataset = await dataset_repo.get_dataset(dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    if dataset.user_id and dataset.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized to access this dataset")
+
+    try:
+        run = await business_rules_service.get_violation_run(run_id)
+    except Exception as e:
+        logger.error(f"Failed to get rule violations: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get rule violations: {str(e)}")
+
+    if run is None or not run.belongs_to(dataset_id) or rule_id not in run.violation_sets:
+        raise HTTPException(status_code=404, detail="Rule violations not found")
+
+    # Row values are only loaded when requested, and only the requested columns are returned
+    data = None
+    if columns:
+        df = await load_dataset_to_dataframe(dataset)
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(missing)}")
+        data = df[columns]
+
+    return {
+        "success": True,
+        "dataset_id": dataset_id,
+        "rule_id": rule_id,
+        **run.page(rule_id, offset=offset, limit=limit, data=data)
+    }
 
 @router.post("/{dataset_id}/rules/generate")
 async def generate_dataset_rules(
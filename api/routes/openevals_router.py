@@ -8,14 +8,10 @@ from datetime import datetime
 # Import services
 from ..services.openevals_service import openevals_service, EvalType, EvalStatus
 from ..services.dataset_processor import get_dataset, process_dataset
-from ..services.business_rules_service import BusinessRulesService
 
 # Create router
 router = APIRouter(prefix="/openevals", tags=["OpenEvals"])
 
-# Initialize services
-business_rules_service = BusinessRulesService()
-
 @router.post("/business-rules/evaluate/{dataset_id}")
 async def evaluate_business_rules(dataset_id: str):
     """
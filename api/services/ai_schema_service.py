@@ -6,18 +6,28 @@ This service uses AI techniques to automatically detect and infer
 schema information from data, including data types, constraints, 
 and relationships between fields.
 """
+import asyncio
 import json
 import logging
+import os
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 from pydantic import BaseModel
 from datetime import datetime
 import re
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from functools import lru_cache
 
 # Import the cache service for performance optimization
 from services.cache_service import get_cached_response, cache_response
+from src.api.python.fingerprint import fingerprint_columns, fingerprint_dataframe, result_cache
+from src.api.python.dataset_stats import DatasetStats, dataset_stats
+from src.api.python.sampling import dataset_sampler
+from src.api.python.relationship_discovery import relationship_engine
+from src.api.python.schema_registry import schema_registry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -45,6 +55,18 @@ class AISchemaDetector:
             "relationship": 0.80,
             "validation_rule": 0.70
         }
+        
+        # Column analysis runs on a process pool for wide tables
+        self.parallel = {
+            "n_jobs": None,  # Worker processes (None or -1 for all CPUs, 1 for serial)
+            "min_columns": 32,  # Analyze columns in a thread below this many columns
+            "columns_per_task": 8  # Columns sent to a worker at a time
+        }
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        
+        # Seed of the row samples schemas are detected from, so detection is reproducible
+        self.sample_seed = 0
     
     @lru_cache(maxsize=100)
     async def detect_schema(self, dataset_id: str, sample_size: int = 1000) -> Dict[str, Any]:
@@ -76,32 +98,37 @@ class AISchemaDetector:
             else:
                 df = data
             
-            # Detect schema using multiple techniques
-            column_schemas = {}
-            relationships = []
-            
-            # Process each column
-            for column in df.columns:
-                column_schema = await self._analyze_column(df[column])
-                column_schemas[column] = column_schema
+            # Compare the upload with the stored schema of its lineage (earlier uploads of the same feed)
+            column_fingerprints = fingerprint_columns(df)
+            fingerprint = fingerprint_dataframe(df, column_fingerprints)
+            lineage = self._dataset_lineage(dataset_id)
+            profiles = await asyncio.to_thread(schema_registry.profile, df, lineage, column_fingerprints)
+            drift = schema_registry.check(lineage, profiles)
             
-            # Detect relationships between columns
-            relationships = await self._detect_relationships(df)
+            # Reuse the analysis of identical data
+            analysis = result_cache.get(fingerprint, "schema_detection", self.confidence_thresholds)
+            if analysis is None:
+                # Only columns that drifted, changed type or are new are detected again
+                stored = schema_registry.get(lineage)
+                analyze = schema_registry.columns_to_analyze(lineage, drift, list(df.columns))
+                reuse = {column: stored["columns"][str(column)] for column in df.columns if column not in analyze} \
+                    if stored else {}
+                analysis = await self._analyze_dataframe(df, dataset_stats.get(df, fingerprint), reuse)
+                result_cache.put(fingerprint, "schema_detection", analysis, self.confidence_thresholds)
+            schema_registry.register(lineage, fingerprint, profiles, analysis["columns"], drift)
             
             # Build final schema
             schema = {
                 "dataset_id": dataset_id,
                 "analysis_timestamp": datetime.now().isoformat(),
-                "columns": column_schemas,
-                "relationships": relationships,
-                "row_count": len(df),
-                "meta": {
-                    "ai_confidence": self._calculate_overall_confidence(column_schemas),
-                    "suggested_indices": await self._suggest_indices(df, column_schemas),
-                    "data_quality_score": await self._calculate_data_quality(df, column_schemas)
-                }
+                **analysis,
+                "drift": drift
             }
             
+            # Foreign keys from the stored column signatures of all datasets (not cached with the
+            # analysis, since they change as datasets are uploaded)
+            schema["relationships"] = analysis["relationships"] + self._stored_relationships(dataset_id)
+            
             # Cache for future use (30 minutes)
             cache_response(cache_key, schema, 1800)
             
@@ -111,12 +138,136 @@ class AISchemaDetector:
             logger.error(f"Error detecting schema for dataset {dataset_id}: {str(e)}")
             raise
     
+    async def _analyze_dataframe(self, df: pd.DataFrame, stats: Optional[DatasetStats] = None,
+                                 reuse: Optional[Dict[Any, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Detect column schemas, relationships and metadata of a DataFrame
+        
+        Args:
+            df: DataFrame to analyze
+            stats: Its shared column statistics
+            reuse: Stored schemas of columns that have not drifted; only their
+                null and unique counts are recomputed
+        """
+        # Column statistics are shared with the other analyzers of the same data
+        if stats is None:
+            stats = dataset_stats.get(df)
+        reuse = reuse or {}
+        analyze = [column for column in df.columns if column not in reuse]
+        
+        # Detect column schemas and relationships between columns together, off the event loop
+        analyzed, relationships = await asyncio.gather(
+            self._analyze_columns_async(df[analyze], stats),
+            asyncio.to_thread(self._detect_relationships, df, stats)
+        )
+        column_schemas = {
+            column: analyzed[column] if column in analyzed else self._reuse_column_schema(reuse[column], column, stats, len(df))
+            for column in df.columns
+        }
+        
+        return {
+            "columns": column_schemas,
+            "relationships": relationships,
+            "row_count": len(df),
+            "meta": {
+                "ai_confidence": self._calculate_overall_confidence(column_schemas),
+                "suggested_indices": await self._suggest_indices(df, column_schemas),
+                "data_quality_score": await self._calculate_data_quality(df, column_schemas, stats)
+            }
+        }
+    
+    def _parallel_jobs(self, df: pd.DataFrame) -> int:
+        """Number of worker processes to analyze columns with (1 means a single thread)"""
+        n_jobs = self.parallel.get("n_jobs")
+        if n_jobs is None or n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        if len(df.columns) < self.parallel.get("min_columns", 32):
+            return 1
+        n_tasks = -(-len(df.columns) // max(1, self.parallel.get("columns_per_task", 8)))
+        return max(1, min(n_jobs, n_tasks))
+    
+    def _get_pool(self, n_jobs: int) -> ProcessPoolExecutor:
+        """Worker pool kept between calls, recreated when more workers are needed"""
+        if self._pool is None or self._pool_workers < n_jobs:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+            self._pool = ProcessPoolExecutor(max_workers=n_jobs)
+            self._pool_workers = n_jobs
+        return self._pool
+    
+    async def _analyze_columns_async(self, df: pd.DataFrame, stats: DatasetStats) -> Dict[str, Any]:
+        """
+        Analyze all columns without blocking the event loop
+        
+        Narrow tables are analyzed in a thread, with the shared statistics.
+        Wide tables are split into batches of columns analyzed by a process
+        pool, and the batches are awaited together; the schemas are merged
+        in column order.
+        """
+        n_jobs = self._parallel_jobs(df)
+        if n_jobs > 1:
+            step = max(1, self.parallel.get("columns_per_task", 8))
+            loop = asyncio.get_running_loop()
+            try:
+                pool = self._get_pool(n_jobs)
+                batches = await asyncio.gather(*[
+                    loop.run_in_executor(pool, _analyze_column_batch, df.iloc[:, start:start + step])
+                    for start in range(0, len(df.columns), step)
+                ])
+                return {column: schema for batch in batches for column, schema in batch.items()}
+            except BrokenProcessPool as e:
+                logger.warning(f"Column analysis pool failed, analyzing in a thread: {str(e)}")
+                self._pool = None
+        return await asyncio.to_thread(self._analyze_columns, df, stats)
+    
+    def _analyze_columns(self, df: pd.DataFrame, stats: Optional[DatasetStats] = None) -> Dict[str, Any]:
+        """Schema of each column of a DataFrame"""
+        if stats is None:
+            stats = DatasetStats(df)
+        return {column: self._analyze_column(df[column], stats) for column in df.columns}
+    
+    def _reuse_column_schema(self, schema: Dict[str, Any], column: Any, stats: DatasetStats,
+                             total_values: int) -> Dict[str, Any]:
+        """Stored schema of a column that has not drifted, with its counts taken from the new data"""
+        schema = copy.deepcopy(schema)
+        null_count = stats.null_count(column)
+        schema.update({
+            "nullable": null_count > 0,
+            "null_count": null_count,
+            "null_percentage": (null_count / total_values * 100) if total_values > 0 else 0,
+            "unique_count": stats.unique_count(column)
+        })
+        return schema
+    
+    def _dataset_lineage(self, dataset_id: str) -> str:
+        """Lineage of a dataset (the feed its uploads belong to), from the dataset metadata"""
+        try:
+            from services.dataset_processor import dataset_metadata
+        except ImportError:
+            return dataset_id
+        return dataset_metadata.get(dataset_id, {}).get("lineage") or dataset_id
+    
+    def _dataset_file(self, dataset_id: str) -> Optional[str]:
+        """Path of a stored dataset's file, from the dataset metadata"""
+        try:
+            from services.dataset_processor import dataset_metadata
+        except ImportError:
+            return None
+        file_path = dataset_metadata.get(dataset_id, {}).get("file_path")
+        return file_path if file_path and os.path.isfile(file_path) else None
+    
     async def _load_dataset(self, dataset_id: str, sample_size: int = 1000) -> pd.DataFrame:
-        """Load dataset from storage (mock implementation)"""
-        # In production, this would connect to your actual data storage
+        """
+        Load a seeded random sample of a dataset's rows
+        
+        Stored datasets are sampled in one streaming pass, keeping only the
+        sample in memory; Parquet files are sampled by row group without
+        reading the whole file. Unknown datasets fall back to mock data.
+        """
         try:
-            # This is a mock implementation
-            # In production, you would retrieve data from database/file storage
+            file_path = self._dataset_file(dataset_id)
+            if file_path is not None:
+                return await asyncio.to_thread(dataset_sampler.sample_file, file_path, sample_size, self.sample_seed)
             
             # Mock datasets
             if dataset_id == "ds001":
@@ -161,7 +312,7 @@ class AISchemaDetector:
             logger.error(f"Error loading dataset {dataset_id}: {str(e)}")
             raise
     
-    async def _analyze_column(self, series: pd.Series) -> Dict[str, Any]:
+    def _analyze_column(self, series: pd.Series, stats: Optional[DatasetStats] = None) -> Dict[str, Any]:
         """
         Analyze a single column using AI techniques to determine its schema
         
@@ -171,10 +322,12 @@ class AISchemaDetector:
         - Outlier detection for constraint suggestion
         """
         # Calculate basic statistics
-        non_null_values = series.dropna()
+        if stats is None:
+            stats = DatasetStats(series.to_frame(name=series.name))
+        non_null_values = stats.non_null(series.name)
         total_values = len(series)
         non_null_count = len(non_null_values)
-        null_count = total_values - non_null_count
+        null_count = stats.null_count(series.name)
         null_percentage = (null_count / total_values * 100) if total_values > 0 else 0
         
         # Detect sample values
@@ -185,25 +338,25 @@ class AISchemaDetector:
             "nullable": null_count > 0,
             "null_count": null_count,
             "null_percentage": null_percentage,
-            "unique_count": non_null_values.nunique(),
+            "unique_count": stats.unique_count(series.name),
             "sample_values": sample_values,
         }
         
         # Infer data type with confidence score
-        data_type_info = await self._infer_data_type(non_null_values)
+        data_type_info = self._infer_data_type(non_null_values)
         column_schema.update(data_type_info)
         
         # Detect constraints based on data
-        constraints = await self._detect_constraints(non_null_values, data_type_info["data_type"])
+        constraints = self._detect_constraints(non_null_values, data_type_info["data_type"], stats)
         column_schema["constraints"] = constraints
         
         # Generate validation rules
-        rules = await self._generate_validation_rules(series, data_type_info["data_type"], constraints)
+        rules = self._generate_validation_rules(series, data_type_info["data_type"], constraints)
         column_schema["validation_rules"] = rules
         
         return column_schema
     
-    async def _infer_data_type(self, series: pd.Series) -> Dict[str, Any]:
+    def _infer_data_type(self, series: pd.Series) -> Dict[str, Any]:
         """
         Use AI techniques to infer the most likely data type for a series
         
@@ -286,9 +439,10 @@ class AISchemaDetector:
         # Default to string
         return {"data_type": "string", "data_type_confidence": 0.7}
     
-    async def _detect_constraints(self, series: pd.Series, data_type: str) -> Dict[str, Any]:
+    def _detect_constraints(self, series: pd.Series, data_type: str,
+                            stats: Optional[DatasetStats] = None) -> Dict[str, Any]:
         """
-        Detect constraints for a column based on its data
+        Detect constraints for a column based on its non-null values
         """
         constraints = {}
         
@@ -297,7 +451,7 @@ class AISchemaDetector:
             return constraints
             
         # Calculate unique values
-        unique_values = series.nunique()
+        unique_values = stats.unique_count(series.name) if stats is not None else series.nunique()
         total_values = len(series)
         
         # Check if values should be unique (like IDs)
@@ -307,8 +461,13 @@ class AISchemaDetector:
         
         if data_type in ["integer", "number"]:
             # Get min/max values
-            constraints["min"] = float(series.min())
-            constraints["max"] = float(series.max())
+            if stats is not None and series.dtype.kind in "iuf":
+                moments = stats.moments(series.name)
+                constraints["min"] = float(moments["min"])
+                constraints["max"] = float(moments["max"])
+            else:
+                constraints["min"] = float(series.min())
+                constraints["max"] = float(series.max())
             
             # Check if values are within common ranges
             if constraints["min"] >= 0 and constraints["max"] <= 100:
@@ -347,7 +506,7 @@ class AISchemaDetector:
         
         return constraints
     
-    async def _detect_relationships(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _detect_relationships(self, df: pd.DataFrame, stats: Optional[DatasetStats] = None) -> List[Dict[str, Any]]:
         """
         Detect potential relationships between columns
         
@@ -385,28 +544,54 @@ class AISchemaDetector:
                     })
         
         # Check for numerical correlations
-        numeric_df = df.select_dtypes(include=['number'])
-        if numeric_df.shape[1] >= 2:
+        if stats is None:
+            stats = dataset_stats.get(df)
+        if len(stats.numeric_columns()) >= 2:
             try:
-                corr_matrix = numeric_df.corr()
+                corr_matrix = stats.correlation()
                 
-                # Find highly correlated columns
-                for i in range(corr_matrix.shape[0]):
-                    for j in range(i+1, corr_matrix.shape[1]):
-                        if abs(corr_matrix.iloc[i, j]) > 0.8:
-                            relationships.append({
-                                "type": "correlation",
-                                "columns": [corr_matrix.index[i], corr_matrix.columns[j]],
-                                "correlation": float(corr_matrix.iloc[i, j]),
-                                "confidence": abs(float(corr_matrix.iloc[i, j])),
-                                "description": f"Strong correlation between {corr_matrix.index[i]} and {corr_matrix.columns[j]}"
-                            })
+                # Find highly correlated columns (upper triangle, row by row)
+                values = corr_matrix.to_numpy()
+                rows, cols = np.triu_indices(values.shape[0], k=1)
+                with np.errstate(invalid="ignore"):
+                    strong = np.abs(values[rows, cols]) > 0.8
+                for i, j in zip(rows[strong], cols[strong]):
+                    relationships.append({
+                        "type": "correlation",
+                        "columns": [corr_matrix.index[i], corr_matrix.columns[j]],
+                        "correlation": float(values[i, j]),
+                        "confidence": abs(float(values[i, j])),
+                        "description": f"Strong correlation between {corr_matrix.index[i]} and {corr_matrix.columns[j]}"
+                    })
             except Exception as e:
                 logger.warning(f"Error calculating correlations: {str(e)}")
         
         return relationships
     
-    async def _calculate_data_quality(self, df: pd.DataFrame, column_schemas: Dict[str, Any]) -> float:
+    def _stored_relationships(self, dataset_id: str) -> List[Dict[str, Any]]:
+        """
+        Inclusion dependencies of a stored dataset with itself and other stored datasets
+        
+        Found from column signatures computed on the full data at upload, so
+        they hold for all rows rather than the sample the schema is detected from.
+        """
+        relationships = []
+        for dependency in relationship_engine.discover(dataset_id):
+            dependent, referenced = dependency["dependent"], dependency["referenced"]
+            relationships.append({
+                "type": "inclusion_dependency",
+                "columns": [dependent["column"], referenced["column"]],
+                "dependent_dataset": dependent["dataset_id"],
+                "referenced_dataset": referenced["dataset_id"],
+                "containment": dependency["containment"],
+                "confidence": dependency["confidence"],
+                "description": f"Values of {dependent['dataset_id']}.{dependent['column']} are contained in "
+                               f"key {referenced['dataset_id']}.{referenced['column']} (foreign key candidate)"
+            })
+        return relationships
+    
+    async def _calculate_data_quality(self, df: pd.DataFrame, column_schemas: Dict[str, Any],
+                                      stats: Optional[DatasetStats] = None) -> float:
         """
         Calculate overall data quality score using AI-based heuristics
         
@@ -440,17 +625,19 @@ class AISchemaDetector:
         
         quality_factors["validity"] = sum(validity_scores) / len(validity_scores) if validity_scores else 0.5
         
+        if stats is None:
+            stats = dataset_stats.get(df)
+        
         # Calculate consistency (based on outliers)
         consistency_scores = []
         for col in df.columns:
             if df[col].dtype.kind in 'ifc':  # integer, float, complex
                 try:
-                    q1 = df[col].quantile(0.25)
-                    q3 = df[col].quantile(0.75)
+                    q1, q3 = stats.quantiles(col, [0.25, 0.75])
                     iqr = q3 - q1
                     lower_bound = q1 - 1.5 * iqr
                     upper_bound = q3 + 1.5 * iqr
-                    outliers = ((df[col] < lower_bound) | (df[col] > upper_bound)).mean()
+                    outliers = stats.count_outside(col, lower_bound, upper_bound) / len(df)
                     consistency_scores.append(1 - outliers)
                 except:
                     consistency_scores.append(0.5)  # Default if calculation fails
@@ -461,7 +648,7 @@ class AISchemaDetector:
         uniqueness_scores = []
         for col, schema in column_schemas.items():
             if schema.get("constraints", {}).get("unique", False):
-                unique_ratio = df[col].nunique() / len(df)
+                unique_ratio = stats.unique_count(col) / len(df)
                 uniqueness_scores.append(unique_ratio)
         
         quality_factors["uniqueness"] = sum(uniqueness_scores) / len(uniqueness_scores) if uniqueness_scores else 0.5
@@ -477,7 +664,7 @@ class AISchemaDetector:
         weighted_score = sum(score * weights[factor] for factor, score in quality_factors.items())
         return round(weighted_score * 100) / 100  # Round to 2 decimal places
     
-    async def _generate_validation_rules(self, series: pd.Series, data_type: str, constraints: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _generate_validation_rules(self, series: pd.Series, data_type: str, constraints: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Use AI to generate validation rules based on detected patterns
         """
@@ -635,6 +822,10 @@ class AISchemaDetector:
 # Initialize the AI schema detector service
 ai_schema_detector = AISchemaDetector()
 
+def _analyze_column_batch(columns: pd.DataFrame) -> Dict[str, Any]:
+    """Schemas of a batch of columns; runs in a worker process"""
+    return ai_schema_detector._analyze_columns(columns)
+
 # API function to detect schema
 async def detect_schema(dataset_id: str, sample_size: int = 1000) -> Dict[str, Any]:
     """
@@ -649,6 +840,19 @@ async def detect_schema(dataset_id: str, sample_size: int = 1000) -> Dict[str, A
     """
     return await ai_schema_detector.detect_schema(dataset_id, sample_size)
 
+# API function to get the drift reports of a dataset lineage
+def get_schema_drift(lineage: str) -> List[Dict[str, Any]]:
+    """
+    Drift reports of a dataset lineage, oldest first
+    
+    Args:
+        lineage: Lineage given when its datasets were processed (by default the dataset ID)
+        
+    Returns:
+        Reports of the uploads that differed from the previous one
+    """
+    return schema_registry.reports(lineage)
+
 # API function to validate data against detected schema
 async def validate_with_ai_schema(dataset_id: str, data: Any) -> Dict[str, Any]:
     """
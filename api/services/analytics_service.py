@@ -20,6 +20,11 @@ from repositories.business_rules_repository import BusinessRulesRepository
 from models.dataset import Dataset, DatasetDetail
 from config.settings import get_settings
 from utils.file_utils import load_dataset_to_dataframe
+from src.api.python.profiling_engine import profiling_engine
+from src.api.python.data_profiling import data_profiler
+from src.api.python.fingerprint import fingerprint_dataframe
+from src.api.python.model_store import FittedModel, anomaly_model_store, resolved_params, warm_start_forest
+from src.api.python.anomaly_scoring import AnomalyScorer, rank
 
 # Optional imports for advanced analytics
 try:
@@ -47,6 +52,9 @@ logger = logging.getLogger(__name__)
 if settings.OPENAI_API_KEY:
     openai.api_key = settings.OPENAI_API_KEY
 
+# Fitted anomaly models are kept on disk and reused for unchanged datasets
+anomaly_model_store.load(os.path.join(os.path.dirname(__file__), '..', 'data', 'models'))
+
 async def get_data_profile(dataset_id: int) -> Dict[str, Any]:
     """
     Get or generate a data profile for a dataset.
@@ -94,161 +102,45 @@ async def get_data_profile(dataset_id: int) -> Dict[str, Any]:
         return _get_mock_profile_data()
 
 async def _generate_data_profile(df: pd.DataFrame) -> Dict[str, Any]:
-    """Generate a data profile from a DataFrame."""
+    """Generate a data profile from a DataFrame (cached by data fingerprint)."""
     try:
-        # Calculate basic statistics
-        row_count = len(df)
-        column_count = len(df.columns)
-        missing_cells = df.isna().sum().sum()
-        missing_cells_pct = (missing_cells / (row_count * column_count) * 100) if row_count * column_count > 0 else 0
-        duplicate_rows = df.duplicated().sum()
-        duplicate_rows_pct = (duplicate_rows / row_count * 100) if row_count > 0 else 0
-        
-        # Memory usage
-        memory_usage = df.memory_usage(deep=True).sum()
-        
-        # Create summary
-        summary = {
-            "row_count": int(row_count),
-            "column_count": int(column_count),
-            "missing_cells": int(missing_cells),
-            "missing_cells_pct": float(missing_cells_pct),
-            "duplicate_rows": int(duplicate_rows),
-            "duplicate_rows_pct": float(duplicate_rows_pct),
-            "memory_usage": int(memory_usage)
-        }
-        
-        # Generate detailed profile
-        variables = {}
-        for column in df.columns:
-            col_data = df[column]
-            col_type = _infer_column_type(col_data)
-            
-            # Base stats
-            col_stats = {
-                "type": col_type,
-                "count": int(len(col_data)),
-                "n_missing": int(col_data.isna().sum()),
-                "n_unique": int(col_data.nunique()),
-                "n": int(len(col_data))
-            }
-            
-            # Type-specific stats
-            if col_type == "numeric":
-                col_stats.update({
-                    "mean": float(col_data.mean()) if not pd.isna(col_data.mean()) else None,
-                    "std": float(col_data.std()) if not pd.isna(col_data.std()) else None,
-                    "min": float(col_data.min()) if not pd.isna(col_data.min()) else None,
-                    "max": float(col_data.max()) if not pd.isna(col_data.max()) else None
-                })
-                
-                # Create histogram for numeric data
-                try:
-                    hist_data = []
-                    hist, bin_edges = np.histogram(col_data.dropna(), bins=6)
-                    for i in range(len(hist)):
-                        bin_label = f"{bin_edges[i]:.1f}-{bin_edges[i+1]:.1f}"
-                        hist_data.append({"bin": bin_label, "count": int(hist[i])})
-                    col_stats["histogram_data"] = hist_data
-                except Exception as e:
-                    logger.warning(f"Could not create histogram for {column}: {str(e)}")
-                    
-            elif col_type == "categorical":
-                # Value counts for categorical data
-                try:
-                    value_counts = col_data.value_counts().head(10).to_dict()
-                    # Convert keys to strings for JSON compatibility
-                    value_counts = {str(k): int(v) for k, v in value_counts.items()}
-                    col_stats["value_counts"] = value_counts
-                except Exception as e:
-                    logger.warning(f"Could not calculate value counts for {column}: {str(e)}")
-            
-            variables[column] = col_stats
-        
-        # Calculate correlations for numeric columns
-        correlations = {}
-        numeric_columns = df.select_dtypes(include=['number']).columns
-        if len(numeric_columns) >= 2:
-            try:
-                # Pearson correlation
-                pearson_corr = df[numeric_columns].corr(method='pearson')
-                pearson_dict = {}
-                
-                # Extract top correlations
-                for i in range(len(numeric_columns)):
-                    for j in range(i+1, len(numeric_columns)):
-                        col1 = numeric_columns[i]
-                        col2 = numeric_columns[j]
-                        corr_value = pearson_corr.iloc[i, j]
-                        if abs(corr_value) >= 0.5:  # Only include strong correlations
-                            key = f"{col1}_{col2}"
-                            pearson_dict[key] = float(corr_value)
-                
-                correlations["pearson"] = pearson_dict
-                
-                # Spearman correlation (rank correlation)
-                spearman_corr = df[numeric_columns].corr(method='spearman')
-                spearman_dict = {}
-                
-                for i in range(len(numeric_columns)):
-                    for j in range(i+1, len(numeric_columns)):
-                        col1 = numeric_columns[i]
-                        col2 = numeric_columns[j]
-                        corr_value = spearman_corr.iloc[i, j]
-                        if abs(corr_value) >= 0.5:  # Only include strong correlations
-                            key = f"{col1}_{col2}"
-                            spearman_dict[key] = float(corr_value)
-                
-                correlations["spearman"] = spearman_dict
-            except Exception as e:
-                logger.warning(f"Could not calculate correlations: {str(e)}")
-        
-        # Create detailed profile
-        detailed_profile = {
-            "table": {
-                "n": int(row_count),
-                "n_var": int(column_count),
-                "n_cells_missing": int(missing_cells),
-                "n_cells_total": int(row_count * column_count),
-                "n_duplicates": int(duplicate_rows),
-                "types": _count_column_types(variables)
-            },
-            "variables": variables,
-            "correlations": correlations
-        }
-        
-        return {
-            "summary": summary,
-            "detailed_profile": detailed_profile
-        }
-        
+        return profiling_engine.profile(df)
     except Exception as e:
         logger.error(f"Error generating data profile: {str(e)}")
         raise
 
-def _infer_column_type(column_data: pd.Series) -> str:
-    """Infer the type of a DataFrame column."""
-    if pd.api.types.is_numeric_dtype(column_data):
-        return "numeric"
-    elif pd.api.types.is_datetime64_dtype(column_data):
-        return "date"
-    elif pd.api.types.is_bool_dtype(column_data):
-        return "boolean"
-    else:
-        # Check if it might be a categorical with few unique values
-        if column_data.nunique() / len(column_data) < 0.05 and column_data.nunique() < 20:
-            return "categorical"
-        return "categorical"
+async def get_profile_summary(dataset_id: int) -> Dict[str, Any]:
+    """
+    Get a dataset's summary statistics at once, building its full
+    ydata-profiling report in the background.
+    
+    Args:
+        dataset_id: ID of the dataset to profile
+        
+    Returns:
+        Dictionary with the summary and the report's ID and status
+    """
+    dataset = await dataset_repo.get_dataset_detail(dataset_id)
+    if not dataset:
+        logger.error(f"Dataset {dataset_id} not found")
+        raise ValueError(f"Dataset {dataset_id} not found")
+    
+    df = await load_dataset_to_dataframe(dataset)
+    return data_profiler.profile_summary(df, dataset_id)
 
-def _count_column_types(variables: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
-    """Count the number of columns of each type."""
-    type_counts = {}
-    for col_name, col_stats in variables.items():
-        col_type = col_stats["type"]
-        if col_type not in type_counts:
-            type_counts[col_type] = 0
-        type_counts[col_type] += 1
-    return type_counts
+async def get_profile_report(dataset_id: int, report_id: str) -> Dict[str, Any]:
+    """
+    Get the status of a report started by get_profile_summary, with the report once complete.
+    
+    Args:
+        dataset_id: ID of the dataset the report was started for
+        report_id: Report ID returned by get_profile_summary
+        
+    Returns:
+        Dictionary with the report's status and, when complete, the report;
+        reports of other datasets are unknown
+    """
+    return data_profiler.report_status(report_id, dataset_id=dataset_id)
 
 async def detect_anomalies(dataset_id: int, config: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -256,7 +148,11 @@ async def detect_anomalies(dataset_id: int, config: Dict[str, Any] = None) -> Di
     
     Args:
         dataset_id: ID of the dataset to analyze
-        config: Configuration for anomaly detection
+        config: Configuration for anomaly detection: "method", "params" and
+            "refit", which says what to do when the dataset has changed since
+            its last model was fitted: "full" fits a new model (the default),
+            "warm_start" extends the last isolation forest with trees fitted on
+            the new data, "none" scores the new data with the last model
         
     Returns:
         Dictionary containing anomaly detection results
@@ -282,19 +178,21 @@ async def detect_anomalies(dataset_id: int, config: Dict[str, Any] = None) -> Di
         # Select method
         method = config.get("method", "isolation_forest").lower()
         params = config.get("params", {})
+        refit = config.get("refit", "full")
+        lineage = str(dataset_id)
         
         # Detect anomalies using the selected method
         if method == "isolation_forest":
-            results = await _detect_anomalies_isolation_forest(df, params)
+            results = await _detect_anomalies_isolation_forest(df, params, lineage, refit)
         elif method == "dbscan":
-            results = await _detect_anomalies_dbscan(df, params)
+            results = await _detect_anomalies_dbscan(df, params, lineage)
         elif method == "autoencoder":
             results = await _detect_anomalies_vector_based(df, method, params)
         elif method == "vector_comparison":
             results = await _detect_anomalies_vector_based(df, method, params)
         else:
             logger.warning(f"Unknown anomaly detection method: {method}, falling back to isolation_forest")
-            results = await _detect_anomalies_isolation_forest(df, params)
+            results = await _detect_anomalies_isolation_forest(df, params, lineage, refit)
         
         # Save results to database
         await analytics_repo.save_anomaly_detection_results(
@@ -317,7 +215,53 @@ async def detect_anomalies(dataset_id: int, config: Dict[str, Any] = None) -> Di
         # Return mock data for development/fallback
         return _get_mock_anomaly_data(config.get("method", "isolation_forest") if config else "isolation_forest")
 
-async def _detect_anomalies_isolation_forest(df: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+def _isolation_forest_model(numeric_df: pd.DataFrame, params: Dict[str, Any],
+                            lineage: Optional[str] = None, refit: str = "full") -> Any:
+    """
+    Isolation forest to score data with, fitted at most once per dataset version.
+    
+    A model fitted on identical data with the same parameters is reused.
+    Otherwise the lineage's last model is reused or extended as refit asks
+    (see detect_anomalies), or a new model is fitted; new models are stored.
+    """
+    n_estimators = params.get("n_estimators", 100)
+    forest = IsolationForest(
+        contamination=params.get("contamination", 0.05),
+        n_estimators=n_estimators,
+        random_state=params.get("random_state", 42),
+        n_jobs=-1
+    )
+    # Key by the resolved parameters: the anomaly detector defaults contamination differently
+    store_params = resolved_params(forest, params)
+    fingerprint = fingerprint_dataframe(numeric_df)
+    fitted = anomaly_model_store.get(fingerprint, "isolation_forest", store_params)
+    if fitted is not None:
+        return fitted.estimator
+    
+    previous = None
+    if lineage is not None and refit in ("warm_start", "none"):
+        previous = anomaly_model_store.latest(lineage, "isolation_forest", store_params)
+        if previous is not None and not previous.fits_columns(numeric_df.columns):
+            previous = None
+    if previous is not None and refit == "none":
+        return previous.estimator
+    
+    model = None
+    if previous is not None:
+        model = warm_start_forest(previous.estimator, numeric_df,
+                                  params.get("warm_start_estimators", max(1, n_estimators // 4)),
+                                  params.get("max_estimators", 2 * n_estimators))
+    if model is None:
+        model = forest
+        model.fit(numeric_df)
+    anomaly_model_store.put(
+        FittedModel("isolation_forest", store_params, model, numeric_df.columns, fingerprint, len(numeric_df)),
+        lineage
+    )
+    return model
+
+async def _detect_anomalies_isolation_forest(df: pd.DataFrame, params: Dict[str, Any],
+                                             lineage: Optional[str] = None, refit: str = "full") -> Dict[str, Any]:
     """Detect anomalies using Isolation Forest algorithm."""
     try:
         # Prepare data: select only numeric columns and drop rows with NaN values
@@ -330,18 +274,12 @@ async def _detect_anomalies_isolation_forest(df: pd.DataFrame, params: Dict[str,
         # Default parameters
         contamination = params.get("contamination", 0.05)
         n_estimators = params.get("n_estimators", 100)
-        random_state = params.get("random_state", 42)
-        
-        # Train Isolation Forest model
-        model = IsolationForest(
-            contamination=contamination,
-            n_estimators=n_estimators,
-            random_state=random_state,
-            n_jobs=-1
-        )
         
-        # Fit model and predict anomalies
-        y_pred = model.fit_predict(numeric_df)
+        # Fitted Isolation Forest model, reused when the data has not changed
+        model = _isolation_forest_model(numeric_df, params, lineage, refit)
+        
+        # Predict anomalies
+        y_pred = model.predict(numeric_df)
         scores = model.decision_function(numeric_df)
         
         # Convert predictions: -1 for anomaly, 1 for normal
@@ -357,39 +295,26 @@ async def _detect_anomalies_isolation_forest(df: pd.DataFrame, params: Dict[str,
             "inconsistentValues": 0
         }
         
-        # Detect specific anomaly types
-        for idx in anomaly_indices:
-            row = numeric_df.iloc[idx]
-            max_zscore = np.max(np.abs(row - numeric_df.mean()) / numeric_df.std())
-            
-            if max_zscore > 3:
-                anomaly_types["outliers"] += 1
-            else:
-                anomaly_types["inconsistentValues"] += 1
+        # Detect specific anomaly types from the most extreme column of every anomaly
+        scorer = AnomalyScorer(numeric_df)
+        max_zscore_columns, max_zscores = scorer.extreme_columns(anomaly_indices)
+        anomaly_types["outliers"] = int((max_zscores > 3).sum())
+        anomaly_types["inconsistentValues"] = anomaly_count - anomaly_types["outliers"]
         
-        # Get top anomalies
+        # Calculate anomaly scores (higher is more anomalous) for all anomalies
+        anomaly_scores = scores[anomaly_indices]
+        anomaly_scores = np.where(anomaly_scores <= 0, 1 - anomaly_scores / 2, 0.5 * (1 - anomaly_scores))
+        
+        # Get top anomalies by score
         top_anomalies = []
-        for i, idx in enumerate(anomaly_indices):
-            if i >= 10:  # Limit to top 10 anomalies
-                break
-                
-            row = df.iloc[idx]
-            row_dict = row.to_dict()
-            
-            # Find the column with the most extreme value
-            numeric_row = numeric_df.iloc[idx]
-            z_scores = np.abs(numeric_row - numeric_df.mean()) / numeric_df.std()
-            max_zscore_column = z_scores.idxmax()
-            
-            # Calculate anomaly score (0-1 range, higher is more anomalous)
-            anomaly_score = (1 - scores[idx] / 2) if scores[idx] <= 0 else 0.5 * (1 - scores[idx])
-            
+        for i in rank(anomaly_scores)[:10]:  # Limit to top 10 anomalies
+            idx = anomaly_indices[i]
             anomaly = {
                 "row": int(idx),
-                "column": max_zscore_column,
-                "value": float(row[max_zscore_column]),
-                "score": float(anomaly_score),
-                "reason": "Statistical outlier" if z_scores[max_zscore_column] > 3 else "Unusual value pattern"
+                "column": max_zscore_columns[i],
+                "value": scorer.value(idx, max_zscore_columns[i]),
+                "score": float(anomaly_scores[i]),
+                "reason": "Statistical outlier" if max_zscores[i] > 3 else "Unusual value pattern"
             }
             top_anomalies.append(anomaly)
         
@@ -406,7 +331,8 @@ async def _detect_anomalies_isolation_forest(df: pd.DataFrame, params: Dict[str,
         logger.error(f"Error in _detect_anomalies_isolation_forest: {str(e)}")
         raise
 
-async def _detect_anomalies_dbscan(df: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+async def _detect_anomalies_dbscan(df: pd.DataFrame, params: Dict[str, Any],
+                                   lineage: Optional[str] = None) -> Dict[str, Any]:
     """Detect anomalies using DBSCAN clustering algorithm."""
     try:
         # Prepare data: select only numeric columns and drop rows with NaN values
@@ -416,17 +342,29 @@ async def _detect_anomalies_dbscan(df: pd.DataFrame, params: Dict[str, Any]) ->
         
         numeric_df = numeric_df.dropna()
         
-        # Scale the data
-        scaler = StandardScaler()
-        scaled_data = scaler.fit_transform(numeric_df)
-        
         # Default parameters
         eps = params.get("eps", 0.5)
         min_samples = params.get("min_samples", 5)
         
-        # Fit DBSCAN model
-        model = DBSCAN(eps=eps, min_samples=min_samples)
-        clusters = model.fit_predict(scaled_data)
+        # Reuse the clustering of identical data; DBSCAN labels only the data it is fitted on
+        fingerprint = fingerprint_dataframe(numeric_df)
+        fitted = anomaly_model_store.get(fingerprint, "dbscan", params)
+        if fitted is not None:
+            scaler, model = fitted.scaler, fitted.estimator
+            scaled_data = scaler.transform(numeric_df)
+        else:
+            # Scale the data
+            scaler = StandardScaler()
+            scaled_data = scaler.fit_transform(numeric_df)
+            
+            # Fit DBSCAN model
+            model = DBSCAN(eps=eps, min_samples=min_samples)
+            model.fit(scaled_data)
+            anomaly_model_store.put(
+                FittedModel("dbscan", params, model, numeric_df.columns, fingerprint, len(numeric_df), scaler=scaler),
+                lineage
+            )
+        clusters = model.labels_
         
         # Points with cluster label -1 are considered anomalies in DBSCAN
         anomalies_mask = clusters == -1
@@ -440,35 +378,27 @@ async def _detect_anomalies_dbscan(df: pd.DataFrame, params: Dict[str, Any]) ->
             "clusterDeviations": 0
         }
         
-        # Get top anomalies
+        # Find the column with the most extreme value of every anomaly
+        scorer = AnomalyScorer(numeric_df)
+        max_zscore_columns, _ = scorer.extreme_columns(anomaly_indices)
+        
+        # Score every anomaly by its distance to the nearest non-anomaly point, from one index over them
+        distances = scorer.nearest_inlier_distances(scaled_data, anomalies_mask)
+        if len(distances) > 0:
+            anomaly_scores = np.minimum(0.99, distances / 10)  # Normalize to 0-1 range
+        else:
+            distances = np.zeros(anomaly_count)
+            anomaly_scores = np.full(anomaly_count, 0.9)  # Default if no non-anomaly points
+        
+        # Get top anomalies, ranked by distance (scores are capped)
         top_anomalies = []
-        for i, idx in enumerate(anomaly_indices):
-            if i >= 10:  # Limit to top 10 anomalies
-                break
-                
-            row = df.iloc[idx]
-            
-            # Find the column with the most extreme value
-            numeric_row = numeric_df.iloc[idx]
-            z_scores = np.abs(numeric_row - numeric_df.mean()) / numeric_df.std()
-            max_zscore_column = z_scores.idxmax()
-            
-            # Calculate distance to nearest non-anomaly point as score
-            non_anomaly_indices = np.where(~anomalies_mask)[0]
-            if len(non_anomaly_indices) > 0:
-                min_distance = float('inf')
-                for non_idx in non_anomaly_indices:
-                    dist = np.linalg.norm(scaled_data[idx] - scaled_data[non_idx])
-                    min_distance = min(min_distance, dist)
-                score = min(0.99, min_distance / 10)  # Normalize to 0-1 range
-            else:
-                score = 0.9  # Default if no non-anomaly points
-            
+        for i in rank(distances)[:10]:  # Limit to top 10 anomalies
+            idx = anomaly_indices[i]
             anomaly = {
                 "row": int(idx),
-                "column": max_zscore_column,
-                "value": float(row[max_zscore_column]),
-                "score": float(score),
+                "column": max_zscore_columns[i],
+                "value": scorer.value(idx, max_zscore_columns[i]),
+                "score": float(anomaly_scores[i]),
                 "reason": "Cluster outlier"
             }
             top_anomalies.append(anomaly)
@@ -11,6 +11,10 @@ This module handles business rules management and execution, including:
 """
 
 import logging
+import asyncio
+import functools
+import time
+import numpy as np
 import pandas as pd
 
 from typing import Dict, Any, List, Optional, Callable
@@ -26,6 +30,9 @@ from pydantic import BaseModel, ValidationError, create_model
 from transformers import pipeline as hf_pipeline
 from sqlalchemy.sql import text
 
+from src.api.python.columnar_validation import schema_engine
+from src.api.python.violation_store import ViolationRun, ViolationSet, ViolationStore
+from services.ge_suite_runner import parse_expectation, run_expectation_suite
 from config.settings import get_settings
 from models.dataset import DatasetStatus
 from repositories.business_rules_repository import BusinessRulesRepository
@@ -62,13 +69,28 @@ class BusinessRulesService:
         self.hf_model_name = getattr(settings, 'HF_MODEL_NAME', 'distilbert-base-uncased')
         self.hf_classifier = hf_pipeline('text-classification', model=self.hf_model_name)
         
-        # Cache for loaded rules
-        self.rules_cache = {}
+        # Versioned rule-set cache: dataset_id -> {"version", "rules", "plan"}.
+        # A dataset's version is bumped whenever its rules change, which
+        # invalidates the cached rules and their compiled plan.
+        self.rules_cache: Dict[str, Dict[str, Any]] = {}
+        self.rule_versions: Dict[str, int] = {}
+        self._rule_datasets: Dict[str, str] = {}
+
+        # Per-rule execution cost statistics (rule_id -> stats dict) and the
+        # datasets whose persisted statistics have already been loaded
+        self.rule_stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_loaded_datasets = set()
+
+        # Recent runs' violating rows, kept as compressed row sets per rule
+        self.violation_store = ViolationStore()
             
     async def load_rules(self, dataset_id: str) -> List[Dict[str, Any]]:
         """
         Load all active rules for a dataset.
 
+        Rules and their compiled execution plan are cached per dataset and
+        reused until the dataset's rule version changes.
+
         Args:
             dataset_id: ID of the dataset to load rules for
 
@@ -76,20 +98,91 @@ class BusinessRulesService:
             List of active rules for the dataset
         """
         try:
-            # Check cache first
-            if dataset_id in self.rules_cache:
-                return self.rules_cache[dataset_id]
-
-            # Get rules from database
-            rules = await rules_repo.get_rules_by_dataset(dataset_id)
-
-            # Cache rules for faster access
-            self.rules_cache[dataset_id] = rules
-            return rules
+            entry = await self._get_rule_set(dataset_id)
+            return entry["rules"]
         except Exception as e:
             logger.error(f"Error loading rules: {str(e)}")
             return []
 
+    async def _get_rule_set(self, dataset_id: str) -> Dict[str, Any]:
+        """Get the cached rule set for a dataset, reloading it if its version is stale."""
+        key = str(dataset_id)
+        version = self.rule_versions.get(key, 0)
+
+        # Check cache first
+        entry = self.rules_cache.get(key)
+        if entry is not None and entry["version"] == version:
+            return entry
+
+        # Get rules from database
+        rules = [
+            rule for rule in await rules_repo.get_rules(dataset_id)
+            if rule.get("is_active", True)
+        ]
+        entry = {
+            "version": version,
+            "rules": rules,
+            "plan": self._compile_rule_plan(rules)
+        }
+        for rule in rules:
+            self._rule_datasets[str(rule["id"])] = key
+
+        # Cache rules for faster access
+        self.rules_cache[key] = entry
+        return entry
+
+    def _bump_rule_version(self, dataset_id: Any) -> int:
+        """Invalidate the cached rule set of a dataset by bumping its version."""
+        key = str(dataset_id)
+        self.rule_versions[key] = self.rule_versions.get(key, 0) + 1
+        self.rules_cache.pop(key, None)
+        return self.rule_versions[key]
+
+    def _compile_rule_plan(self, rules: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Pre-parse and compile rule conditions so executions skip that work.
+
+        Returns:
+            Compiled conditions per rule source kind, keyed by rule ID
+        """
+        plan = {"great_expectations": {}, "pydantic": {}, "python": {}}
+        for rule in rules:
+            kind = self._plan_kind(rule.get("source", "manual"))
+            if kind is None:
+                continue
+            try:
+                plan[kind][rule["id"]] = self._compile_for_kind(kind, rule["condition"])
+            except Exception as e:
+                # The rule will report the error when it is executed
+                logger.warning(f"Could not compile rule {rule.get('id')}: {str(e)}")
+        return plan
+
+    def _plan_kind(self, source: str) -> Optional[str]:
+        if source == "great_expectations":
+            return "great_expectations"
+        if source == "pydantic":
+            return "pydantic"
+        if source in ("manual", "ai", "python"):
+            return "python"
+        return None
+
+    def _compile_for_kind(self, kind: str, condition: Any) -> Any:
+        if kind == "great_expectations":
+            return parse_expectation(condition)
+        if kind == "pydantic":
+            return schema_engine.compile(condition)
+        return self._build_python_validator(condition)
+
+    def _get_compiled(self, rule: Dict[str, Any], kind: str) -> Any:
+        """Get a rule's compiled condition from the cached plan, compiling it on a miss."""
+        key = str(rule.get("dataset_id", self._rule_datasets.get(str(rule["id"]), "")))
+        entry = self.rules_cache.get(key)
+        if entry is not None and entry["version"] == self.rule_versions.get(key, 0):
+            compiled = entry["plan"][kind].get(rule["id"])
+            if compiled is not None:
+                return compiled
+        return self._compile_for_kind(kind, rule["condition"])
+
     async def save_generated_rules(
         self, rules: List[Dict[str, Any]], dataset_id: str
     ) -> Dict[str, Any]:
@@ -177,10 +270,8 @@ class BusinessRulesService:
             # Create rule in database
             rule = await rules_repo.create_rule(rule_data)
             
-            # Update cache
-            dataset_id = rule_data["dataset_id"]
-            if dataset_id in self.rules_cache:
-                self.rules_cache[dataset_id].append(rule)
+            # Invalidate the cached rule set
+            self._bump_rule_version(rule_data["dataset_id"])
             
             # Log rule creation
             await self._log_rule_execution(
@@ -215,7 +306,14 @@ class BusinessRulesService:
                 )
                 await session.commit()
             
-            return await self.get_rule(rule_id)
+            rule = await self.get_rule(rule_id)
+            
+            # Invalidate the cached rule set
+            dataset_id = rule["dataset_id"] if rule else self._rule_datasets.get(str(rule_id))
+            if dataset_id is not None:
+                self._bump_rule_version(dataset_id)
+            
+            return rule
             
         except Exception as e:
             logger.error(f"Error updating rule: {str(e)}")
@@ -224,12 +322,22 @@ class BusinessRulesService:
     async def delete_rule(self, rule_id: str) -> bool:
         """Delete a business rule."""
         try:
+            dataset_id = self._rule_datasets.get(str(rule_id))
+            if dataset_id is None:
+                rule = await self.get_rule(rule_id)
+                dataset_id = rule["dataset_id"] if rule else None
+            
             async with get_db_session() as session:
                 await session.execute(
                     text("DELETE FROM business_rules WHERE id = :rule_id"),
                     {"rule_id": rule_id}
                 )
                 await session.commit()
+            
+            # Invalidate the cached rule set
+            if dataset_id is not None:
+                self._bump_rule_version(dataset_id)
+            self._rule_datasets.pop(str(rule_id), None)
             return True
             
         except Exception as e:
@@ -301,6 +409,9 @@ class BusinessRulesService:
                         "rule": rule.get("name", "Unknown"),
                         "error": str(rule_error)
                     })
+            
+            # Invalidate the cached rule set once more for the whole import
+            self._bump_rule_version(dataset_id)
             return {
                 "success": len(imported_rules) > 0,
                 "imported_count": len(imported_rules),
@@ -704,12 +815,38 @@ class BusinessRulesService:
                 "metadata": {"generator": "huggingface", "model": self.hf_model_name}
             }
     
-    async def _execute_rules(self, dataset_id: str, df: pd.DataFrame) -> Dict[str, Any]:
+    async def execute_rules(
+        self, dataset_id: str, df: pd.DataFrame, rule_ids: Optional[List[Any]] = None, fail_fast: bool = False
+    ) -> Dict[str, Any]:
+        """Validate a dataset against its active rules.
+        
+        Args:
+            dataset_id: ID of the dataset to execute rules for
+            df: Pandas DataFrame containing the dataset
+            rule_ids: Only execute these rules (all active rules if None)
+            fail_fast: Run rules sequentially and stop at the first failing
+                high-severity rule
+                
+        Returns:
+            Dictionary containing execution results and the violation run ID
+        """
+        return await self._execute_rules(dataset_id, df, rule_ids=rule_ids, fail_fast=fail_fast)
+    
+    async def _execute_rules(
+        self, dataset_id: str, df: pd.DataFrame, rule_ids: Optional[List[Any]] = None, fail_fast: bool = False
+    ) -> Dict[str, Any]:
         """Execute rules on a dataset.
         
+        Rules are ordered by their recorded cost statistics so that cheap rules
+        that are likely to fail run first. The statistics of all executed rules
+        are persisted together once the run is over.
+        
         Args:
             dataset_id: ID of the dataset to execute rules for
             df: Pandas DataFrame containing the dataset
+            rule_ids: Only execute these rules (all active rules if None)
+            fail_fast: Run rules sequentially and stop at the first failing
+                high-severity rule
                 
         Returns:
             Dictionary containing execution results
@@ -717,6 +854,9 @@ class BusinessRulesService:
         try:
             # Load active rules
             rules = await self.load_rules(dataset_id)
+            if rule_ids is not None:
+                selected = {str(rule_id) for rule_id in rule_ids}
+                rules = [rule for rule in rules if str(rule["id"]) in selected]
             if not rules:
                 return {
                     "success": True,
@@ -724,17 +864,45 @@ class BusinessRulesService:
                     "results": []
                 }
             
-            # Execute rules in parallel
-            results = await asyncio.gather(
-                *[self._execute_rule(rule, df) for rule in rules],
-                return_exceptions=True
-            )
+            # Order rules by observed cost and failure likelihood
+            await self._load_rule_stats(dataset_id)
+            rules = self._order_rules(rules)
+            
+            # Great Expectations wrapper of df, created once and shared by this run's GE rules
+            ge_datasets: Dict[int, Any] = {}
+            skipped_rules = []
+            if fail_fast:
+                # Execute rules one at a time so a high-severity failure stops the run
+                results = []
+                for index, rule in enumerate(rules):
+                    result = await self._execute_rule(rule, df, persist_stats=False, ge_datasets=ge_datasets)
+                    results.append(result)
+                    if not result["success"] and rule.get("severity") == "high":
+                        skipped_rules = [r["id"] for r in rules[index + 1:]]
+                        break
+                executed_rules = rules[:len(results)]
+            else:
+                # Great Expectations rules run together as one suite over one wrapped dataset
+                ge_rules = [r for r in rules if r.get("source") == "great_expectations"]
+                ge_results = await self._execute_ge_rules_batch(ge_rules, df, ge_datasets) if len(ge_rules) > 1 else {}
+                
+                # Execute the remaining rules in parallel
+                other_rules = [r for r in rules if r["id"] not in ge_results]
+                other_results = await asyncio.gather(
+                    *[self._execute_rule(rule, df, persist_stats=False, ge_datasets=ge_datasets) for rule in other_rules],
+                    return_exceptions=True
+                )
+                other_results = dict(zip([r["id"] for r in other_rules], other_results))
+                results = [ge_results.get(r["id"], other_results.get(r["id"])) for r in rules]
+                executed_rules = rules
             
-            # Process results
+            # Process results; violating rows are kept as compressed row sets, not in the results
+            violation_run = ViolationRun(len(df), dataset_id=dataset_id)
             processed_results = []
-            for rule, result in zip(rules, results):
+            for rule, result in zip(executed_rules, results):
                 if isinstance(result, Exception):
                     logger.error(f"Error executing rule {rule['id']}: {str(result)}")
+                    violation_run.add_error(rule, str(result))
                     processed_results.append({
                         "rule_id": rule["id"],
                         "name": rule["name"],
@@ -742,7 +910,14 @@ class BusinessRulesService:
                         "error": str(result)
                     })
                 else:
+                    violation_set = result.pop("violation_set", None)
+                    if violation_set is not None:
+                        violation_run.add(rule, violation_set)
                     processed_results.append(result)
+            await self._save_violation_run(dataset_id, violation_run)
+            await self._save_rule_stats([
+                self.rule_stats[str(rule["id"])] for rule in executed_rules if str(rule["id"]) in self.rule_stats
+            ])
             
             # Log execution results
             await self._log_rules_execution(
@@ -761,19 +936,28 @@ class BusinessRulesService:
             return {
                 "success": success,
                 "message": "All rules passed" if success else f"{len(failed_rules)} rules failed",
-                "results": processed_results
+                "results": processed_results,
+                "fail_fast": fail_fast,
+                "skipped_rules": skipped_rules,
+                "run_id": violation_run.run_id
             }
             
         except Exception as e:
             logger.error(f"Error executing rules: {str(e)}")
             raise
             
-    async def _execute_rule(self, rule: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+    async def _execute_rule(
+        self, rule: Dict[str, Any], df: pd.DataFrame, persist_stats: bool = True,
+        ge_datasets: Optional[Dict[int, Any]] = None
+    ) -> Dict[str, Any]:
         """Execute a single rule on a dataset.
         
         Args:
             rule: Rule to execute
             df: DataFrame to validate
+            persist_stats: Save the rule's cost statistics at once (runs of
+                several rules save them together instead)
+            ge_datasets: A rule run's Great Expectations wrappers (see _get_ge_dataset)
             
         Returns:
             Dictionary containing execution result
@@ -783,14 +967,15 @@ class BusinessRulesService:
             execution_fn = self._get_execution_function(rule["source"])
             if not execution_fn:
                 raise ValueError(f"Unsupported rule source: {rule['source']}")
+            if ge_datasets is not None and rule["source"] == "great_expectations":
+                execution_fn = functools.partial(execution_fn, ge_datasets=ge_datasets)
             
             # Execute rule
-            start_time = datetime.datetime.now()
+            start_time = time.perf_counter()
             result = await execution_fn(rule, df)
-            end_time = datetime.datetime.now()
+            execution_time = time.perf_counter() - start_time
             
             # Add execution metadata
-            execution_time = (end_time - start_time).total_seconds()
             result.update({
                 "rule_id": rule["id"],
                 "name": rule["name"],
@@ -798,6 +983,11 @@ class BusinessRulesService:
                 "execution_time": execution_time
             })
             
+            # Record cost statistics used for rule ordering
+            stats = await self._record_rule_stats(rule, result, len(df), execution_time)
+            if persist_stats:
+                await self._save_rule_stats([stats])
+            
             # Log execution
             await self._log_rule_execution(
                 rule["id"],
@@ -835,6 +1025,130 @@ class BusinessRulesService:
             )
             
             return error_result
+
+    async def _load_rule_stats(self, dataset_id: str) -> None:
+        """Load persisted rule cost statistics for a dataset into memory once."""
+        if dataset_id in self._stats_loaded_datasets:
+            return
+        try:
+            for stats in await rules_repo.get_rule_cost_stats(dataset_id):
+                rule_id = str(stats["rule_id"])
+                # In-memory statistics are newer than the persisted ones
+                self.rule_stats.setdefault(rule_id, {**stats, "rule_id": rule_id})
+            self._stats_loaded_datasets.add(dataset_id)
+        except Exception as e:
+            logger.warning(f"Could not load rule cost statistics for dataset {dataset_id}: {str(e)}")
+
+    async def _record_rule_stats(
+        self, rule: Dict[str, Any], result: Dict[str, Any], rows: int, execution_time: float
+    ) -> Dict[str, Any]:
+        """Accumulate cost statistics for a rule execution (saved by _save_rule_stats).
+
+        Selectivity is the fraction of processed rows the rule flagged; when an
+        execution function does not report a row count, a failed run counts all
+        rows as violating.
+        """
+        rule_id = str(rule["id"])
+        stats = self.rule_stats.setdefault(rule_id, {
+            "rule_id": rule_id,
+            "dataset_id": rule.get("dataset_id"),
+            "executions": 0,
+            "failures": 0,
+            "total_time": 0.0,
+            "rows_processed": 0,
+            "rows_violated": 0
+        })
+
+        metadata = result.get("metadata") or {}
+        violations = metadata.get("total_affected", metadata.get("total_failed"))
+        if violations is None:
+            violations = 0 if result.get("success") else rows
+
+        stats["executions"] += 1
+        stats["failures"] += 0 if result.get("success") else 1
+        stats["total_time"] += execution_time
+        stats["rows_processed"] += rows
+        stats["rows_violated"] += int(violations)
+        stats["mean_time"] = stats["total_time"] / stats["executions"]
+        stats["rows_per_sec"] = (
+            stats["rows_processed"] / stats["total_time"] if stats["total_time"] > 0 else None
+        )
+        stats["selectivity"] = (
+            stats["rows_violated"] / stats["rows_processed"] if stats["rows_processed"] else 0.0
+        )
+        stats["failure_rate"] = stats["failures"] / stats["executions"]
+        stats["last_execution_time"] = execution_time
+        return stats
+
+    async def _save_rule_stats(self, stats: List[Dict[str, Any]]) -> None:
+        """Persist the cost statistics of executed rules in one upsert."""
+        try:
+            await rules_repo.upsert_rule_cost_stats(stats)
+        except Exception as e:
+            logger.warning(f"Could not persist cost statistics for {len(stats)} rules: {str(e)}")
+
+    def _order_rules(self, rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Order rules for execution using their recorded cost statistics.
+
+        High-severity rules come first, then rules are ranked by expected
+        failures per second of execution time. Rules without statistics run
+        first within their severity so they get profiled.
+        """
+        def rank(rule: Dict[str, Any]):
+            is_high = rule.get("severity") == "high"
+            stats = self.rule_stats.get(str(rule["id"]))
+            if not stats or not stats.get("executions"):
+                return (not is_high, 0, 0.0)
+            # Prefer rules that fail often and flag many rows, at low cost
+            likelihood = max(stats.get("failure_rate", 0.0), stats.get("selectivity", 0.0))
+            score = likelihood / max(stats.get("mean_time", 0.0), 1e-6)
+            return (not is_high, 1, -score)
+
+        return sorted(rules, key=rank)
+
+    async def get_rule_stats(self, dataset_id: str) -> List[Dict[str, Any]]:
+        """Get cost statistics for a dataset's rules, with rule names, slowest rules first.
+
+        Persisted statistics (of all workers) are overlaid with this
+        service's own, which are newer when saving them failed.
+        """
+        stats = {str(s["rule_id"]): s for s in await rules_repo.get_rule_cost_stats(dataset_id)}
+        for rule_id, own in self.rule_stats.items():
+            persisted = stats.get(rule_id, {})
+            if str(own.get("dataset_id")) == str(dataset_id) and own["executions"] > persisted.get("executions", 0):
+                stats[rule_id] = {**persisted, **own, "rule_id": persisted.get("rule_id", own["rule_id"])}
+        return sorted(stats.values(), key=lambda s: s.get("mean_time", 0.0), reverse=True)
+
+    async def _save_violation_run(self, dataset_id: str, run: ViolationRun) -> None:
+        """Keep a run's violation sets in memory and persist them."""
+        self.violation_store.put(run)
+        try:
+            await rules_repo.save_violation_sets(run.run_id, dataset_id, [
+                {**violation_set.to_dict(), "rule_id": rule_id, "payload": violation_set.payload}
+                for rule_id, violation_set in run.violation_sets.items()
+            ])
+        except Exception as e:
+            logger.warning(f"Could not persist violation sets for run {run.run_id}: {str(e)}")
+
+    async def get_violation_run(self, run_id: str) -> Optional[ViolationRun]:
+        """Get a rule run's violation sets, from memory or from the database."""
+        run = self.violation_store.get(run_id)
+        if run is not None:
+            return run
+
+        rows = await rules_repo.get_violation_sets(run_id)
+        if not rows:
+            return None
+        run = ViolationRun(rows[0]["total_rows"], run_id, rows[0]["dataset_id"])
+        run.created_at = rows[0]["created_at"].isoformat() if rows[0].get("created_at") else run.created_at
+        for row in rows:
+            run.add(
+                {k: v for k, v in (("id", row["rule_id"]), ("name", row["name"]),
+                                   ("severity", row["severity"]), ("message", row["message"])) if v is not None},
+                ViolationSet(row["total_rows"], row["violation_count"], row["encoding"], bytes(row["payload"]))
+            )
+        self.violation_store.put(run)
+        return run
             
     async def _execute_python_rule(self, rule: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -842,38 +1156,23 @@ class BusinessRulesService:
         Returns a dict with success, message, and metadata.
         """
         try:
-            # Prepare safe context
-            condition = rule["condition"]
-            context = {
-                "df": df,
-                "pd": pd,
-                "np": np,
-                "re": re,
-                "datetime": datetime
-            }
-            # Build a function from the condition
-            fn_code = (
-                "def validate(df):\n"
-                "    try:\n"
-                f"        {condition}\n"
-                "    except Exception as e:\n"
-                "        return False, str(e)\n"
-                "    return True, 'Rule validation passed'"
-            )
-            local_env = {}
-            exec(fn_code, context, local_env)
-            success, message = local_env["validate"](df)
+            validate = self._get_compiled(rule, "python")
+            success, message = validate(df)
             affected_rows = []
+            violation_set = None
             if isinstance(success, pd.Series):
-                affected_rows = df[~success].index.tolist()
-                success = success.all()
+                # Keep violating rows as a compressed row set instead of a list of labels
+                violation_set = ViolationSet.from_mask(~success.to_numpy(dtype=bool))
+                affected_rows = df.index[violation_set.page(0, 10)].tolist()  # Limit number of rows returned
+                success = violation_set.count == 0
             return {
                 "success": bool(success),
                 "message": message if not success else "Rule validation passed",
                 "metadata": {
-                    "affected_rows": affected_rows[:10],  # Limit number of rows returned
-                    "total_affected": len(affected_rows)
-                }
+                    "affected_rows": affected_rows,
+                    "total_affected": violation_set.count if violation_set else 0
+                },
+                "violation_set": violation_set
             }
         except Exception as e:
             logger.error(f"Error executing Python rule: {str(e)}")
@@ -883,21 +1182,41 @@ class BusinessRulesService:
                 "metadata": {}
             }
 
-    async def _execute_ge_rule(self, rule: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+    def _build_python_validator(self, condition: str) -> Callable:
+        """Build the validate(df) function for a Python rule condition."""
+        # Prepare safe context
+        context = {
+            "pd": pd,
+            "np": np,
+            "re": re,
+            "datetime": datetime
+        }
+        # Build a function from the condition
+        fn_code = (
+            "def validate(df):\n"
+            "    try:\n"
+            f"        {condition}\n"
+            "    except Exception as e:\n"
+            "        return False, str(e)\n"
+            "    return True, 'Rule validation passed'"
+        )
+        local_env = {}
+        exec(fn_code, context, local_env)
+        return local_env["validate"]
+
+    async def _execute_ge_rule(
+        self, rule: Dict[str, Any], df: pd.DataFrame, ge_datasets: Optional[Dict[int, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Execute a Great Expectations rule. The rule's 'condition' should be a GE expectation string or config.
         """
         try:
             # Example: condition = 'expect_column_values_to_not_be_null("customer_id")'
-            expectation = rule["condition"]
-            ge_df = ge.from_pandas(df)
-            result = eval(f"ge_df.{expectation}")
-            success = result.success if hasattr(result, 'success') else False
-            return {
-                "success": success,
-                "message": "GE rule passed" if success else str(result),
-                "metadata": {"ge_result": str(result)}
-            }
+            expectation_type, kwargs = self._get_compiled(rule, "great_expectations")
+            ge_df = self._get_ge_dataset(df, ge_datasets)
+            result = getattr(ge_df, expectation_type)(**kwargs)
+            success = bool(result.success)
+            return self._ge_rule_result(success, result.result or {}, str(result))
         except Exception as e:
             logger.error(f"Error executing GE rule: {str(e)}")
             return {
@@ -906,26 +1225,134 @@ class BusinessRulesService:
                 "metadata": {}
             }
 
+    async def _execute_ge_rules_batch(
+        self, rules: List[Dict[str, Any]], df: pd.DataFrame, ge_datasets: Optional[Dict[int, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute Great Expectations rules as a single expectation suite.
+
+        The dataset is wrapped once (or the rule run's wrapper is reused, see
+        _get_ge_dataset) and validated once; results are mapped back to rule
+        IDs. Execution time is split evenly across the suite's rules.
+
+        Returns:
+            Mapping of rule ID to execution result
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        expectations = []
+        for rule in rules:
+            try:
+                expectation_type, kwargs = self._get_compiled(rule, "great_expectations")
+                expectations.append((rule["id"], expectation_type, kwargs))
+            except Exception as e:
+                results[rule["id"]] = {
+                    "success": False,
+                    "message": f"Error executing GE rule: {str(e)}",
+                    "metadata": {}
+                }
+
+        start_time = time.perf_counter()
+        try:
+            suite_results = run_expectation_suite(
+                df, expectations, suite_name="business_rules", ge_df=self._get_ge_dataset(df, ge_datasets)
+            ) if expectations else {}
+        except Exception as e:
+            logger.error(f"Error executing GE rule suite: {str(e)}")
+            suite_results = {
+                rule_id: {"success": False, "result": {}, "exception": str(e)}
+                for rule_id, _, _ in expectations
+            }
+        execution_time = (time.perf_counter() - start_time) / max(len(expectations), 1)
+
+        for rule_id, suite_result in suite_results.items():
+            if suite_result["exception"]:
+                results[rule_id] = {
+                    "success": False,
+                    "message": f"Error executing GE rule: {suite_result['exception']}",
+                    "metadata": {}
+                }
+            else:
+                results[rule_id] = self._ge_rule_result(
+                    suite_result["success"], suite_result["result"], str(suite_result["result"])
+                )
+
+        for rule in rules:
+            result = results.setdefault(rule["id"], {
+                "success": False,
+                "message": "GE rule was not evaluated",
+                "metadata": {}
+            })
+            result.update({
+                "rule_id": rule["id"],
+                "name": rule["name"],
+                "source": rule["source"],
+                "execution_time": execution_time,
+                "batched": True
+            })
+            await self._record_rule_stats(rule, result, len(df), execution_time)
+            await self._log_rule_execution(
+                rule["id"],
+                {
+                    "success": result["success"],
+                    "message": result.get("message", ""),
+                    "execution_metadata": {
+                        "execution_time": execution_time,
+                        "rows_processed": len(df),
+                        "batched": True,
+                        **result.get("metadata", {})
+                    }
+                }
+            )
+        return results
+
+    def _get_ge_dataset(self, df: pd.DataFrame, ge_datasets: Optional[Dict[int, Any]] = None):
+        """Wrap a DataFrame for Great Expectations.
+
+        ge_datasets holds the wrappers of one rule run, by frame identity; it
+        lives only as long as the run, so no frame or wrapper outlives it and
+        a frame changed between runs is wrapped again.
+        """
+        if ge_datasets is None:
+            return ge.from_pandas(df)
+        if id(df) not in ge_datasets:
+            ge_datasets[id(df)] = ge.from_pandas(df)
+        return ge_datasets[id(df)]
+
+    def _ge_rule_result(self, success: bool, ge_result: Dict[str, Any], details: str) -> Dict[str, Any]:
+        """Build a rule result from a Great Expectations validation result."""
+        metadata = {"ge_result": details}
+        if ge_result.get("unexpected_count") is not None:
+            metadata["total_affected"] = int(ge_result["unexpected_count"])
+        return {
+            "success": success,
+            "message": "GE rule passed" if success else details,
+            "metadata": metadata
+        }
+
     async def _execute_pydantic_rule(self, rule: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
         """
-        Execute a Pydantic rule. The rule's 'condition' should be a Pydantic model definition or schema.
+        Execute a Pydantic rule. The rule's 'condition' is a field schema such as
+        "{ 'amount': { 'type': 'number', 'minimum': 0, 'maximum': 100 } }".
+        Columns are validated with vectorized checks against a cached compiled schema.
         """
         try:
-            # This is a placeholder - you should parse the condition and build a model dynamically
-            model_def = rule["condition"]
-            # For demo: assume model_def is a dict of field types
-            Model = create_model('DynamicModel', **model_def)
-            errors = []
-            for idx, row in df.iterrows():
-                try:
-                    Model(**row.to_dict())
-                except ValidationError as ve:
-                    errors.append((idx, str(ve)))
-            success = len(errors) == 0
+            compiled_schema = self._get_compiled(rule, "pydantic")
+            result = schema_engine.validate(df, compiled_schema)
+            # Only failing rows are turned into error records
+            errors = [
+                (
+                    row["row_index"],
+                    "; ".join(f"{e['field']}: {e['error']}" for e in row["errors"])
+                )
+                for row in result.row_errors(limit=10)
+            ]
+            total_failed = result.invalid_rows
+            success = total_failed == 0
             return {
                 "success": success,
-                "message": "Pydantic validation passed" if success else f"{len(errors)} rows failed",
-                "metadata": {"errors": errors[:10], "total_failed": len(errors)}
+                "message": "Pydantic validation passed" if success else f"{total_failed} rows failed",
+                "metadata": {"errors": errors, "total_failed": total_failed},
+                "violation_set": ViolationSet.from_mask(result.invalid_mask)
             }
         except Exception as e:
             logger.error(f"Error executing Pydantic rule: {str(e)}")
@@ -999,4 +1426,15 @@ class BusinessRulesService:
             return namespace['evaluate']
         except Exception as e:
             logger.error(f"Error compiling condition: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+
+@functools.lru_cache()
+def get_business_rules_service() -> BusinessRulesService:
+    """
+    Shared business rules service, created on first use
+
+    Its constructor loads the Hugging Face classifier, so importing the
+    routes and services that use it does not.
+    """
+    return BusinessRulesService()
@@ -10,6 +10,10 @@ from fastapi import HTTPException
 # Import vector service for embedding generation
 from .vector_service import add_vectors, get_vector_db
 from .ai_agent_service import generate_embeddings
+from src.api.python.dtype_optimization import dtype_optimizer, to_records
+from src.api.python.dataset_stats import DatasetStats, dataset_stats
+from src.api.python.relationship_discovery import relationship_engine
+from src.api.python.schema_registry import schema_registry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -54,10 +58,16 @@ def save_metadata():
 # Initialize metadata
 load_metadata()
 
+# Column signatures for relationship discovery across datasets
+relationship_engine.load(os.path.join(DATASET_PATH, 'signatures'))
+
+# Latest schema of each dataset lineage, for drift detection between uploads
+schema_registry.load(os.path.join(DATASET_PATH, 'schemas'))
+
 async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Process a dataset after pipeline processing and prepare it for AI analysis
-    - Loads the dataset
+    - Loads the dataset and converts it to compact dtypes
     - Extracts schema and statistics
     - Generates embeddings for vectorization
     - Updates metadata
@@ -65,7 +75,8 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
     Args:
         dataset_id: Unique identifier for the dataset
         file_path: Path to the processed dataset file
-        options: Processing options
+        options: Processing options ("lineage" names the feed the dataset is an upload of,
+            so its schema is checked for drift against the previous upload)
         
     Returns:
         Processed dataset information
@@ -85,6 +96,11 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported file format: {file_path}")
         
+        # Convert columns to compact dtypes (categoricals, Arrow strings)
+        memory_report = None
+        if (options or {}).get("optimize_dtypes", True):
+            df, memory_report = dtype_optimizer.optimize(df)
+        
         # Get basic dataset information
         rows, columns = df.shape
         column_names = df.columns.tolist()
@@ -97,52 +113,59 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
             "temporal_columns": {}
         }
         
-        # Analyze columns
+        # Analyze columns; statistics are computed once and shared with the other analyzers
+        stats = dataset_stats.get(df)
         for col in column_names:
+            nulls = stats.null_count(col)
+            
             # Skip if column is all null
-            if df[col].isna().all():
+            if nulls == rows:
                 continue
                 
             # Check data type and calculate appropriate statistics
             if pd.api.types.is_numeric_dtype(df[col]):
+                moments = stats.moments(col)
+                median = stats.median(col)
                 statistics["numeric_columns"][col] = {
-                    "min": float(df[col].min()) if not pd.isna(df[col].min()) else None,
-                    "max": float(df[col].max()) if not pd.isna(df[col].max()) else None,
-                    "mean": float(df[col].mean()) if not pd.isna(df[col].mean()) else None,
-                    "median": float(df[col].median()) if not pd.isna(df[col].median()) else None,
-                    "std": float(df[col].std()) if not pd.isna(df[col].std()) else None,
-                    "nulls": int(df[col].isna().sum()),
-                    "nulls_percent": float(df[col].isna().mean() * 100)
+                    "min": float(moments["min"]) if not pd.isna(moments["min"]) else None,
+                    "max": float(moments["max"]) if not pd.isna(moments["max"]) else None,
+                    "mean": float(moments["mean"]) if not pd.isna(moments["mean"]) else None,
+                    "median": float(median) if not pd.isna(median) else None,
+                    "std": float(moments["std"]) if not pd.isna(moments["std"]) else None,
+                    "nulls": nulls,
+                    "nulls_percent": float(nulls / rows * 100)
                 }
             elif pd.api.types.is_string_dtype(df[col]):
                 # Check if it's a categorical or text column
-                unique_values = df[col].nunique()
+                unique_values = stats.unique_count(col)
                 unique_ratio = unique_values / rows if rows > 0 else 0
                 
                 if unique_ratio < 0.2 and unique_values < 100:  # Likely categorical
-                    value_counts = df[col].value_counts().head(20).to_dict()
+                    value_counts = stats.value_counts(col).head(20).to_dict()
                     statistics["categorical_columns"][col] = {
                         "unique_values": int(unique_values),
                         "most_common": value_counts,
-                        "nulls": int(df[col].isna().sum()),
-                        "nulls_percent": float(df[col].isna().mean() * 100)
+                        "nulls": nulls,
+                        "nulls_percent": float(nulls / rows * 100)
                     }
                 else:  # Likely text
                     # Calculate average text length
-                    text_lengths = df[col].astype(str).str.len()
+                    text_lengths = stats.text_lengths(col)
+                    avg_length, max_length, min_length = text_lengths.mean(), text_lengths.max(), text_lengths.min()
                     statistics["text_columns"][col] = {
-                        "avg_length": float(text_lengths.mean()) if not pd.isna(text_lengths.mean()) else 0,
-                        "max_length": int(text_lengths.max()) if not pd.isna(text_lengths.max()) else 0,
-                        "min_length": int(text_lengths.min()) if not pd.isna(text_lengths.min()) else 0,
-                        "nulls": int(df[col].isna().sum()),
-                        "nulls_percent": float(df[col].isna().mean() * 100)
+                        "avg_length": float(avg_length) if not pd.isna(avg_length) else 0,
+                        "max_length": int(max_length) if not pd.isna(max_length) else 0,
+                        "min_length": int(min_length) if not pd.isna(min_length) else 0,
+                        "nulls": nulls,
+                        "nulls_percent": float(nulls / rows * 100)
                     }
             elif pd.api.types.is_datetime64_dtype(df[col]):
+                moments = stats.moments(col)
                 statistics["temporal_columns"][col] = {
-                    "min": df[col].min().isoformat() if not pd.isna(df[col].min()) else None,
-                    "max": df[col].max().isoformat() if not pd.isna(df[col].max()) else None,
-                    "nulls": int(df[col].isna().sum()),
-                    "nulls_percent": float(df[col].isna().mean() * 100)
+                    "min": moments["min"].isoformat() if not pd.isna(moments["min"]) else None,
+                    "max": moments["max"].isoformat() if not pd.isna(moments["max"]) else None,
+                    "nulls": nulls,
+                    "nulls_percent": float(nulls / rows * 100)
                 }
         
         # Generate dataset summary
@@ -155,26 +178,27 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
         column_descriptions = []
         for col in column_names:
             if col in statistics["numeric_columns"]:
-                stats = statistics["numeric_columns"][col]
-                col_desc = f"Column '{col}' is numeric with range from {stats['min']} to {stats['max']}, mean {stats['mean']:.2f}."
+                col_stats = statistics["numeric_columns"][col]
+                col_desc = f"Column '{col}' is numeric with range from {col_stats['min']} to {col_stats['max']}, mean {col_stats['mean']:.2f}."
                 column_descriptions.append(col_desc)
             elif col in statistics["categorical_columns"]:
-                stats = statistics["categorical_columns"][col]
-                top_cats = list(stats["most_common"].keys())[:5]
-                col_desc = f"Column '{col}' is categorical with {stats['unique_values']} unique values including {', '.join(top_cats)}."
+                col_stats = statistics["categorical_columns"][col]
+                top_cats = list(col_stats["most_common"].keys())[:5]
+                col_desc = f"Column '{col}' is categorical with {col_stats['unique_values']} unique values including {', '.join(top_cats)}."
                 column_descriptions.append(col_desc)
             elif col in statistics["text_columns"]:
-                stats = statistics["text_columns"][col]
-                col_desc = f"Column '{col}' contains text with average length {stats['avg_length']:.1f} characters."
+                col_stats = statistics["text_columns"][col]
+                col_desc = f"Column '{col}' contains text with average length {col_stats['avg_length']:.1f} characters."
                 column_descriptions.append(col_desc)
             elif col in statistics["temporal_columns"]:
-                stats = statistics["temporal_columns"][col]
-                col_desc = f"Column '{col}' contains dates/times from {stats['min']} to {stats['max']}."
+                col_stats = statistics["temporal_columns"][col]
+                col_desc = f"Column '{col}' contains dates/times from {col_stats['min']} to {col_stats['max']}."
                 column_descriptions.append(col_desc)
                 
         # Save dataset information to metadata
         dataset_metadata[dataset_id] = {
             "id": dataset_id,
+            "lineage": (options or {}).get("lineage") or dataset_id,
             "file_path": file_path,
             "rows": rows,
             "columns": columns,
@@ -182,12 +206,16 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat(),
             "summary": summary,
-            "statistics": statistics
+            "statistics": statistics,
+            "memory": memory_report
         }
         
         # Save metadata
         save_metadata()
         
+        # Update the column signatures used to find foreign keys across datasets
+        relationship_engine.add_dataset(dataset_id, df)
+        
         # Generate embeddings for the dataset description
         dataset_texts = [
             {"content": summary, "metadata": {"type": "summary", "dataset_id": dataset_id, "source": f"Dataset: {dataset_id}"}},
@@ -203,7 +231,7 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
         # Add sample data (first few rows)
         sample_rows = min(5, rows)
         if sample_rows > 0:
-            sample_data = df.head(sample_rows).to_dict(orient='records')
+            sample_data = to_records(df.head(sample_rows))
             for i, row in enumerate(sample_data):
                 # Convert to string representation
                 row_str = ", ".join([f"{col}: {val}" for col, val in row.items()])
@@ -234,7 +262,7 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
             await add_vectors(dataset_id, vectors_to_add)
             
         # Extract data patterns and insights (simple version)
-        patterns = extract_data_patterns(df)
+        patterns = extract_data_patterns(df, stats)
         
         return {
             "success": True,
@@ -243,22 +271,29 @@ async def process_dataset(dataset_id: str, file_path: str, options: Optional[Dic
             "columns": columns,
             "summary": summary,
             "vectors_added": len(vectors_to_add),
-            "patterns": patterns
+            "patterns": patterns,
+            "memory": memory_report
         }
     
     except Exception as e:
         logger.error(f"Error processing dataset: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to process dataset: {str(e)}")
 
-def extract_data_patterns(df: pd.DataFrame) -> List[Dict[str, Any]]:
+def extract_data_patterns(df: pd.DataFrame, stats: Optional[DatasetStats] = None) -> List[Dict[str, Any]]:
     """
     Extract patterns and insights from the dataset
+    
+    Args:
+        df: DataFrame to analyze
+        stats: Its shared statistics, if already requested
     """
     patterns = []
     
     try:
+        stats = stats or dataset_stats.get(df)
+        
         # Check for missing values
-        missing_vals = df.isna().sum()
+        missing_vals = stats.null_counts()
         cols_with_missing = missing_vals[missing_vals > 0]
         if not cols_with_missing.empty:
             for col, count in cols_with_missing.items():
@@ -272,27 +307,26 @@ def extract_data_patterns(df: pd.DataFrame) -> List[Dict[str, Any]]:
                         "description": f"Column '{col}' has {percent:.1f}% missing values"
                     })
         
-        # Check for outliers in numeric columns
-        for col in df.select_dtypes(include=[np.number]).columns:
-            q1 = df[col].quantile(0.25)
-            q3 = df[col].quantile(0.75)
+        # Check for outliers in numeric columns, counted on values sorted once per column
+        for col in stats.numeric_columns():
+            q1, q3 = stats.quantiles(col, [0.25, 0.75])
             iqr = q3 - q1
             lower_bound = q1 - (1.5 * iqr)
             upper_bound = q3 + (1.5 * iqr)
-            outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)][col]
+            outlier_count = stats.count_outside(col, lower_bound, upper_bound)
             
-            if len(outliers) > 0 and len(outliers) < len(df) * 0.1:  # Less than 10% are outliers
+            if outlier_count > 0 and outlier_count < len(df) * 0.1:  # Less than 10% are outliers
                 patterns.append({
                     "type": "outliers",
                     "column": col,
-                    "count": len(outliers),
-                    "percent": float((len(outliers) / len(df)) * 100),
-                    "description": f"Column '{col}' has {len(outliers)} outliers ({(len(outliers) / len(df) * 100):.1f}%)"
+                    "count": outlier_count,
+                    "percent": float((outlier_count / len(df)) * 100),
+                    "description": f"Column '{col}' has {outlier_count} outliers ({(outlier_count / len(df) * 100):.1f}%)"
                 })
         
         # Check for correlations between numeric columns
-        if len(df.select_dtypes(include=[np.number]).columns) >= 2:
-            corr_matrix = df.select_dtypes(include=[np.number]).corr()
+        if len(stats.numeric_columns()) >= 2:
+            corr_matrix = stats.correlation()
             # Get the strongest correlations (ignoring self-correlations)
             strong_corrs = []
             for i in range(len(corr_matrix.columns)):
@@ -357,8 +391,14 @@ async def delete_dataset(dataset_id: str) -> Dict[str, Any]:
         file_path = dataset_metadata[dataset_id].get("file_path")
         
         # Remove from metadata
+        lineage = dataset_metadata[dataset_id].get("lineage") or dataset_id
         del dataset_metadata[dataset_id]
         save_metadata()
+        relationship_engine.remove_dataset(dataset_id)
+        
+        # A dataset without a lineage of its own takes its stored schema with it
+        if lineage == dataset_id:
+            schema_registry.remove(dataset_id)
         
         # Delete vector data
         from .vector_service import delete_vectors
@@ -0,0 +1,163 @@
+"""
+Great Expectations suite runner.
+
+Builds one expectation suite from many expectation conditions and validates it
+over a single wrapped dataset, instead of calling ge.from_pandas() and
+scanning the frame once per expectation. Results are mapped back to caller
+keys (rule IDs, column checks) through the expectation meta.
+"""
+import ast
+import inspect
+import logging
+import time
+from typing import Any, Dict, Hashable, List, Tuple
+
+import pandas as pd
+import great_expectations as ge
+from great_expectations.core import ExpectationConfiguration, ExpectationSuite
+from great_expectations.dataset import PandasDataset
+
+logger = logging.getLogger(__name__)
+
+# Keyword arguments that control how an expectation is called rather than what it checks
+CALL_ONLY_KWARGS = {"include_config", "catch_exceptions"}
+
+
+def parse_expectation(condition: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse an expectation call string into its type and keyword arguments.
+
+    Example: "expect_column_values_to_be_between('age', 0, 120)" ->
+    ("expect_column_values_to_be_between", {"column": "age", "min_value": 0, "max_value": 120})
+    """
+    call = ast.parse(condition.strip(), mode="eval").body
+    if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name)
+            and call.func.id.startswith("expect_")):
+        raise ValueError(f"Not a Great Expectations expectation: {condition}")
+
+    expectation_type = call.func.id
+    method = getattr(PandasDataset, expectation_type, None)
+    if method is None:
+        raise ValueError(f"Unknown expectation: {expectation_type}")
+
+    args = [ast.literal_eval(arg) for arg in call.args]
+    kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in call.keywords}
+
+    # Resolve positional arguments to parameter names using the expectation signature
+    signature = inspect.signature(method)
+    bound = signature.bind_partial(None, *args, **kwargs).arguments
+    expectation_kwargs = {}
+    for name, value in bound.items():
+        if name == "self" or name in CALL_ONLY_KWARGS:
+            continue
+        if signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+            expectation_kwargs.update(value)
+        else:
+            expectation_kwargs[name] = value
+    return expectation_type, expectation_kwargs
+
+
+def run_expectation_suite(
+    df: pd.DataFrame,
+    expectations: List[Tuple[Hashable, str, Dict[str, Any]]],
+    suite_name: str = "dataset_suite",
+    result_format: str = "SUMMARY",
+    ge_df: PandasDataset = None
+) -> Dict[Hashable, Dict[str, Any]]:
+    """
+    Validate many expectations in a single suite run over one wrapped dataset.
+
+    Args:
+        df: DataFrame to validate
+        expectations: (key, expectation_type, kwargs) tuples; key identifies the result
+        suite_name: Name of the generated expectation suite
+        result_format: Great Expectations result format
+        ge_df: Already wrapped dataset to reuse instead of wrapping df
+
+    Returns:
+        Mapping of key to {"success", "result", "exception"}
+    """
+    suite = ExpectationSuite(expectation_suite_name=suite_name)
+    for key, expectation_type, kwargs in expectations:
+        # Append directly: add_expectation() would replace expectations that share
+        # a domain, e.g. a range rule and an outlier rule on the same column
+        suite.expectations.append(ExpectationConfiguration(
+            expectation_type=expectation_type,
+            kwargs=kwargs,
+            meta={"suite_key": key}
+        ))
+
+    if ge_df is None:
+        ge_df = ge.from_pandas(df)
+    validation = ge_df.validate(
+        expectation_suite=suite,
+        result_format=result_format,
+        catch_exceptions=True
+    )
+
+    results = {}
+    for result in validation.results:
+        key = result.expectation_config.meta.get("suite_key")
+        exception_info = result.exception_info or {}
+        results[key] = {
+            "success": bool(result.success),
+            "result": result.result or {},
+            "exception": exception_info.get("exception_message") if exception_info.get("raised_exception") else None
+        }
+    return results
+
+
+def run_per_expectation(df: pd.DataFrame, conditions: List[str]) -> List[bool]:
+    """Legacy path: wrap the frame and evaluate each expectation separately."""
+    outcomes = []
+    for condition in conditions:
+        ge_df = ge.from_pandas(df)
+        expectation_type, kwargs = parse_expectation(condition)
+        outcomes.append(bool(getattr(ge_df, expectation_type)(**kwargs).success))
+    return outcomes
+
+
+def compare_with_per_rule(df: pd.DataFrame, conditions: List[str]) -> Dict[str, Any]:
+    """
+    Time the single-suite path against wrapping the frame once per expectation.
+
+    Returns:
+        Timings in seconds and the speedup of the suite path
+    """
+    start = time.perf_counter()
+    per_rule = run_per_expectation(df, conditions)
+    per_rule_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expectations = [(i, *parse_expectation(c)) for i, c in enumerate(conditions)]
+    suite_results = run_expectation_suite(df, expectations)
+    suite_time = time.perf_counter() - start
+
+    return {
+        "expectations": len(conditions),
+        "rows": len(df),
+        "per_rule_seconds": per_rule_time,
+        "suite_seconds": suite_time,
+        "speedup": per_rule_time / suite_time if suite_time > 0 else None,
+        "results_match": per_rule == [suite_results[i]["success"] for i in range(len(conditions))]
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    rows = 200_000
+    data = pd.DataFrame({
+        f"num_{i}": rng.normal(size=rows) for i in range(10)
+    })
+    data["category"] = rng.choice(["a", "b", "c"], size=rows)
+
+    conditions = []
+    for column in data.columns[:-1]:
+        conditions.append(f"expect_column_values_to_not_be_null('{column}')")
+        conditions.append(f"expect_column_values_to_be_between('{column}', -4, 4)")
+    conditions.append("expect_column_values_to_be_in_set('category', ['a', 'b', 'c'])")
+
+    print(json.dumps(compare_with_per_rule(data, conditions), indent=2))
@@ -12,8 +12,10 @@ from enum import Enum
 
 # Import other services
 from .ai_agent_service import get_agent_response
-from .business_rules_service import BusinessRulesService
+from .business_rules_service import get_business_rules_service
 from .conversation_memory import conversation_memory
+from src.api.python.fingerprint import fingerprint_columns, result_cache
+from src.api.python.dataset_stats import DatasetStats, dataset_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -40,8 +42,6 @@ class EvalStatus(str, Enum):
     EXCELLENT = "excellent"
     IMPROVEMENT_NEEDED = "improvement_needed"
 
-# Initialize business rules service
-business_rules_service = BusinessRulesService()
 
 class OpenEvalsService:
     """
@@ -74,7 +74,7 @@ class OpenEvalsService:
         
         try:
             # Execute existing business rules
-            rule_execution = await business_rules_service.execute_rules(dataset_id, df)
+            rule_execution = await get_business_rules_service().execute_rules(dataset_id, df)
             
             # Create evaluation log entry
             evaluation = {
@@ -157,26 +157,14 @@ class OpenEvalsService:
                 "accuracy": {}
             }
             
-            # Completeness (missing values)
-            missing_counts = df.isna().sum()
-            for column in df.columns:
-                missing = missing_counts[column]
-                missing_pct = (missing / len(df)) * 100 if len(df) > 0 else 0
-                dq_metrics["completeness"][column] = {
-                    "missing_count": int(missing),
-                    "missing_percentage": float(missing_pct),
-                    "score": float(100 - missing_pct)  # Higher is better
-                }
-            
-            # Uniqueness
-            for column in df.columns:
-                unique_count = df[column].nunique()
-                unique_pct = (unique_count / len(df)) * 100 if len(df) > 0 else 0
-                dq_metrics["uniqueness"][column] = {
-                    "unique_count": int(unique_count),
-                    "unique_percentage": float(unique_pct),
-                    "is_unique": unique_count == len(df)
-                }
+            # Completeness and uniqueness, reused for columns already evaluated
+            stats = dataset_stats.get(df)
+            column_metrics = result_cache.get_or_compute_columns(
+                dict(zip(df.columns, fingerprint_columns(df))), "data_quality",
+                lambda columns: {column: self._column_quality(stats, column) for column in columns})
+            for column, metrics in column_metrics.items():
+                dq_metrics["completeness"][column] = metrics["completeness"]
+                dq_metrics["uniqueness"][column] = metrics["uniqueness"]
             
             # Overall data quality score (simple average)
             completeness_scores = [metric["score"] for metric in dq_metrics["completeness"].values()]
@@ -230,6 +218,26 @@ class OpenEvalsService:
             
             return evaluation
     
+    def _column_quality(self, stats: DatasetStats, column: str) -> Dict[str, Dict[str, Any]]:
+        """Completeness (missing values) and uniqueness of one column"""
+        values = stats.data[column]
+        missing = stats.null_count(column)
+        missing_pct = (missing / len(values)) * 100 if len(values) > 0 else 0
+        unique_count = stats.unique_count(column)
+        unique_pct = (unique_count / len(values)) * 100 if len(values) > 0 else 0
+        return {
+            "completeness": {
+                "missing_count": int(missing),
+                "missing_percentage": float(missing_pct),
+                "score": float(100 - missing_pct)  # Higher is better
+            },
+            "uniqueness": {
+                "unique_count": int(unique_count),
+                "unique_percentage": float(unique_pct),
+                "is_unique": unique_count == len(values)
+            }
+        }
+    
     async def generate_business_rules_with_openeval(self, 
                                                    dataset_id: str, 
                                                    column_metadata: Dict[str, Any],
@@ -252,7 +260,7 @@ class OpenEvalsService:
         
         try:
             # Step 1: Generate initial rules using AI
-            initial_rules = await business_rules_service.generate_ai_rules(dataset_id, column_metadata)
+            initial_rules = await get_business_rules_service().generate_ai_rules(dataset_id, column_metadata)
             
             # If no sample data, return the initial rules
             if data_sample is None or len(initial_rules.get("rules", [])) == 0:
@@ -282,7 +290,7 @@ class OpenEvalsService:
             
             for rule in rules_to_test:
                 # Execute rule
-                result = await business_rules_service._execute_python_rule(rule, data_sample)
+                result = await get_business_rules_service()._execute_python_rule(rule, data_sample)
                 
                 # Add test result
                 test_results.append({
@@ -343,7 +351,7 @@ class OpenEvalsService:
                         corrected_rule["metadata"]["original_condition"] = rule["condition"] 
                         
                         # Test corrected rule
-                        test_result = await business_rules_service._execute_python_rule(corrected_rule, data_sample)
+                        test_result = await get_business_rules_service()._execute_python_rule(corrected_rule, data_sample)
                         
                         if test_result.get("success"):
                             # Rule successfully corrected
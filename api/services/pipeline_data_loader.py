@@ -18,7 +18,9 @@ import uuid
 from functools import lru_cache
 
 # Import business rules service
-from services.business_rules_service import BusinessRulesService
+from services.business_rules_service import BusinessRulesService, get_business_rules_service
+from src.api.python.type_inference import type_engine
+from src.api.python.dtype_optimization import dtype_optimizer, is_text_dtype, to_records
 
 # Import local services
 from services.cache_service import get_cached_response, cache_response
@@ -46,9 +48,6 @@ class PipelineDataLoader:
         logger.info("Initializing AI-powered Pipeline Data Loader")
         self.temp_storage = {}
         
-        # Initialize business rules service
-        self.business_rules_service = BusinessRulesService()
-        
         # Configure supported file types and their handlers
         self.file_handlers = {
             "csv": self._load_csv,
@@ -65,10 +64,11 @@ class PipelineDataLoader:
         Args:
             file_path: Path to the file
             file_type: Type of file (csv, excel, json, etc.)
-            options: Additional loading options
+            options: Additional loading options; "optimize_dtypes": False keeps
+                the loaded dtypes instead of converting to compact ones
             
         Returns:
-            Dictionary containing loaded data, stats and automatically inferred schema
+            Dictionary containing loaded data, stats (with a memory report) and automatically inferred schema
         """
         try:
             # Generate a unique dataset ID if not provided
@@ -98,6 +98,11 @@ class PipelineDataLoader:
             else:
                 raise ValueError(f"Unsupported file type: {file_type}")
             
+            # Convert columns to compact dtypes before anything else holds on to the frame
+            memory_report = None
+            if options.get("optimize_dtypes", True):
+                df, memory_report = dtype_optimizer.optimize(df)
+            
             # Store in temporary storage
             self.temp_storage[dataset_id] = df
             
@@ -116,12 +121,14 @@ class PipelineDataLoader:
                 "missing_values": int(df.isna().sum().sum()),
                 "column_types": {col: str(df[col].dtype) for col in df.columns}
             }
+            if memory_report is not None:
+                stats["memory"] = memory_report
             
             # Combine results
             result = {
                 "success": True,
                 "dataset_id": dataset_id,
-                "data_sample": df.head(10).to_dict(orient="records"),
+                "data_sample": to_records(df.head(10)),
                 "stats": {**stats, **load_stats} if load_stats else stats,
                 "schema": schema,
                 "validation": {
@@ -305,38 +312,26 @@ class PipelineDataLoader:
         
         return df, stats
     
+    @property
+    def business_rules_service(self) -> BusinessRulesService:
+        """Shared business rules service, created on first use"""
+        return get_business_rules_service()
+    
     def _infer_column_types(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Use advanced type inference to clean DataFrame"""
+        """Use advanced type inference to clean DataFrame
+
+        Object columns are converted to datetime, numeric or boolean when the
+        shared type-inference engine detects it from a sample (confirmed on the
+        full column when needed); decisions are cached per column content.
+        """
         for col in df.columns:
             # Skip columns that already have appropriate types
             if df[col].dtype != 'object':
                 continue
-                
-            # Try to convert to datetime
-            try:
-                pd.to_datetime(df[col], errors='raise')
-                df[col] = pd.to_datetime(df[col])
-                continue
-            except:
-                pass
-                
-            # Try to convert to numeric
-            try:
-                numeric_values = pd.to_numeric(df[col], errors='coerce')
-                # Only convert if most values are valid numbers
-                if numeric_values.notna().mean() > 0.8:
-                    df[col] = numeric_values
-                continue
-            except:
-                pass
-                
-            # Check for boolean values
-            bool_values = {'true', 'false', 'yes', 'no', 'y', 'n', 't', 'f', '1', '0'}
-            if df[col].astype(str).str.lower().isin(bool_values).all():
-                df[col] = df[col].astype(str).str.lower().map({
-                    'true': True, 'yes': True, 'y': True, 't': True, '1': True,
-                    'false': False, 'no': False, 'n': False, 'f': False, '0': False
-                })
+            
+            parse_type, converted = type_engine.convert_column(df[col])
+            if parse_type is not None:
+                df[col] = converted
                 
         return df
     
@@ -365,8 +360,8 @@ class PipelineDataLoader:
             Business rules validation results
         """
         try:
-            # Get business rules for the dataset
-            rules = await self.business_rules_service.get_rules_for_dataset(dataset_id)
+            # Get business rules for the dataset (served from the versioned rule-set cache)
+            rules = await self.business_rules_service.load_rules(dataset_id)
             
             if not rules or len(rules) == 0:
                 return {
@@ -383,13 +378,15 @@ class PipelineDataLoader:
                 if not rule.get("active", True):
                     continue
                     
-                rule_result = await self.business_rules_service.execute_rule(rule, df)
+                rule_result = await self.business_rules_service._execute_rule(rule, df)
+                metadata = rule_result.get("metadata", {})
+                violations = metadata.get("affected_rows", metadata.get("errors", []))
                 results.append({
                     "rule_id": rule.get("id"),
                     "rule_name": rule.get("name"),
-                    "passed": rule_result.get("passed", False),
-                    "violations": rule_result.get("violations", []),
-                    "violation_count": len(rule_result.get("violations", [])),
+                    "passed": rule_result.get("success", False),
+                    "violations": violations,
+                    "violation_count": metadata.get("total_affected", metadata.get("total_failed", len(violations))),
                     "execution_time": rule_result.get("execution_time")
                 })
             
@@ -495,7 +492,7 @@ class PipelineDataLoader:
                 text_columns = []
                 # Look for likely text columns (object type with enough text)
                 for col in df.columns:
-                    if df[col].dtype == 'object':
+                    if is_text_dtype(df[col].dtype):
                         # Check if column has string values with sufficient length
                         sample = df[col].dropna().astype(str)
                         if len(sample) > 0 and sample.str.len().mean() > 10:
@@ -503,7 +500,7 @@ class PipelineDataLoader:
             
             # If still no text columns, use all object columns
             if not text_columns:
-                text_columns = [col for col in df.columns if df[col].dtype == 'object']
+                text_columns = [col for col in df.columns if is_text_dtype(df[col].dtype)]
             
             # Check if we have columns to work with
             if not text_columns:
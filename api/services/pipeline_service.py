@@ -17,6 +17,7 @@ from sklearn.ensemble import IsolationForest
 from config.settings import get_settings
 from repositories.dataset_repository import DatasetRepository
 from models.dataset import DatasetStatus
+from src.api.python.dataset_stats import DatasetStats, dataset_stats
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -62,14 +63,17 @@ class DataPipeline:
             cleaned_path = f"{dataset['file_path']}_cleaned.csv"
             cleaned_df.to_csv(cleaned_path, index=False)
             
+            # Column statistics shared by the steps below
+            stats = dataset_stats.get(cleaned_df)
+            
             # 2. Validate data
-            validation_results = await self._validate_data(cleaned_df)
+            validation_results = await self._validate_data(cleaned_df, stats)
             
             # 3. Generate profile
             profile = await self._generate_profile(cleaned_df)
             
             # 4. Perform analytics
-            analytics_results = await self._analyze_data(cleaned_df)
+            analytics_results = await self._analyze_data(cleaned_df, stats)
             
             # 5. Detect anomalies
             anomalies = await self._detect_anomalies(cleaned_df)
@@ -88,8 +92,8 @@ class DataPipeline:
                         "name": col,
                         "data_type": str(cleaned_df[col].dtype),
                         "stats": {
-                            "unique": int(cleaned_df[col].nunique()),
-                            "missing": int(cleaned_df[col].isnull().sum())
+                            "unique": stats.unique_count(col),
+                            "missing": stats.null_count(col)
                         }
                     }
                     for col in cleaned_df.columns
@@ -136,14 +140,16 @@ class DataPipeline:
         
         return result_df
     
-    async def _validate_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def _validate_data(self, df: pd.DataFrame, stats: Optional[DatasetStats] = None) -> Dict[str, Any]:
         """Validate dataset and return quality metrics."""
+        if stats is None:
+            stats = dataset_stats.get(df)
         return {
             "row_count": len(df),
             "column_count": len(df.columns),
-            "missing_values": df.isnull().sum().to_dict(),
-            "duplicates": int(df.duplicated().sum()),
-            "quality_score": self._calculate_quality_score(df)
+            "missing_values": stats.null_counts().to_dict(),
+            "duplicates": stats.duplicate_count(),
+            "quality_score": self._calculate_quality_score(df, stats)
         }
     
     async def _generate_profile(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -151,23 +157,34 @@ class DataPipeline:
         profile = yp.ProfileReport(df, minimal=True)
         return profile.get_description()
     
-    async def _analyze_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def _analyze_data(self, df: pd.DataFrame, stats: Optional[DatasetStats] = None) -> Dict[str, Any]:
         """Perform data analysis and return insights."""
+        if stats is None:
+            stats = dataset_stats.get(df)
+        numeric_cols = stats.numeric_columns()
+        if len(numeric_cols) <= 1:
+            correlation = {}
+        elif len(numeric_cols) == df.shape[1]:
+            correlation = stats.correlation().to_dict()
+        else:
+            # Columns left non-numeric by cleaning are correlated as DataFrame.corr does
+            correlation = df.corr().to_dict()
         insights = {
-            "correlation": df.corr().to_dict() if len(df.select_dtypes(include=['number']).columns) > 1 else {},
-            "summary_stats": df.describe().to_dict(),
+            "correlation": correlation,
+            "summary_stats": stats.describe().to_dict(),
             "key_metrics": {}
         }
         
         # Calculate key metrics for each column
-        for col in df.columns:
-            if df[col].dtype in ['int64', 'float64']:
-                insights["key_metrics"][col] = {
-                    "mean": float(df[col].mean()),
-                    "median": float(df[col].median()),
-                    "std": float(df[col].std()),
-                    "skew": float(df[col].skew())
-                }
+        metric_cols = [col for col in df.columns if df[col].dtype in ['int64', 'float64']]
+        moments = stats.column_moments(metric_cols)
+        for col in metric_cols:
+            insights["key_metrics"][col] = {
+                "mean": float(moments[col]["mean"]),
+                "median": stats.median(col),
+                "std": float(moments[col]["std"]),
+                "skew": float(stats.skew(col))
+            }
         
         return insights
     
@@ -194,10 +211,12 @@ class DataPipeline:
         # For now, return random embeddings
         return np.random.rand(768)  # 768-dimensional embedding
     
-    def _calculate_quality_score(self, df: pd.DataFrame) -> float:
+    def _calculate_quality_score(self, df: pd.DataFrame, stats: Optional[DatasetStats] = None) -> float:
         """Calculate overall data quality score."""
+        if stats is None:
+            stats = dataset_stats.get(df)
         # Calculate based on missing values, duplicates, and data types
-        missing_score = 1 - (df.isnull().sum().sum() / (df.shape[0] * df.shape[1]))
-        duplicate_score = 1 - (df.duplicated().sum() / len(df))
+        missing_score = 1 - (stats.null_counts().sum() / (df.shape[0] * df.shape[1]))
+        duplicate_score = 1 - (stats.duplicate_count() / len(df))
         
         return (missing_score + duplicate_score) / 2
@@ -6,6 +6,9 @@ from datetime import datetime
 import great_expectations as ge
 from transformers import pipeline
 
+from src.api.python.columnar_validation import schema_engine, schema_from_dtypes
+from services.ge_suite_runner import run_expectation_suite
+
 class ValidationRule(BaseModel):
     field: str
     rule_type: str
@@ -22,30 +25,9 @@ class ValidationService:
         return [ValidationRule(**rule) for rule in rules_data]
 
     def create_dynamic_model(self, df: pd.DataFrame, rules: List[ValidationRule]) -> BaseModel:
-        """Create a Pydantic model dynamically based on DataFrame schema and rules"""
-        field_types = {}
-        validators = {}
-
-        for column in df.columns:
-            dtype = df[column].dtype
-            if dtype == 'object':
-                field_types[column] = (str, ...)
-            elif dtype == 'int64':
-                field_types[column] = (int, ...)
-            elif dtype == 'float64':
-                field_types[column] = (float, ...)
-            else:
-                field_types[column] = (str, ...)
-
-        # Add validators based on rules
-        for rule in rules:
-            if rule.rule_type == 'range':
-                validators[f'validate_{rule.field}'] = validator(
-                    rule.field,
-                    allow_reuse=True
-                )(lambda v, field: self._validate_range(v, field, rule.parameters))
-
-        return create_model('DynamicModel', **field_types)
+        """Get the (cached) Pydantic model for the DataFrame schema and range rules"""
+        range_rules = {rule.field: rule.parameters for rule in rules if rule.rule_type == 'range'}
+        return schema_engine.compile(schema_from_dtypes(df, range_rules)).model
 
     async def validate_data(
         self,
@@ -76,41 +58,45 @@ class ValidationService:
             rules.extend([ValidationRule(**rule) for rule in custom_rules])
 
         if rules:
-            dynamic_model = self.create_dynamic_model(df, rules)
-            schema_errors = []
-            for idx, row in df.iterrows():
-                try:
-                    dynamic_model(**row.to_dict())
-                except Exception as e:
-                    schema_errors.append({'row': idx, 'error': str(e)})
+            # Column-wise validation against the dtype schema plus range rules
+            range_rules = {
+                rule.field: rule.parameters for rule in rules if rule.rule_type == 'range'
+            }
+            result = schema_engine.validate(df, schema_from_dtypes(df, range_rules))
+            schema_errors = [
+                {
+                    'row': row['row_index'],
+                    'error': '; '.join(f"{e['field']}: {e['error']}" for e in row['errors'])
+                }
+                for row in result.row_errors()
+            ]
             validation_results['schema_validation'] = {
                 'passed': len(schema_errors) == 0,
                 'errors': schema_errors
             }
 
         # 2. Great Expectations Validation
-        ge_df = ge.from_pandas(df)
-        ge_results = {}
-
-        # Basic column expectations
+        # All column expectations run as one suite over a single wrapped dataset
+        expectations = []
         for column in df.columns:
+            expectations.append(((column, 'not_null'), 'expect_column_values_to_not_be_null', {'column': column}))
             if df[column].dtype in ['int64', 'float64']:
-                ge_results[column] = {
-                    'not_null': ge_df.expect_column_values_to_not_be_null(column).success,
-                    'in_range': ge_df.expect_column_values_to_be_between(
-                        column,
-                        min_value=df[column].min(),
-                        max_value=df[column].max()
-                    ).success
-                }
+                expectations.append((
+                    (column, 'in_range'),
+                    'expect_column_values_to_be_between',
+                    {'column': column, 'min_value': df[column].min(), 'max_value': df[column].max()}
+                ))
             else:
-                ge_results[column] = {
-                    'not_null': ge_df.expect_column_values_to_not_be_null(column).success,
-                    'unique_count': ge_df.expect_column_unique_value_count_to_be_between(
-                        column,
-                        min_value=1
-                    ).success
-                }
+                expectations.append((
+                    (column, 'unique_count'),
+                    'expect_column_unique_value_count_to_be_between',
+                    {'column': column, 'min_value': 1}
+                ))
+
+        suite_results = run_expectation_suite(df, expectations, suite_name='data_quality_validation')
+        ge_results = {}
+        for (column, check), result in suite_results.items():
+            ge_results.setdefault(column, {})[check] = result['success']
 
         validation_results['data_quality_validation'] = ge_results
 
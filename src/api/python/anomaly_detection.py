@@ -5,6 +5,8 @@ Anomaly Detection Module
 This module provides functionality for detecting anomalies in datasets
 using statistical methods and machine learning techniques including
 isolation forests, autoencoders, and vector database comparison.
+Fitted isolation forests and autoencoders are kept in the shared model
+store, so identical training data is not fitted twice.
 
 In a production environment, this would be deployed as an API endpoint or microservice.
 """
@@ -14,10 +16,18 @@ import numpy as np
 from sklearn.ensemble import IsolationForest
 from sklearn.neighbors import LocalOutlierFactor
 from typing import Dict, List, Any, Union, Optional
+import copy
 import logging
 import json
 from datetime import datetime
 
+try:
+    from .fingerprint import fingerprint_dataframe
+    from .model_store import FittedModel, anomaly_model_store, resolved_params, warm_start_forest
+except ImportError:
+    from fingerprint import fingerprint_dataframe
+    from model_store import FittedModel, anomaly_model_store, resolved_params, warm_start_forest
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -91,14 +101,25 @@ class AnomalyDetector:
         self.embedding_model = None
         logger.info(f"AnomalyDetector initialized with method: {method}")
     
-    def fit(self, data: pd.DataFrame, columns: Optional[List[str]] = None):
+    def fit(self, data: pd.DataFrame, columns: Optional[List[str]] = None,
+            lineage: Optional[str] = None, warm_start: bool = False):
         """
         Fit the anomaly detection model to the data
         
+        Isolation forests and autoencoders fitted before on identical data
+        with the same parameters are taken from the model store instead of
+        being trained again; detect() then scores new data with them.
+        
         Args:
             data: Pandas DataFrame containing the dataset
             columns: List of column names to use for fitting
                      (if None, all numeric columns are used)
+            lineage: Dataset the data is a version of (e.g. its ID); its last
+                     model is used for warm starts
+            warm_start: Continue from the lineage's last model (for appended
+                        data) instead of training from scratch: an isolation
+                        forest grows extra trees, an autoencoder trains for
+                        a few more epochs
         """
         # Select columns for analysis
         if columns is None:
@@ -113,23 +134,58 @@ class AnomalyDetector:
         # Fill missing values for algorithm processing
         analysis_data = analysis_data.fillna(analysis_data.mean())
         
-        # Fit the appropriate model
+        # Stored forests are keyed by their resolved parameters, which other callers of the store share
+        store_params = self.params
         if self.method == "isolation_forest":
             n_estimators = self.params.get('n_estimators', 100)
-            contamination = self.params.get('contamination', 'auto')
-            random_state = self.params.get('random_state', 42)
-            
-            self.model = IsolationForest(
+            forest = IsolationForest(
                 n_estimators=n_estimators,
-                contamination=contamination,
-                random_state=random_state
+                contamination=self.params.get('contamination', 'auto'),
+                random_state=self.params.get('random_state', 42)
             )
-            self.model.fit(analysis_data)
+            store_params = resolved_params(forest, self.params)
+        
+        # Reuse a model fitted on the same data
+        stored = self.method == "isolation_forest" or (self.method == "autoencoder" and TORCH_AVAILABLE)
+        fingerprint = fingerprint_dataframe(analysis_data) if stored else None
+        if stored:
+            fitted = anomaly_model_store.get(fingerprint, self.method, store_params)
+            if fitted is not None:
+                self._restore(fitted)
+                logger.info(f"Reusing stored {self.method} model")
+                return self
+        
+        # Last model of the dataset, to continue training from
+        previous = None
+        if stored and warm_start and lineage is not None:
+            previous = anomaly_model_store.latest(lineage, self.method, store_params)
+            if previous is not None and not previous.fits_columns(analysis_data.columns):
+                previous = None
+        
+        # Fit the appropriate model
+        if self.method == "isolation_forest":
+            self.model = None
+            if previous is not None:
+                self.model = warm_start_forest(previous.estimator, analysis_data,
+                                               self.params.get('warm_start_estimators', max(1, n_estimators // 4)),
+                                               self.params.get('max_estimators', 2 * n_estimators))
+            if self.model is None:
+                self.model = forest
+                self.model.fit(analysis_data)
             logger.info("Isolation forest model fitted")
+            anomaly_model_store.put(
+                FittedModel(self.method, store_params, self.model, analysis_data.columns, fingerprint, len(analysis_data)),
+                lineage
+            )
             
         elif self.method == "autoencoder" and TORCH_AVAILABLE:
-            self._fit_autoencoder(analysis_data)
+            self._fit_autoencoder(analysis_data, previous)
             logger.info("Autoencoder model fitted")
+            anomaly_model_store.put(
+                FittedModel(self.method, self.params, self.model, analysis_data.columns, fingerprint,
+                            len(analysis_data), scaler=self.scaler, details={"threshold": self.threshold}),
+                lineage
+            )
             
         elif self.method == "vector_comparison" and VECTOR_DB_AVAILABLE:
             self._fit_vector_db(analysis_data)
@@ -137,11 +193,23 @@ class AnomalyDetector:
             
         return self
     
-    def _fit_autoencoder(self, data: pd.DataFrame):
-        """Fit an autoencoder model to the data"""
-        # Normalize data to [0,1]
-        min_vals = data.min()
-        max_vals = data.max()
+    def _restore(self, fitted: FittedModel):
+        """Use a stored fitted model"""
+        self.model = fitted.estimator
+        if fitted.scaler is not None:
+            self.scaler = fitted.scaler
+        if "threshold" in fitted.details:
+            self.threshold = fitted.details["threshold"]
+    
+    def _fit_autoencoder(self, data: pd.DataFrame, previous: Optional[FittedModel] = None):
+        """Fit an autoencoder model to the data, or continue training a previous one"""
+        # Normalize data to [0,1] (with the previous model's scaling when continuing its training)
+        if previous is not None:
+            min_vals = previous.scaler["min"]
+            max_vals = previous.scaler["max"]
+        else:
+            min_vals = data.min()
+            max_vals = data.max()
         normalized_data = (data - min_vals) / (max_vals - min_vals)
         
         # Convert to PyTorch tensors
@@ -157,9 +225,13 @@ class AnomalyDetector:
         dataset = TensorDataset(X_tensor, X_tensor)
         dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
         
-        # Create and train the autoencoder
+        # Create and train the autoencoder (a copy of the previous one, for a few epochs, when continuing)
         input_dim = data.shape[1]
-        self.model = Autoencoder(input_dim, encoding_dim)
+        if previous is not None:
+            self.model = copy.deepcopy(previous.estimator)
+            epochs = self.params.get('warm_start_epochs', max(1, epochs // 5))
+        else:
+            self.model = Autoencoder(input_dim, encoding_dim)
         self.scaler = {"min": min_vals, "max": max_vals}
         
         optimizer = optim.Adam(self.model.parameters(), lr=learning_rate)
@@ -272,7 +344,25 @@ class AnomalyDetector:
     def _isolation_forest(self, analysis_data: pd.DataFrame, 
                          original_data: pd.DataFrame) -> Dict[str, Any]:
         """Use Isolation Forest algorithm to detect anomalies"""
-        # ... keep existing code (isolation forest implementation)
+        try:
+            # Score with the fitted model, fitting one first if needed
+            if self.model is None:
+                self.fit(analysis_data)
+            
+            # Negated scores, so that higher is more anomalous
+            anomaly_scores = -self.model.score_samples(analysis_data)
+            anomaly_indices = np.where(self.model.predict(analysis_data) == -1)[0]
+            
+            return self._format_results(original_data, anomaly_indices, anomaly_scores,
+                                      analysis_data.columns.tolist(),
+                                      method_details={
+                                          "threshold": float(-self.model.offset_),
+                                          "n_estimators": len(self.model.estimators_)
+                                      })
+            
+        except Exception as e:
+            logger.error(f"Error in isolation forest detection: {str(e)}")
+            return {"success": False, "error": str(e)}
     
     def _local_outlier_factor(self, analysis_data: pd.DataFrame, 
                              original_data: pd.DataFrame) -> Dict[str, Any]:
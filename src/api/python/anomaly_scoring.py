@@ -0,0 +1,151 @@
+
+"""
+Anomaly Scoring Module
+
+This module post-processes the output of an anomaly detector for reporting,
+for all anomalies at once instead of row by row:
+- column means and standard deviations are computed once per run, and the
+  z-scores of all anomalous rows in one array operation, giving each row's
+  most extreme column
+- the distance from each anomaly to its nearest inlier comes from one
+  index built over the inliers (exact FAISS search when available,
+  otherwise a scikit-learn KD-tree or ball tree), queried in batches
+- anomalies are ranked by their scores, so the reported top anomalies are
+  the highest-scoring ones
+
+Z-scores use the sample standard deviation, as pandas does; columns without
+variance have no z-score.
+"""
+
+import logging
+from typing import List, Any, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree, KDTree
+
+try:
+    from .knn_imputation import KD_TREE_MAX_DIMS
+except ImportError:
+    from knn_imputation import KD_TREE_MAX_DIMS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+
+def nearest_distances(reference: np.ndarray, queries: np.ndarray, backend: str = "auto",
+                      batch_size: int = 10_000) -> np.ndarray:
+    """
+    Euclidean distance from each query point to its nearest reference point
+
+    Args:
+        reference: (m, d) points to index
+        queries: (n, d) points to look up
+        backend: "faiss", "kd_tree", "ball_tree" or "auto" (FAISS if installed,
+            otherwise a KD-tree for up to KD_TREE_MAX_DIMS dimensions and a ball tree above)
+        batch_size: Query points looked up at a time
+
+    Returns:
+        Array of n distances
+    """
+    if backend == "auto":
+        if FAISS_AVAILABLE:
+            backend = "faiss"
+        else:
+            backend = "kd_tree" if reference.shape[1] <= KD_TREE_MAX_DIMS else "ball_tree"
+    if backend == "faiss":
+        index = faiss.IndexFlatL2(reference.shape[1])
+        index.add(np.ascontiguousarray(reference, dtype=np.float32))
+    elif backend == "kd_tree":
+        index = KDTree(reference)
+    elif backend == "ball_tree":
+        index = BallTree(reference)
+    else:
+        raise ValueError(f"Unknown nearest neighbour backend: {backend}")
+
+    distances = np.empty(len(queries))
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        if backend == "faiss":
+            squared, _ = index.search(np.ascontiguousarray(batch, dtype=np.float32), 1)
+            distances[start:start + len(batch)] = np.sqrt(np.maximum(squared[:, 0], 0))
+        else:
+            distances[start:start + len(batch)] = index.query(batch, k=1)[0][:, 0]
+    return distances
+
+
+def rank(scores: np.ndarray) -> np.ndarray:
+    """Positions of scores from highest to lowest, ties in their original order"""
+    return np.argsort(-np.asarray(scores, dtype=float), kind="stable")
+
+
+class AnomalyScorer:
+    """Statistics of one detection run's numeric data, shared by all of its anomalies"""
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Initialize the scorer
+
+        Args:
+            data: Numeric data the detector ran on (the rows anomaly positions refer to)
+        """
+        self.columns = list(data.columns)
+        self.values = data.to_numpy(dtype=float)
+        self.means = data.mean().to_numpy(dtype=float)
+        self.stds = data.std().to_numpy(dtype=float)
+
+    def z_scores(self, rows: np.ndarray) -> np.ndarray:
+        """Absolute z-scores of rows, (len(rows), columns); NaN for columns without variance"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = np.abs(self.values[rows] - self.means) / self.stds
+        z[:, ~(self.stds > 0)] = np.nan
+        return z
+
+    def extreme_columns(self, rows: np.ndarray) -> Tuple[List[Any], np.ndarray]:
+        """
+        Most extreme column of each row
+
+        Args:
+            rows: Row positions
+
+        Returns:
+            (column name of each row's largest z-score, that z-score); rows
+            whose columns all lack variance get the first column and NaN
+        """
+        z = self.z_scores(rows)
+        if len(rows) == 0 or z.shape[1] == 0:
+            return [], np.empty(0)
+        filled = np.where(np.isnan(z), -np.inf, z)
+        positions = np.argmax(filled, axis=1)
+        largest = filled[np.arange(len(rows)), positions]
+        largest = np.where(np.isneginf(largest), np.nan, largest)
+        return [self.columns[i] for i in positions], largest
+
+    def value(self, row: int, column: Any) -> float:
+        """Value of a column in a row"""
+        return float(self.values[row, self.columns.index(column)])
+
+    def nearest_inlier_distances(self, points: np.ndarray, anomalies_mask: np.ndarray,
+                                 backend: str = "auto") -> np.ndarray:
+        """
+        Distance from each anomaly to its nearest inlier
+
+        Args:
+            points: Coordinates of every row (e.g. the scaled data the detector used)
+            anomalies_mask: Which rows are anomalies
+            backend: Nearest neighbour backend (see nearest_distances)
+
+        Returns:
+            Distance of each anomaly, in row order; empty when there are no inliers
+        """
+        inliers = points[~anomalies_mask]
+        if len(inliers) == 0:
+            return np.empty(0)
+        return nearest_distances(inliers, points[anomalies_mask], backend)
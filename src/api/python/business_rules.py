@@ -17,16 +17,34 @@ import logging
 import re
 from datetime import datetime
 
+try:
+    from .violation_store import ViolationRun, ViolationSet, ViolationStore
+    from .sketches import HyperLogLog
+except ImportError:
+    from violation_store import ViolationRun, ViolationSet, ViolationStore
+    from sketches import HyperLogLog
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rule generation samples tables above this many rows down to a reservoir sample
+DEFAULT_SAMPLE_THRESHOLD = 1_000_000
+DEFAULT_SAMPLE_SIZE = 100_000
+
+# HyperLogLog precision of the full-column distinct counts of sampled tables (about 0.8% error)
+DISTINCT_COUNT_PRECISION = 14
+
+# Rows whose row dicts are built at a time when rules are applied
+DEFAULT_RULE_CHUNK_SIZE = 10_000
+
 class RuleEngine:
     """Class for managing and executing business rules"""
     
     def __init__(self):
         """Initialize the rule engine"""
         self.rules = []
+        self.violation_store = ViolationStore()
         logger.info("RuleEngine initialized")
     
     def load_rules(self, rules_json: Union[str, Dict, List]) -> Dict[str, Any]:
@@ -137,12 +155,21 @@ def evaluate_condition(data):
             logger.error(f"Error compiling condition '{condition}': {str(e)}")
             raise ValueError(f"Invalid condition syntax: {str(e)}")
     
-    def apply_rules(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def apply_rules(self, data: pd.DataFrame, page_size: int = 1000,
+                    chunk_size: int = DEFAULT_RULE_CHUNK_SIZE) -> Dict[str, Any]:
         """
         Apply rules to a dataframe and get violations
         
+        Violations are stored per rule as compressed row sets in a run record;
+        the result carries exact counts and the first page of violations. Use
+        get_violations() with the returned run_id to page through the rest.
+        Row contexts are built for chunk_size rows at a time and shared by all
+        rules, so only one chunk of row dicts is held in memory.
+        
         Args:
             data: Pandas DataFrame to apply rules to
+            page_size: Number of violations to include in the result
+            chunk_size: Number of rows evaluated at a time
             
         Returns:
             Dict with rule application results and violations
@@ -156,60 +183,48 @@ def evaluate_condition(data):
                     "violations": []
                 }
             
-            violations = []
-            rules_applied = 0
+            run = ViolationRun(len(data))
+            errors = {}
             
-            # Apply each rule to the data
-            for rule in self.rules:
-                rules_applied += 1
-                rule_id = rule["id"]
-                rule_name = rule["name"]
-                condition = rule["condition"]
-                severity = rule.get("severity", "medium")
-                message = rule.get("message", f"Violated rule: {rule_name}")
-                
+            # Compile each rule's condition; a row violates the rule when it is False
+            evaluators = {}
+            for i, rule in enumerate(self.rules):
                 try:
-                    # Compile the condition
-                    evaluate_fn = self._compile_condition(condition)
-                    
-                    # Apply the rule to each row
-                    for index, row in data.iterrows():
-                        # Create data context
-                        context = row.to_dict()
-                        
-                        # Evaluate the condition
-                        result = evaluate_fn(context)
-                        
-                        # If condition is False, it's a violation
-                        if not result:
-                            violations.append({
-                                "rule_id": rule_id,
-                                "rule_name": rule_name,
-                                "row_index": int(index),
-                                "severity": severity,
-                                "message": message
-                            })
-                            
-                            # Limit to 1000 violations for performance
-                            if len(violations) >= 1000:
-                                break
-                    
+                    evaluators[i] = self._compile_condition(rule["condition"])
                 except Exception as e:
-                    logger.error(f"Error applying rule '{rule_name}': {str(e)}")
-                    violations.append({
-                        "rule_id": rule_id,
-                        "rule_name": rule_name,
-                        "row_index": None,
-                        "severity": "error",
-                        "message": f"Error evaluating rule: {str(e)}"
-                    })
+                    errors[i] = str(e)
+            passed = {i: np.empty(len(data), dtype=bool) for i in evaluators}
+            
+            # Apply the rules one chunk of rows at a time
+            for start in range(0, len(data), chunk_size):
+                records = data.iloc[start:start + chunk_size].to_dict(orient="records")
+                for i, evaluate_fn in list(evaluators.items()):
+                    try:
+                        passed[i][start:start + len(records)] = np.fromiter(
+                            (evaluate_fn(context) for context in records), dtype=bool, count=len(records))
+                    except Exception as e:
+                        errors[i] = str(e)
+                        del evaluators[i]
+            
+            for i, rule in enumerate(self.rules):
+                if i in errors:
+                    logger.error(f"Error applying rule '{rule['name']}': {errors[i]}")
+                    run.add_error(rule, errors[i])
+                else:
+                    run.add(rule, ViolationSet.from_mask(~passed[i]))
+            
+            self.violation_store.put(run)
+            first_page = run.page(limit=page_size, index=data.index)
             
             return {
                 "success": True,
-                "rules_applied": rules_applied,
+                "run_id": run.run_id,
+                "rules_applied": len(self.rules),
                 "total_rows": len(data),
-                "violation_count": len(violations),
-                "violations": violations
+                "violation_count": run.violation_count,
+                "rule_summary": run.summary()["rules"],
+                "violations": first_page["violations"],
+                "has_more": first_page["has_more"]
             }
             
         except Exception as e:
@@ -219,13 +234,45 @@ def evaluate_condition(data):
                 "error": str(e)
             }
     
+    def get_violations(self, run_id: str, rule_id: Optional[str] = None, offset: int = 0,
+                       limit: int = 100, data: Optional[pd.DataFrame] = None,
+                       columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Page through the violations of a previous apply_rules run
+        
+        Args:
+            run_id: Run ID returned by apply_rules
+            rule_id: Restrict to one rule's violations
+            offset: Number of violations to skip
+            limit: Maximum number of violations to return
+            data: The validated DataFrame, to include row values
+            columns: Columns to project from data
+            
+        Returns:
+            Dict with the page of violations and paging information
+        """
+        run = self.violation_store.get(run_id)
+        if run is None:
+            return {
+                "success": False,
+                "error": f"Run {run_id} not found"
+            }
+        return {
+            "success": True,
+            **run.page(rule_id=rule_id, offset=offset, limit=limit, data=data, columns=columns)
+        }
+    
     def generate_rules(self, data: pd.DataFrame, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Generate business rules from data using heuristics and patterns
         
+        Column summaries are computed in a single statistics pass (see
+        compute_column_stats) and shared by all rule generators.
+        
         Args:
             data: Pandas DataFrame to generate rules from
-            options: Options for rule generation
+            options: Options for rule generation, including sample_threshold,
+                sample_size and random_state for sampling large tables
             
         Returns:
             Dict with generated rules
@@ -237,46 +284,47 @@ def evaluate_condition(data):
             generated_rules = []
             rule_id_counter = 1
             
+            stats = self.compute_column_stats(data, options)
+            
             # Generate rules for each column based on data patterns
             for column in data.columns:
-                column_data = data[column]
-                dtype = column_data.dtype
+                summary = stats["columns"][column]
                 
                 # Skip columns with too many unique values
-                unique_ratio = len(column_data.dropna().unique()) / len(column_data.dropna()) if len(column_data.dropna()) > 0 else 0
-                if unique_ratio > 0.9 and len(column_data) > 10:
+                if summary["skip"]:
                     continue
                 
                 # Generate rules based on data type
-                if pd.api.types.is_numeric_dtype(dtype):
+                if summary["kind"] == "numeric":
                     # Numeric column rules
-                    rules = self._generate_numeric_rules(column, column_data, rule_id_counter)
+                    rules = self._generate_numeric_rules(column, summary, rule_id_counter)
                     generated_rules.extend(rules)
                     rule_id_counter += len(rules)
                     
-                elif pd.api.types.is_string_dtype(dtype):
+                elif summary["kind"] == "string":
                     # String column rules
-                    rules = self._generate_string_rules(column, column_data, rule_id_counter)
+                    rules = self._generate_string_rules(column, summary, rule_id_counter)
                     generated_rules.extend(rules)
                     rule_id_counter += len(rules)
                     
-                elif pd.api.types.is_datetime64_dtype(dtype):
+                elif summary["kind"] == "datetime":
                     # Date column rules
-                    rules = self._generate_date_rules(column, column_data, rule_id_counter)
+                    rules = self._generate_date_rules(column, summary, rule_id_counter)
                     generated_rules.extend(rules)
                     rule_id_counter += len(rules)
             
             # Generate cross-column rules if requested
             if options.get("cross_column_rules", True):
                 # Find potential correlations or relationships
-                corr_rules = self._generate_correlation_rules(data, rule_id_counter)
+                corr_rules = self._generate_correlation_rules(stats["sample"], rule_id_counter)
                 generated_rules.extend(corr_rules)
                 rule_id_counter += len(corr_rules)
             
             return {
                 "success": True,
                 "rules_generated": len(generated_rules),
-                "rules": generated_rules
+                "rules": generated_rules,
+                "sampled": stats["sampled"]
             }
             
         except Exception as e:
@@ -286,19 +334,117 @@ def evaluate_condition(data):
                 "error": str(e)
             }
     
-    def _generate_numeric_rules(self, column: str, data: pd.Series, start_id: int) -> List[Dict[str, Any]]:
+    def compute_column_stats(self, data: pd.DataFrame, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Compute the per-column summaries used by rule generation in one pass
+        
+        Tables with more than sample_threshold rows are reduced to a reservoir
+        sample of sample_size rows for quantiles, string examples and
+        correlations. Null counts, min/max, string lengths and the value sets
+        of low-cardinality columns are always computed on the full data, and
+        so is the distinct ratio, estimated with HyperLogLog: a sample
+        overstates how distinct a column is.
+        
+        Args:
+            data: Pandas DataFrame to summarize
+            options: Optional sample_threshold, sample_size and random_state
+            
+        Returns:
+            Dict with the row count, whether the data was sampled, the sample
+            and a summary per column
+        """
+        options = options or {}
+        sample_threshold = options.get("sample_threshold", DEFAULT_SAMPLE_THRESHOLD)
+        sample_size = options.get("sample_size", DEFAULT_SAMPLE_SIZE)
+        
+        sampled = len(data) > sample_threshold and len(data) > sample_size
+        if sampled:
+            positions = reservoir_sample_indices(len(data), sample_size, options.get("random_state"))
+            sample = data.iloc[positions]
+        else:
+            sample = data
+        
+        return {
+            "row_count": len(data),
+            "sampled": sampled,
+            "sample": sample,
+            "columns": {
+                column: self._summarize_column(data[column], sample[column], sampled)
+                for column in data.columns
+            }
+        }
+    
+    def _summarize_column(self, column: pd.Series, sample_column: pd.Series, sampled: bool) -> Dict[str, Any]:
+        """Summarize one column for the rule generators"""
+        dtype = column.dtype
+        if pd.api.types.is_numeric_dtype(dtype):
+            kind = "numeric"
+        elif pd.api.types.is_string_dtype(dtype):
+            kind = "string"
+        elif pd.api.types.is_datetime64_dtype(dtype):
+            kind = "datetime"
+        else:
+            kind = None
+        
+        non_null = column.dropna()
+        source = sample_column.dropna() if sampled else non_null
+        unique_values = pd.unique(source)
+        if sampled:
+            distinct = min(HyperLogLog(DISTINCT_COUNT_PRECISION).update(non_null).count(), len(non_null))
+        else:
+            distinct = len(unique_values)
+        unique_ratio = distinct / len(non_null) if len(non_null) > 0 else 0
+        summary = {
+            "kind": kind,
+            "count": len(column),
+            "non_null": len(non_null),
+            "unique_ratio": unique_ratio,
+            "skip": unique_ratio > 0.9 and len(column) > 10
+        }
+        if summary["skip"] or kind is None or len(non_null) == 0:
+            return summary
+        
+        if kind == "numeric":
+            quantiles = source.quantile([0.01, 0.99])
+            summary.update({
+                "min": non_null.min(),
+                "max": non_null.max(),
+                "q01": quantiles.iloc[0],
+                "q99": quantiles.iloc[1]
+            })
+            if pd.api.types.is_integer_dtype(dtype) and len(unique_values) <= 10:
+                # A sample can miss rare values, so small value sets are taken from the full column
+                summary["values"] = pd.unique(non_null) if sampled else unique_values
+        
+        elif kind == "string":
+            # Lengths and the value set come from the distinct values instead of every row
+            values = _unique_strings(pd.unique(non_null) if sampled else unique_values)
+            lengths = np.fromiter((len(x) for x in values), dtype=np.int64, count=len(values))
+            summary.update({
+                "min_len": int(lengths.min()),
+                "max_len": int(lengths.max()),
+                "examples": source.sample(min(10, len(source))).tolist()
+            })
+            if len(values) <= 20:
+                summary["values"] = values
+        
+        else:
+            summary.update({"min": non_null.min(), "max": non_null.max()})
+        
+        return summary
+    
+    def _generate_numeric_rules(self, column: str, stats: Dict[str, Any], start_id: int) -> List[Dict[str, Any]]:
         """Generate rules for numeric columns"""
         rules = []
-        data = data.dropna()
         
-        if len(data) == 0:
+        if stats["non_null"] == 0:
             return rules
         
         # Get basic statistics
-        min_val = data.min()
-        max_val = data.max()
-        q1 = data.quantile(0.01)  # 1st percentile
-        q99 = data.quantile(0.99)  # 99th percentile
+        min_val = stats["min"]
+        max_val = stats["max"]
+        q1 = stats["q01"]  # 1st percentile
+        q99 = stats["q99"]  # 99th percentile
         
         # Range rule
         rules.append({
@@ -320,31 +466,29 @@ def evaluate_condition(data):
             })
         
         # If integers, check for specific values
-        if pd.api.types.is_integer_dtype(data.dtype):
-            # Check if column might be categorical
-            unique_vals = data.unique()
-            if len(unique_vals) <= 10:
-                vals_str = ", ".join(map(str, unique_vals))
-                rules.append({
-                    "id": f"R{start_id + 2}",
-                    "name": f"{column} Allowed Values",
-                    "condition": f"data['{column}'] in [{vals_str}]",
-                    "severity": "medium",
-                    "message": f"{column} must be one of: {vals_str}"
-                })
+        unique_vals = stats.get("values")
+        if unique_vals is not None and len(unique_vals) <= 10:
+            # Column might be categorical
+            vals_str = ", ".join(map(str, unique_vals))
+            rules.append({
+                "id": f"R{start_id + 2}",
+                "name": f"{column} Allowed Values",
+                "condition": f"data['{column}'] in [{vals_str}]",
+                "severity": "medium",
+                "message": f"{column} must be one of: {vals_str}"
+            })
         
         return rules
     
-    def _generate_string_rules(self, column: str, data: pd.Series, start_id: int) -> List[Dict[str, Any]]:
+    def _generate_string_rules(self, column: str, stats: Dict[str, Any], start_id: int) -> List[Dict[str, Any]]:
         """Generate rules for string columns"""
         rules = []
-        data = data.dropna().astype(str)
         
-        if len(data) == 0:
+        if stats["non_null"] == 0:
             return rules
         
         # Check if column looks like an email
-        if any('@' in str(x) and '.' in str(x).split('@')[-1] for x in data.sample(min(10, len(data)))):
+        if any('@' in str(x) and '.' in str(x).split('@')[-1] for x in stats["examples"]):
             rules.append({
                 "id": f"R{start_id}",
                 "name": f"{column} Email Format",
@@ -354,8 +498,8 @@ def evaluate_condition(data):
             })
             
         # Length rules
-        min_len = min(len(str(x)) for x in data)
-        max_len = max(len(str(x)) for x in data)
+        min_len = stats["min_len"]
+        max_len = stats["max_len"]
         
         rules.append({
             "id": f"R{start_id + 1}",
@@ -366,9 +510,9 @@ def evaluate_condition(data):
         })
         
         # Check if column might be categorical
-        if len(data.unique()) <= 20 and len(data.unique()) < len(data) / 2:
+        vals = stats.get("values")
+        if vals is not None and len(vals) <= 20 and len(vals) < stats["non_null"] / 2:
             # Create allowed values rule
-            vals = list(data.unique())
             vals_str = ", ".join(f"'{x}'" for x in vals)
             
             rules.append({
@@ -381,17 +525,16 @@ def evaluate_condition(data):
         
         return rules
     
-    def _generate_date_rules(self, column: str, data: pd.Series, start_id: int) -> List[Dict[str, Any]]:
+    def _generate_date_rules(self, column: str, stats: Dict[str, Any], start_id: int) -> List[Dict[str, Any]]:
         """Generate rules for date columns"""
         rules = []
-        data = data.dropna()
         
-        if len(data) == 0:
+        if stats["non_null"] == 0:
             return rules
         
         # Get min and max dates
-        min_date = data.min()
-        max_date = data.max()
+        min_date = stats["min"]
+        max_date = stats["max"]
         
         # Convert to string format for rule
         min_date_str = min_date.strftime('%Y-%m-%d')
@@ -429,44 +572,76 @@ def evaluate_condition(data):
             return rules
         
         try:
-            # Calculate correlation matrix
-            corr_matrix = data[numeric_cols].corr()
+            # Calculate correlation matrix; NumPy is used unless pairwise null handling is needed
+            values = data[numeric_cols].to_numpy(dtype=float)
+            if np.isnan(values).any():
+                corr_matrix = data[numeric_cols].corr().to_numpy()
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    corr_matrix = np.corrcoef(values, rowvar=False)
             
-            # Find highly correlated pairs
-            for i in range(len(numeric_cols)):
-                for j in range(i+1, len(numeric_cols)):
-                    col1 = numeric_cols[i]
-                    col2 = numeric_cols[j]
-                    corr = corr_matrix.iloc[i, j]
+            # Find highly correlated pairs, in column order
+            rows, cols = np.triu_indices(len(numeric_cols), k=1)
+            pair_corr = corr_matrix[rows, cols]
+            for pair in np.flatnonzero((pair_corr > 0.8) | (pair_corr < -0.8)):
+                col1 = numeric_cols[rows[pair]]
+                col2 = numeric_cols[cols[pair]]
+                corr = pair_corr[pair]
+                
+                # Strong positive correlation
+                if corr > 0.8:
+                    rules.append({
+                        "id": f"R{start_id}",
+                        "name": f"{col1} - {col2} Correlation",
+                        "condition": f"data['{col1}'] * 0.5 <= data['{col2}'] <= data['{col1}'] * 1.5",
+                        "severity": "low",
+                        "message": f"Expected correlation between {col1} and {col2} not maintained"
+                    })
                     
-                    # Strong positive correlation
-                    if corr > 0.8:
-                        rules.append({
-                            "id": f"R{start_id}",
-                            "name": f"{col1} - {col2} Correlation",
-                            "condition": f"data['{col1}'] * 0.5 <= data['{col2}'] <= data['{col1}'] * 1.5",
-                            "severity": "low",
-                            "message": f"Expected correlation between {col1} and {col2} not maintained"
-                        })
-                        start_id += 1
-                        
-                    # Strong negative correlation
-                    elif corr < -0.8:
-                        rules.append({
-                            "id": f"R{start_id}",
-                            "name": f"{col1} - {col2} Inverse Correlation",
-                            "condition": f"(data['{col1}'] > 0 and data['{col2}'] < 0) or " + 
-                                      f"(data['{col1}'] < 0 and data['{col2}'] > 0) or " +
-                                      f"(data['{col1}'] == 0 and data['{col2}'] == 0)",
-                            "severity": "low",
-                            "message": f"Expected inverse correlation between {col1} and {col2} not maintained"
-                        })
-                        start_id += 1
+                # Strong negative correlation
+                else:
+                    rules.append({
+                        "id": f"R{start_id}",
+                        "name": f"{col1} - {col2} Inverse Correlation",
+                        "condition": f"(data['{col1}'] > 0 and data['{col2}'] < 0) or " + 
+                                  f"(data['{col1}'] < 0 and data['{col2}'] > 0) or " +
+                                  f"(data['{col1}'] == 0 and data['{col2}'] == 0)",
+                        "severity": "low",
+                        "message": f"Expected inverse correlation between {col1} and {col2} not maintained"
+                    })
+                start_id += 1
         except Exception as e:
             logger.warning(f"Error generating correlation rules: {str(e)}")
             
         return rules
 
+
+def reservoir_sample_indices(n_rows: int, sample_size: int, random_state: Optional[int] = None) -> np.ndarray:
+    """
+    Draw a uniform sample of row positions with reservoir sampling (Algorithm R)
+    
+    Every row i >= sample_size replaces reservoir slot j ~ U[0, i] when
+    j < sample_size. The replacements are applied in vectorized form: each
+    slot keeps the last row that replaced it.
+    
+    Returns:
+        Sorted row positions of the sample
+    """
+    if n_rows <= sample_size:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(random_state)
+    rows = np.arange(sample_size, n_rows)
+    slots = (rng.random(len(rows)) * (rows + 1)).astype(np.int64)
+    replaced = slots < sample_size
+    reservoir = np.arange(sample_size)
+    np.maximum.at(reservoir, slots[replaced], rows[replaced])
+    return np.sort(reservoir)
+
+
+def _unique_strings(values: Any) -> List[str]:
+    """String forms of values, de-duplicated in order of first appearance"""
+    return list(dict.fromkeys(str(x) for x in values))
+
 # Example usage (would be called via API endpoint in production)
 if __name__ == "__main__":
     import json
@@ -0,0 +1,426 @@
+
+"""
+Columnar Schema Validation Module
+
+This module validates pandas DataFrames against field schemas using vectorized
+column operations instead of building a Pydantic model instance per row.
+Type, range, length, regex and allowed-value constraints are evaluated over
+whole columns; only the rows that fail are materialized into detailed
+per-row error records.
+
+Compiled schemas (normalized checks plus an equivalent Pydantic model) are
+cached by a hash of the schema definition, so repeated validations with the
+same schema skip compilation entirely.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, create_model
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Canonical field types and the aliases accepted for them
+TYPE_ALIASES = {
+    "string": "string", "str": "string", "text": "string",
+    "integer": "integer", "int": "integer",
+    "number": "number", "float": "number", "numeric": "number",
+    "boolean": "boolean", "bool": "boolean",
+    "date": "date", "datetime": "date", "date-time": "date",
+    "array": "array", "list": "array",
+    "object": "object", "dict": "object"
+}
+
+PYTHON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "date": datetime,
+    "array": list,
+    "object": dict
+}
+
+# Values Pydantic accepts for booleans in lax mode
+BOOLEAN_VALUES = {
+    True, False, 0, 1,
+    "true", "false", "True", "False", "TRUE", "FALSE",
+    "yes", "no", "y", "n", "on", "off", "t", "f", "1", "0"
+}
+
+# Mapping from JSON-schema style keywords to constraint names
+JSON_SCHEMA_CONSTRAINTS = {
+    "minimum": "min",
+    "maximum": "max",
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "pattern": "regex",
+    "enum": "allowed_values"
+}
+
+
+class CompiledSchema:
+    """Normalized field checks for a schema, plus a lazily built Pydantic model"""
+
+    def __init__(self, name: str, fields: Dict[str, Dict[str, Any]], schema_hash: str):
+        self.name = name
+        self.fields = fields
+        self.schema_hash = schema_hash
+        self.patterns = {
+            field: re.compile(config["constraints"]["regex"])
+            for field, config in fields.items()
+            if "regex" in config["constraints"]
+        }
+        self._model: Optional[Type[BaseModel]] = None
+
+    @property
+    def model(self) -> Type[BaseModel]:
+        """Pydantic model equivalent to the schema's field types"""
+        if self._model is None:
+            field_types = {}
+            for field, config in self.fields.items():
+                field_type = PYTHON_TYPES[config["type"]]
+                if config["required"]:
+                    field_types[field] = (field_type, ...)
+                else:
+                    field_types[field] = (Optional[field_type], None)
+            self._model = create_model(self.name, **field_types)
+        return self._model
+
+
+class ColumnarValidationResult:
+    """Per-field failure masks for a validated DataFrame"""
+
+    def __init__(self, data: pd.DataFrame, failures: List[Tuple[str, np.ndarray, str]]):
+        self.data = data
+        # (field, failure mask, message) in field order, at most one failing check per field and row
+        self.failures = failures
+        invalid = np.zeros(len(data), dtype=bool)
+        for _, mask, _ in failures:
+            invalid |= mask
+        self.invalid_mask = invalid
+
+    @property
+    def total_rows(self) -> int:
+        return len(self.data)
+
+    @property
+    def invalid_rows(self) -> int:
+        return int(self.invalid_mask.sum())
+
+    @property
+    def valid_rows(self) -> int:
+        return self.total_rows - self.invalid_rows
+
+    def invalid_positions(self) -> np.ndarray:
+        """Positional indices of rows that failed at least one check"""
+        return np.flatnonzero(self.invalid_mask)
+
+    def field_failure_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for field, mask, _ in self.failures:
+            counts[field] = counts.get(field, 0) + int(mask.sum())
+        return counts
+
+    def row_errors(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Materialize detailed error records for failing rows only
+
+        Args:
+            limit: Maximum number of failing rows to materialize (None for all)
+
+        Returns:
+            List of {"row_index", "errors": [{"field", "error", "value"}]} records
+        """
+        positions = self.invalid_positions()
+        if limit is not None:
+            positions = positions[:limit]
+        if len(positions) == 0:
+            return []
+
+        index = self.data.index
+        records = {pos: {"row_index": _to_python(index[pos]), "errors": []} for pos in positions}
+        for field, mask, message in self.failures:
+            failing = positions[mask[positions]]
+            if len(failing) == 0:
+                continue
+            values = self.data[field].to_numpy()[failing] if field in self.data.columns else [None] * len(failing)
+            for pos, value in zip(failing, values):
+                records[pos]["errors"].append({
+                    "field": field,
+                    "error": message,
+                    "value": "" if _is_missing(value) else str(value)
+                })
+        return [records[pos] for pos in positions]
+
+
+class ColumnarSchemaEngine:
+    """Vectorized schema validation with a compiled-schema cache"""
+
+    def __init__(self, cache_size: int = 128):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, CompiledSchema]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def compile(self, schema_def: Union[Dict[str, Any], str]) -> CompiledSchema:
+        """
+        Compile a schema definition, reusing a cached compilation if available
+
+        Accepts the SchemaValidator format ({"name", "fields": {field: {"type",
+        "required", "constraints"}}}), a bare mapping of fields, or a JSON-schema
+        style mapping ({field: {"type", "minimum", "maximum", "enum", ...}}),
+        optionally serialized as a string.
+        """
+        if isinstance(schema_def, str):
+            schema_def = parse_schema_string(schema_def)
+
+        schema_hash = schema_fingerprint(schema_def)
+        compiled = self._cache.get(schema_hash)
+        if compiled is not None:
+            self._cache.move_to_end(schema_hash)
+            self.cache_hits += 1
+            return compiled
+
+        self.cache_misses += 1
+        fields_def = schema_def.get("fields", schema_def)
+        name = schema_def.get("name", "DataModel") if isinstance(schema_def.get("name"), str) else "DataModel"
+        fields = {
+            field: _normalize_field(config)
+            for field, config in fields_def.items()
+            if isinstance(config, dict)
+        }
+        compiled = CompiledSchema(name, fields, schema_hash)
+
+        self._cache[schema_hash] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def validate(self, data: pd.DataFrame, schema_def: Union[Dict[str, Any], str, CompiledSchema]) -> ColumnarValidationResult:
+        """
+        Validate a DataFrame column by column
+
+        Args:
+            data: DataFrame to validate
+            schema_def: Schema definition or an already compiled schema
+
+        Returns:
+            ColumnarValidationResult with per-field failure masks
+        """
+        compiled = schema_def if isinstance(schema_def, CompiledSchema) else self.compile(schema_def)
+        failures = []
+        for field, config in compiled.fields.items():
+            failures.extend(self._check_field(data, field, config, compiled.patterns.get(field)))
+        return ColumnarValidationResult(data, failures)
+
+    def _check_field(self, data: pd.DataFrame, field: str, config: Dict[str, Any],
+                     pattern: Optional[re.Pattern]) -> List[Tuple[str, np.ndarray, str]]:
+        """Run the type and constraint checks of one field as column operations"""
+        n = len(data)
+        field_type = config["type"]
+        required = config["required"]
+
+        if field not in data.columns:
+            if required:
+                return [(field, np.ones(n, dtype=bool), "Field required")]
+            return []
+
+        series = data[field]
+        null_mask = series.isna().to_numpy()
+        failures = []
+        type_message = f"Input should be a valid {_type_label(field_type)}"
+
+        # Nulls fail required fields and are skipped by all other checks
+        if required and null_mask.any():
+            failures.append((field, null_mask.copy(), type_message))
+        pending = ~null_mask
+
+        values, type_ok = _coerce(series, field_type)
+        bad_type = pending & ~type_ok
+        if bad_type.any():
+            failures.append((field, bad_type, type_message))
+        pending &= type_ok
+
+        # Constraints only apply to values that passed type validation
+        constraints = config["constraints"]
+        for check, message in _constraint_checks(series, values, field_type, constraints, pattern):
+            if not pending.any():
+                break
+            failed = pending & ~check()
+            if failed.any():
+                failures.append((field, failed, message))
+                pending &= ~failed
+
+        return failures
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"size": len(self._cache), "hits": self.cache_hits, "misses": self.cache_misses}
+
+
+def schema_fingerprint(schema_def: Dict[str, Any]) -> str:
+    """Stable hash of a schema definition"""
+    canonical = json.dumps(schema_def, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def parse_schema_string(schema_str: str) -> Dict[str, Any]:
+    """Parse a schema serialized as JSON or as a Python literal"""
+    try:
+        return json.loads(schema_str)
+    except (TypeError, ValueError):
+        return ast.literal_eval(schema_str.strip())
+
+
+def schema_from_dtypes(df: pd.DataFrame, range_rules: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Build a schema where every column is required and typed by its dtype
+
+    Args:
+        df: DataFrame whose dtypes define the field types
+        range_rules: Optional {column: {"min": .., "max": ..}} constraints
+
+    Returns:
+        Schema definition usable with ColumnarSchemaEngine
+    """
+    range_rules = range_rules or {}
+    fields = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            field_type = "integer"
+        elif pd.api.types.is_float_dtype(dtype):
+            field_type = "number"
+        else:
+            field_type = "string"
+        constraints = {k: v for k, v in range_rules.get(column, {}).items() if k in ("min", "max") and v is not None}
+        fields[column] = {"type": field_type, "required": True, "constraints": constraints}
+    return {"name": "DynamicModel", "fields": fields}
+
+
+def _normalize_field(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a field definition to {"type", "required", "constraints"}"""
+    raw_type = str(config.get("type", "string")).lower()
+    if config.get("format") in ("date", "date-time"):
+        raw_type = "date"
+    constraints = dict(config.get("constraints", {}))
+    for json_key, name in JSON_SCHEMA_CONSTRAINTS.items():
+        if json_key in config:
+            constraints[name] = config[json_key]
+    return {
+        "type": TYPE_ALIASES.get(raw_type, "string"),
+        "required": bool(config.get("required", True)),
+        "constraints": constraints
+    }
+
+
+def _coerce(series: pd.Series, field_type: str) -> Tuple[pd.Series, np.ndarray]:
+    """Coerce a column to the field type, returning the values and a validity mask"""
+    if field_type in ("integer", "number"):
+        if pd.api.types.is_bool_dtype(series.dtype):
+            values = series.astype(float)
+        else:
+            values = pd.to_numeric(series, errors="coerce")
+        ok = values.notna().to_numpy()
+        if field_type == "integer":
+            with np.errstate(invalid="ignore"):
+                ok &= (np.floor(values.to_numpy(dtype=float, na_value=np.nan)) == values.to_numpy(dtype=float, na_value=np.nan))
+        return values, ok
+
+    if field_type == "string":
+        if pd.api.types.is_string_dtype(series.dtype) and series.dtype != object:
+            return series, np.ones(len(series), dtype=bool)
+        if series.dtype == object:
+            inferred = pd.api.types.infer_dtype(series, skipna=True)
+            if inferred in ("string", "empty"):
+                return series, np.ones(len(series), dtype=bool)
+            return series, series.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series, series.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+        return series, np.zeros(len(series), dtype=bool)
+
+    if field_type == "boolean":
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series, np.ones(len(series), dtype=bool)
+        return series, series.isin(BOOLEAN_VALUES).to_numpy()
+
+    if field_type == "date":
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series, np.ones(len(series), dtype=bool)
+        values = pd.to_datetime(series, errors="coerce")
+        return values, values.notna().to_numpy()
+
+    python_type = PYTHON_TYPES[field_type]
+    return series, series.map(lambda v: isinstance(v, python_type)).to_numpy(dtype=bool)
+
+
+def _constraint_checks(series: pd.Series, values: pd.Series, field_type: str,
+                       constraints: Dict[str, Any], pattern: Optional[re.Pattern]):
+    """Yield (lazy mask function, message) pairs for a field's constraints"""
+    numeric = field_type in ("integer", "number")
+
+    if "min" in constraints and constraints["min"] is not None:
+        minimum = constraints["min"]
+        if numeric:
+            yield (lambda: (values >= minimum).to_numpy()), f"Value must be >= {minimum}"
+    if "max" in constraints and constraints["max"] is not None:
+        maximum = constraints["max"]
+        if numeric:
+            yield (lambda: (values <= maximum).to_numpy()), f"Value must be <= {maximum}"
+
+    if "min_length" in constraints or "max_length" in constraints:
+        lengths = None
+
+        def get_lengths():
+            nonlocal lengths
+            if lengths is None:
+                lengths = series.astype(str).str.len()
+            return lengths
+
+        if "min_length" in constraints:
+            min_length = constraints["min_length"]
+            yield (lambda: (get_lengths() >= min_length).to_numpy()), f"Length must be >= {min_length}"
+        if "max_length" in constraints:
+            max_length = constraints["max_length"]
+            yield (lambda: (get_lengths() <= max_length).to_numpy()), f"Length must be <= {max_length}"
+
+    if pattern is not None:
+        yield (
+            lambda: series.astype(str).str.match(pattern, na=False).to_numpy(dtype=bool)
+        ), f"Value must match pattern: {pattern.pattern}"
+
+    if "allowed_values" in constraints:
+        allowed = constraints["allowed_values"]
+        yield (lambda: series.isin(allowed).to_numpy()), f"Value must be one of: {allowed}"
+
+
+def _type_label(field_type: str) -> str:
+    return {"date": "datetime", "array": "list", "object": "dictionary"}.get(field_type, field_type)
+
+
+def _is_missing(value: Any) -> bool:
+    try:
+        return value is None or bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _to_python(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# Shared engine instance
+schema_engine = ColumnarSchemaEngine()
@@ -15,15 +15,329 @@ import logging
 import re
 from datetime import datetime, timedelta
 import json
-from sklearn.impute import SimpleImputer, KNNImputer
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, OneHotEncoder
 from sklearn.cluster import DBSCAN
 import string
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    from .sketches import RunningMoments, TDigest, TopK
+    from .type_inference import type_engine
+    from .knn_imputation import KNNImputationEngine
+    from .dtype_optimization import dtype_optimizer, is_text_dtype
+    from .format_detection import format_engine
+    from .rule_compiler import compile_row_condition, FallbackRequired
+    from .fingerprint import fingerprint_dataframe, result_cache
+    from .dedup import dedup_engine
+    from .dataset_stats import chunk_row_hashes
+except ImportError:
+    from sketches import RunningMoments, TDigest, TopK
+    from type_inference import type_engine
+    from knn_imputation import KNNImputationEngine
+    from dtype_optimization import dtype_optimizer, is_text_dtype
+    from format_detection import format_engine
+    from rule_compiler import compile_row_condition, FallbackRequired
+    from fingerprint import fingerprint_dataframe, result_cache
+    from dedup import dedup_engine
+    from dataset_stats import chunk_row_hashes
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Check name and description of the values for each detected format
+FORMAT_CHECKS = {
+    "email": ("Email", "email values"),
+    "url": ("URL", "URL values"),
+    "datetime": ("Date", "date values"),
+    "phone": ("Phone", "phone numbers")
+}
+
+class CellChangeTracker:
+    """Tracks which cells of a DataFrame have been changed by cleaning operations"""
+    
+    def __init__(self, n_rows: int):
+        self.n_rows = n_rows
+        self.masks: Dict[str, np.ndarray] = {}
+    
+    def record(self, column: str, mask: Any) -> int:
+        """
+        Mark changed cells of a column
+        
+        Args:
+            column: Column name
+            mask: Boolean mask over the current rows, True where a cell changed
+            
+        Returns:
+            Number of cells marked by this call
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if column in self.masks:
+            self.masks[column] |= mask
+        else:
+            self.masks[column] = mask.copy()
+        return int(mask.sum())
+    
+    def drop_rows(self, keep: Any) -> None:
+        """Restrict all masks to the kept rows after rows are removed"""
+        keep = np.asarray(keep, dtype=bool)
+        self.n_rows = int(keep.sum())
+        self.masks = {col: mask[keep] for col, mask in self.masks.items()}
+    
+    def changed_cells(self) -> int:
+        return int(sum(mask.sum() for mask in self.masks.values()))
+
+
+class RowHashSet:
+    """Set of 64-bit row hashes stored as a few sorted NumPy runs (8 bytes per row)"""
+    
+    def __init__(self):
+        self.runs: List[np.ndarray] = []
+    
+    def __len__(self) -> int:
+        return sum(len(run) for run in self.runs)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(run.nbytes for run in self.runs)
+    
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Mask of hashes already in the set"""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+    
+    def add(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.sort(hashes))
+        # Merge runs like a binary counter, so there are O(log n) runs to search
+        while len(self.runs) > 1 and len(self.runs[-2]) <= len(self.runs[-1]):
+            newer, older = self.runs.pop(), self.runs.pop()
+            self.runs.append(np.sort(np.concatenate([older, newer])))
+
+
+class ColumnSummaries:
+    """Per-column summaries computed at most once and shared by the checks of one validation run"""
+    
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._null_counts: Optional[pd.Series] = None
+        self._cache: Dict[Tuple[str, Any], Any] = {}
+        # Columns cast for row-level rule conditions, see VectorizedCondition.evaluate
+        self.row_values: Dict[str, Tuple[pd.Series, np.ndarray]] = {}
+    
+    def _get(self, kind: str, column: Any, compute) -> Any:
+        key = (kind, column)
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+    
+    def null_counts(self) -> pd.Series:
+        """Number of null values in each column"""
+        if self._null_counts is None:
+            self._null_counts = self.data.isna().sum()
+        return self._null_counts
+    
+    def non_null(self, column: Any) -> np.ndarray:
+        """Boolean mask of the column's non-null values"""
+        return self._get("non_null", column, lambda: self.data[column].notna().to_numpy())
+    
+    def non_null_values(self, column: Any) -> pd.Series:
+        return self._get("non_null_values", column, lambda: self.data[column][self.non_null(column)])
+    
+    def text_values(self, column: Any) -> pd.Series:
+        """Non-null values as strings"""
+        return self._get("text_values", column, lambda: self.non_null_values(column).astype(str))
+    
+    def unique_count(self, column: Any) -> int:
+        """Number of distinct values, counting null as one value"""
+        return self._get("unique_count", column, lambda: len(self.data[column].unique()))
+    
+    def text_uniques(self, column: Any) -> np.ndarray:
+        """Distinct non-null values as strings"""
+        return self._get("text_uniques", column,
+                         lambda: pd.unique(pd.Series(self.data[column].unique()).dropna().astype(str)))
+    
+    def normalized_uniques(self, column: Any) -> np.ndarray:
+        """Distinct non-null values as strings, stripped and lowercased"""
+        return self._get("normalized_uniques", column,
+                         lambda: pd.unique(pd.Series(self.text_uniques(column), dtype=object)
+                                           .str.strip().str.lower()))
+
+
+def changed_mask(before: pd.Series, after: pd.Series) -> np.ndarray:
+    """Cells that differ between two versions of a column, treating NaN as equal to NaN"""
+    try:
+        unchanged = before.eq(after) | (before.isna() & after.isna())
+        return ~unchanged.to_numpy(dtype=bool)
+    except (TypeError, ValueError):
+        # If comparison fails, assume all cells changed
+        return np.ones(len(after), dtype=bool)
+
+
+def _as_float(series: pd.Series) -> pd.Series:
+    """Nullable integer columns as float64, so they can take fractional fill values and bounds"""
+    if pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, np.dtype):
+        return series.astype(float)
+    return series
+
+
+def _as_str(series: pd.Series) -> pd.Series:
+    """Values as strings, with missing values of extension dtypes written as NaN is in object columns"""
+    if isinstance(series.dtype, np.dtype):
+        return series.astype(str)
+    return series.astype(object).where(series.notna(), np.nan).astype(str)
+
+
+def _column_values(series: pd.Series) -> Any:
+    """A column's values for sending to another process: a NumPy array, or the extension array"""
+    return series.to_numpy() if isinstance(series.dtype, np.dtype) else series.array
+
+
+def _received_values(values: Any) -> Any:
+    """
+    Values received from another process, ready to build a column from
+
+    Unpickled object arrays carry a copy of the object dtype rather than
+    the canonical instance, and in pandas 2.1 astype(str) then converts
+    the array in place instead of copying it.
+    """
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return values.view(np.dtype(object))
+    return values
+
+
+def _encode_strings(values: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Dictionary-encode an object array of strings, so it can be moved between
+    processes as integer codes instead of pickled string objects
+
+    Returns:
+        (int32 codes, unique strings, null values in order of appearance), or
+        None if the array holds anything other than strings and nulls
+    """
+    if values.dtype != object or pd.api.types.infer_dtype(values, skipna=True) != "string":
+        return None
+    codes, uniques = pd.factorize(values)
+    # Nulls are kept as-is, since None and NaN standardize to different strings
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object), values[codes < 0]
+
+
+def _decode_strings(codes: np.ndarray, uniques: np.ndarray, nulls: np.ndarray) -> np.ndarray:
+    values = np.empty(len(codes), dtype=object)
+    valid = codes >= 0
+    values[valid] = uniques[codes[valid]]
+    values[~valid] = nulls
+    return values
+
+
+def _share_columns(data: pd.DataFrame, columns: List[str]) -> Tuple[Optional[shared_memory.SharedMemory],
+                                                                     Dict[str, Tuple[int, str]],
+                                                                     Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Copy columns into one shared memory segment: NumPy-backed numeric, boolean
+    and datetime columns by value, string columns as dictionary codes
+
+    Returns:
+        The segment (None if no column qualifies), each shared column's
+        (byte offset, dtype string), and (uniques, nulls) of each string column
+    """
+    arrays = {}
+    dictionaries = {}
+    for col in columns:
+        dtype = data[col].dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+            arrays[col] = data[col].to_numpy()
+        elif dtype == object:
+            encoded = _encode_strings(data[col].to_numpy())
+            if encoded is not None:
+                arrays[col] = encoded[0]
+                dictionaries[col] = encoded[1:]
+    
+    layout = {}
+    size = 0
+    for col, values in arrays.items():
+        layout[col] = (size, values.dtype.str)
+        # Keep every column 64-byte aligned
+        size += -(-values.nbytes // 64) * 64
+    if size == 0:
+        return None, {}, {}
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    for col, (offset, dtype) in layout.items():
+        np.ndarray(len(data), dtype=dtype, buffer=shm.buf, offset=offset)[:] = arrays[col]
+    return shm, layout, dictionaries
+
+
+def _clean_columns_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one cleaning step on a subset of columns in a worker process
+
+    Shared numeric columns that change but keep their dtype are written back
+    into shared memory; other changed columns are returned, dictionary-encoded
+    when they hold strings. Change masks and the outlier row mask are
+    returned bit-packed.
+    """
+    layout = task["layout"]
+    shm = shared_memory.SharedMemory(name=task["shm_name"]) if layout else None
+    try:
+        n_rows = task["n_rows"]
+        columns = {}
+        for col in task["columns"]:
+            if col in layout:
+                offset, dtype = layout[col]
+                values = np.ndarray(n_rows, dtype=dtype, buffer=shm.buf, offset=offset).copy()
+                if col in task["dictionaries"]:
+                    values = _decode_strings(values, *task["dictionaries"][col])
+                columns[col] = values
+            else:
+                columns[col] = _received_values(task["arrays"][col])
+        data = pd.DataFrame(columns, columns=task["columns"])
+        
+        agent = DataCleaningAgent(task["config"])
+        changes = CellChangeTracker(n_rows)
+        result = {"operations": [], "deferred_knn": [], "removed": None,
+                  "shared": [], "values": {}, "encoded": {}, "changes": {}}
+        if task["step"] == "missing_values":
+            result["operations"] = agent._handle_missing_values(
+                data, task["column_types"], changes, deferred_knn=result["deferred_knn"])
+        elif task["step"] == "outliers":
+            removed = np.zeros(n_rows, dtype=bool)
+            result["operations"] = agent._handle_outliers(data, task["column_types"], changes, removed=removed)
+            result["removed"] = np.packbits(removed)
+        else:
+            result["operations"] = agent._handle_inconsistent_values(data, task["column_types"], changes)
+        
+        for col, mask in changes.masks.items():
+            result["changes"][col] = np.packbits(mask)
+            values = _column_values(data[col])
+            if col in layout and col not in task["dictionaries"] and values.dtype == np.dtype(layout[col][1]):
+                offset, dtype = layout[col]
+                np.ndarray(n_rows, dtype=dtype, buffer=shm.buf, offset=offset)[:] = values
+                result["shared"].append(col)
+                continue
+            encoded = _encode_strings(values) if values.dtype == object else None
+            if encoded is not None:
+                result["encoded"][col] = encoded
+            else:
+                result["values"][col] = values
+        return result
+    finally:
+        if shm is not None:
+            shm.close()
+
+
 class DataCleaningAgent:
     """Class for automatic data cleaning using ML techniques"""
     
@@ -37,7 +351,9 @@ class DataCleaningAgent:
         self.config = config or {
             "missing_values": {
                 "strategy": "auto",  # auto, mean, median, mode, knn, none
-                "knn_neighbors": 5
+                "knn_neighbors": 5,
+                "knn_max_reference_rows": 100_000,  # Rows indexed per imputed column
+                "knn_batch_size": 10_000  # Rows queried at a time
             },
             "outliers": {
                 "strategy": "auto",  # auto, clip, remove, none
@@ -48,10 +364,18 @@ class DataCleaningAgent:
                 "case_sensitive": False
             },
             "duplicate_rows": {
-                "strategy": "remove"  # remove, keep, none
+                "strategy": "remove",  # remove, keep, none
+                "near_duplicate_columns": [],  # Text columns compared for near duplicates (none: exact only)
+                "near_duplicate_threshold": 0.9,  # Minimum Jaccard similarity of near duplicates
+                "across_chunks": True  # clean_csv: also remove repeats of earlier chunks (8 bytes per distinct row)
             },
             "column_types": {},  # Manual column type overrides
-            "column_transforms": {}  # Manual column transformations
+            "column_transforms": {},  # Manual column transformations
+            "parallel": {
+                "n_jobs": 1,  # Worker processes for per-column cleaning (-1 for all CPUs)
+                "min_columns": 32  # Clean serially below this many columns
+            },
+            "optimize_dtypes": True  # Store the cleaned data in compact dtypes
         }
         logger.info("DataCleaningAgent initialized with config")
     
@@ -59,6 +383,11 @@ class DataCleaningAgent:
         """
         Automatically clean a dataset
         
+        The input is not copied up front: cleaning works on a shallow copy
+        and every operation replaces the columns it modifies instead of
+        writing into them, so only those columns are duplicated and the
+        input is left unchanged. Each operation records the cells it changed.
+        
         Args:
             data: Pandas DataFrame to clean
             
@@ -66,162 +395,281 @@ class DataCleaningAgent:
             Dictionary with cleaning results and cleaned data
         """
         try:
-            # Keep a copy of the original data for comparison
-            original_data = data.copy()
-            cleaned_data = data.copy()
-            
-            # Track cleaning operations
-            operations = []
+            return self._clean(data)
+        except Exception as e:
+            logger.error(f"Error cleaning dataset: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def _clean(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Run the cleaning operations"""
+        # Shallow copy: columns are shared with the input until an operation replaces them.
+        # Operations must assign whole columns (data[col] = ...), never write into them
+        cleaned_data = data.copy(deep=False)
+        rows_before = len(data)
+        total_cells_original = data.size
+        
+        # Track cleaning operations and the cells they change
+        operations = []
+        changes = CellChangeTracker(rows_before)
+        
+        # 1. Handle duplicate rows
+        if self.config["duplicate_rows"]["strategy"] != "none":
+            # Row hashes of the input are shared with its validation and profiling
+            duplicates = dedup_engine.duplicated(data)
+            num_duplicates = duplicates.sum()
+            if num_duplicates > 0:
+                cleaned_data = cleaned_data[~duplicates]
+                changes.drop_rows(~duplicates)
+                operations.append({
+                    "operation": "remove_duplicates",
+                    "rows_affected": int(num_duplicates)
+                })
             
-            # 1. Handle duplicate rows
-            if self.config["duplicate_rows"]["strategy"] != "none":
-                num_duplicates = cleaned_data.duplicated().sum()
-                if num_duplicates > 0:
-                    cleaned_data = cleaned_data.drop_duplicates()
+            near_columns = [col for col in self.config["duplicate_rows"].get("near_duplicate_columns", [])
+                            if col in cleaned_data.columns]
+            if near_columns:
+                near = dedup_engine.near_duplicates(cleaned_data, near_columns,
+                                                    self.config["duplicate_rows"].get("near_duplicate_threshold", 0.9))
+                # Keep the first row of each group of near duplicates
+                keep = np.ones(len(cleaned_data), dtype=bool)
+                for group in near["groups"]:
+                    keep[group[1:]] = False
+                if not keep.all():
+                    cleaned_data = cleaned_data[keep]
+                    changes.drop_rows(keep)
                     operations.append({
-                        "operation": "remove_duplicates",
-                        "rows_affected": int(num_duplicates)
+                        "operation": "remove_near_duplicates",
+                        "columns": near_columns,
+                        "rows_affected": int((~keep).sum())
                     })
-            
-            # 2. Infer column types if not provided
-            column_types = self._infer_column_types(cleaned_data)
-            
-            # Apply manual overrides
-            for col, col_type in self.config["column_types"].items():
-                if col in column_types:
-                    column_types[col] = col_type
-            
+        
+        # 2. Infer column types if not provided
+        column_types = self._infer_column_types(cleaned_data)
+        
+        # Apply manual overrides
+        for col, col_type in self.config["column_types"].items():
+            if col in column_types:
+                column_types[col] = col_type
+        
+        n_jobs = self._parallel_jobs(cleaned_data)
+        if n_jobs > 1:
+            # 3-5. Per-column cleaning across a process pool
+            cleaned_data = self._clean_columns_parallel(cleaned_data, column_types, changes, operations, n_jobs)
+        else:
             # 3. Handle missing values
             if self.config["missing_values"]["strategy"] != "none":
-                missing_ops = self._handle_missing_values(cleaned_data, column_types)
+                missing_ops = self._handle_missing_values(cleaned_data, column_types, changes)
                 operations.extend(missing_ops)
             
             # 4. Handle outliers
             if self.config["outliers"]["strategy"] != "none":
-                outlier_ops = self._handle_outliers(cleaned_data, column_types)
+                outlier_ops = self._handle_outliers(cleaned_data, column_types, changes)
                 operations.extend(outlier_ops)
             
             # 5. Handle inconsistent values
             if self.config["inconsistent_values"]["strategy"] != "none":
-                inconsistent_ops = self._handle_inconsistent_values(cleaned_data, column_types)
+                inconsistent_ops = self._handle_inconsistent_values(cleaned_data, column_types, changes)
                 operations.extend(inconsistent_ops)
+        
+        # 6. Apply manual column transformations
+        for col, transform in self.config["column_transforms"].items():
+            if col in cleaned_data.columns:
+                if callable(transform):
+                    before = cleaned_data[col]
+                    cleaned_data[col] = before.apply(transform)
+                    changes.record(col, changed_mask(before, cleaned_data[col]))
+                operations.append({
+                    "operation": "custom_transform",
+                    "column": col
+                })
+        
+        # Calculate cleaning summary from the recorded changes
+        rows_removed = rows_before - len(cleaned_data)
+        changed_cells = changes.changed_cells()
+        cells_changed_percent = (changed_cells / total_cells_original * 100) if total_cells_original > 0 else 0
+        
+        summary = {
+            "rows_before": rows_before,
+            "rows_after": len(cleaned_data),
+            "rows_removed": rows_removed,
+            "cells_changed": int(changed_cells),
+            "cells_changed_percent": float(cells_changed_percent),
+            "operations": operations,
+            "column_types": column_types
+        }
+        
+        # 7. Convert the cleaned data to compact dtypes
+        if self.config.get("optimize_dtypes", True):
+            cleaned_data, summary["memory"] = dtype_optimizer.optimize(cleaned_data)
+        
+        return {
+            "success": True,
+            "cleaned_data": cleaned_data,
+            "summary": summary
+        }
+    
+    def _parallel_jobs(self, data: pd.DataFrame) -> int:
+        """Number of worker processes to clean columns with (1 means serial)"""
+        parallel = self.config.get("parallel", {})
+        n_jobs = parallel.get("n_jobs", 1)
+        if n_jobs is None or n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        if len(data) == 0 or len(data.columns) < parallel.get("min_columns", 32):
+            return 1
+        return max(1, min(n_jobs, len(data.columns)))
+    
+    def _clean_columns_parallel(self, data: pd.DataFrame, column_types: Dict[str, str],
+                                changes: CellChangeTracker, operations: List[Dict[str, Any]],
+                                n_jobs: int) -> pd.DataFrame:
+        """
+        Handle missing values, outliers and inconsistent values with columns
+        partitioned across a process pool
+        
+        Numeric columns reach the workers through a shared memory segment and
+        are written back into it, string columns travel as dictionary codes
+        and other columns are pickled. Operations are
+        merged in the serial order (step, then column position), independent
+        of which worker finishes first. Differences from the serial path:
+        KNN imputation runs in this process, and outlier removal is decided on all rows and applied once
+        through a combined row mask, instead of each column seeing the rows
+        left by the previous one.
+        
+        Args:
+            data: DataFrame to process
+            column_types: Dictionary of column types
+            changes: Tracker to record changed cells and removed rows in
+            operations: List to append the operations performed to
+            n_jobs: Number of worker processes
             
-            # 6. Apply manual column transformations
-            for col, transform in self.config["column_transforms"].items():
-                if col in cleaned_data.columns:
-                    if callable(transform):
-                        cleaned_data[col] = cleaned_data[col].apply(transform)
-                    operations.append({
-                        "operation": "custom_transform",
-                        "column": col
-                    })
-            
-            # Calculate cleaning summary
-            total_cells_original = original_data.size
-            total_cells_cleaned = cleaned_data.size
-            rows_removed = len(original_data) - len(cleaned_data)
-            
-            # Calculate percentage of changed cells
-            changed_cells = 0
-            for col in cleaned_data.columns:
-                if col in original_data.columns:
-                    try:
-                        # For numeric columns
-                        if pd.api.types.is_numeric_dtype(cleaned_data[col]):
-                            changed_mask = ~original_data[col].equals(cleaned_data[col])
-                            changed_cells += changed_mask.sum()
-                        else:
-                            # For non-numeric columns
-                            changed_mask = original_data[col] != cleaned_data[col]
-                            changed_cells += changed_mask.sum()
-                    except:
-                        # If comparison fails, assume all cells changed
-                        changed_cells += len(cleaned_data[col])
+        Returns:
+            The cleaned DataFrame
+        """
+        # Callable transforms are applied by the caller and may not pickle
+        config = {key: value for key, value in self.config.items()
+                  if key not in ("column_transforms", "parallel")}
+        
+        # Workers must share this process's resource tracker, or each would
+        # track the segments it attaches to and unlink them when it exits
+        resource_tracker.ensure_running()
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            # 3. Handle missing values; KNN columns need all numeric columns, so they are imputed here
+            if self.config["missing_values"]["strategy"] != "none":
+                columns = data.columns[data.isna().any().to_numpy()].tolist()
+                results = self._run_column_step(pool, n_jobs, "missing_values", data, columns, column_types, config)
+                missing_ops = self._merge_column_results(data, results, changes)
+                deferred = {col for result in results for col in result["deferred_knn"]}
+                missing_ops.extend(self._fill_knn_columns(
+                    data, [col for col in data.columns if col in deferred], column_types, changes))
+                operations.extend(self._in_column_order(data, missing_ops))
             
-            cells_changed_percent = (changed_cells / total_cells_original * 100) if total_cells_original > 0 else 0
+            # 4. Handle outliers; rows are removed once, after every column has been checked
+            if self.config["outliers"]["strategy"] != "none":
+                columns = [col for col in data.columns if column_types.get(col) in ["integer", "float"]]
+                results = self._run_column_step(pool, n_jobs, "outliers", data, columns, column_types, config)
+                outlier_ops = self._merge_column_results(data, results, changes)
+                removed = np.zeros(len(data), dtype=bool)
+                for result in results:
+                    removed |= np.unpackbits(result["removed"], count=len(data)).astype(bool)
+                if removed.any():
+                    data = data[~removed]
+                    changes.drop_rows(~removed)
+                operations.extend(self._in_column_order(data, outlier_ops))
             
-            return {
-                "success": True,
-                "cleaned_data": cleaned_data,
-                "summary": {
-                    "rows_before": len(original_data),
-                    "rows_after": len(cleaned_data),
-                    "rows_removed": rows_removed,
-                    "cells_changed": int(changed_cells),
-                    "cells_changed_percent": float(cells_changed_percent),
-                    "operations": operations,
-                    "column_types": column_types
-                }
-            }
+            # 5. Handle inconsistent values
+            if self.config["inconsistent_values"]["strategy"] != "none":
+                columns = [col for col in data.columns if column_types.get(col, "text") not in ["integer", "float"]]
+                results = self._run_column_step(pool, n_jobs, "inconsistent_values", data, columns, column_types, config)
+                inconsistent_ops = self._merge_column_results(data, results, changes)
+                operations.extend(self._in_column_order(data, inconsistent_ops))
+        
+        return data
+    
+    def _run_column_step(self, pool: ProcessPoolExecutor, n_jobs: int, step: str, data: pd.DataFrame,
+                         columns: List[str], column_types: Dict[str, str],
+                         config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run one cleaning step over columns split round-robin across the pool"""
+        if not columns:
+            return []
+        shm, layout, dictionaries = _share_columns(data, columns)
+        try:
+            tasks = []
+            for part in range(min(n_jobs, len(columns))):
+                part_columns = columns[part::n_jobs]
+                tasks.append({
+                    "step": step,
+                    "config": config,
+                    "columns": part_columns,
+                    "column_types": {col: column_types.get(col) for col in part_columns},
+                    "n_rows": len(data),
+                    "shm_name": shm.name if shm is not None else None,
+                    "layout": {col: layout[col] for col in part_columns if col in layout},
+                    "dictionaries": {col: dictionaries[col] for col in part_columns if col in dictionaries},
+                    "arrays": {col: _column_values(data[col]) for col in part_columns if col not in layout}
+                })
+            results = list(pool.map(_clean_columns_task, tasks))
             
-        except Exception as e:
-            logger.error(f"Error cleaning dataset: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            # Read back the columns workers wrote into shared memory or returned encoded
+            for result in results:
+                for col in result["shared"]:
+                    offset, dtype = layout[col]
+                    result["values"][col] = np.ndarray(len(data), dtype=dtype, buffer=shm.buf, offset=offset).copy()
+                for col, encoded in result.pop("encoded").items():
+                    result["values"][col] = _decode_strings(*encoded)
+            return results
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+    
+    def _merge_column_results(self, data: pd.DataFrame, results: List[Dict[str, Any]],
+                              changes: CellChangeTracker) -> List[Dict[str, Any]]:
+        """Apply worker results to data and changes; returns their operations"""
+        operations = []
+        for result in results:
+            for col, values in result["values"].items():
+                data[col] = _received_values(values)
+            for col, packed in result["changes"].items():
+                changes.record(col, np.unpackbits(packed, count=len(data)).astype(bool))
+            operations.extend(result["operations"])
+        return operations
+    
+    def _in_column_order(self, data: pd.DataFrame, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sort one step's operations by column position (stable, like the serial loop)"""
+        position = {col: i for i, col in enumerate(data.columns)}
+        return sorted(operations, key=lambda op: position.get(op["column"], len(position)))
     
     def _infer_column_types(self, data: pd.DataFrame) -> Dict[str, str]:
-        """Infer column types from data"""
-        column_types = {}
-        
-        for col in data.columns:
-            # Check if column is numeric
-            if pd.api.types.is_numeric_dtype(data[col]):
-                # Check if values are mostly integers
-                if pd.api.types.is_integer_dtype(data[col]) or (data[col].dropna().apply(float.is_integer).mean() > 0.8):
-                    column_types[col] = "integer"
-                else:
-                    column_types[col] = "float"
-                    
-            # Check if column is datetime
-            elif pd.api.types.is_datetime64_dtype(data[col]):
-                column_types[col] = "datetime"
-                
-            # Check if boolean
-            elif pd.api.types.is_bool_dtype(data[col]):
-                column_types[col] = "boolean"
-                
-            # Check if categorical
-            elif len(data[col].unique()) / len(data[col]) < 0.1 and len(data[col].unique()) < 50:
-                column_types[col] = "categorical"
-                
-            # Check if likely an email
-            elif data[col].dropna().astype(str).str.contains('@.*\.').mean() > 0.5:
-                column_types[col] = "email"
-                
-            # Check if likely a phone number
-            elif data[col].dropna().astype(str).str.replace(r'[^0-9]', '').str.len().mean() > 7:
-                if data[col].dropna().astype(str).str.match(r'^\+?[\d\s\-\(\)]+$').mean() > 0.8:
-                    column_types[col] = "phone"
-                    
-            # Check if likely a URL
-            elif data[col].dropna().astype(str).str.contains('http|www\..*\.').mean() > 0.5:
-                column_types[col] = "url"
-                
-            # Default to text
-            else:
-                column_types[col] = "text"
-                
-        return column_types
+        """Infer column types from data (sampled, and cached per column content)"""
+        return type_engine.infer_column_types(data)
     
-    def _handle_missing_values(self, data: pd.DataFrame, column_types: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _handle_missing_values(self, data: pd.DataFrame, column_types: Dict[str, str],
+                               changes: Optional[CellChangeTracker] = None,
+                               deferred_knn: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Handle missing values in the dataset
         
         Args:
             data: DataFrame to process (modified in place)
             column_types: Dictionary of column types
+            changes: Optional tracker to record filled cells in
+            deferred_knn: If given, columns that need KNN imputation are appended
+                here and left unfilled for the caller to impute
             
         Returns:
             List of operations performed
         """
         operations = []
+        knn_columns = deferred_knn if deferred_knn is not None else []
         
         for col in data.columns:
-            missing_count = data[col].isna().sum()
+            missing = data[col].isna()
+            missing_count = missing.sum()
             if missing_count == 0:
                 continue
+            ops_before = len(operations)
             
             col_type = column_types.get(col, "text")
             strategy = self.config["missing_values"]["strategy"]
@@ -240,7 +688,7 @@ class DataCleaningAgent:
             
             # Apply the appropriate strategy
             if strategy == "mean" and col_type in ["integer", "float"]:
-                data[col] = data[col].fillna(data[col].mean())
+                data[col] = _as_float(data[col]).fillna(data[col].mean())
                 operations.append({
                     "operation": "fill_missing",
                     "column": col,
@@ -249,7 +697,7 @@ class DataCleaningAgent:
                 })
                 
             elif strategy == "median" and col_type in ["integer", "float"]:
-                data[col] = data[col].fillna(data[col].median())
+                data[col] = _as_float(data[col]).fillna(data[col].median())
                 operations.append({
                     "operation": "fill_missing",
                     "column": col,
@@ -269,60 +717,99 @@ class DataCleaningAgent:
                 })
                 
             elif strategy == "knn" and col_type in ["integer", "float"]:
-                # Use KNN imputation for numeric columns
-                try:
-                    numeric_cols = [c for c in data.columns if column_types.get(c) in ["integer", "float"]]
-                    if len(numeric_cols) > 1:  # Need at least one other numeric column
-                        subset = data[numeric_cols].copy()
-                        
-                        # Create a mask of missing values to restore after imputation
-                        missing_mask = subset.isna()
-                        
-                        # Temporarily fill other missing values with column means
-                        for num_col in numeric_cols:
-                            subset[num_col] = subset[num_col].fillna(subset[num_col].mean())
-                        
-                        # Apply KNN imputation
-                        imputer = KNNImputer(n_neighbors=self.config["missing_values"]["knn_neighbors"])
-                        imputed_data = imputer.fit_transform(subset)
-                        imputed_df = pd.DataFrame(imputed_data, columns=numeric_cols)
-                        
-                        # Replace only the missing values in the original data
-                        data.loc[:, col] = data[col].fillna(imputed_df[col])
-                        operations.append({
-                            "operation": "fill_missing",
-                            "column": col,
-                            "strategy": "knn",
-                            "count": int(missing_count)
-                        })
-                    else:
-                        # Fallback to median if not enough numeric columns
-                        data[col] = data[col].fillna(data[col].median())
-                        operations.append({
-                            "operation": "fill_missing",
-                            "column": col,
-                            "strategy": "median (fallback)",
-                            "count": int(missing_count)
-                        })
-                except Exception as e:
-                    logger.warning(f"KNN imputation failed for {col}: {e}. Using median instead.")
-                    data[col] = data[col].fillna(data[col].median())
-                    operations.append({
-                        "operation": "fill_missing",
-                        "column": col,
-                        "strategy": "median (fallback)",
-                        "count": int(missing_count)
-                    })
+                # Imputed together once every other column is filled
+                knn_columns.append(col)
+                continue
+            
+            if changes is not None and len(operations) > ops_before:
+                changes.record(col, missing.to_numpy() & data[col].notna().to_numpy())
+        
+        if deferred_knn is None and knn_columns:
+            operations.extend(self._fill_knn_columns(data, knn_columns, column_types, changes))
+            operations = self._in_column_order(data, operations)
         
         return operations
     
-    def _handle_outliers(self, data: pd.DataFrame, column_types: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _fill_knn_columns(self, data: pd.DataFrame, columns: List[str], column_types: Dict[str, str],
+                          changes: Optional[CellChangeTracker] = None) -> List[Dict[str, Any]]:
+        """
+        Fill numeric columns by KNN imputation, all at once so the features
+        are standardized a single time
+        
+        Args:
+            data: DataFrame to process (modified in place)
+            columns: Columns to impute
+            column_types: Dictionary of column types
+            changes: Optional tracker to record filled cells in
+            
+        Returns:
+            List of operations performed
+        """
+        missing = {col: data[col].isna() for col in columns}
+        strategies = self._impute_knn(data, columns, column_types)
+        operations = []
+        for col in columns:
+            operations.append({
+                "operation": "fill_missing",
+                "column": col,
+                "strategy": strategies[col],
+                "count": int(missing[col].sum())
+            })
+            if changes is not None:
+                changes.record(col, missing[col].to_numpy() & data[col].notna().to_numpy())
+        return operations
+    
+    def _impute_knn(self, data: pd.DataFrame, columns: List[str], column_types: Dict[str, str]) -> Dict[str, str]:
+        """
+        Fill numeric columns' missing values from their nearest neighbours over the other numeric columns
+        
+        Args:
+            data: DataFrame to process (modified in place)
+            columns: Columns to impute
+            column_types: Dictionary of column types
+            
+        Returns:
+            Strategy used per column: "knn", or "median (fallback)" if KNN was not possible
+        """
+        strategies = {}
+        numeric_cols = [c for c in data.columns if column_types.get(c) in ["integer", "float"]]
+        if len(numeric_cols) > 1:  # Need at least one other numeric column
+            config = self.config["missing_values"]
+            engine = KNNImputationEngine(
+                n_neighbors=config.get("knn_neighbors", 5),
+                max_reference_rows=config.get("knn_max_reference_rows", 100_000),
+                batch_size=config.get("knn_batch_size", 10_000)
+            )
+            try:
+                imputed = engine.impute(data, columns, numeric_cols)
+            except Exception as e:
+                logger.warning(f"KNN imputation failed for {columns}: {e}. Using median instead.")
+                imputed = {}
+            for col, (positions, values) in imputed.items():
+                filled = data[col].to_numpy(dtype=float, na_value=np.nan, copy=True)
+                filled[positions] = values
+                data[col] = filled
+                strategies[col] = "knn"
+        
+        # Fallback to median if not enough numeric columns, reference rows, or KNN failed
+        for col in columns:
+            if col not in strategies:
+                data[col] = _as_float(data[col]).fillna(data[col].median())
+                strategies[col] = "median (fallback)"
+        return strategies
+    
+    def _handle_outliers(self, data: pd.DataFrame, column_types: Dict[str, str],
+                         changes: Optional[CellChangeTracker] = None,
+                         removed: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         Handle outliers in the dataset
         
         Args:
             data: DataFrame to process (modified in place)
             column_types: Dictionary of column types
+            changes: Optional tracker to record clipped cells and removed rows in
+            removed: If given, the "remove" strategy marks outlier rows in this
+                boolean mask instead of dropping them, leaving the drop to the caller
             
         Returns:
             List of operations performed
@@ -358,8 +845,11 @@ class DataCleaningAgent:
                     lower_bound = mean_val - threshold * std_val
                     upper_bound = mean_val + threshold * std_val
                     
-                    data.loc[data[col] < lower_bound, col] = lower_bound
-                    data.loc[data[col] > upper_bound, col] = upper_bound
+                    # Replace the column rather than assigning into it: the column may be shared with the input
+                    clipped = (data[col] < lower_bound) | (data[col] > upper_bound)
+                    data[col] = _as_float(data[col]).clip(lower_bound, upper_bound)
+                    if changes is not None:
+                        changes.record(col, clipped.to_numpy())
                     
                     operations.append({
                         "operation": "clip_outliers",
@@ -376,9 +866,20 @@ class DataCleaningAgent:
                 outliers = (z_scores.abs() > threshold)
                 outlier_count = outliers.sum()
                 
-                if outlier_count > 0:
+                if outlier_count > 0 and removed is not None:
+                    removed |= outliers.to_numpy()
+                    operations.append({
+                        "operation": "remove_outliers",
+                        "column": col,
+                        "count": int(outlier_count)
+                    })
+                    
+                elif outlier_count > 0:
                     # Remove rows with outliers
-                    data.drop(data[outliers].index, inplace=True)
+                    outlier_index = data[outliers].index
+                    if changes is not None:
+                        changes.drop_rows(~data.index.isin(outlier_index))
+                    data.drop(outlier_index, inplace=True)
                     
                     operations.append({
                         "operation": "remove_outliers",
@@ -388,13 +889,15 @@ class DataCleaningAgent:
         
         return operations
     
-    def _handle_inconsistent_values(self, data: pd.DataFrame, column_types: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _handle_inconsistent_values(self, data: pd.DataFrame, column_types: Dict[str, str],
+                                    changes: Optional[CellChangeTracker] = None) -> List[Dict[str, Any]]:
         """
         Handle inconsistent values in the dataset
         
         Args:
             data: DataFrame to process (modified in place)
             column_types: Dictionary of column types
+            changes: Optional tracker to record standardized cells in
             
         Returns:
             List of operations performed
@@ -417,25 +920,16 @@ class DataCleaningAgent:
             if strategy == "standardize":
                 # For categorical and text columns
                 if col_type in ["categorical", "text", "email"]:
-                    # Convert to string first
-                    data[col] = data[col].astype(str)
-                    
-                    # Remove extra whitespace
-                    old_data = data[col].copy()
-                    data[col] = data[col].str.strip()
-                    
-                    # Make lowercase if configured
-                    if not self.config["inconsistent_values"]["case_sensitive"]:
-                        data[col] = data[col].str.lower()
+                    original = data[col]
                     
-                    # Special handling for email addresses
-                    if col_type == "email":
-                        # Basic email cleanup
-                        data[col] = data[col].str.replace(r'\s+@\s+', '@', regex=True)
-                        data[col] = data[col].str.replace(r'\s+', '', regex=True)
+                    # Convert to string first
+                    old_data = _as_str(original)
+                    data[col] = self._standardize_values(old_data, col_type)
                     
                     # Count changes
                     changed = (old_data != data[col]).sum()
+                    if changes is not None:
+                        changes.record(col, changed_mask(original, data[col]))
                     
                     if changed > 0:
                         operations.append({
@@ -445,6 +939,362 @@ class DataCleaningAgent:
                         })
         
         return operations
+    
+    def _standardize_values(self, values: pd.Series, col_type: str) -> pd.Series:
+        """Standardize string values: strip whitespace, lowercase and clean up emails"""
+        # Remove extra whitespace
+        values = values.str.strip()
+        
+        # Make lowercase if configured
+        if not self.config["inconsistent_values"]["case_sensitive"]:
+            values = values.str.lower()
+        
+        # Special handling for email addresses
+        if col_type == "email":
+            # Basic email cleanup
+            values = values.str.replace(r'\s+@\s+', '@', regex=True)
+            values = values.str.replace(r'\s+', '', regex=True)
+        
+        return values
+    
+    def clean_csv(self, input_path: str, output_path: str, chunksize: int = 100_000,
+                  read_csv_kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Clean a CSV file that may not fit in memory, writing the result to Parquet
+        
+        Runs in two passes over the file. The first pass builds mergeable
+        statistics per column (running moments, a t-digest for medians and a
+        Misra-Gries summary for modes). The second pass imputes, clips and
+        standardizes each chunk using those statistics and appends it to the
+        output file. Memory is bounded by the chunk size, except that
+        removing duplicate rows keeps one 64-bit hash per distinct row of the
+        whole file, so it grows with the number of distinct rows (reported as
+        "row_hash_bytes"). Set duplicate_rows.across_chunks to False to only
+        remove duplicates within each chunk and keep memory bounded, or the
+        duplicate_rows strategy to "none".
+        
+        Column types are inferred from the first chunk. KNN imputation needs
+        the full table, so numeric columns that would use it are filled with
+        the median instead. Outlier bounds come from the whole (imputed)
+        column, so outlier removal does not depend on the other columns.
+        
+        Args:
+            input_path: Path of the CSV file to clean
+            output_path: Path of the Parquet file to write
+            chunksize: Number of rows read per chunk
+            read_csv_kwargs: Extra arguments for pandas.read_csv
+            
+        Returns:
+            Dictionary with the cleaning summary (including the bytes of row
+            hashes kept for duplicate removal) and output path
+        """
+        try:
+            if pq is None:
+                raise ImportError("pyarrow is required to write the cleaned output")
+            read_csv_kwargs = dict(read_csv_kwargs or {})
+            
+            stats = self._collect_stream_statistics(input_path, chunksize, read_csv_kwargs)
+            plan = self._plan_stream_cleaning(stats)
+            
+            rows_after = 0
+            changed_cells = 0
+            counts = {col: {"fill": 0, "clip": 0, "remove": 0, "standardize": 0} for col in stats["columns"]}
+            seen_rows = RowHashSet() if self.config["duplicate_rows"]["strategy"] != "none" else None
+            writer = None
+            try:
+                for chunk in pd.read_csv(input_path, chunksize=chunksize, **read_csv_kwargs):
+                    if seen_rows is not None:
+                        chunk = chunk[self._first_occurrences(chunk, seen_rows)]
+                    chunk, chunk_changed = self._clean_chunk(chunk, plan, counts)
+                    changed_cells += chunk_changed
+                    rows_after += len(chunk)
+                    
+                    table = pa.Table.from_pandas(chunk, schema=plan["schema"], preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, plan["schema"])
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is None:
+                pq.write_table(plan["schema"].empty_table(), output_path)
+            
+            operations = []
+            if stats["duplicates"] > 0:
+                operations.append({
+                    "operation": "remove_duplicates",
+                    "rows_affected": int(stats["duplicates"])
+                })
+            for col, col_plan in plan["columns"].items():
+                if "fill_value" in col_plan and counts[col]["fill"]:
+                    operations.append({
+                        "operation": "fill_missing",
+                        "column": col,
+                        "strategy": col_plan["fill_strategy"],
+                        "count": counts[col]["fill"]
+                    })
+            for col, col_plan in plan["columns"].items():
+                if "bounds" in col_plan and (counts[col]["clip"] or counts[col]["remove"]):
+                    lower_bound, upper_bound = col_plan["bounds"]
+                    if col_plan["outlier_strategy"] == "clip":
+                        operations.append({
+                            "operation": "clip_outliers",
+                            "column": col,
+                            "count": counts[col]["clip"],
+                            "lower_bound": float(lower_bound),
+                            "upper_bound": float(upper_bound)
+                        })
+                    else:
+                        operations.append({
+                            "operation": "remove_outliers",
+                            "column": col,
+                            "count": counts[col]["remove"]
+                        })
+            for col, col_plan in plan["columns"].items():
+                if col_plan.get("standardize") and counts[col]["standardize"]:
+                    operations.append({
+                        "operation": "standardize_values",
+                        "column": col,
+                        "count": counts[col]["standardize"]
+                    })
+            
+            total_cells_original = stats["rows"] * len(stats["columns"])
+            cells_changed_percent = (changed_cells / total_cells_original * 100) if total_cells_original > 0 else 0
+            
+            return {
+                "success": True,
+                "output_path": output_path,
+                "summary": {
+                    "rows_before": stats["rows"],
+                    "rows_after": rows_after,
+                    "rows_removed": stats["rows"] - rows_after,
+                    "cells_changed": int(changed_cells),
+                    "cells_changed_percent": float(cells_changed_percent),
+                    "operations": operations,
+                    "column_types": plan["column_types"],
+                    "chunks": stats["chunks"],
+                    "row_hash_bytes": seen_rows.nbytes if seen_rows is not None else 0
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Error cleaning CSV file {input_path}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def _first_occurrences(self, chunk: pd.DataFrame, seen_rows: RowHashSet) -> np.ndarray:
+        """Mask of rows not seen before in this chunk or, with across_chunks, earlier chunks, by row hash"""
+        hashes = chunk_row_hashes(chunk)
+        keep = np.zeros(len(chunk), dtype=bool)
+        _, first = np.unique(hashes, return_index=True)
+        if not self.config["duplicate_rows"].get("across_chunks", True):
+            keep[first] = True
+            return keep
+        keep[first] = ~seen_rows.contains(hashes[first])
+        seen_rows.add(hashes[keep])
+        return keep
+    
+    def _collect_stream_statistics(self, input_path: str, chunksize: int,
+                                   read_csv_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """First pass: mergeable per-column statistics over all chunks"""
+        stats = {"rows": 0, "duplicates": 0, "chunks": 0, "column_types": {}, "columns": {}}
+        seen_rows = RowHashSet() if self.config["duplicate_rows"]["strategy"] != "none" else None
+        
+        for chunk in pd.read_csv(input_path, chunksize=chunksize, **read_csv_kwargs):
+            stats["chunks"] += 1
+            stats["rows"] += len(chunk)
+            if seen_rows is not None:
+                keep = self._first_occurrences(chunk, seen_rows)
+                stats["duplicates"] += int((~keep).sum())
+                chunk = chunk[keep]
+            
+            if not stats["columns"]:
+                # Column types are inferred from the first chunk
+                stats["column_types"] = self._infer_column_types(chunk)
+                for col in chunk.columns:
+                    stats["columns"][col] = {
+                        "rows": 0,
+                        "missing": 0,
+                        "numeric": True,
+                        "integer": True,
+                        "boolean": True,
+                        "moments": RunningMoments(),
+                        "digest": TDigest(),
+                        "top": TopK(capacity=1000),
+                        "distinct": set(),
+                        "has_null": False
+                    }
+            
+            for col in chunk.columns:
+                col_stats = stats["columns"][col]
+                values = chunk[col]
+                missing = int(values.isna().sum())
+                col_stats["rows"] += len(values)
+                col_stats["missing"] += missing
+                col_stats["has_null"] |= missing > 0
+                
+                is_bool = pd.api.types.is_bool_dtype(values)
+                col_stats["boolean"] &= is_bool
+                col_stats["numeric"] &= pd.api.types.is_numeric_dtype(values) and not is_bool
+                col_stats["integer"] &= pd.api.types.is_integer_dtype(values)
+                
+                if col_stats["numeric"]:
+                    col_stats["moments"].update(values.to_numpy(dtype=float))
+                    col_stats["digest"].update(values.to_numpy(dtype=float))
+                col_stats["top"].update(values)
+                
+                # Distinct values are only needed up to the standardization limit of 100
+                distinct = col_stats["distinct"]
+                if distinct is not None:
+                    distinct.update(values.dropna().unique().tolist())
+                    if len(distinct) > 100:
+                        col_stats["distinct"] = None
+        
+        return stats
+    
+    def _plan_stream_cleaning(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Decide per-column fill values, outlier bounds, standardization and output types"""
+        column_types = dict(stats["column_types"])
+        for col, col_type in self.config["column_types"].items():
+            if col in column_types:
+                column_types[col] = col_type
+        
+        plan = {"column_types": column_types, "columns": {}}
+        fields = []
+        for col, col_stats in stats["columns"].items():
+            col_type = column_types.get(col, "text")
+            if col_type in ["integer", "float"] and not col_stats["numeric"]:
+                # Later chunks contained non-numeric values
+                col_type = column_types[col] = "text"
+            col_plan = {"type": col_type}
+            moments = RunningMoments().merge(col_stats["moments"])
+            
+            # Missing values
+            strategy = self.config["missing_values"]["strategy"]
+            missing = col_stats["missing"]
+            if strategy != "none" and missing > 0:
+                if strategy == "auto":
+                    if col_type in ["integer", "float"]:
+                        strategy = "median" if missing / col_stats["rows"] < 0.3 else "knn"
+                    elif col_type in ["categorical", "boolean"]:
+                        strategy = "mode"
+                    else:
+                        strategy = "none"
+                
+                if strategy == "mean" and col_type in ["integer", "float"]:
+                    col_plan.update(fill_value=moments.mean, fill_strategy="mean")
+                elif strategy in ["median", "knn"] and col_type in ["integer", "float"]:
+                    col_plan.update(
+                        fill_value=col_stats["digest"].quantile(0.5),
+                        fill_strategy="median" if strategy == "median" else "median (fallback)"
+                    )
+                elif strategy == "mode" and col_stats["top"].counters:
+                    col_plan.update(fill_value=col_stats["top"].mode(), fill_strategy="mode")
+                
+                if col_plan.get("fill_value") is not None and col_stats["numeric"]:
+                    moments.add_constant(float(col_plan["fill_value"]), missing)
+            
+            # Outliers, with bounds from the imputed column
+            strategy = self.config["outliers"]["strategy"]
+            if strategy == "auto":
+                strategy = "clip"
+            if (strategy in ["clip", "remove"] and col_type in ["integer", "float"]
+                    and col_stats["numeric"] and moments.count >= 10):
+                threshold = self.config["outliers"]["threshold"]
+                col_plan.update(
+                    mean=moments.mean,
+                    std=moments.std(),
+                    bounds=(moments.mean - threshold * moments.std(), moments.mean + threshold * moments.std()),
+                    outlier_strategy=strategy
+                )
+            
+            # Inconsistent values
+            strategy = self.config["inconsistent_values"]["strategy"]
+            distinct = col_stats["distinct"]
+            if (strategy in ["auto", "standardize"] and col_type in ["categorical", "text", "email"]
+                    and distinct is not None and len(distinct) + col_stats["has_null"] <= 100):
+                col_plan["standardize"] = True
+            
+            # Output type: integers stay integers unless nulls remain or values get clipped
+            if col_stats["numeric"]:
+                clipped = "bounds" in col_plan and col_plan["outlier_strategy"] == "clip" and (
+                    moments.min < col_plan["bounds"][0] or moments.max > col_plan["bounds"][1])
+                is_integer = col_stats["integer"] and not clipped
+                col_plan["dtype"] = "int64" if is_integer else "float64"
+                fields.append(pa.field(col, pa.int64() if is_integer else pa.float64()))
+            elif col_stats["boolean"] and not col_plan.get("standardize"):
+                col_plan["dtype"] = "bool"
+                fields.append(pa.field(col, pa.bool_()))
+            else:
+                col_plan["dtype"] = "string"
+                fields.append(pa.field(col, pa.string()))
+            
+            plan["columns"][col] = col_plan
+        
+        plan["schema"] = pa.schema(fields)
+        return plan
+    
+    def _clean_chunk(self, chunk: pd.DataFrame, plan: Dict[str, Any],
+                     counts: Dict[str, Dict[str, int]]) -> Tuple[pd.DataFrame, int]:
+        """Second pass: clean one chunk with the precomputed plan"""
+        changes = CellChangeTracker(len(chunk))
+        
+        # 1. Missing values
+        for col, col_plan in plan["columns"].items():
+            if col_plan.get("fill_value") is None:
+                continue
+            missing = chunk[col].isna()
+            if missing.any():
+                chunk[col] = chunk[col].fillna(col_plan["fill_value"])
+                counts[col]["fill"] += changes.record(col, missing.to_numpy() & chunk[col].notna().to_numpy())
+        
+        # 2. Outliers
+        for col, col_plan in plan["columns"].items():
+            if "bounds" not in col_plan:
+                continue
+            z_scores = (chunk[col] - col_plan["mean"]) / col_plan["std"]
+            outliers = z_scores.abs() > self.config["outliers"]["threshold"]
+            if not outliers.any():
+                continue
+            if col_plan["outlier_strategy"] == "clip":
+                lower_bound, upper_bound = col_plan["bounds"]
+                clipped = (chunk[col] < lower_bound) | (chunk[col] > upper_bound)
+                chunk[col] = chunk[col].clip(lower_bound, upper_bound)
+                counts[col]["clip"] += int(outliers.sum())
+                changes.record(col, clipped.to_numpy())
+            else:
+                counts[col]["remove"] += int(outliers.sum())
+                changes.drop_rows(~outliers.to_numpy())
+                chunk = chunk[~outliers]
+        
+        # 3. Inconsistent values
+        for col, col_plan in plan["columns"].items():
+            if not col_plan.get("standardize"):
+                continue
+            original = chunk[col]
+            old_data = original.astype(str)
+            chunk[col] = self._standardize_values(old_data, col_plan["type"])
+            counts[col]["standardize"] += int((old_data != chunk[col]).sum())
+            changes.record(col, changed_mask(original, chunk[col]))
+        
+        # 4. Manual column transformations
+        for col, transform in self.config["column_transforms"].items():
+            if col in chunk.columns and callable(transform):
+                before = chunk[col]
+                chunk[col] = before.apply(transform)
+                changes.record(col, changed_mask(before, chunk[col]))
+        
+        # Align chunk types with the output schema
+        for col, col_plan in plan["columns"].items():
+            if col_plan["dtype"] == "string":
+                if pd.api.types.infer_dtype(chunk[col], skipna=True) not in ["string", "empty"]:
+                    chunk[col] = chunk[col].astype(object).where(chunk[col].isna(), chunk[col].astype(str))
+            elif chunk[col].dtype != col_plan["dtype"]:
+                chunk[col] = chunk[col].astype(col_plan["dtype"])
+        
+        return chunk, changes.changed_cells()
 
 class DataValidationAgent:
     """Class for validating data quality using configurable rules"""
@@ -462,7 +1312,8 @@ class DataValidationAgent:
             "consistency_checks": True,
             "format_validation": True,
             "relationship_validation": False,
-            "custom_rules": []
+            "custom_rules": [],
+            "cache_results": True  # Reuse results for identical data, rules and schema
         }
         self.rules = []
         logger.info("DataValidationAgent initialized")
@@ -537,13 +1388,36 @@ class DataValidationAgent:
         """
         Validate a dataset against rules and schema
         
+        Results are cached by data fingerprint, configuration, rules and schema
+        
         Args:
             data: Pandas DataFrame to validate
             schema: Optional schema definition
             
         Returns:
-            Dictionary with validation results
+            Dictionary with validation results; the caller's own copy, which
+            it may modify without affecting later cache hits
         """
+        if not self.config.get("cache_results", True):
+            return self._validate_dataset(data, schema)
+        
+        cache_config = {"config": self.config, "rules": self.rules, "schema": schema}
+        try:
+            fingerprint = fingerprint_dataframe(data)
+        except Exception as e:
+            logger.warning(f"Could not fingerprint dataset, validating without cache: {str(e)}")
+            return self._validate_dataset(data, schema)
+        
+        # The cache stores and hands out deep copies, so results returned here are never the cached ones
+        cached = result_cache.get(fingerprint, "validation", cache_config)
+        if cached is not None:
+            return cached
+        validation_results = self._validate_dataset(data, schema)
+        if validation_results["success"]:
+            result_cache.put(fingerprint, "validation", validation_results, cache_config)
+        return validation_results
+    
+    def _validate_dataset(self, data: pd.DataFrame, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         try:
             validation_results = {
                 "success": True,
@@ -560,9 +1434,12 @@ class DataValidationAgent:
                 "checks": []
             }
             
+            # Null masks, string views and unique counts shared by all checks
+            summaries = ColumnSummaries(data)
+            
             # 1. Schema validation
             if self.config["schema_validation"] and schema:
-                schema_results = self._validate_schema(data, schema)
+                schema_results = self._validate_schema(data, schema, summaries)
                 validation_results["checks"].extend(schema_results["checks"])
                 validation_results["summary"]["total_checks"] += schema_results["total_checks"]
                 validation_results["summary"]["passed_checks"] += schema_results["passed_checks"]
@@ -572,7 +1449,7 @@ class DataValidationAgent:
                     validation_results["passed"] = False
             
             # 2. Completeness check
-            completeness_results = self._check_completeness(data)
+            completeness_results = self._check_completeness(data, summaries)
             validation_results["checks"].append(completeness_results)
             validation_results["summary"]["total_checks"] += 1
             
@@ -586,7 +1463,7 @@ class DataValidationAgent:
             
             # 3. Format validation
             if self.config["format_validation"]:
-                format_results = self._validate_formats(data)
+                format_results = self._validate_formats(data, summaries)
                 validation_results["checks"].extend(format_results["checks"])
                 validation_results["summary"]["total_checks"] += format_results["total_checks"]
                 validation_results["summary"]["passed_checks"] += format_results["passed_checks"]
@@ -599,7 +1476,7 @@ class DataValidationAgent:
             
             # 4. Consistency checks
             if self.config["consistency_checks"]:
-                consistency_results = self._check_consistency(data)
+                consistency_results = self._check_consistency(data, summaries)
                 validation_results["checks"].extend(consistency_results["checks"])
                 validation_results["summary"]["total_checks"] += consistency_results["total_checks"]
                 validation_results["summary"]["passed_checks"] += consistency_results["passed_checks"]
@@ -612,7 +1489,7 @@ class DataValidationAgent:
             
             # 5. Custom rules
             if self.rules:
-                rule_results = self._apply_custom_rules(data)
+                rule_results = self._apply_custom_rules(data, summaries)
                 validation_results["checks"].extend(rule_results["checks"])
                 validation_results["summary"]["total_checks"] += rule_results["total_checks"]
                 validation_results["summary"]["passed_checks"] += rule_results["passed_checks"]
@@ -647,17 +1524,20 @@ class DataValidationAgent:
                 "error": str(e)
             }
     
-    def _validate_schema(self, data: pd.DataFrame, schema: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_schema(self, data: pd.DataFrame, schema: Dict[str, Any],
+                         summaries: Optional[ColumnSummaries] = None) -> Dict[str, Any]:
         """
         Validate data against a schema
         
         Args:
             data: DataFrame to validate
             schema: Schema definition
+            summaries: Column summaries shared with the other checks
             
         Returns:
             Results of schema validation
         """
+        summaries = summaries or ColumnSummaries(data)
         results = {
             "total_checks": 0,
             "passed_checks": 0,
@@ -705,7 +1585,7 @@ class DataValidationAgent:
                 if field_type == "integer":
                     valid_type = pd.api.types.is_integer_dtype(data[column].dtype) or \
                                 (pd.api.types.is_float_dtype(data[column].dtype) and 
-                                 data[column].dropna().apply(lambda x: float(x).is_integer()).all())
+                                 summaries.non_null_values(column).apply(lambda x: float(x).is_integer()).all())
                     if not valid_type:
                         type_check["passed"] = False
                         type_check["message"] = f"Column '{column}' should be integer"
@@ -748,43 +1628,43 @@ class DataValidationAgent:
                         }
                         
                         # Skip if all values are null
-                        if data[column].isna().all():
+                        if not summaries.non_null(column).any():
                             continue
                         
                         try:
                             if constraint_name == "min" and field_type in ["integer", "number"]:
-                                valid = data[column].dropna().astype(float).min() >= constraint_value
+                                valid = summaries.non_null_values(column).astype(float).min() >= constraint_value
                                 if not valid:
                                     constraint_check["passed"] = False
                                     constraint_check["message"] = f"Column '{column}' has values below minimum {constraint_value}"
                             
                             elif constraint_name == "max" and field_type in ["integer", "number"]:
-                                valid = data[column].dropna().astype(float).max() <= constraint_value
+                                valid = summaries.non_null_values(column).astype(float).max() <= constraint_value
                                 if not valid:
                                     constraint_check["passed"] = False
                                     constraint_check["message"] = f"Column '{column}' has values above maximum {constraint_value}"
                             
                             elif constraint_name == "min_length" and field_type in ["string", "text"]:
-                                valid = data[column].dropna().astype(str).str.len().min() >= constraint_value
+                                valid = summaries.text_values(column).str.len().min() >= constraint_value
                                 if not valid:
                                     constraint_check["passed"] = False
                                     constraint_check["message"] = f"Column '{column}' has strings below minimum length {constraint_value}"
                             
                             elif constraint_name == "max_length" and field_type in ["string", "text"]:
-                                valid = data[column].dropna().astype(str).str.len().max() <= constraint_value
+                                valid = summaries.text_values(column).str.len().max() <= constraint_value
                                 if not valid:
                                     constraint_check["passed"] = False
                                     constraint_check["message"] = f"Column '{column}' has strings above maximum length {constraint_value}"
                             
                             elif constraint_name == "regex" and field_type in ["string", "text"]:
                                 pattern = re.compile(constraint_value)
-                                valid = data[column].dropna().astype(str).apply(lambda x: bool(pattern.match(x))).all()
+                                valid = summaries.text_values(column).apply(lambda x: bool(pattern.match(x))).all()
                                 if not valid:
                                     constraint_check["passed"] = False
                                     constraint_check["message"] = f"Column '{column}' has values not matching pattern {constraint_value}"
                             
                             elif constraint_name == "allowed_values":
-                                valid = data[column].dropna().isin(constraint_value).all()
+                                valid = summaries.non_null_values(column).isin(constraint_value).all()
                                 if not valid:
                                     constraint_check["passed"] = False
                                     constraint_check["message"] = f"Column '{column}' has values outside allowed set"
@@ -802,18 +1682,21 @@ class DataValidationAgent:
         
         return results
     
-    def _check_completeness(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def _check_completeness(self, data: pd.DataFrame,
+                            summaries: Optional[ColumnSummaries] = None) -> Dict[str, Any]:
         """
         Check data completeness
         
         Args:
             data: DataFrame to check
+            summaries: Column summaries shared with the other checks
             
         Returns:
             Completeness check result
         """
+        summaries = summaries or ColumnSummaries(data)
         total_cells = data.size
-        missing_cells = data.isna().sum().sum()
+        missing_cells = summaries.null_counts().sum()
         completeness_ratio = 1 - (missing_cells / total_cells if total_cells > 0 else 0)
         
         # Check if completeness ratio meets threshold
@@ -829,16 +1712,19 @@ class DataValidationAgent:
             "message": f"Data is {completeness_ratio:.2%} complete (threshold: {threshold:.2%})"
         }
     
-    def _validate_formats(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def _validate_formats(self, data: pd.DataFrame,
+                          summaries: Optional[ColumnSummaries] = None) -> Dict[str, Any]:
         """
         Validate data formats
         
         Args:
             data: DataFrame to validate
+            summaries: Column summaries shared with the other checks
             
         Returns:
             Format validation results
         """
+        summaries = summaries or ColumnSummaries(data)
         results = {
             "total_checks": 0,
             "passed_checks": 0,
@@ -847,133 +1733,37 @@ class DataValidationAgent:
             "score": 0
         }
         
-        # Infer column types and validate formats
-        column_formats = {}
-        
-        # Try to identify column types
+        # Detect each text column's format from a random sample and check it
         for col in data.columns:
-            # Skip columns with too many null values
-            if data[col].isna().mean() > 0.5:
+            # Skip columns that are not text, and columns with too many null values
+            if not is_text_dtype(data[col].dtype):
                 continue
-                
-            # Email format check
-            if data[col].dtype == object:
-                sample = data[col].dropna().astype(str).iloc[:100]  # Sample first 100 non-null values
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                
-                email_match_ratio = sample.str.match(email_pattern).mean()
-                if email_match_ratio > 0.5:  # If > 50% match, likely emails
-                    column_formats[col] = "email"
-                    
-                    check = {
-                        "name": f"Email Format: {col}",
-                        "type": "format",
-                        "passed": email_match_ratio > 0.9  # 90% must match to pass
-                    }
-                    
-                    if not check["passed"]:
-                        check["message"] = f"Column '{col}' contains email values with invalid format"
-                    
-                    check["score"] = email_match_ratio
-                    results["checks"].append(check)
-                    results["total_checks"] += 1
-                    
-                    if check["passed"]:
-                        results["passed_checks"] += 1
-                    else:
-                        results["failed_checks"] += 1
-                        
-            # URL format check
-            if data[col].dtype == object and col not in column_formats:
-                sample = data[col].dropna().astype(str).iloc[:100]
-                url_pattern = r'^(https?|ftp)://[^\s/$.?#].[^\s]*$'
-                
-                url_match_ratio = sample.str.match(url_pattern).mean()
-                if url_match_ratio > 0.5:  # If > 50% match, likely URLs
-                    column_formats[col] = "url"
-                    
-                    check = {
-                        "name": f"URL Format: {col}",
-                        "type": "format",
-                        "passed": url_match_ratio > 0.9
-                    }
-                    
-                    if not check["passed"]:
-                        check["message"] = f"Column '{col}' contains URL values with invalid format"
-                    
-                    check["score"] = url_match_ratio
-                    results["checks"].append(check)
-                    results["total_checks"] += 1
-                    
-                    if check["passed"]:
-                        results["passed_checks"] += 1
-                    else:
-                        results["failed_checks"] += 1
-                        
-            # Date format check
-            if col not in column_formats:
-                try:
-                    if pd.api.types.is_datetime64_dtype(data[col]):
-                        column_formats[col] = "datetime"
-                    else:
-                        # Try to convert to datetime
-                        pd.to_datetime(data[col])
-                        column_formats[col] = "datetime"
-                        
-                        # Check if conversion worked for at least 90%
-                        valid_dates = pd.to_datetime(data[col], errors='coerce').notna()
-                        date_ratio = valid_dates.mean()
-                        
-                        check = {
-                            "name": f"Date Format: {col}",
-                            "type": "format",
-                            "passed": date_ratio > 0.9
-                        }
-                        
-                        if not check["passed"]:
-                            check["message"] = f"Column '{col}' contains date values with invalid format"
-                        
-                        check["score"] = date_ratio
-                        results["checks"].append(check)
-                        results["total_checks"] += 1
-                        
-                        if check["passed"]:
-                            results["passed_checks"] += 1
-                        else:
-                            results["failed_checks"] += 1
-                except:
-                    pass
-                    
-            # Phone number format check
-            if data[col].dtype == object and col not in column_formats:
-                sample = data[col].dropna().astype(str).iloc[:100]
-                
-                # First standardize by removing common separators
-                standardized = sample.str.replace(r'[\s\-\(\)\+]', '', regex=True)
-                
-                # Check if mostly digits of reasonable length
-                digit_ratio = standardized.str.match(r'^\d{7,15}$').mean()
-                
-                if digit_ratio > 0.5:  # If > 50% match, likely phone numbers
-                    column_formats[col] = "phone"
-                    
-                    check = {
-                        "name": f"Phone Format: {col}",
-                        "type": "format",
-                        "passed": digit_ratio > 0.9
-                    }
-                    
-                    if not check["passed"]:
-                        check["message"] = f"Column '{col}' contains phone numbers with invalid format"
-                    
-                    check["score"] = digit_ratio
-                    results["checks"].append(check)
-                    results["total_checks"] += 1
-                    
-                    if check["passed"]:
-                        results["passed_checks"] += 1
-                    else:
-                        results["failed_checks"] += 1
+            non_null = summaries.non_null(col)
+            if non_null.mean() < 0.5:
+                continue
+            
+            detected = format_engine.detect(data[col], non_null)
+            if detected is None:
+                continue
+            label, description = FORMAT_CHECKS[detected["format"]]
+            
+            check = {
+                "name": f"{label} Format: {col}",
+                "type": "format",
+                "passed": detected["passed"]  # 90% must match to pass
+            }
+            
+            if not check["passed"]:
+                check["message"] = f"Column '{col}' contains {description} with invalid format"
+            
+            check["score"] = detected["ratio"]
+            results["checks"].append(check)
+            results["total_checks"] += 1
+            
+            if check["passed"]:
+                results["passed_checks"] += 1
+            else:
+                results["failed_checks"] += 1
         
         # Calculate format score
         if results["total_checks"] > 0:
@@ -982,16 +1772,19 @@ class DataValidationAgent:
         
         return results
     
-    def _check_consistency(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def _check_consistency(self, data: pd.DataFrame,
+                           summaries: Optional[ColumnSummaries] = None) -> Dict[str, Any]:
         """
         Check data consistency
         
         Args:
             data: DataFrame to check
+            summaries: Column summaries shared with the other checks
             
         Returns:
             Consistency check results
         """
+        summaries = summaries or ColumnSummaries(data)
         results = {
             "total_checks": 0,
             "passed_checks": 0,
@@ -1007,7 +1800,7 @@ class DataValidationAgent:
             "passed": True
         }
         
-        duplicate_count = data.duplicated().sum()
+        duplicate_count = dedup_engine.count_duplicates(data)
         dupes_ratio = duplicate_count / len(data) if len(data) > 0 else 0
         
         if dupes_ratio > 0.01:  # Allow up to 1% duplicates
@@ -1026,14 +1819,11 @@ class DataValidationAgent:
         # Check 2: Value consistency for categorical columns
         for col in data.columns:
             # Skip columns with too many unique values
-            if data[col].dtype == object and len(data[col].unique()) <= 50:
-                # Check for inconsistent capitalization or spacing
-                values = data[col].dropna().astype(str)
-                standardized = values.str.strip().str.lower()
-                
-                # Count unique values before and after standardization
-                orig_count = len(values.unique())
-                std_count = len(standardized.unique())
+            if is_text_dtype(data[col].dtype) and summaries.unique_count(col) <= 50:
+                # Check for inconsistent capitalization or spacing by counting
+                # unique values before and after standardization
+                orig_count = len(summaries.text_uniques(col))
+                std_count = len(summaries.normalized_uniques(col))
                 
                 if std_count < orig_count:
                     consistency_ratio = std_count / orig_count
@@ -1063,16 +1853,22 @@ class DataValidationAgent:
         
         return results
     
-    def _apply_custom_rules(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def _apply_custom_rules(self, data: pd.DataFrame,
+                            summaries: Optional[ColumnSummaries] = None) -> Dict[str, Any]:
         """
         Apply custom validation rules
         
+        Row-level conditions are evaluated over whole columns when they can be
+        compiled (see rule_compiler.py), and row by row otherwise
+        
         Args:
             data: DataFrame to check
+            summaries: Column summaries shared with the other checks
             
         Returns:
             Custom rule validation results
         """
+        summaries = summaries or ColumnSummaries(data)
         results = {
             "total_checks": 0,
             "passed_checks": 0,
@@ -1094,20 +1890,7 @@ class DataValidationAgent:
             try:
                 # Evaluate rule condition
                 if rule_type == "row_level":
-                    # Row-level rules are evaluated for each row
-                    violations = 0
-                    
-                    for _, row in data.iterrows():
-                        context = row.to_dict()
-                        # Create rule evaluation code
-                        code = f"result = {condition}"
-                        # Create local namespace
-                        local_vars = {"data": context, "re": re, "np": np}
-                        
-                        # Execute and get result
-                        exec(code, {}, local_vars)
-                        if not local_vars.get("result", True):
-                            violations += 1
+                    violations = self._count_row_violations(data, condition, summaries)
                     
                     violation_ratio = violations / len(data) if len(data) > 0 else 0
                     threshold = rule.get("threshold", 0.01)  # Default 1% threshold
@@ -1162,6 +1945,34 @@ class DataValidationAgent:
                 results["failed_checks"] += 1
         
         return results
+    
+    def _count_row_violations(self, data: pd.DataFrame, condition: str,
+                              summaries: ColumnSummaries) -> int:
+        """Number of rows for which a row-level condition is false"""
+        compiled = compile_row_condition(condition)
+        if compiled is not None:
+            try:
+                passed, fallback_rows = compiled.evaluate(data, summaries.row_values)
+                violations = int((~passed).sum()) - int((~passed[fallback_rows]).sum())
+                return violations + self._evaluate_rows(data.iloc[fallback_rows], condition)
+            except FallbackRequired as e:
+                logger.debug(f"Evaluating condition row by row ({e}): {condition}")
+        return self._evaluate_rows(data, condition)
+    
+    def _evaluate_rows(self, data: pd.DataFrame, condition: str) -> int:
+        """Number of rows for which a condition is false, executing it once per row"""
+        # Create rule evaluation code
+        code = compile(f"result = {condition}", "<rule>", "exec")
+        violations = 0
+        for _, row in data.iterrows():
+            # Create local namespace
+            local_vars = {"data": row.to_dict(), "re": re, "np": np}
+            
+            # Execute and get result
+            exec(code, {}, local_vars)
+            if not local_vars.get("result", True):
+                violations += 1
+        return violations
 
 # Example usage
 if __name__ == "__main__":
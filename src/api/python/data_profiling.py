@@ -5,29 +5,80 @@ Data Profiling Module
 This module provides functionality for generating comprehensive profiles of datasets
 using the ydata-profiling library (formerly pandas-profiling).
 
+The report settings are picked from the data's shape: wide or large tables
+are profiled in minimal mode, the expensive correlations (Kendall, phi_k,
+Cramér's V) and missing-value diagrams are only computed for small tables,
+and tables with many rows are profiled on a random sample. Reports are
+cached by data fingerprint and settings. A summary of the full data can be
+returned at once while the report builds in a background thread; a bounded
+number of reports wait for that thread (each holds its data), and further
+requests are rejected until it catches up.
+
 In a production environment, this would be deployed as an API endpoint or microservice.
 """
 
 import pandas as pd
-from ydata_profiling import ProfileReport
+import copy
 import json
 import os
 import logging
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Set, Tuple
+
+try:
+    from ydata_profiling import ProfileReport
+    YDATA_AVAILABLE = True
+except ImportError:
+    YDATA_AVAILABLE = False
+
+try:
+    from .fingerprint import config_hash, result_cache
+    from .dataset_stats import dataset_stats
+except ImportError:
+    from fingerprint import config_hash, result_cache
+    from dataset_stats import dataset_stats
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shape thresholds for picking report settings
+DEFAULT_POLICY = {
+    "adaptive": True,
+    # Rows above this are profiled on a random sample
+    "max_rows": 100_000,
+    # Tables with more columns or (profiled) cells get a minimal report
+    "max_explorative_columns": 50,
+    "max_explorative_cells": 2_000_000,
+    # Kendall, phi_k and Cramér's V are only computed up to this many cells
+    "max_expensive_correlation_cells": 250_000,
+    # Missing-value matrix and heatmap are only drawn up to this many cells
+    "max_missing_diagram_cells": 500_000,
+    "random_state": 0
+}
+
+# Correlations whose cost grows fastest with the table size
+EXPENSIVE_CORRELATIONS = ("kendall", "phi_k", "cramers")
+
 class DataProfiler:
     """Class for generating data profiles from datasets"""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None, policy: Optional[Dict[str, Any]] = None,
+                 max_pending_reports: int = 4, max_reports: int = 1024):
         """
         Initialize the data profiler with configuration
         
         Args:
-            config: Dictionary of configuration parameters for profiling
+            config: Dictionary of configuration parameters for profiling (the
+                settings used for small tables)
+            policy: Shape thresholds overriding DEFAULT_POLICY; pass
+                {"adaptive": False} to always use config on all rows
+            max_pending_reports: Background reports queued or building at a
+                time; each keeps its DataFrame in memory until it is built
+            max_reports: Report IDs remembered for report_status; the least
+                recently used are forgotten
         """
         self.config = config or {
             "minimal": False,
@@ -45,6 +96,14 @@ class DataProfiler:
                 "heatmap": True,
             }
         }
+        self.policy = {**DEFAULT_POLICY, **(policy or {})}
+        self.max_pending_reports = max_pending_reports
+        self.max_reports = max_reports
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-report")
+        # Running or failed background reports, and the cache key and owning datasets of recent reports
+        self._reports: Dict[str, Future] = {}
+        self._report_keys: "OrderedDict[str, Tuple[str, Dict[str, Any], Set[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
         logger.info("DataProfiler initialized with config: %s", self.config)
     
     def profile_dataset(self, data: pd.DataFrame) -> Dict[str, Any]:
@@ -60,36 +119,234 @@ class DataProfiler:
         logger.info(f"Profiling dataset with {len(data)} rows and {len(data.columns)} columns")
         
         try:
-            # Generate the profile report
-            profile = ProfileReport(data, title="DataForge Data Profile", **self.config)
+            settings = self.choose_settings(data)
+            fingerprint = dataset_stats.get(data).fingerprint
+            return result_cache.get_or_compute(fingerprint, "ydata_profile",
+                                               lambda: self._build_report(data, settings), settings)
             
-            # Get the JSON representation
-            profile_json = json.loads(profile.to_json())
-            
-            # Extract key metrics for quick access
-            summary_stats = {
-                "row_count": len(data),
-                "column_count": len(data.columns),
-                "missing_cells": data.isna().sum().sum(),
-                "missing_cells_pct": (data.isna().sum().sum() / (len(data) * len(data.columns)) * 100),
-                "duplicate_rows": sum(data.duplicated()),
-                "duplicate_rows_pct": (sum(data.duplicated()) / len(data) * 100),
-                "memory_usage": data.memory_usage(deep=True).sum(),
+        except Exception as e:
+            logger.error(f"Error generating profile: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
             }
+    
+    def choose_settings(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Pick report settings and a row sample size from the data's shape
+        
+        Args:
+            data: DataFrame to profile
             
+        Returns:
+            Dictionary with the "mode" (minimal or explorative), the ProfileReport
+            keyword arguments ("report") and the number of rows to profile
+            ("sample_rows", None for all rows)
+        """
+        policy = self.policy
+        n_rows, n_columns = data.shape
+        if not policy["adaptive"]:
+            return {"mode": "configured", "report": copy.deepcopy(self.config), "sample_rows": None}
+        
+        sample_rows = policy["max_rows"] if n_rows > policy["max_rows"] else None
+        cells = (sample_rows or n_rows) * n_columns
+        if n_columns > policy["max_explorative_columns"] or cells > policy["max_explorative_cells"]:
+            return {"mode": "minimal", "report": {"minimal": True}, "sample_rows": sample_rows}
+        
+        report = copy.deepcopy(self.config)
+        if cells > policy["max_expensive_correlation_cells"] and isinstance(report.get("correlations"), dict):
+            for name in EXPENSIVE_CORRELATIONS:
+                if name in report["correlations"]:
+                    report["correlations"][name] = False
+        if cells > policy["max_missing_diagram_cells"] and isinstance(report.get("missing_diagrams"), dict):
+            for name in ("matrix", "heatmap"):
+                if name in report["missing_diagrams"]:
+                    report["missing_diagrams"][name] = False
+        return {"mode": "explorative", "report": report, "sample_rows": sample_rows}
+    
+    def summarize(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Summary statistics of the full dataset, without building a report
+        
+        Args:
+            data: DataFrame to summarize
+            
+        Returns:
+            Dictionary of row, column, missing cell, duplicate row and memory counts
+        """
+        stats = dataset_stats.get(data)
+        row_count, column_count = data.shape
+        total_cells = row_count * column_count
+        missing_cells = int(stats.null_counts().sum())
+        duplicate_rows = stats.duplicate_count()
+        return {
+            "row_count": int(row_count),
+            "column_count": int(column_count),
+            "missing_cells": missing_cells,
+            "missing_cells_pct": float(missing_cells / total_cells * 100) if total_cells else 0.0,
+            "duplicate_rows": int(duplicate_rows),
+            "duplicate_rows_pct": float(duplicate_rows / row_count * 100) if row_count else 0.0,
+            "memory_usage": int(data.memory_usage(deep=True).sum()),
+        }
+    
+    def profile_summary(self, data: pd.DataFrame, dataset_id: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Return the dataset summary at once and build the full report in the background
+        
+        Args:
+            data: DataFrame to profile
+            dataset_id: Dataset the report is requested for (see start_report)
+            
+        Returns:
+            Dictionary with the summary and the report's status (see
+            report_status); the status is "rejected" when too many reports
+            are waiting to be built
+        """
+        try:
+            summary = self.summarize(data)
+            report_id = self.start_report(data, dataset_id)
+            if report_id is None:
+                report = {
+                    "report_id": None,
+                    "status": "rejected",
+                    "error": "Too many profile reports are being built, try again later"
+                }
+            else:
+                report = self.report_status(report_id, include_result=False, dataset_id=dataset_id)
             return {
                 "success": True,
-                "summary": summary_stats,
-                "detailed_profile": profile_json,
+                "summary": summary,
+                "report": report
             }
+        except Exception as e:
+            logger.error(f"Error summarizing dataset: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def start_report(self, data: pd.DataFrame, dataset_id: Optional[Any] = None) -> Optional[str]:
+        """
+        Start building a report in the background, unless it is cached or already building
+        
+        Args:
+            data: DataFrame to profile
+            dataset_id: Dataset the report is requested for; report_status
+                only serves the report to the datasets that requested it
+            
+        Returns:
+            Report ID to poll with report_status, or None when
+            max_pending_reports reports are already waiting to be built
+        """
+        settings = self.choose_settings(data)
+        fingerprint = dataset_stats.get(data).fingerprint
+        report_id = f"{fingerprint}-{config_hash(settings)}"
+        with self._lock:
+            future = self._reports.get(report_id)
+            building = future is not None and not future.done()
+            if not building and result_cache.get(fingerprint, "ydata_profile", settings) is None:
+                # New, evicted from the cache, or failed before: (re)build it, if there is room in the queue
+                if sum(not f.done() for f in self._reports.values()) >= self.max_pending_reports:
+                    return None
+                self._reports[report_id] = self._executor.submit(self._run_report, data, fingerprint, settings)
+            self._remember_report(report_id, fingerprint, settings, dataset_id)
+        return report_id
+    
+    def _remember_report(self, report_id: str, fingerprint: str, settings: Dict[str, Any],
+                         dataset_id: Optional[Any]) -> None:
+        """Record a report's cache key and requesting dataset, forgetting the least recently used reports"""
+        owners = self._report_keys[report_id][2] if report_id in self._report_keys else set()
+        owners.add(str(dataset_id))
+        self._report_keys[report_id] = (fingerprint, settings, owners)
+        self._report_keys.move_to_end(report_id)
+        for old_id in list(self._report_keys)[:max(len(self._report_keys) - self.max_reports, 0)]:
+            future = self._reports.get(old_id)
+            if future is not None and not future.done():
+                continue
+            del self._report_keys[old_id]
+            self._reports.pop(old_id, None)
+    
+    def report_status(self, report_id: str, include_result: bool = True,
+                      dataset_id: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Status of a report started with start_report
+        
+        Args:
+            report_id: ID returned by start_report
+            include_result: Whether to include the finished report
+            dataset_id: Dataset asking for the report, as passed to start_report
             
+        Returns:
+            Dictionary with the report ID, its status (pending, running,
+            complete, failed or unknown) and, when complete, the result;
+            reports not started for dataset_id are unknown
+        """
+        status = {"report_id": report_id}
+        with self._lock:
+            key = self._report_keys.get(report_id)
+            if key is None or str(dataset_id) not in key[2]:
+                status["status"] = "unknown"
+                return status
+            future = self._reports.get(report_id)
+            if future is not None and future.done() and future.result().get("success"):
+                # Finished reports are served from the result cache
+                del self._reports[report_id]
+        if future is not None and not future.done():
+            status["status"] = "running" if future.running() else "pending"
+            return status
+        
+        if future is not None and not future.result().get("success"):
+            result = future.result()
+        else:
+            result = result_cache.get(key[0], "ydata_profile", key[1])
+        if result is None:
+            status["status"] = "unknown"
+        elif not result.get("success"):
+            status["status"] = "failed"
+            status["error"] = result.get("error")
+        else:
+            status["status"] = "complete"
+            if include_result:
+                status["result"] = result
+        return status
+    
+    def _run_report(self, data: pd.DataFrame, fingerprint: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Background job: build and cache a report; failures are returned, not raised"""
+        try:
+            return result_cache.get_or_compute(fingerprint, "ydata_profile",
+                                               lambda: self._build_report(data, settings), settings)
         except Exception as e:
-            logger.error(f"Error generating profile: {str(e)}")
+            logger.error(f"Error generating profile in the background: {str(e)}")
             return {
                 "success": False,
                 "error": str(e)
             }
-
+    
+    def _build_report(self, data: pd.DataFrame, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a ydata-profiling report with the chosen settings"""
+        if not YDATA_AVAILABLE:
+            raise ImportError("ydata-profiling is not installed")
+        profiled = data
+        if settings["sample_rows"] is not None:
+            profiled = data.sample(n=settings["sample_rows"], random_state=self.policy["random_state"]).sort_index()
+        
+        # Generate the profile report
+        profile = ProfileReport(profiled, title="DataForge Data Profile", **settings["report"])
+        
+        # Get the JSON representation; the parsed result is cached, so it is serialized once per dataset
+        profile_json = json.loads(profile.to_json())
+        
+        return {
+            "success": True,
+            "summary": self.summarize(data),
+            "detailed_profile": profile_json,
+            "profiling": {
+                "mode": settings["mode"],
+                "rows_profiled": int(len(profiled)),
+                "sampled": settings["sample_rows"] is not None
+            }
+        }
+    
     def profile_from_file(self, filepath: str) -> Dict[str, Any]:
         """
         Load a file and generate a profile
@@ -128,6 +385,9 @@ class DataProfiler:
                 "error": str(e)
             }
 
+# Shared profiler used by the analytics service
+data_profiler = DataProfiler()
+
 # Example usage (would be called via API endpoint in production)
 if __name__ == "__main__":
     # Create sample data
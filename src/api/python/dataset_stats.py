@@ -0,0 +1,352 @@
+
+"""
+Dataset Statistics Module
+
+This module computes column statistics once per dataset version and shares
+them between the services analysing the same data (dataset processing,
+profiling, schema detection, data quality evaluation and the pipeline):
+- null counts, non-null values, distinct counts and value counts
+- mean, standard deviation, minimum and maximum, reduced together across
+  numeric columns
+- quantiles, medians and outlier counts from values sorted once per column
+- correlation matrices and summary tables
+- row hashes and exact duplicate row groups
+
+Each statistic is computed on first use and memoized. Datasets are
+identified by their fingerprint, which is computed on every request, so
+every consumer of the same data gets the same DatasetStats and a changed
+dataset, including a DataFrame modified in place, gets a new one. Results
+are the same as computing each statistic with pandas.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .fingerprint import fingerprint_dataframe
+    from .sketches import hash_values
+except ImportError:
+    from fingerprint import fingerprint_dataframe
+    from sketches import hash_values
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Multiplier used to mix column hashes into row hashes (64-bit golden ratio)
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class DatasetStats:
+    """Lazily computed, memoized statistics of one version of a dataset"""
+
+    def __init__(self, data: pd.DataFrame, fingerprint: Optional[str] = None):
+        """
+        Initialize the statistics of a DataFrame
+
+        Args:
+            data: The dataset; DatasetStatsService.get() rebinds it to the current frame with the same fingerprint
+            fingerprint: Fingerprint of the dataset, if already computed
+        """
+        self.data = data
+        self.fingerprint = fingerprint
+        self._cache: Dict[Tuple[str, Any], Any] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, kind: str, column: Any, compute: Callable[[], Any]) -> Any:
+        key = (kind, column)
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+
+    def has(self, kind: str, column: Any = None) -> bool:
+        """Whether a statistic has been computed already"""
+        return (kind, column) in self._cache
+
+    def null_counts(self) -> pd.Series:
+        """Number of null values in each column"""
+        return self._get("null_counts", None, lambda: self.data.isna().sum())
+
+    def null_count(self, column: Any) -> int:
+        return int(self.null_counts()[column])
+
+    def non_null(self, column: Any) -> pd.Series:
+        """The column without its null values"""
+        def compute():
+            series = self.data[column]
+            return series.dropna() if self.null_count(column) else series
+        return self._get("non_null", column, compute)
+
+    def value_counts(self, column: Any) -> pd.Series:
+        """Count of each non-null value, most frequent first, as Series.value_counts gives"""
+        return self._get("value_counts", column, lambda: self.data[column].value_counts())
+
+    def unique_count(self, column: Any) -> int:
+        """Number of distinct non-null values, as Series.nunique gives"""
+        def compute():
+            if self.has("value_counts", column):
+                return len(self.value_counts(column))
+            if self.has("sorted_values", column):
+                values = self.sorted_values(column)
+                return int(len(values) > 0) + int(np.count_nonzero(values[1:] != values[:-1]))
+            return int(self.data[column].nunique())
+        return self._get("unique_count", column, compute)
+
+    def moments(self, column: Any) -> Dict[str, Any]:
+        """Mean, standard deviation, minimum and maximum of a numeric column"""
+        return self.column_moments([column])[column]
+
+    def column_moments(self, columns: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Moments of several numeric columns
+
+        Columns with NumPy integer or float64 values that are not memoized yet
+        are reduced together, one reduction per statistic (pandas reduces
+        float32 blocks in a different order than float32 columns).
+        """
+        data = self.data
+        vectorized = [col for col in columns if not self.has("moments", col)
+                      and isinstance(data[col].dtype, np.dtype)
+                      and (data[col].dtype.kind in "iu" or data[col].dtype == np.float64)]
+        if len(vectorized) > 1 and not data.columns.has_duplicates:
+            frame = data[vectorized]
+            reductions = {"mean": frame.mean(), "std": frame.std(), "min": frame.min(), "max": frame.max()}
+            with self._lock:
+                for col in vectorized:
+                    self._cache[("moments", col)] = {name: values[col] for name, values in reductions.items()}
+
+        def compute(series):
+            return {"mean": series.mean(), "std": series.std(), "min": series.min(), "max": series.max()}
+        return {col: self._get("moments", col, lambda: compute(data[col])) for col in columns}
+
+    def sorted_values(self, column: Any) -> np.ndarray:
+        """Non-null values of a numeric column, sorted"""
+        def compute():
+            values = self.non_null(column)
+            dtype = values.dtype
+            # Nullable integer and float columns sort as their NumPy dtype
+            values = values.to_numpy(dtype=getattr(dtype, "numpy_dtype", None))
+            return np.sort(values)
+        return self._get("sorted_values", column, compute)
+
+    def quantiles(self, column: Any, qs: List[float]) -> List[float]:
+        """Quantiles of a numeric column, as Series.quantile gives (NaN if it has no values)"""
+        values = self.sorted_values(column)
+        if len(values) == 0:
+            return [float("nan")] * len(qs)
+        # Series.quantile asks NumPy for percentiles; the sorted input makes the partition cheap
+        return [float(value) for value in np.percentile(values, np.asarray(qs, dtype=float) * 100.0)]
+
+    def quantile(self, column: Any, q: float) -> float:
+        return self.quantiles(column, [q])[0]
+
+    def median(self, column: Any) -> float:
+        """Median of a numeric column, as Series.median gives"""
+        def compute():
+            values = self.sorted_values(column)
+            n = len(values)
+            if n == 0:
+                return float("nan")
+            if n % 2:
+                return float(values[n // 2])
+            return float(np.mean(values[n // 2 - 1:n // 2 + 1].astype(np.float64)))
+        return self._get("median", column, compute)
+
+    def count_outside(self, column: Any, lower: float, upper: float) -> int:
+        """Number of values of a numeric column below lower or above upper"""
+        values = self.sorted_values(column)
+        # Comparisons with NaN bounds are false, as in Series comparisons
+        below = np.searchsorted(values, lower, side="left") if not pd.isna(lower) else 0
+        above = len(values) - np.searchsorted(values, upper, side="right") if not pd.isna(upper) else 0
+        return int(below + above)
+
+    def skew(self, column: Any) -> float:
+        return self._get("skew", column, lambda: self.data[column].skew())
+
+    def text_lengths(self, column: Any) -> pd.Series:
+        """Length of each value written as a string (nulls included, as "nan" or "None")"""
+        return self._get("text_lengths", column, lambda: self.data[column].astype(str).str.len())
+
+    def numeric_columns(self) -> pd.Index:
+        """Columns with numeric dtypes, as DataFrame.select_dtypes(include=["number"]) selects them"""
+        return self._get("numeric_columns", None, lambda: self.data.select_dtypes(include=["number"]).columns)
+
+    def correlation(self, method: str = "pearson") -> pd.DataFrame:
+        """Correlation matrix of the numeric columns"""
+        return self._get("correlation", method,
+                         lambda: self.data[self.numeric_columns()].corr(method=method))
+
+    def describe(self) -> pd.DataFrame:
+        return self._get("describe", None, lambda: self.data.describe())
+
+    def row_hashes(self) -> np.ndarray:
+        """64-bit hash of each row, see row_hashes"""
+        return self._get("row_hashes", None, lambda: row_hashes(self.data))
+
+    def duplicate_groups(self) -> List[np.ndarray]:
+        """Positions of the rows in each group of equal rows, see duplicate_groups"""
+        return self._get("duplicate_groups", None,
+                         lambda: duplicate_groups(self.data, self.row_hashes()))
+
+    def duplicated(self) -> np.ndarray:
+        """Mask of rows equal to an earlier row, as DataFrame.duplicated gives"""
+        def compute():
+            mask = np.zeros(len(self.data), dtype=bool)
+            for group in self.duplicate_groups():
+                mask[group[1:]] = True
+            return mask
+        return self._get("duplicated", None, compute)
+
+    def duplicate_count(self) -> int:
+        """Number of rows equal to an earlier row, as counted by DataFrame.duplicated"""
+        return self._get("duplicate_count", None,
+                         lambda: int(sum(len(group) - 1 for group in self.duplicate_groups())))
+
+
+class DatasetStatsService:
+    """Hands out one DatasetStats per dataset version, shared by all consumers"""
+
+    def __init__(self, max_datasets: int = 4):
+        """
+        Initialize the service
+
+        Args:
+            max_datasets: Number of recently used datasets whose statistics are kept
+        """
+        self.max_datasets = max_datasets
+        self._stats: "OrderedDict[str, DatasetStats]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, data: pd.DataFrame, fingerprint: Optional[str] = None) -> DatasetStats:
+        """
+        Statistics of a DataFrame, shared with earlier callers passing the same data
+
+        Args:
+            data: The dataset
+            fingerprint: Its fingerprint, if already computed
+
+        Returns:
+            The dataset's DatasetStats
+        """
+        # Always hashed: a DataFrame seen before may have been modified in place since
+        if fingerprint is None:
+            fingerprint = fingerprint_dataframe(data)
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                stats = self._stats[fingerprint] = DatasetStats(data, fingerprint)
+            else:
+                # Statistics not computed yet are computed from this frame, which has the fingerprint
+                # now; the frame they were first requested for may have changed since
+                stats.data = data
+            self._stats.move_to_end(fingerprint)
+            while len(self._stats) > self.max_datasets:
+                self._stats.popitem(last=False)
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of each row
+
+    Rows that DataFrame.duplicated considers equal get equal hashes: missing
+    values hash alike, and so do 0.0 and -0.0. Different rows may collide.
+    """
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        dtype = series.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind == "f":
+            # Adding 0.0 turns -0.0 into 0.0; all NaNs get one hash
+            values = series.to_numpy().astype(np.float64) + 0.0
+            column = values.view(np.uint64)
+            column[np.isnan(values)] = 0
+        elif isinstance(dtype, np.dtype) and dtype.kind in "biumM":
+            column = series.to_numpy().astype(np.int64, copy=False).view(np.uint64)
+        else:
+            # Same equality as DataFrame.duplicated, which factorizes every column
+            column = pd.factorize(series)[0].view(np.uint64)
+        with np.errstate(over="ignore"):
+            hashes = (hashes ^ column) * HASH_MULTIPLIER
+            hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+
+def chunk_row_hashes(chunk: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of each row of a chunk, whatever dtypes pandas inferred for the chunk
+
+    read_csv infers dtypes per chunk, so one column can be integers in one
+    chunk, floats in another (when it has missing values) and text in a third.
+    Numbers hash alike in all of them (1, 1.0 and "1"), as do 0.0 and -0.0,
+    and missing values hash alike, so a row repeated in a later chunk gets
+    the same hash.
+    """
+    hashes = np.zeros(len(chunk), dtype=np.uint64)
+    for i in range(chunk.shape[1]):
+        values = chunk.iloc[:, i]
+        if values.dtype == object:
+            # Text that reads as a number is hashed as that number
+            numbers = pd.to_numeric(values, errors="coerce")
+            numeric = numbers.notna().to_numpy()
+            column = np.empty(len(values), dtype=np.uint64)
+            column[numeric] = hash_values(numbers[numeric])
+            column[~numeric] = hash_values(values[~numeric], dropna=False)
+        else:
+            column = hash_values(values, dropna=False)
+        with np.errstate(over="ignore"):
+            hashes = (hashes ^ column) * HASH_MULTIPLIER
+            hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+
+def duplicate_groups(df: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> List[np.ndarray]:
+    """
+    Groups of equal rows, with the equality DataFrame.duplicated uses
+
+    Args:
+        df: DataFrame to search
+        hashes: Its row hashes, if already computed
+
+    Returns:
+        Ascending positions of the rows of each group with two or more rows,
+        ordered by their first row
+    """
+    if df.empty:
+        return []
+    if hashes is None:
+        hashes = row_hashes(df)
+    candidates = np.flatnonzero(pd.Series(hashes).duplicated(keep=False).to_numpy())
+    if len(candidates) == 0:
+        return []
+    # Compare the rows sharing a hash exactly, to rule out collisions
+    subset = df.iloc[candidates]
+    codes = np.empty((len(candidates), df.shape[1]), dtype=np.int64)
+    for i in range(df.shape[1]):
+        codes[:, i] = pd.factorize(subset.iloc[:, i])[0]
+    _, row_ids = np.unique(codes, axis=0, return_inverse=True)
+    order = np.argsort(row_ids.ravel(), kind="stable")
+    sorted_ids = row_ids.ravel()[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    groups = [candidates[positions] for positions in np.split(order, starts[1:]) if len(positions) > 1]
+    groups.sort(key=lambda group: group[0])
+    return groups
+
+
+def count_duplicate_rows(df: pd.DataFrame) -> int:
+    """Number of rows equal to an earlier row, as counted by DataFrame.duplicated"""
+    return int(sum(len(group) - 1 for group in duplicate_groups(df)))
+
+
+# Shared service used by dataset processing, profiling, schema detection, data quality evaluation and the pipeline
+dataset_stats = DatasetStatsService()
@@ -0,0 +1,252 @@
+
+"""
+Deduplication Module
+
+This module finds duplicate rows for the cleaning, validation and profiling
+services:
+- exact duplicates from 64-bit row hashes computed once per dataset version
+  (see dataset_stats), verified exactly and returned as groups of row
+  positions
+- near duplicates on chosen text columns, from MinHash signatures of
+  character shingles and locality-sensitive hashing (LSH) to find the
+  candidate pairs without comparing every pair of rows
+
+Exact duplicates use the equality of DataFrame.duplicated. Near-duplicate
+similarities are Jaccard similarities of the rows' shingle sets, estimated
+from their signatures.
+"""
+
+import logging
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .dataset_stats import dataset_stats
+    from .sketches import mix64
+except ImportError:
+    from dataset_stats import dataset_stats
+    from sketches import mix64
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Signature entries hashed at a time (shingles x permutations)
+SIGNATURE_BLOCK_SIZE = 1 << 22
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text with runs of whitespace replaced by one space"""
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """Distinct character shingles (substrings of the given size) of a text"""
+    if len(text) <= size:
+        return [text] if text else []
+    return list({text[i:i + size] for i in range(len(text) - size + 1)})
+
+
+def lsh_parameters(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Number of bands and rows per band for LSH
+
+    Picks the split of the signature whose S-curve, the probability
+    1 - (1 - s^rows)^bands that two rows of similarity s share a band,
+    rises at or just below the threshold (approximately (1 / bands) ^ (1 / rows)).
+    Candidates below the threshold are discarded later, so the split errs
+    towards more candidates rather than missed pairs.
+    """
+    splits = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    rises = {split: (1.0 / split[0]) ** (1.0 / split[1]) for split in splits}
+    below = [split for split in splits if rises[split] <= threshold]
+    if below:
+        return max(below, key=lambda split: rises[split])
+    return min(splits, key=lambda split: rises[split])
+
+
+def connected_groups(n: int, left: np.ndarray, right: np.ndarray) -> List[np.ndarray]:
+    """Groups of two or more of n items connected by pairs, as ascending positions"""
+    labels = np.arange(n)
+    if len(left):
+        # Propagate the smallest label along the pairs until nothing changes
+        while True:
+            pair_labels = np.minimum(labels[left], labels[right])
+            updated = labels.copy()
+            np.minimum.at(updated, left, pair_labels)
+            np.minimum.at(updated, right, pair_labels)
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    return [group for group in np.split(order, starts[1:]) if len(group) > 1]
+
+
+class MinHasher:
+    """MinHash signatures of texts, from their character shingles"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 0):
+        """
+        Initialize the hasher
+
+        Args:
+            num_perm: Number of hash functions (signature length)
+            shingle_size: Length of the character shingles
+            seed: Seed of the hash functions; signatures are comparable for equal seeds
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seeds = np.random.default_rng(seed).integers(0, 2 ** 63, num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signatures(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Signatures of texts
+
+        Args:
+            texts: Normalized texts
+
+        Returns:
+            (signatures, has_shingles): a (len(texts), num_perm) uint64 array,
+            and a mask of the texts with at least one shingle (empty texts
+            have no meaningful signature)
+        """
+        doc_shingles = [shingles(text, self.shingle_size) for text in texts]
+        counts = np.fromiter((len(values) for values in doc_shingles), dtype=np.int64, count=len(texts))
+        has_shingles = counts > 0
+        signatures = np.full((len(texts), self.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+        if not has_shingles.any():
+            return signatures, has_shingles
+
+        flat = [value for values in doc_shingles for value in values]
+        hashes = pd.util.hash_array(np.asarray(flat, dtype=object))
+        starts = np.concatenate([[0], np.cumsum(counts[has_shingles])[:-1]])
+        block = max(1, SIGNATURE_BLOCK_SIZE // len(hashes))
+        for first in range(0, self.num_perm, block):
+            seeds = self.seeds[first:first + block]
+            # Each seed gives a different pseudo-random permutation of the shingle hashes
+            permuted = mix64(hashes[:, None] ^ seeds[None, :])
+            signatures[has_shingles, first:first + len(seeds)] = np.minimum.reduceat(permuted, starts, axis=0)
+        return signatures, has_shingles
+
+
+class DedupEngine:
+    """Exact and near-duplicate row detection"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, max_bucket_size: int = 1000, seed: int = 0):
+        """
+        Initialize the engine
+
+        Args:
+            num_perm: MinHash signature length
+            shingle_size: Length of the character shingles
+            max_bucket_size: LSH buckets larger than this are linked to their
+                first row instead of pairing every two rows
+            seed: Seed of the MinHash functions
+        """
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.max_bucket_size = max_bucket_size
+
+    def row_hashes(self, data: pd.DataFrame) -> np.ndarray:
+        """64-bit hash of each row, computed once per dataset version"""
+        return dataset_stats.get(data).row_hashes()
+
+    def duplicate_groups(self, data: pd.DataFrame) -> List[np.ndarray]:
+        """
+        Groups of exactly equal rows
+
+        Args:
+            data: DataFrame to search
+
+        Returns:
+            Ascending row positions of each group of two or more equal rows,
+            ordered by their first row
+        """
+        return dataset_stats.get(data).duplicate_groups()
+
+    def duplicated(self, data: pd.DataFrame) -> np.ndarray:
+        """Mask of rows equal to an earlier row, as DataFrame.duplicated gives"""
+        return dataset_stats.get(data).duplicated()
+
+    def count_duplicates(self, data: pd.DataFrame) -> int:
+        """Number of rows equal to an earlier row"""
+        return dataset_stats.get(data).duplicate_count()
+
+    def near_duplicates(self, data: pd.DataFrame, columns: List[str], threshold: float = 0.8) -> Dict[str, Any]:
+        """
+        Rows whose text in the given columns is nearly the same
+
+        The values of the columns are joined, lowercased and split into
+        character shingles. Rows whose MinHash signatures agree on a whole
+        LSH band become candidate pairs, and pairs with an estimated
+        Jaccard similarity of at least the threshold are kept. Rows whose
+        text is empty are never near duplicates.
+
+        Args:
+            data: DataFrame to search
+            columns: Text columns to compare
+            threshold: Minimum Jaccard similarity of a pair
+
+        Returns:
+            Dictionary with "pairs" (an (n, 2) array of row positions),
+            "similarity" (estimated similarity of each pair) and "groups"
+            (ascending row positions of the rows connected by pairs)
+        """
+        empty = {"pairs": np.empty((0, 2), dtype=np.int64), "similarity": np.empty(0), "groups": []}
+        if len(data) < 2 or not columns:
+            return empty
+
+        text = data[columns[0]].astype(str).where(data[columns[0]].notna(), "")
+        for column in columns[1:]:
+            text = text + " | " + data[column].astype(str).where(data[column].notna(), "")
+        texts = [normalize_text(value) for value in text.tolist()]
+        signatures, has_shingles = self.hasher.signatures(texts)
+
+        left, right = self._candidate_pairs(signatures, np.flatnonzero(has_shingles), threshold)
+        if len(left) == 0:
+            return empty
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        similar = similarity >= threshold
+        left, right, similarity = left[similar], right[similar], similarity[similar]
+        return {
+            "pairs": np.column_stack([left, right]),
+            "similarity": similarity,
+            "groups": connected_groups(len(data), left, right)
+        }
+
+    def _candidate_pairs(self, signatures: np.ndarray, rows: np.ndarray,
+                         threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct pairs (left < right) of rows sharing at least one LSH band"""
+        bands, band_rows = lsh_parameters(signatures.shape[1], threshold)
+        lefts, rights = [], []
+        for band in range(bands):
+            keys = np.zeros(len(rows), dtype=np.uint64)
+            for column in range(band * band_rows, (band + 1) * band_rows):
+                keys = mix64(keys ^ signatures[rows, column])
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            sizes = np.diff(np.r_[starts, len(order)])
+            for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+                bucket = rows[order[start:start + size]]
+                if size <= self.max_bucket_size:
+                    i, j = np.triu_indices(size, 1)
+                    lefts.append(bucket[i])
+                    rights.append(bucket[j])
+                else:
+                    # Link a very large bucket to its first row, which still connects the group
+                    lefts.append(np.repeat(bucket[0], size - 1))
+                    rights.append(bucket[1:])
+        if not lefts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        pairs = np.unique(np.column_stack([np.concatenate(lefts), np.concatenate(rights)]), axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+
+# Shared engine used by data cleaning, validation and profiling
+dedup_engine = DedupEngine()
@@ -0,0 +1,198 @@
+
+"""
+Dtype Optimization Module
+
+This module shrinks the memory footprint of loaded DataFrames without
+changing their values:
+- low-cardinality strings become categoricals
+- other strings become Arrow-backed strings
+- optionally, integers are downcast to the smallest signed type that holds
+  them, floats holding only whole numbers become signed integers (nullable
+  ones when values are missing), and other floats become float32 when that
+  is exact
+
+Numeric conversions are off by default: arithmetic between small integer
+columns wraps around on overflow, and float32 aggregates lose precision,
+so they would change results computed on the optimized frame. Unsigned
+types are never used, since subtracting them wraps around below zero.
+
+Each run reports memory before and after, per column and in total.
+"""
+
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401 (required by the "string[pyarrow]" dtype)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Signed integer types, smallest first
+SIGNED_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+class DtypeOptimizer:
+    """Converts DataFrame columns to compact dtypes that hold the same values"""
+
+    def __init__(self, category_ratio: float = 0.5, arrow_strings: bool = True,
+                 downcast_integers: bool = False, integer_floats: bool = False,
+                 nullable_integers: bool = True, downcast_floats: bool = False):
+        """
+        Initialize the optimizer
+
+        Args:
+            category_ratio: Strings become categorical when the number of
+                distinct values is at most this fraction of non-null values
+            arrow_strings: Store other strings as "string[pyarrow]" (needs pyarrow)
+            downcast_integers: Downcast integer columns to the smallest signed
+                type that holds them. Off by default: arithmetic between the
+                downcast columns can overflow
+            integer_floats: Convert float columns holding only whole numbers to
+                signed integers. Off by default for the same reason, and
+                because integer division and dtype checks behave differently
+            nullable_integers: With integer_floats, also convert whole-number
+                float columns with missing values, to nullable integer types
+            downcast_floats: Convert float64 columns to float32 when exact. Off by
+                default: pandas sums float32 columns in float32, so means and
+                other aggregates would change
+        """
+        self.category_ratio = category_ratio
+        self.arrow_strings = arrow_strings and PYARROW_AVAILABLE
+        self.downcast_integers = downcast_integers
+        self.integer_floats = integer_floats
+        self.nullable_integers = nullable_integers
+        self.downcast_floats = downcast_floats
+
+    def optimize(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Optimize the dtypes of a DataFrame
+
+        Args:
+            df: DataFrame to optimize (not modified)
+
+        Returns:
+            The optimized DataFrame and a memory report
+        """
+        optimized = df.copy(deep=False)
+        before = df.memory_usage(deep=True)
+        columns = {}
+        for i, col in enumerate(df.columns):
+            series = df.iloc[:, i]
+            try:
+                converted = self.optimize_column(series)
+            except (TypeError, ValueError) as e:
+                logger.debug(f"Keeping dtype of column {col}: {e}")
+                continue
+            if converted is series:
+                continue
+            optimized.isetitem(i, converted)
+            columns[str(col)] = {
+                "dtype_before": str(series.dtype),
+                "dtype_after": str(converted.dtype),
+                "bytes_before": int(series.memory_usage(index=False, deep=True)),
+                "bytes_after": int(converted.memory_usage(index=False, deep=True))
+            }
+
+        after = optimized.memory_usage(deep=True)
+        bytes_before, bytes_after = int(before.sum()), int(after.sum())
+        report = {
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after,
+            "reduction_percent": float((1 - bytes_after / bytes_before) * 100) if bytes_before else 0.0,
+            "columns": columns
+        }
+        return optimized, report
+
+    def optimize_column(self, series: pd.Series) -> pd.Series:
+        """Compact version of a column, or the column itself if there is none"""
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+            return series
+        if pd.api.types.is_integer_dtype(dtype):
+            return self._downcast_integers(series) if self.downcast_integers else series
+        if isinstance(dtype, np.dtype) and dtype.kind == "f":
+            return self._downcast_floats(series)
+        if dtype == object:
+            return self._convert_objects(series)
+        return series
+
+    def _downcast_integers(self, series: pd.Series) -> pd.Series:
+        values = series.dropna()
+        if len(values) == 0:
+            return series
+        target = _smallest_integer_type(int(values.min()), int(values.max()))
+        # Unsigned columns are left alone rather than mixed with signed types
+        if target is None or series.dtype.kind == "u" or np.dtype(target).itemsize >= series.dtype.itemsize:
+            return series
+        if isinstance(series.dtype, np.dtype):
+            return series.astype(target)
+        return series.astype(_nullable(target))
+
+    def _downcast_floats(self, series: pd.Series) -> pd.Series:
+        values = series.to_numpy()
+        finite = values[np.isfinite(values)]
+        has_missing = len(finite) < len(values)
+        if self.integer_floats and len(finite) and not np.isinf(values).any() \
+                and np.all(np.mod(finite, 1) == 0) and (self.nullable_integers or not has_missing):
+            target = _smallest_integer_type(int(finite.min()), int(finite.max()))
+            if target is not None:
+                if not has_missing:
+                    return series.astype(target)
+                return series.astype(_nullable(target))
+        if self.downcast_floats and values.dtype == np.float64:
+            as_float32 = values.astype(np.float32)
+            if np.array_equal(as_float32.astype(np.float64), values, equal_nan=True):
+                return pd.Series(as_float32, index=series.index, name=series.name)
+        return series
+
+    def _convert_objects(self, series: pd.Series) -> pd.Series:
+        kind = pd.api.types.infer_dtype(series, skipna=True)
+        if kind == "boolean":
+            return series.astype("boolean")
+        if kind != "string":
+            return series
+        non_null = series.count()
+        if non_null and series.nunique(dropna=True) <= self.category_ratio * non_null:
+            return series.astype("category")
+        if self.arrow_strings:
+            return series.astype("string[pyarrow]")
+        return series
+
+
+def _smallest_integer_type(low: int, high: int) -> Optional[type]:
+    """Smallest signed NumPy integer type holding [low, high]"""
+    for candidate in SIGNED_TYPES:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return candidate
+    return None
+
+
+def _nullable(numpy_type: type) -> pd.api.extensions.ExtensionDtype:
+    """Nullable pandas integer dtype (Int8, Int16, ...) matching a NumPy integer type"""
+    return pd.api.types.pandas_dtype("I" + np.dtype(numpy_type).name[1:])
+
+
+def is_text_dtype(dtype: Any) -> bool:
+    """Whether a column dtype holds text: object, string, or categorical over either"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return is_text_dtype(dtype.categories.dtype)
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+
+def to_records(df: pd.DataFrame) -> list:
+    """Rows as JSON-friendly dicts, with missing values of any dtype as None"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+# Shared optimizer used by the data loaders and the cleaning agent
+dtype_optimizer = DtypeOptimizer()
@@ -0,0 +1,225 @@
+
+"""
+Dataset Fingerprint Module
+
+This module identifies datasets by their content so that analysis results
+can be reused for identical data:
+- a fast hash over each column's values (its buffer for NumPy dtypes), combined
+  with the column names into a dataset fingerprint
+- a hash of a file's bytes, for data that has not been loaded yet
+- a result cache keyed by (fingerprint, analysis kind, config hash), with
+  per-column entries so that changing one column only recomputes that column
+
+Fingerprints depend on column names, dtypes and values, not on the index.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Bytes read at a time when hashing files
+FILE_CHUNK_SIZE = 1 << 20
+
+
+def _hasher() -> Any:
+    """New 128-bit hash object: xxh3 when installed, otherwise BLAKE2b"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def fingerprint_column(series: pd.Series) -> str:
+    """
+    Fingerprint of a column's dtype and values
+
+    Args:
+        series: Column to fingerprint
+
+    Returns:
+        Hex digest
+    """
+    digest = _hasher()
+    dtype = series.dtype
+    digest.update(f"{dtype}|{len(series)}|".encode())
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        digest.update(np.ascontiguousarray(series.to_numpy()).view(np.uint8).data)
+    elif isinstance(dtype, pd.CategoricalDtype):
+        digest.update(np.ascontiguousarray(series.cat.codes.to_numpy()).view(np.uint8).data)
+        digest.update(fingerprint_column(pd.Series(dtype.categories)).encode())
+        digest.update(b"ordered" if dtype.ordered else b"unordered")
+    elif (dtype == object or isinstance(dtype, pd.StringDtype)) \
+            and pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        nulls = series.isna().to_numpy()
+        digest.update(np.packbits(nulls).data)
+        if nulls.any():
+            # Tell None, NaN and pd.NA apart; checks such as "is None" depend on them
+            digest.update(" ".join(type(value).__name__ for value in series.to_numpy()[nulls]).encode())
+        values = series[~nulls] if nulls.any() else series
+        digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().view(np.uint8).data)
+    else:
+        # Mixed objects and other extension types
+        digest.update(pickle.dumps(series.array, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def fingerprint_columns(df: pd.DataFrame) -> List[str]:
+    """Fingerprint of each column, in column order"""
+    return [fingerprint_column(df.iloc[:, i]) for i in range(df.shape[1])]
+
+
+def fingerprint_dataframe(df: pd.DataFrame, column_fingerprints: Optional[List[str]] = None) -> str:
+    """
+    Fingerprint of a DataFrame's column names, dtypes and values
+
+    Args:
+        df: DataFrame to fingerprint
+        column_fingerprints: Fingerprints of its columns, if already computed
+
+    Returns:
+        Hex digest
+    """
+    if column_fingerprints is None:
+        column_fingerprints = fingerprint_columns(df)
+    digest = _hasher()
+    digest.update(f"{df.shape}".encode())
+    for name, column_fingerprint in zip(df.columns, column_fingerprints):
+        digest.update(f"{name!r}:{column_fingerprint}|".encode())
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: str) -> str:
+    """Fingerprint of a file's bytes"""
+    digest = _hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(FILE_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_hash(config: Any) -> str:
+    """Hash of an analysis configuration (any JSON-like value)"""
+    encoded = json.dumps(config, sort_keys=True, default=repr)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """In-memory LRU cache of analysis results keyed by data fingerprint, analysis kind and config"""
+
+    def __init__(self, max_entries: int = 256, max_column_entries: int = 100_000):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of dataset-level results kept
+            max_column_entries: Maximum number of per-column results kept
+        """
+        self.max_entries = max_entries
+        self.max_column_entries = max_column_entries
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._column_entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "column_hits": 0, "column_misses": 0, "evictions": 0}
+
+    def get(self, fingerprint: str, kind: str, config: Any = None) -> Optional[Any]:
+        """Cached result (a copy), or None"""
+        return self._get(self._entries, (fingerprint, kind, config_hash(config)), "hits", "misses")
+
+    def put(self, fingerprint: str, kind: str, value: Any, config: Any = None) -> None:
+        self._put(self._entries, (fingerprint, kind, config_hash(config)), value, self.max_entries)
+
+    def get_or_compute(self, fingerprint: str, kind: str, compute: Callable[[], Any], config: Any = None) -> Any:
+        """
+        Cached result, computing and caching it on a miss
+
+        Args:
+            fingerprint: Fingerprint of the analysed data
+            kind: Name of the analysis
+            compute: Function computing the result
+            config: Configuration the result depends on
+
+        Returns:
+            The result (a copy, so callers may modify it)
+        """
+        result = self.get(fingerprint, kind, config)
+        if result is None:
+            result = compute()
+            self.put(fingerprint, kind, result, config)
+        return result
+
+    def get_or_compute_columns(self, fingerprints: Dict[Any, str], kind: str,
+                               compute: Callable[[List[Any]], Dict[Any, Any]],
+                               config: Any = None) -> Dict[Any, Any]:
+        """
+        Per-column results, computing only the columns not cached
+
+        Args:
+            fingerprints: Fingerprint of each column, by column name
+            kind: Name of the analysis
+            compute: Function computing the results of a list of columns, by name
+            config: Configuration the results depend on
+
+        Returns:
+            Result of each column, in the order of fingerprints
+        """
+        config_key = config_hash(config)
+        results, missing = {}, []
+        for name, fingerprint in fingerprints.items():
+            cached = self._get(self._column_entries, (fingerprint, kind, config_key),
+                               "column_hits", "column_misses")
+            if cached is None:
+                missing.append(name)
+            else:
+                results[name] = cached
+        if missing:
+            computed = compute(missing)
+            for name in missing:
+                results[name] = computed[name]
+                self._put(self._column_entries, (fingerprints[name], kind, config_key),
+                          computed[name], self.max_column_entries)
+        return {name: results[name] for name in fingerprints}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._column_entries.clear()
+
+    def _get(self, entries: OrderedDict, key: tuple, hit: str, miss: str) -> Optional[Any]:
+        with self._lock:
+            if key not in entries:
+                self.stats[miss] += 1
+                return None
+            entries.move_to_end(key)
+            self.stats[hit] += 1
+            value = entries[key]
+        return copy.deepcopy(value)
+
+    def _put(self, entries: OrderedDict, key: tuple, value: Any, max_entries: int) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+
+# Shared cache used by the profiling, validation, schema detection and evaluation services
+result_cache = ResultCache()
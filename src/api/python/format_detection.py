@@ -0,0 +1,174 @@
+
+"""
+Format Detection Module
+
+This module detects whether a text column holds emails, URLs, dates or
+phone numbers, and how many of its values are well formed. Values are
+tested on a uniform random sample rather than the first rows. The share
+of matching values is compared with the detection and pass thresholds
+through a Wilson confidence interval, and the full column is tested only
+when the interval straddles a threshold. Formats are tried in order and
+the first one detected decides the column.
+
+Patterns are compiled once. Dates are parsed in a single pass with a
+format string guessed from the sampled values, instead of falling back to
+per-value parsing.
+"""
+
+import logging
+import re
+import warnings
+from collections import Counter
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+try:
+    from .type_inference import _as_text, _wilson_interval
+except ImportError:
+    from type_inference import _as_text, _wilson_interval
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+URL_PATTERN = re.compile(r'^(https?|ftp)://[^\s/$.?#].[^\s]*$')
+PHONE_SEPARATORS = re.compile(r'[\s\-\(\)\+]')
+PHONE_DIGITS = re.compile(r'^\d{7,15}$')
+
+# Formats in the order they are tried
+FORMATS = ["email", "url", "datetime", "phone"]
+
+# Number of sampled values a date format is guessed from
+FORMAT_GUESS_VALUES = 20
+
+
+class FormatDetectionEngine:
+    """Sampled format detection for text columns"""
+
+    def __init__(self, sample_size: int = 1000, z: float = 3.0, detect_threshold: float = 0.5,
+                 pass_threshold: float = 0.9, random_state: int = 0):
+        """
+        Initialize the detection engine
+
+        Args:
+            sample_size: Number of non-null values tested per column
+            z: Width of the confidence interval, in standard errors
+            detect_threshold: A column has a format when more than this share of values matches it
+            pass_threshold: A column passes its format check when more than this share matches
+            random_state: Seed for sampling values
+        """
+        self.sample_size = sample_size
+        self.z = z
+        self.detect_threshold = detect_threshold
+        self.pass_threshold = pass_threshold
+        self.random_state = random_state
+        self.full_scans = 0
+
+    def detect(self, series: pd.Series, non_null: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+        """
+        Detect the format of a text column
+
+        Args:
+            series: Column to check
+            non_null: Boolean mask of the column's non-null values, if already known
+
+        Returns:
+            None if no format is detected, otherwise a dictionary with the
+            format, the share of matching non-null values ("ratio", estimated
+            from the sample unless the column was scanned), whether it passes
+            the check, the number of values tested and, for dates, the
+            parsed format string
+        """
+        positions = np.flatnonzero(series.notna().to_numpy() if non_null is None else non_null)
+        if len(positions) == 0:
+            return None
+        sampled = self._sample(positions)
+        sample = _as_text(series.iloc[sampled])
+
+        for name in FORMATS:
+            test, details = self._tester(name, sample)
+            if test is None:
+                continue
+            rate, tested = float(np.asarray(test(sample), dtype=float).mean()), len(sample)
+            if tested < len(positions):
+                lower, upper = _wilson_interval(rate, tested, self.z)
+                if upper <= self.detect_threshold:
+                    continue
+                if lower <= self.detect_threshold or lower <= self.pass_threshold < upper:
+                    # Ambiguous for one of the thresholds: decide on the full column
+                    self.full_scans += 1
+                    values = _as_text(series.iloc[positions])
+                    rate, tested = float(np.asarray(test(values), dtype=float).mean()), len(values)
+            if rate <= self.detect_threshold:
+                continue
+            return {
+                "format": name,
+                "ratio": rate,
+                "passed": rate > self.pass_threshold,
+                "values_tested": tested,
+                **details
+            }
+        return None
+
+    def _tester(self, name: str, sample: pd.Series) -> Tuple[Optional[Callable[[pd.Series], Any]], Dict[str, Any]]:
+        """Vectorized test of whether values match a format (None if it cannot apply)"""
+        if name == "email":
+            return lambda values: values.str.match(_pattern(values, EMAIL_PATTERN)), {}
+        if name == "url":
+            return lambda values: values.str.match(_pattern(values, URL_PATTERN)), {}
+        if name == "phone":
+            return lambda values: values.str.replace(_pattern(values, PHONE_SEPARATORS), '', regex=True) \
+                .str.match(_pattern(values, PHONE_DIGITS)), {}
+        date_format = _guess_date_format(sample)
+        if date_format is None:
+            return None, {}
+        return (lambda values: pd.to_datetime(values, format=date_format, errors="coerce").notna(),
+                {"date_format": date_format})
+
+    def _sample(self, positions: np.ndarray) -> np.ndarray:
+        """Uniform random sample of positions, kept in column order"""
+        if len(positions) <= self.sample_size:
+            return positions
+        rng = np.random.default_rng(self.random_state)
+        return np.sort(rng.choice(positions, self.sample_size, replace=False))
+
+
+def _pattern(values: pd.Series, pattern: re.Pattern) -> Any:
+    """The compiled pattern for object columns; its source for Arrow strings, which compile it themselves"""
+    return pattern if values.dtype == object else pattern.pattern
+
+
+def _guess_date_format(sample: pd.Series) -> Optional[str]:
+    """
+    Format string, guessed from the first sampled values, that parses the most of the sample
+
+    Values are guessed both month-first and day-first: 12/01/2023 reads
+    either way, 13/01/2023 only day-first. Ties go to the most commonly
+    guessed format, month-first first.
+    """
+    guesses = Counter()
+    with warnings.catch_warnings():
+        # pandas warns for every day-first value guessed month-first
+        warnings.simplefilter("ignore", UserWarning)
+        for dayfirst in (False, True):
+            for value in sample.iloc[:FORMAT_GUESS_VALUES]:
+                date_format = guess_datetime_format(value, dayfirst=dayfirst)
+                if date_format is not None:
+                    guesses[date_format] += 1
+    if len(guesses) <= 1:
+        return next(iter(guesses), None)
+    parsed = {date_format: int(pd.to_datetime(sample, format=date_format, errors="coerce").notna().sum())
+              for date_format, _ in guesses.most_common()}
+    return max(parsed, key=parsed.get)
+
+
+# Shared engine used by the validation agent
+format_engine = FormatDetectionEngine()
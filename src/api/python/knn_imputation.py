@@ -0,0 +1,220 @@
+
+"""
+KNN Imputation Module
+
+This module imputes missing numeric values from their nearest neighbours
+without comparing every row with every other row. Feature columns are
+standardized once into a float32 matrix. For each column to impute, a
+bounded sample of reference rows where that column is observed is indexed
+(FAISS HNSW when available, otherwise a scikit-learn KD-tree or ball tree), and rows
+missing the column are queried in batches. The cost is about O(n log m)
+per column, for n rows and m reference rows, instead of the O(n^2) of a
+full pairwise KNN imputation.
+
+Like KNNImputer's NaN-aware distance, rows are matched only on the features
+they have: rows missing the same features are queried together against an
+index over their observed features. The most common missing patterns get
+their own index; rows with rarer patterns are matched with their missing
+features set to the column mean.
+
+FAISS HNSW searches can return fewer than k neighbours (padded with -1);
+those rows are queried again on an exact KD-tree or ball tree.
+"""
+
+import logging
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree, KDTree
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Above this many features a ball tree is used instead of a KD-tree
+KD_TREE_MAX_DIMS = 16
+
+
+class KNNImputationEngine:
+    """Approximate-neighbour imputation over a sampled reference index"""
+
+    def __init__(self, n_neighbors: int = 5, max_reference_rows: int = 100_000,
+                 batch_size: int = 10_000, min_complete_rows: int = 1000,
+                 max_patterns: int = 32, backend: str = "auto", random_state: int = 0):
+        """
+        Initialize the imputation engine
+
+        Args:
+            n_neighbors: Number of neighbours averaged for each imputed value
+            max_reference_rows: Maximum number of rows indexed per imputed column
+            batch_size: Number of rows queried at a time
+            min_complete_rows: Reference rows must have every feature observed
+                when at least this many such rows exist; otherwise rows with
+                missing features are used too, with those features mean-filled
+            max_patterns: Number of most common missing-feature patterns that
+                get an index over just their observed features
+            backend: "faiss", "ball_tree", "kd_tree" or "auto" (FAISS if installed,
+                otherwise a KD-tree for up to KD_TREE_MAX_DIMS features and a ball tree above)
+            random_state: Seed for sampling reference rows
+        """
+        if backend == "auto" and FAISS_AVAILABLE:
+            backend = "faiss"
+        if backend == "faiss" and not FAISS_AVAILABLE:
+            raise ImportError("faiss is required for the faiss backend")
+        if backend not in ("faiss", "ball_tree", "kd_tree", "auto"):
+            raise ValueError(f"Unknown KNN backend: {backend}")
+        self.n_neighbors = n_neighbors
+        self.max_reference_rows = max_reference_rows
+        self.batch_size = batch_size
+        self.min_complete_rows = min_complete_rows
+        self.max_patterns = max_patterns
+        self.backend = backend
+        self.random_state = random_state
+
+    def impute(self, data: pd.DataFrame, targets: List[str],
+               features: List[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Impute the missing values of target columns from the feature columns
+
+        Args:
+            data: DataFrame holding the targets and features
+            targets: Numeric columns to impute
+            features: Numeric columns to measure distance on; each target is
+                left out of its own distance
+
+        Returns:
+            For each imputed target, (positions, values) of its filled cells.
+            Targets without at least n_neighbors reference rows are omitted.
+        """
+        columns = list(dict.fromkeys(list(features) + list(targets)))
+        scaled, means, stds = self._standardize(data, columns)
+        missing = np.isnan(scaled)
+        rng = np.random.default_rng(self.random_state)
+
+        imputed = {}
+        for target in targets:
+            j = columns.index(target)
+            query_rows = np.flatnonzero(missing[:, j])
+            dims = [i for i, col in enumerate(columns) if col in features and i != j]
+            if len(query_rows) == 0 or not dims:
+                continue
+            reference = self._reference_rows(missing, j, dims, rng)
+            if len(reference) < self.n_neighbors:
+                continue
+
+            reference_values = scaled[reference, j]
+            values = np.empty(len(query_rows))
+            for group_dims, group in self._query_groups(missing, query_rows, dims):
+                index = self._build_index(_fill_mean(scaled[np.ix_(reference, group_dims)]))
+                for start in range(0, len(group), self.batch_size):
+                    batch = group[start:start + self.batch_size]
+                    neighbors = self._query(index, _fill_mean(scaled[np.ix_(query_rows[batch], group_dims)]))
+                    values[batch] = reference_values[neighbors].mean(axis=1)
+            imputed[target] = (query_rows, values.astype(float) * stds[j] + means[j])
+        return imputed
+
+    def _standardize(self, data: pd.DataFrame, columns: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Z-scores of columns as one row-major float32 matrix, missing values kept as NaN"""
+        scaled = np.empty((len(data), len(columns)), dtype=np.float32)
+        means = np.zeros(len(columns))
+        stds = np.ones(len(columns))
+        for i, col in enumerate(columns):
+            values = data[col].to_numpy(dtype=float, na_value=np.nan)
+            observed = values[~np.isnan(values)]
+            if len(observed):
+                means[i] = observed.mean()
+                std = observed.std()
+                stds[i] = std if std > 0 else 1.0
+            scaled[:, i] = (values - means[i]) / stds[i]
+        return scaled, means, stds
+
+    def _reference_rows(self, missing: np.ndarray, target: int, dims: List[int],
+                        rng: np.random.Generator) -> np.ndarray:
+        """Rows to index for a target: observed target, complete features if enough, sampled"""
+        observed = ~missing[:, target]
+        complete = observed & ~missing[:, dims].any(axis=1)
+        candidates = np.flatnonzero(complete)
+        if len(candidates) < min(self.min_complete_rows, int(observed.sum())):
+            candidates = np.flatnonzero(observed)
+        if len(candidates) > self.max_reference_rows:
+            candidates = np.sort(rng.choice(candidates, self.max_reference_rows, replace=False))
+        return candidates
+
+    def _query_groups(self, missing: np.ndarray, query_rows: np.ndarray, dims: List[int]):
+        """
+        Split query rows by missing-feature pattern
+
+        The most common patterns are indexed on their observed features. Rows
+        with any other pattern join the indexed pattern that needs the fewest
+        of their missing features mean-filled, then drops the fewest of their
+        observed features.
+
+        Yields:
+            (feature dims to match on, positions into query_rows)
+        """
+        patterns, inverse, counts = np.unique(missing[np.ix_(query_rows, dims)], axis=0,
+                                              return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        indexed = [p for p in np.argsort(-counts, kind="stable")[:self.max_patterns] if not patterns[p].all()]
+        if not indexed:
+            yield dims, np.arange(len(query_rows))
+            return
+        candidates = patterns[indexed]
+        mean_filled = (patterns[:, None, :] & ~candidates[None, :, :]).sum(axis=2)
+        dropped = (~patterns[:, None, :] & candidates[None, :, :]).sum(axis=2)
+        assigned = np.asarray(indexed)[np.argmin(mean_filled * (len(dims) + 1) + dropped, axis=1)]
+        row_pattern = assigned[inverse]
+        for p in indexed:
+            group = np.flatnonzero(row_pattern == p)
+            if len(group):
+                yield [d for d, is_missing in zip(dims, patterns[p]) if not is_missing], group
+
+    def _build_index(self, reference: np.ndarray) -> Any:
+        if self.backend == "faiss":
+            return _HNSWIndex(reference)
+        return _build_tree(reference, self.backend)
+
+    def _query(self, index: Any, rows: np.ndarray) -> np.ndarray:
+        """Positions (into the reference rows) of each row's nearest neighbours"""
+        if self.backend == "faiss":
+            return index.query(rows, self.n_neighbors)
+        return index.query(rows, k=self.n_neighbors, return_distance=False)
+
+
+class _HNSWIndex:
+    """FAISS HNSW index over reference rows, with an exact tree for rows it finds too few neighbours for"""
+
+    def __init__(self, reference: np.ndarray):
+        self.reference = reference
+        self.index = faiss.IndexHNSWFlat(reference.shape[1], 32)
+        self.index.add(np.ascontiguousarray(reference, dtype=np.float32))
+        self.tree = None
+
+    def query(self, rows: np.ndarray, k: int) -> np.ndarray:
+        _, neighbors = self.index.search(np.ascontiguousarray(rows, dtype=np.float32), k)
+        # Missing neighbours are -1, which would index the last reference row
+        short = (neighbors < 0).any(axis=1)
+        if short.any():
+            if self.tree is None:
+                self.tree = _build_tree(self.reference, "auto")
+            neighbors[short] = self.tree.query(rows[short], k=k, return_distance=False)
+        return neighbors
+
+
+def _build_tree(reference: np.ndarray, backend: str) -> Any:
+    """Exact index: a ball tree for the ball_tree backend or, under auto, above KD_TREE_MAX_DIMS features; else a KD-tree"""
+    if backend == "kd_tree" or (backend == "auto" and reference.shape[1] <= KD_TREE_MAX_DIMS):
+        return KDTree(reference)
+    return BallTree(reference)
+
+
+def _fill_mean(block: np.ndarray) -> np.ndarray:
+    """Fill missing standardized features with 0, the column mean"""
+    return np.nan_to_num(block, nan=0.0)
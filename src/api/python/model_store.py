@@ -0,0 +1,280 @@
+
+"""
+Model Store Module
+
+This module keeps fitted anomaly detection models so that they are trained
+once per dataset version instead of on every request:
+- models are keyed by (dataset fingerprint, method, parameter hash), so
+  identical training data with the same settings reuses the fitted
+  estimator and its scaler. Callers fill in different defaults, so they key
+  estimators by their resolved parameters (see resolved_params)
+- recently used models stay in memory (LRU) and every model is saved to
+  disk, so they survive restarts
+- the latest model of each dataset lineage is remembered, so appended data
+  can warm-start from it (see warm_start_forest) or be scored with it
+  without refitting
+
+Stored models are shared between callers and must not be modified; warm
+starts fit a copy.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import pandas as pd
+
+try:
+    import joblib
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+try:
+    from .fingerprint import config_hash
+except ImportError:
+    from fingerprint import config_hash
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+
+# Estimator parameters that do not change the fitted model
+RUNTIME_PARAMS = {"n_jobs", "verbose", "warm_start"}
+
+
+class FittedModel:
+    """A fitted estimator with the data description needed to score new rows with it"""
+
+    def __init__(self, method: str, params: Dict[str, Any], estimator: Any, columns: List[Any],
+                 fingerprint: str, rows: int, scaler: Any = None, details: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            method: Detection method, e.g. "isolation_forest"
+            params: Parameters the model was fitted with
+            estimator: The fitted estimator
+            columns: Columns it was fitted on, in order
+            fingerprint: Fingerprint of the training data
+            rows: Number of training rows
+            scaler: Fitted scaler applied before the estimator, if any
+            details: Other fitted values, e.g. a score threshold
+        """
+        self.method = method
+        self.params = params
+        self.estimator = estimator
+        self.columns = list(columns)
+        self.fingerprint = fingerprint
+        self.rows = rows
+        self.scaler = scaler
+        self.details = details or {}
+        self.created_at = datetime.now().isoformat()
+
+    def fits_columns(self, columns: List[Any]) -> bool:
+        """Whether new data with these columns can be scored with the model"""
+        return self.columns == list(columns)
+
+
+def resolved_params(estimator: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parameters to store a model under: the caller's parameters with every estimator parameter resolved
+
+    The same request parameters can give different estimators, e.g. when
+    one caller defaults contamination to "auto" and another to 0.05, so the
+    raw parameters alone would let one caller reuse the other's model.
+
+    Args:
+        estimator: The (unfitted) sklearn estimator built from params
+        params: Parameters as the caller received them
+
+    Returns:
+        The parameters, overridden by the estimator's own
+    """
+    estimator_params = {name: value for name, value in estimator.get_params(deep=False).items()
+                        if name not in RUNTIME_PARAMS}
+    return {**params, **estimator_params}
+
+
+def warm_start_forest(estimator: Any, data: pd.DataFrame, new_estimators: int,
+                      max_estimators: int) -> Optional[Any]:
+    """
+    Partial refit of an isolation forest on grown data
+
+    A copy of the forest keeps its trees and grows new_estimators trees
+    sampled from the new data; its score offset is recomputed on the new
+    data. Returns None when the forest would exceed max_estimators trees,
+    after which the caller should fit a new forest.
+
+    Args:
+        estimator: Fitted sklearn IsolationForest
+        data: The new training data (all rows, with the same columns)
+        new_estimators: Trees to add
+        max_estimators: Largest forest kept
+
+    Returns:
+        The extended forest, or None
+    """
+    total = estimator.n_estimators + new_estimators
+    if new_estimators <= 0 or total > max_estimators:
+        return None
+    model = copy.deepcopy(estimator)
+    model.set_params(warm_start=True, n_estimators=total)
+    model.fit(data)
+    model.set_params(warm_start=False)
+    return model
+
+
+class ModelStore:
+    """Fitted models by training data fingerprint, method and parameters, in memory and on disk"""
+
+    def __init__(self, max_models: int = 16, max_stored_models: int = 256):
+        """
+        Initialize the store
+
+        Args:
+            max_models: Models kept in memory
+            max_stored_models: Models kept on disk; the oldest are deleted
+                first, except the latest model of each lineage
+        """
+        self.max_models = max_models
+        self.max_stored_models = max_stored_models
+        self.directory: Optional[str] = None
+        self._models: "OrderedDict[str, FittedModel]" = OrderedDict()
+        self._stored: Dict[str, str] = {}
+        self._latest: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0}
+
+    def load(self, directory: str) -> None:
+        """Keep models in a directory, indexing those saved there before (they are loaded on use)"""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.directory = directory
+            index_path = os.path.join(directory, INDEX_FILE)
+            if os.path.exists(index_path):
+                try:
+                    with open(index_path, "r") as f:
+                        index = json.load(f)
+                    self._stored = {key: created_at for key, created_at in index["models"].items()
+                                    if os.path.exists(self._path(key))}
+                    self._latest = {lineage: key for lineage, key in index["latest"].items() if key in self._stored}
+                except Exception as e:
+                    logger.error(f"Error loading model index: {str(e)}")
+        logger.info(f"Indexed {len(self._stored)} stored models")
+
+    @staticmethod
+    def _key(fingerprint: str, method: str, params: Dict[str, Any]) -> str:
+        return hashlib.blake2b(f"{fingerprint}|{method}|{config_hash(params)}".encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _lineage_key(lineage: str, method: str, params: Dict[str, Any]) -> str:
+        return hashlib.blake2b(f"{lineage}|{method}|{config_hash(params)}".encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.joblib" if JOBLIB_AVAILABLE else f"{key}.pkl")
+
+    def get(self, fingerprint: str, method: str, params: Dict[str, Any]) -> Optional[FittedModel]:
+        """
+        Model fitted on data with this fingerprint, method and parameters
+
+        Args:
+            fingerprint: Fingerprint of the training data
+            method: Detection method
+            params: Model parameters
+
+        Returns:
+            The fitted model (not to be modified), or None
+        """
+        return self._get(self._key(fingerprint, method, params))
+
+    def latest(self, lineage: str, method: str, params: Dict[str, Any]) -> Optional[FittedModel]:
+        """Model last stored for a dataset lineage with this method and parameters, or None"""
+        with self._lock:
+            key = self._latest.get(self._lineage_key(lineage, method, params))
+        return self._get(key) if key is not None else None
+
+    def put(self, model: FittedModel, lineage: Optional[str] = None) -> None:
+        """
+        Store a fitted model
+
+        Args:
+            model: The fitted model
+            lineage: Dataset lineage (e.g. the dataset ID) whose latest model it becomes
+        """
+        key = self._key(model.fingerprint, model.method, model.params)
+        with self._lock:
+            self._remember(key, model)
+            if lineage is not None:
+                self._latest[self._lineage_key(lineage, model.method, model.params)] = key
+            if self.directory is None:
+                return
+            try:
+                if JOBLIB_AVAILABLE:
+                    joblib.dump(model, self._path(key))
+                else:
+                    with open(self._path(key), "wb") as f:
+                        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+                self._stored[key] = model.created_at
+                self._evict_stored()
+                self._save_index()
+            except Exception as e:
+                logger.error(f"Error saving {model.method} model: {str(e)}")
+
+    def _get(self, key: str) -> Optional[FittedModel]:
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._models[key]
+            if key not in self._stored:
+                self.stats["misses"] += 1
+                return None
+            try:
+                if JOBLIB_AVAILABLE:
+                    model = joblib.load(self._path(key))
+                else:
+                    with open(self._path(key), "rb") as f:
+                        model = pickle.load(f)
+            except Exception as e:
+                logger.error(f"Error loading stored model {key}: {str(e)}")
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, model)
+            return model
+
+    def _remember(self, key: str, model: FittedModel) -> None:
+        self._models[key] = model
+        self._models.move_to_end(key)
+        while len(self._models) > self.max_models:
+            self._models.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_stored(self) -> None:
+        latest = set(self._latest.values())
+        for key in sorted(self._stored, key=self._stored.get):
+            if len(self._stored) <= self.max_stored_models:
+                break
+            if key in latest:
+                continue
+            del self._stored[key]
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+
+    def _save_index(self) -> None:
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"models": self._stored, "latest": self._latest}, f)
+        os.replace(f"{path}.tmp", path)
+
+
+# Shared store used by the anomaly detector and the analytics service
+anomaly_model_store = ModelStore()
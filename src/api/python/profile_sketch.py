@@ -0,0 +1,341 @@
+
+"""
+Profile Sketch Module
+
+This module represents a data profile as mergeable sketches, so profiles
+can be built chunk by chunk, in parallel workers, and extended with appended
+rows without rescanning the rows already profiled:
+- running moments for mean, standard deviation, minimum and maximum
+- a t-digest for quantiles and histograms
+- a Misra-Gries summary for the most frequent values
+- HyperLogLog counters for distinct values
+- a set of 64-bit row hashes for duplicate rows (8 bytes per distinct row,
+  estimated with HyperLogLog beyond a limit)
+- pairwise co-moments for Pearson correlations
+
+to_profile() renders a sketch in the analytics service's profile format
+("summary" and "detailed_profile"). Counts of rows, missing cells and
+column types are exact, and so are duplicate rows up to hash collisions.
+Distinct counts, histograms and value counts are estimates, exact while a
+column has few distinct values.
+Spearman correlations need a global ranking, which does not merge, and
+are left out. Sketches are plain Python objects and can be pickled.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .sketches import RunningMoments, PairwiseMoments, TDigest, TopK, HyperLogLog, mix64
+    from .profiling_engine import ProfilingEngine, profiling_engine, infer_column_type, count_column_types, strong_pairs
+    from .dataset_stats import chunk_row_hashes
+except ImportError:
+    from sketches import RunningMoments, PairwiseMoments, TDigest, TopK, HyperLogLog, mix64
+    from profiling_engine import ProfilingEngine, profiling_engine, infer_column_type, count_column_types, strong_pairs
+    from dataset_stats import chunk_row_hashes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows per chunk when sketching an in-memory DataFrame
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class ColumnSketch:
+    """Mergeable statistics of one column"""
+
+    def __init__(self, precision: int = 14, top_capacity: int = 1000):
+        """
+        Initialize an empty column sketch
+
+        Args:
+            precision: HyperLogLog precision of the distinct count
+            top_capacity: Number of counters kept for frequent values
+        """
+        self.types = set()
+        self.correlatable = True
+        self.count = 0
+        self.n_missing = 0
+        self.moments = RunningMoments()
+        self.digest = TDigest()
+        self.distinct = HyperLogLog(precision)
+        self.top = TopK(top_capacity)
+
+    def update(self, values: pd.Series) -> "ColumnSketch":
+        """Add the values of a chunk of the column"""
+        col_type = infer_column_type(values)
+        self.types.add(col_type)
+        # Only non-boolean numeric columns take part in correlations, as in DataFrame.select_dtypes
+        self.correlatable &= pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        self.count += len(values)
+        self.n_missing += int(values.isna().sum())
+
+        if col_type == "numeric":
+            numbers = values.to_numpy(dtype=float, na_value=np.nan)
+            self.moments.update(numbers)
+            self.digest.update(numbers[np.isfinite(numbers)])
+        self.distinct.update(values)
+        try:
+            top = TopK(self.top.capacity).update(values)
+        except TypeError:
+            # Unhashable values, e.g. lists
+            top = TopK(self.top.capacity).update(values.dropna().astype(str))
+        self.top.merge(top)
+        return self
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        self.types |= other.types
+        self.correlatable &= other.correlatable
+        self.count += other.count
+        self.n_missing += other.n_missing
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.distinct.merge(other.distinct)
+        self.top.merge(other.top)
+        return self
+
+    @property
+    def type(self) -> str:
+        """Profile type over all chunks; chunks of different types make the column categorical"""
+        if len(self.types) == 1:
+            return next(iter(self.types))
+        return "categorical"
+
+    def to_dict(self, histogram_bins: int = 6, top_values: int = 10) -> Dict[str, Any]:
+        """Column statistics in the format of the detailed profile's variables"""
+        col_type = self.type
+        n_unique = min(self.distinct.count(), self.count - self.n_missing)
+        col_stats = {
+            "type": col_type,
+            "count": int(self.count),
+            "n_missing": int(self.n_missing),
+            "n_unique": int(n_unique),
+            "n": int(self.count)
+        }
+        if col_type == "numeric":
+            moments = self.moments.to_dict()
+            col_stats.update({name: moments[name] for name in ("mean", "std", "min", "max")})
+            if self.digest.count > 0 and np.isfinite([self.moments.min, self.moments.max]).all():
+                col_stats["histogram_data"] = self._histogram(histogram_bins, n_unique)
+        elif col_type == "categorical":
+            col_stats["value_counts"] = {str(value): int(count) for value, count in
+                                         self.top.most_common(top_values)}
+        return col_stats
+
+    def _histogram(self, bins: int, n_unique: int) -> List[Dict[str, Any]]:
+        """
+        Equal-width histogram over the value range
+
+        Bin counts are exact when the frequent-value counters hold every
+        value, and read from the t-digest otherwise.
+        """
+        low, high = self.digest.min, self.digest.max
+        total = int(round(self.digest.count))
+        if self.distinct.registers is None and n_unique <= self.top.capacity:
+            values, counts = zip(*self.top.counters.items())
+            counts, edges = np.histogram(np.asarray(values, dtype=float), bins=bins, weights=counts,
+                                         range=None if low == high else (low, high))
+            counts = np.round(counts).astype(np.int64)
+        elif low == high:
+            # Same bins as np.histogram gives a constant column
+            edges = np.linspace(low - 0.5, high + 0.5, bins + 1)
+            counts = np.zeros(bins, dtype=np.int64)
+            counts[min(int(np.searchsorted(edges, low, side="right")) - 1, bins - 1)] = total
+        else:
+            edges = np.linspace(low, high, bins + 1)
+            cumulative = np.round(self.digest.cdf(edges) * total).astype(np.int64)
+            cumulative[0], cumulative[-1] = 0, total
+            counts = np.diff(cumulative)
+        return [{"bin": f"{edges[i]:.1f}-{edges[i+1]:.1f}", "count": int(counts[i])}
+                for i in range(bins)]
+
+
+class ProfileSketch:
+    """Mergeable profile of a table, updated chunk by chunk"""
+
+    def __init__(self, precision: int = 14, top_capacity: int = 1000, exact_rows: int = 10_000_000):
+        """
+        Initialize an empty profile sketch
+
+        Args:
+            precision: HyperLogLog precision of each column's distinct count
+            top_capacity: Number of counters kept per column for frequent values
+            exact_rows: Number of distinct row hashes kept before duplicates are estimated
+        """
+        self.precision = precision
+        self.top_capacity = top_capacity
+        self.exact_rows = exact_rows
+        self.columns: Optional[List[Any]] = None
+        self.column_sketches: Dict[Any, ColumnSketch] = {}
+        self.row_count = 0
+        self.memory_usage = 0
+        self.distinct_rows = HyperLogLog(16, exact_limit=exact_rows)
+        self.pairs: Optional[PairwiseMoments] = None
+
+    def update(self, chunk: pd.DataFrame) -> "ProfileSketch":
+        """
+        Add the rows of a chunk, e.g. rows appended to a profiled dataset
+
+        Args:
+            chunk: DataFrame with the same columns as the chunks already added
+
+        Returns:
+            This sketch
+        """
+        self._check_columns(list(chunk.columns))
+        self.row_count += len(chunk)
+        self.memory_usage += int(chunk.memory_usage(deep=True).sum())
+
+        numeric_positions = []
+        for i, column in enumerate(self.columns):
+            values = chunk.iloc[:, i]
+            self.column_sketches[column].update(values)
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                numeric_positions.append(i)
+        # Unlike the factorized codes row_hashes uses, these hashes do not depend on the chunk or its dtypes
+        self.distinct_rows.update_hashes(mix64(chunk_row_hashes(chunk)))
+
+        if numeric_positions and len(chunk):
+            numeric = chunk.iloc[:, numeric_positions].to_numpy(dtype=float, na_value=np.nan)
+            self.pairs.update(numeric, numeric_positions)
+        return self
+
+    def merge(self, other: "ProfileSketch") -> "ProfileSketch":
+        """
+        Add another sketch's rows; both must have the same columns
+
+        Args:
+            other: Sketch of other rows of the same table
+
+        Returns:
+            This sketch
+        """
+        if other.columns is None:
+            return self
+        self._check_columns(other.columns)
+        for column in self.columns:
+            self.column_sketches[column].merge(other.column_sketches[column])
+        self.row_count += other.row_count
+        self.memory_usage += other.memory_usage
+        self.distinct_rows.merge(other.distinct_rows)
+        self.pairs.merge(other.pairs)
+        return self
+
+    def to_profile(self, engine: ProfilingEngine = profiling_engine) -> Dict[str, Any]:
+        """
+        Profile in the analytics service's format
+
+        Args:
+            engine: Profiling engine whose histogram, value count and correlation settings are used
+
+        Returns:
+            Dictionary with the "summary" and the "detailed_profile"
+        """
+        columns = self.columns or []
+        row_count = self.row_count
+        column_count = len(columns)
+        variables = {column: self.column_sketches[column].to_dict(engine.histogram_bins, engine.top_values)
+                     for column in columns}
+        missing_cells = sum(col_stats["n_missing"] for col_stats in variables.values())
+        total_cells = row_count * column_count
+        duplicate_rows = max(row_count - self.distinct_rows.count(), 0) if column_count else 0
+
+        summary = {
+            "row_count": int(row_count),
+            "column_count": int(column_count),
+            "missing_cells": int(missing_cells),
+            "missing_cells_pct": float(missing_cells / total_cells * 100) if total_cells > 0 else 0.0,
+            "duplicate_rows": int(duplicate_rows),
+            "duplicate_rows_pct": float(duplicate_rows / row_count * 100) if row_count > 0 else 0.0,
+            "memory_usage": int(self.memory_usage)
+        }
+
+        return {
+            "summary": summary,
+            "detailed_profile": {
+                "table": {
+                    "n": int(row_count),
+                    "n_var": int(column_count),
+                    "n_cells_missing": int(missing_cells),
+                    "n_cells_total": int(total_cells),
+                    "n_duplicates": int(duplicate_rows),
+                    "types": count_column_types(variables)
+                },
+                "variables": variables,
+                "correlations": self._correlations(engine.correlation_threshold)
+            }
+        }
+
+    def _correlations(self, threshold: float) -> Dict[str, Dict[str, float]]:
+        """Pearson correlations above the threshold, between columns numeric in every chunk"""
+        positions = [i for i, column in enumerate(self.columns or [])
+                     if self.column_sketches[column].correlatable]
+        if len(positions) < 2:
+            return {}
+        matrix = self.pairs.correlation()[np.ix_(positions, positions)]
+        return {"pearson": strong_pairs(matrix, [self.columns[i] for i in positions], threshold)}
+
+    def _check_columns(self, columns: List[Any]):
+        if self.columns is None:
+            self.columns = columns
+            self.column_sketches = {column: ColumnSketch(self.precision, self.top_capacity) for column in columns}
+            self.pairs = PairwiseMoments(len(columns))
+        elif columns != self.columns:
+            raise ValueError(f"Columns {columns} do not match the profiled columns {self.columns}")
+
+
+def sketch_chunks(chunks: Iterable[pd.DataFrame], n_jobs: int = 1, **sketch_options) -> ProfileSketch:
+    """
+    Sketch a table given as chunks of rows, optionally across a process pool
+
+    Each worker sketches whole chunks; the sketches are merged in chunk
+    order, so the result does not depend on which worker finishes first.
+
+    Args:
+        chunks: DataFrames with the same columns
+        n_jobs: Number of worker processes (1 to sketch in this process)
+        **sketch_options: Options passed to ProfileSketch
+
+    Returns:
+        Sketch of all rows
+    """
+    sketch = ProfileSketch(**sketch_options)
+    if n_jobs <= 1:
+        for chunk in chunks:
+            sketch.update(chunk)
+        return sketch
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(_sketch_chunk, chunk, sketch_options))
+            # Bound the chunks held in memory at once
+            while len(pending) > 2 * n_jobs:
+                sketch.merge(pending.pop(0).result())
+        for future in pending:
+            sketch.merge(future.result())
+    return sketch
+
+
+def sketch_dataframe(df: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE, n_jobs: int = 1,
+                     **sketch_options) -> ProfileSketch:
+    """Sketch an in-memory DataFrame in chunks of rows"""
+    chunks = (df.iloc[start:start + chunk_size] for start in range(0, max(len(df), 1), chunk_size))
+    return sketch_chunks(chunks, n_jobs, **sketch_options)
+
+
+def sketch_csv(path: str, chunksize: int = DEFAULT_CHUNK_SIZE, n_jobs: int = 1,
+               read_csv_kwargs: Optional[Dict[str, Any]] = None, **sketch_options) -> ProfileSketch:
+    """Sketch a CSV file read in chunks, without loading it whole"""
+    chunks = pd.read_csv(path, chunksize=chunksize, **(read_csv_kwargs or {}))
+    return sketch_chunks(chunks, n_jobs, **sketch_options)
+
+
+def _sketch_chunk(chunk: pd.DataFrame, sketch_options: Dict[str, Any]) -> ProfileSketch:
+    """Worker: sketch one chunk"""
+    return ProfileSketch(**sketch_options).update(chunk)
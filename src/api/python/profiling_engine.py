@@ -0,0 +1,361 @@
+
+"""
+Profiling Engine Module
+
+This module builds the basic data profile served by the analytics service
+(summary, per-column statistics and strong correlations) in few passes over
+the data:
+- mean, standard deviation, minimum and maximum are computed in one
+  vectorized reduction per statistic across all numeric columns
+- duplicate rows are counted from 64-bit row hashes; only rows whose hashes
+  repeat are compared exactly
+- strong correlations are taken from the correlation matrices with an
+  upper-triangle mask
+- Spearman correlations are computed with NumPy, ranking each column once
+  and re-ranking column pairs by cumulative counts instead of sorting
+
+Null counts, distinct values, moments and duplicate rows come from the
+dataset's shared DatasetStats, so other services analysing the same data
+reuse them. The output is the same as computing each statistic separately
+with pandas. Profiles are cached by data fingerprint, and per-column statistics by column
+fingerprint, so changing one column only reprofiles that column.
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .fingerprint import ResultCache, result_cache, fingerprint_columns, fingerprint_dataframe
+    from .dataset_stats import DatasetStats, dataset_stats
+except ImportError:
+    from fingerprint import ResultCache, result_cache, fingerprint_columns, fingerprint_dataframe
+    from dataset_stats import DatasetStats, dataset_stats
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ProfilingEngine:
+    """Builds data profiles with vectorized statistics and cached results"""
+
+    def __init__(self, histogram_bins: int = 6, top_values: int = 10, correlation_threshold: float = 0.5,
+                 cache: Optional[ResultCache] = result_cache):
+        """
+        Initialize the profiling engine
+
+        Args:
+            histogram_bins: Number of histogram bins for numeric columns
+            top_values: Number of most frequent values reported for categorical columns
+            correlation_threshold: Correlations are reported when their absolute value is at least this
+            cache: Cache for profiles and per-column statistics (None to disable)
+        """
+        self.histogram_bins = histogram_bins
+        self.top_values = top_values
+        self.correlation_threshold = correlation_threshold
+        self.cache = cache
+
+    def profile(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Profile a DataFrame
+
+        Args:
+            df: DataFrame to profile
+
+        Returns:
+            Dictionary with the "summary" and the "detailed_profile"
+        """
+        if self.cache is None:
+            return self._profile(df, None, DatasetStats(df))
+        column_fingerprints = fingerprint_columns(df)
+        fingerprint = fingerprint_dataframe(df, column_fingerprints)
+        return self.cache.get_or_compute(
+            fingerprint, "profile",
+            lambda: self._profile(df, column_fingerprints, dataset_stats.get(df, fingerprint)), self._config())
+
+    def _config(self) -> Dict[str, Any]:
+        return {
+            "histogram_bins": self.histogram_bins,
+            "top_values": self.top_values,
+            "correlation_threshold": self.correlation_threshold
+        }
+
+    def _profile(self, df: pd.DataFrame, column_fingerprints: Optional[List[str]],
+                 stats: DatasetStats) -> Dict[str, Any]:
+        # Calculate basic statistics
+        row_count = len(df)
+        column_count = len(df.columns)
+        missing_cells = stats.null_counts().sum()
+        missing_cells_pct = (missing_cells / (row_count * column_count) * 100) if row_count * column_count > 0 else 0
+        duplicate_rows = stats.duplicate_count()
+        duplicate_rows_pct = (duplicate_rows / row_count * 100) if row_count > 0 else 0
+        memory_usage = df.memory_usage(deep=True).sum()
+
+        summary = {
+            "row_count": int(row_count),
+            "column_count": int(column_count),
+            "missing_cells": int(missing_cells),
+            "missing_cells_pct": float(missing_cells_pct),
+            "duplicate_rows": int(duplicate_rows),
+            "duplicate_rows_pct": float(duplicate_rows_pct),
+            "memory_usage": int(memory_usage)
+        }
+
+        if column_fingerprints is None:
+            variables = self._profile_columns(df, list(df.columns), stats)
+        else:
+            variables = self.cache.get_or_compute_columns(
+                dict(zip(df.columns, column_fingerprints)), "profile_column",
+                lambda columns: self._profile_columns(df, columns, stats), self._config())
+
+        detailed_profile = {
+            "table": {
+                "n": int(row_count),
+                "n_var": int(column_count),
+                "n_cells_missing": int(missing_cells),
+                "n_cells_total": int(row_count * column_count),
+                "n_duplicates": int(duplicate_rows),
+                "types": count_column_types(variables)
+            },
+            "variables": variables,
+            "correlations": self._correlations(df, column_fingerprints)
+        }
+
+        return {
+            "summary": summary,
+            "detailed_profile": detailed_profile
+        }
+
+    def _profile_columns(self, df: pd.DataFrame, columns: List[Any], stats: DatasetStats) -> Dict[Any, Dict[str, Any]]:
+        """Statistics of the given columns"""
+        numeric = [column for column in columns if infer_column_type(df[column]) == "numeric"]
+        moments = stats.column_moments(numeric)
+
+        variables = {}
+        for column in columns:
+            col_data = df[column]
+            col_type = infer_column_type(col_data)
+            if col_type == "categorical" and col_data.dtype == object:
+                # Distinct values are counted once, for both n_unique and value_counts
+                try:
+                    stats.value_counts(column)
+                except Exception:
+                    pass
+
+            col_stats = {
+                "type": col_type,
+                "count": int(len(col_data)),
+                "n_missing": stats.null_count(column),
+                "n_unique": stats.unique_count(column),
+                "n": int(len(col_data))
+            }
+
+            if col_type == "numeric":
+                col_moments = moments[column]
+                col_stats.update({name: float(value) if not pd.isna(value) else None
+                                  for name, value in col_moments.items()})
+
+                try:
+                    col_stats["histogram_data"] = self._histogram(col_data, col_moments["min"], col_moments["max"])
+                except Exception as e:
+                    logger.warning(f"Could not create histogram for {column}: {str(e)}")
+
+            elif col_type == "categorical":
+                try:
+                    # Convert keys to strings for JSON compatibility
+                    col_stats["value_counts"] = {str(k): int(v) for k, v in
+                                                 stats.value_counts(column).head(self.top_values).to_dict().items()}
+                except Exception as e:
+                    logger.warning(f"Could not calculate value counts for {column}: {str(e)}")
+
+            variables[column] = col_stats
+        return variables
+
+    def _histogram(self, col_data: pd.Series, low: Any, high: Any) -> List[Dict[str, Any]]:
+        if col_data.dtype == np.float64 and not pd.isna(low):
+            # Values outside the range, i.e. NaN, are not counted: no need to drop them first
+            hist, bin_edges = np.histogram(col_data.to_numpy(), bins=self.histogram_bins, range=(low, high))
+        else:
+            hist, bin_edges = np.histogram(col_data.dropna(), bins=self.histogram_bins)
+        return [{"bin": f"{bin_edges[i]:.1f}-{bin_edges[i+1]:.1f}", "count": int(hist[i])}
+                for i in range(len(hist))]
+
+    def _correlations(self, df: pd.DataFrame, column_fingerprints: Optional[List[str]]) -> Dict[str, Dict[str, float]]:
+        """Pearson and Spearman correlations of numeric column pairs above the threshold"""
+        correlations = {}
+        numeric_columns = df.select_dtypes(include=['number']).columns
+        if len(numeric_columns) >= 2:
+            try:
+                numeric = df[numeric_columns]
+                for method in ("pearson", "spearman"):
+                    matrix = self._correlation_matrix(numeric, method, column_fingerprints and
+                                                      dict(zip(df.columns, column_fingerprints)))
+                    correlations[method] = strong_pairs(matrix, numeric_columns, self.correlation_threshold)
+            except Exception as e:
+                logger.warning(f"Could not calculate correlations: {str(e)}")
+        return correlations
+
+    def _correlation_matrix(self, numeric: pd.DataFrame, method: str,
+                            fingerprints: Optional[Dict[Any, str]]) -> np.ndarray:
+        """
+        Correlation matrix of numeric columns, upper triangle only
+
+        Each pair only depends on its two columns, so with a cache the pairs
+        of unchanged columns are reused.
+        """
+        k = numeric.shape[1]
+        pairs = list(zip(*np.triu_indices(k, k=1)))
+        if fingerprints is None:
+            computed = _pair_correlations(numeric, method, pairs)
+        else:
+            keys = {(i, j): f"{fingerprints[numeric.columns[i]]}|{fingerprints[numeric.columns[j]]}"
+                    for i, j in pairs}
+            computed = self.cache.get_or_compute_columns(
+                keys, f"{method}_correlation", lambda missing: _pair_correlations(numeric, method, missing))
+        matrix = np.full((k, k), np.nan)
+        for (i, j), value in computed.items():
+            matrix[i, j] = value
+        return matrix
+
+
+def strong_pairs(matrix: np.ndarray, columns: Any, threshold: float) -> Dict[str, float]:
+    """Upper-triangle entries with an absolute value of at least the threshold, in row-major order"""
+    rows, cols = np.triu_indices(len(columns), k=1)
+    values = matrix[rows, cols]
+    with np.errstate(invalid="ignore"):
+        strong = np.abs(values) >= threshold
+    return {f"{columns[i]}_{columns[j]}": float(value)
+            for i, j, value in zip(rows[strong], cols[strong], values[strong])}
+
+
+def _pair_correlations(numeric: pd.DataFrame, method: str, pairs: List[Tuple[int, int]]) -> Dict[Tuple[int, int], float]:
+    """Correlations of column pairs (by position), the same as DataFrame.corr gives"""
+    k = numeric.shape[1]
+    if len(pairs) == k * (k - 1) // 2 and method == "pearson":
+        matrix = numeric.corr(method="pearson").to_numpy()
+    elif method == "pearson":
+        matrix = np.full((k, k), np.nan)
+        for i, j in pairs:
+            matrix[i, j] = numeric.iloc[:, [i, j]].corr(method="pearson").iat[0, 1]
+    else:
+        columns = sorted({c for pair in pairs for c in pair})
+        values = np.full((len(numeric), k), np.nan)
+        values[:, columns] = numeric.iloc[:, columns].to_numpy(dtype=float, na_value=np.nan)
+        matrix = spearman_matrix(values, pairs)
+    return {pair: float(matrix[pair]) for pair in pairs}
+
+
+def infer_column_type(column_data: pd.Series) -> str:
+    """Profile type of a column: numeric, date, boolean or categorical"""
+    if pd.api.types.is_numeric_dtype(column_data):
+        return "numeric"
+    elif pd.api.types.is_datetime64_dtype(column_data):
+        return "date"
+    elif pd.api.types.is_bool_dtype(column_data):
+        return "boolean"
+    return "categorical"
+
+
+def count_column_types(variables: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Count the number of columns of each type."""
+    type_counts = {}
+    for col_stats in variables.values():
+        type_counts[col_stats["type"]] = type_counts.get(col_stats["type"], 0) + 1
+    return type_counts
+
+
+def spearman_matrix(values: np.ndarray, pairs: Optional[List[Tuple[int, int]]] = None) -> np.ndarray:
+    """
+    Pairwise Spearman correlation of the columns of a float matrix
+
+    Gives the same values as DataFrame.corr(method="spearman"): each pair is
+    ranked over the rows where both values are finite, ties get their average
+    rank, and sums run over rows in order.
+
+    Args:
+        values: Matrix with one column per variable, missing values as NaN
+        pairs: Column pairs (i < j) to compute; all pairs by default
+
+    Returns:
+        Correlation matrix with the requested pairs filled in (NaN elsewhere)
+    """
+    n, k = values.shape
+    if pairs is None:
+        pairs = list(zip(*np.triu_indices(k, k=1)))
+    finite = np.isfinite(values)
+    complete = finite.all(axis=0)
+    columns = {c: _RankedColumn(values[:, c]) for c in sorted({c for pair in pairs for c in pair})}
+
+    result = np.full((k, k), np.nan)
+    for x, y in pairs:
+        if complete[x] and complete[y]:
+            rank_x, rank_y, nobs = columns[x].ranks, columns[y].ranks, n
+        else:
+            both = finite[:, x] & finite[:, y]
+            nobs = int(both.sum())
+            if nobs < 1:
+                continue
+            if np.array_equal(finite[:, x], finite[:, y]):
+                # Like pandas, keep the ranks over all non-NaN values
+                rank_x, rank_y = columns[x].ranks[both], columns[y].ranks[both]
+            else:
+                rank_x, rank_y = columns[x].subset_ranks(both), columns[y].subset_ranks(both)
+        mean = (nobs + 1) / 2.
+        vx, vy = rank_x - mean, rank_y - mean
+        # Sequential sums (cumsum), matching the order of pandas' loops
+        sumx = np.cumsum(vx * vy)[-1]
+        divisor = np.sqrt(np.cumsum(vx * vx)[-1] * np.cumsum(vy * vy)[-1])
+        if divisor != 0:
+            result[x, y] = result[y, x] = sumx / divisor
+    return result
+
+
+class _RankedColumn:
+    """A column sorted once, from which average ranks over any subset of rows are counted"""
+
+    def __init__(self, values: np.ndarray):
+        # Rank over all non-NaN values, as pandas does before dropping infinite ones
+        index_type = np.int32 if len(values) < np.iinfo(np.int32).max else np.int64
+        self.rows = np.flatnonzero(~np.isnan(values))
+        self.order = self.rows[np.argsort(values[self.rows], kind="stable")].astype(index_type)
+        sorted_values = values[self.order]
+        new_group = np.concatenate([[True], sorted_values[1:] != sorted_values[:-1]])
+        self.has_ties = not new_group.all()
+        # Sorted position of each row, and where its tie group ends
+        self.group_start = np.zeros(len(values), dtype=index_type)
+        self.group_end = np.zeros(len(values), dtype=index_type)
+        starts = np.flatnonzero(new_group)
+        ends = np.append(starts[1:], len(self.rows))
+        self.group_start[self.order] = np.repeat(starts, ends - starts)
+        self.group_end[self.order] = np.repeat(ends, ends - starts)
+        self._ranks_all = None
+
+    @property
+    def ranks(self) -> np.ndarray:
+        """Average ranks among all non-NaN rows (NaN elsewhere)"""
+        if self._ranks_all is None:
+            self._ranks_all = np.full(len(self.group_start), np.nan)
+            self._ranks_all[self.rows] = self._ranks(self.rows, np.arange(len(self.rows) + 1))
+        return self._ranks_all
+
+    def subset_ranks(self, subset: np.ndarray) -> np.ndarray:
+        """Average ranks among the rows of a boolean subset (of non-NaN rows), in row order"""
+        # kept[p] = number of subset rows among the first p sorted positions
+        kept = np.zeros(len(self.order) + 1, dtype=self.group_start.dtype)
+        np.cumsum(subset[self.order], out=kept[1:])
+        return self._ranks(subset, kept)
+
+    def _ranks(self, rows: np.ndarray, kept: np.ndarray) -> np.ndarray:
+        low = kept[self.group_start[rows]]
+        if not self.has_ties:
+            return low + 1.
+        # A tie group holding kept ranks low+1..high has average rank low + (high - low + 1) / 2
+        high = kept[self.group_end[rows]]
+        return low + (high - low + 1) / 2.
+
+
+# Shared engine used by the analytics service
+profiling_engine = ProfilingEngine()
@@ -0,0 +1,406 @@
+
+"""
+Relationship Discovery Module
+
+This module finds foreign-key candidates within and across datasets from
+compact per-column signatures, without joining any data:
+- each key-like column (integers, whole-valued floats, strings,
+  categoricals) gets a signature: a bottom-k MinHash sketch (the k
+  smallest hashes of its distinct values), its distinct count, counted
+  exactly while the whole column is at hand, and a HyperLogLog sketch
+- an inclusion dependency A ⊆ B is estimated by comparing the hashes of
+  both sketches below the smaller of their largest hashes: those are all
+  the values of A and of B in one random slice of the hash space, so the
+  share of A's values found in B estimates the containment of A in B
+- candidate pairs come from an inverted index over the hashes of unique
+  (key) columns, so only columns sharing values are compared
+- signatures are kept per dataset in a store that is updated when a
+  dataset is uploaded, appended to or deleted, and optionally saved to disk
+
+Containment is exact when both columns have fewer than k distinct values.
+Whether a column is a key is decided on its exact distinct count: a
+HyperLogLog estimate (about 1.6% error at precision 12) would drop real keys
+below any useful uniqueness threshold. When rows are appended, values
+repeated across the old and new rows are estimated from the two sketches;
+appended keys that share none of their sketched values keep the count exact.
+When the dependent column has far fewer distinct values than the
+referenced one, few of its hashes fall in the compared slice and the
+estimate rests on fewer samples; each result reports its sample count.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .sketches import HyperLogLog, hash_values
+except ImportError:
+    from sketches import HyperLogLog, hash_values
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_HASH = np.uint64(np.iinfo(np.uint64).max)
+
+# Name tokens too common to link a column to a table or key
+GENERIC_NAME_TOKENS = {"id", "key", "code", "no", "num", "number", "ref", "fk", "pk"}
+
+# Confidence multiplier of dependencies whose names do not point at the referenced column
+UNNAMED_DEPENDENCY_WEIGHT = 0.6
+
+
+def signature_column(series: pd.Series) -> bool:
+    """Whether a column can hold keys: integers, whole-valued floats, strings or categoricals"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return False
+    if pd.api.types.is_integer_dtype(dtype):
+        return True
+    if pd.api.types.is_float_dtype(dtype):
+        values = series.dropna().to_numpy(dtype=np.float64)
+        return len(values) > 0 and bool(np.all(values == np.floor(values)))
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+        return True
+    return False
+
+
+def name_tokens(name: str) -> List[str]:
+    """Lowercase word tokens of a name, with a plural "s" removed (customer_ids -> customer, id)"""
+    tokens = re.findall(r"[a-z0-9]+", re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", str(name)).lower())
+    return [token[:-1] if len(token) > 2 and token.endswith("s") else token for token in tokens]
+
+
+def names_match(dependent_column: str, referenced_dataset: str, referenced_column: str) -> bool:
+    """
+    Whether a column's name points at a referenced column, e.g. customer_id at
+    customers.id or product_code at products.code
+    """
+    dependent = set(name_tokens(dependent_column))
+    referenced = set(name_tokens(referenced_column)) - GENERIC_NAME_TOKENS
+    dataset = set(name_tokens(referenced_dataset)) - GENERIC_NAME_TOKENS
+    return bool(dependent & referenced) or bool(dependent & dataset) or \
+        str(dependent_column).lower() == str(referenced_column).lower()
+
+
+def containment_lower_bound(containment: float, samples: int, z: float = 1.645) -> float:
+    """One-sided 95% Wilson lower bound of a containment measured on a number of samples"""
+    if samples == 0:
+        return 0.0
+    z2 = z * z
+    centre = containment + z2 / (2 * samples)
+    spread = z * math.sqrt(containment * (1 - containment) / samples + z2 / (4 * samples * samples))
+    return max(0.0, (centre - spread) / (1 + z2 / samples))
+
+
+class ColumnSignature:
+    """Mergeable signature of a column's distinct values: bottom-k MinHash, distinct count and HyperLogLog"""
+
+    def __init__(self, num_hashes: int = 1024, precision: int = 12):
+        """
+        Initialize an empty signature
+
+        Args:
+            num_hashes: Number of smallest distinct value hashes kept (k)
+            precision: HyperLogLog precision
+        """
+        self.num_hashes = num_hashes
+        self.minhash = np.empty(0, dtype=np.uint64)
+        self.hll = HyperLogLog(precision)
+        self.rows = 0
+        self.non_null = 0
+        # Distinct non-null values, None when unknown (signatures saved without it)
+        self.distinct: Optional[int] = 0
+
+    def update(self, series: pd.Series) -> "ColumnSignature":
+        """Add the values of a column (or of rows appended to it)"""
+        self.rows += len(series)
+        return self.update_hashes(hash_values(series))
+
+    def update_hashes(self, hashes: np.ndarray) -> "ColumnSignature":
+        """Add non-null values already hashed with hash_values"""
+        if self.non_null:
+            # Values repeating earlier rows are only known from the sketches
+            return self.merge(ColumnSignature(self.num_hashes, self.hll.precision).update_hashes(hashes))
+        self.non_null = len(hashes)
+        self.hll.update_hashes(hashes)
+        hashes = np.unique(hashes)
+        self.distinct = len(hashes)
+        self.minhash = hashes[:self.num_hashes]
+        return self
+
+    def merge(self, other: "ColumnSignature") -> "ColumnSignature":
+        """Combine with the signature of other rows of the same column"""
+        self.distinct = self._merged_distinct(other)
+        self.rows += other.rows
+        self.non_null += other.non_null
+        self.hll.merge(other.hll)
+        self.minhash = np.unique(np.concatenate([self.minhash, other.minhash]))[:self.num_hashes]
+        return self
+
+    def _merged_distinct(self, other: "ColumnSignature") -> Optional[int]:
+        """
+        Distinct values of both signatures' rows together
+
+        The share of values found in both is measured on the hashes below
+        the smaller threshold; it is exact when both sketches are complete,
+        and a count without shared values stays exact.
+        """
+        if self.distinct is None or other.distinct is None:
+            return None
+        threshold = min(self.threshold(), other.threshold())
+        mine = self.minhash[:np.searchsorted(self.minhash, threshold, side="right")]
+        theirs = other.minhash[:np.searchsorted(other.minhash, threshold, side="right")]
+        shared = len(np.intersect1d(mine, theirs, assume_unique=True))
+        if shared == 0:
+            return self.distinct + other.distinct
+        # |A ∪ B| = (|A| + |B|) / (1 + J), with J the Jaccard similarity in the slice
+        jaccard = shared / (len(mine) + len(theirs) - shared)
+        return int(round((self.distinct + other.distinct) / (1 + jaccard)))
+
+    def complete(self) -> bool:
+        """Whether the sketch holds the hashes of all distinct values"""
+        return len(self.minhash) < self.num_hashes
+
+    def threshold(self) -> np.uint64:
+        """Largest hash the sketch covers: every distinct value hashing at or below it is in the sketch"""
+        return MAX_HASH if self.complete() else self.minhash[-1]
+
+    def distinct_count(self) -> int:
+        """Number of distinct non-null values (exact unless appended rows repeated earlier values)"""
+        if self.distinct is not None:
+            return self.distinct
+        return len(self.minhash) if self.complete() else self.hll.count()
+
+    def uniqueness(self) -> float:
+        """Distinct values per non-null value (1.0 for a key)"""
+        return min(1.0, self.distinct_count() / self.non_null) if self.non_null else 0.0
+
+    def containment_in(self, other: "ColumnSignature") -> Tuple[float, int]:
+        """
+        Estimated share of this column's distinct values that occur in another column
+
+        Returns:
+            (containment, samples): the estimate and the number of this
+            column's values it was measured on
+        """
+        threshold = min(self.threshold(), other.threshold())
+        mine = self.minhash[:np.searchsorted(self.minhash, threshold, side="right")]
+        if len(mine) == 0:
+            return 0.0, 0
+        theirs = other.minhash[:np.searchsorted(other.minhash, threshold, side="right")]
+        positions = np.minimum(np.searchsorted(theirs, mine), max(len(theirs) - 1, 0))
+        shared = int(np.count_nonzero(theirs[positions] == mine)) if len(theirs) else 0
+        return shared / len(mine), len(mine)
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        """Arrays to save the signature with np.savez"""
+        hll = self.hll.registers if self.hll.registers is not None else self.hll.hashes
+        return {
+            f"{prefix}minhash": self.minhash,
+            f"{prefix}hll": hll,
+            f"{prefix}counts": np.array([self.num_hashes, self.hll.precision, self.rows, self.non_null,
+                                         self.hll.registers is not None,
+                                         -1 if self.distinct is None else self.distinct], dtype=np.int64)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Any, prefix: str) -> "ColumnSignature":
+        # Signatures saved before distinct counts were kept have five counts
+        num_hashes, precision, rows, non_null, dense, distinct = (arrays[f"{prefix}counts"].tolist() + [-1])[:6]
+        signature = cls(num_hashes, precision)
+        signature.minhash = arrays[f"{prefix}minhash"]
+        signature.rows, signature.non_null = rows, non_null
+        signature.distinct = None if distinct < 0 else distinct
+        if dense:
+            signature.hll.registers, signature.hll.hashes = arrays[f"{prefix}hll"], None
+        else:
+            signature.hll.hashes = arrays[f"{prefix}hll"]
+        return signature
+
+
+class RelationshipEngine:
+    """Store of column signatures for all datasets, and inclusion dependency discovery over it"""
+
+    def __init__(self, num_hashes: int = 1024, precision: int = 12, min_containment: float = 0.95,
+                 min_uniqueness: float = 0.99, min_distinct: int = 2, min_samples: int = 4):
+        """
+        Initialize the engine
+
+        Args:
+            num_hashes: Hashes kept per column signature
+            precision: HyperLogLog precision
+            min_containment: Share of the dependent column's values that must
+                occur in the referenced column
+            min_uniqueness: Distinct values per non-null value of a referenced (key) column
+            min_distinct: Distinct values both columns must have
+            min_samples: Values a containment estimate must rest on
+        """
+        self.num_hashes = num_hashes
+        self.precision = precision
+        self.min_containment = min_containment
+        self.min_uniqueness = min_uniqueness
+        self.min_distinct = min_distinct
+        self.min_samples = min_samples
+        self.directory: Optional[str] = None
+        self._signatures: Dict[str, Dict[str, ColumnSignature]] = {}
+        self._lock = threading.RLock()
+
+    def load(self, directory: str) -> None:
+        """Keep signatures in a directory, loading those saved there before"""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.directory = directory
+            for name in os.listdir(directory):
+                if not name.endswith(".npz"):
+                    continue
+                try:
+                    with np.load(os.path.join(directory, name)) as arrays:
+                        meta = json.loads(str(arrays["meta"]))
+                        self._signatures[meta["dataset_id"]] = {
+                            column: ColumnSignature.from_arrays(arrays, f"{i}_")
+                            for i, column in enumerate(meta["columns"])
+                        }
+                except Exception as e:
+                    logger.error(f"Error loading column signatures {name}: {str(e)}")
+        logger.info(f"Loaded column signatures of {len(self._signatures)} datasets")
+
+    def _path(self, dataset_id: str) -> str:
+        name = hashlib.blake2b(str(dataset_id).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{name}.npz")
+
+    def _save(self, dataset_id: str) -> None:
+        if self.directory is None:
+            return
+        signatures = self._signatures[dataset_id]
+        arrays = {"meta": np.array(json.dumps({"dataset_id": dataset_id, "columns": list(signatures)}))}
+        for i, signature in enumerate(signatures.values()):
+            arrays.update(signature.to_arrays(f"{i}_"))
+        np.savez(self._path(dataset_id), **arrays)
+
+    def add_dataset(self, dataset_id: str, data: pd.DataFrame) -> Dict[str, ColumnSignature]:
+        """
+        Compute and store the signatures of a dataset's columns, replacing earlier ones
+
+        Args:
+            dataset_id: Dataset identifier
+            data: The dataset
+
+        Returns:
+            Signatures of its key-like columns
+        """
+        signatures = {}
+        for column in data.columns:
+            series = data[column]
+            if isinstance(series, pd.Series) and signature_column(series):
+                signatures[str(column)] = ColumnSignature(self.num_hashes, self.precision).update(series)
+        with self._lock:
+            self._signatures[dataset_id] = signatures
+            self._save(dataset_id)
+        return signatures
+
+    def append_rows(self, dataset_id: str, rows: pd.DataFrame) -> None:
+        """Update a stored dataset's signatures with appended rows"""
+        with self._lock:
+            if dataset_id not in self._signatures:
+                self.add_dataset(dataset_id, rows)
+                return
+            signatures = self._signatures[dataset_id]
+            for column, signature in signatures.items():
+                if column in rows.columns:
+                    signature.merge(ColumnSignature(self.num_hashes, self.precision).update(rows[column]))
+            self._save(dataset_id)
+
+    def remove_dataset(self, dataset_id: str) -> None:
+        with self._lock:
+            self._signatures.pop(dataset_id, None)
+            if self.directory is not None and os.path.exists(self._path(dataset_id)):
+                os.remove(self._path(dataset_id))
+
+    def signatures(self, dataset_id: str) -> Dict[str, ColumnSignature]:
+        with self._lock:
+            return dict(self._signatures.get(dataset_id, {}))
+
+    def discover(self, dataset_id: Optional[str] = None,
+                 min_containment: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Inclusion dependencies from dependent columns to key columns
+
+        A key column is one whose values are (nearly) all distinct. Only
+        pairs sharing at least one sketched value are compared.
+
+        Args:
+            dataset_id: Only return dependencies with a column of this dataset
+                on either side (None for all datasets)
+            min_containment: Overrides the engine's minimum containment
+
+        Returns:
+            Dependencies, most confident first, each with the dependent and
+            referenced dataset and column, the estimated containment, the
+            number of values it was measured on, whether the dependent
+            column's name points at the referenced column, and a confidence:
+            the lower bound of the containment, reduced when the names do
+            not match (integer surrogate keys are often contained in each
+            other by chance)
+        """
+        min_containment = self.min_containment if min_containment is None else min_containment
+        with self._lock:
+            columns = [(ds, column, signature) for ds, signatures in self._signatures.items()
+                       for column, signature in signatures.items()
+                       if signature.distinct_count() >= self.min_distinct]
+        keys = [i for i, (_, _, signature) in enumerate(columns) if signature.uniqueness() >= self.min_uniqueness]
+        if not keys:
+            return []
+
+        # Inverted index: sketch hash -> key column
+        index_hashes = np.concatenate([columns[i][2].minhash for i in keys])
+        index_keys = np.concatenate([np.full(len(columns[i][2].minhash), i) for i in keys])
+        order = np.argsort(index_hashes, kind="stable")
+        index_hashes, index_keys = index_hashes[order], index_keys[order]
+
+        dependencies = []
+        for i, (dependent_ds, dependent_column, dependent) in enumerate(columns):
+            start = np.searchsorted(index_hashes, dependent.minhash, side="left")
+            lengths = np.searchsorted(index_hashes, dependent.minhash, side="right") - start
+            # Index positions start[n] .. start[n] + lengths[n] - 1 for every hash n
+            offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            matched = index_keys[np.repeat(start, lengths) + offsets]
+            for j in np.unique(matched):
+                referenced_ds, referenced_column, referenced = columns[j]
+                if j == i or (dataset_id is not None and dataset_id not in (dependent_ds, referenced_ds)):
+                    continue
+                # A containment of min_containment needs |A| <= |B| / min_containment (with room for HLL error)
+                if dependent.distinct_count() > 1.1 * referenced.distinct_count() / max(min_containment, 1e-9):
+                    continue
+                containment, samples = dependent.containment_in(referenced)
+                if containment < min_containment or samples < self.min_samples:
+                    continue
+                dependencies.append({
+                    "type": "inclusion_dependency",
+                    "dependent": {"dataset_id": dependent_ds, "column": dependent_column},
+                    "referenced": {"dataset_id": referenced_ds, "column": referenced_column},
+                    "containment": float(containment),
+                    "samples": samples,
+                    "dependent_distinct": dependent.distinct_count(),
+                    "referenced_distinct": referenced.distinct_count(),
+                    "name_match": names_match(dependent_column, referenced_ds, referenced_column),
+                    "confidence": 0.0
+                })
+                confidence = containment_lower_bound(containment, samples)
+                if not dependencies[-1]["name_match"]:
+                    confidence *= UNNAMED_DEPENDENCY_WEIGHT
+                dependencies[-1]["confidence"] = float(confidence)
+        dependencies.sort(key=lambda dependency: -dependency["confidence"])
+        return dependencies
+
+
+# Shared engine used by dataset uploads and schema detection
+relationship_engine = RelationshipEngine()
@@ -0,0 +1,399 @@
+
+"""
+Row Rule Compiler Module
+
+This module compiles row-level rule conditions, Python expressions over a
+row dict named ``data`` such as ``data['age'] >= 0 and data['age'] < 120``,
+into operations over whole columns. A condition is evaluated for every row
+at once instead of executing it once per row.
+
+Only conditions built from a known subset of Python are compiled:
+- column lookups ``data['col']`` and constants
+- comparisons, including chains, ``is None``, and ``in`` over literal lists
+- ``and`` / ``or`` / ``not`` over boolean expressions
+- arithmetic
+- ``str()``, ``len()`` and ``abs()``
+- string methods: lower, upper, strip, startswith, endswith
+- ``re.match``, ``re.search`` and ``re.fullmatch``
+
+Anything else is left to the caller's row-by-row evaluation.
+
+Compiled conditions give the same result as evaluating each row:
+- Columns are first cast the way DataFrame.iterrows casts row values.
+- Rows holding pd.NA or NaT in a referenced column, or None in a column
+  used other than in ``is None``, ``in`` or ``str()``, are reported for
+  row-by-row evaluation, since Python operators treat these nulls
+  differently from pandas.
+- Operations Python would raise on, such as division by zero, raise
+  FallbackRequired, so the caller can evaluate row by row and surface the
+  same error.
+"""
+
+import ast
+import logging
+import operator
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPARISONS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge
+}
+
+ARITHMETIC = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow
+}
+
+# Functions of the re module and the matching pandas string method
+REGEX_FUNCTIONS = {"match": "match", "search": "contains", "fullmatch": "fullmatch"}
+
+STRING_METHODS = {"lower", "upper", "strip"}
+STRING_PREDICATES = {"startswith", "endswith"}
+
+
+class UnsupportedCondition(Exception):
+    """The condition uses syntax that is not compiled to column operations"""
+
+
+class FallbackRequired(Exception):
+    """The condition must be evaluated row by row for this data, e.g. because Python would raise"""
+
+
+class VectorizedCondition:
+    """A row condition compiled to column operations"""
+
+    def __init__(self, condition: str, tree: ast.AST, columns: List[str], none_unsafe: List[str]):
+        self.condition = condition
+        self.tree = tree
+        self.columns = columns
+        # Columns whose None values must be evaluated row by row
+        self.none_unsafe = set(none_unsafe)
+
+    def evaluate(self, data: pd.DataFrame,
+                 cache: Optional[Dict[str, Tuple[pd.Series, np.ndarray, np.ndarray]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the condition for every row
+
+        Args:
+            data: DataFrame the rows come from
+            cache: Dictionary in which cast columns are kept, to share them between
+                conditions evaluated on the same data
+
+        Returns:
+            (truth value of the condition per row, positions of rows that must
+            be evaluated row by row instead; their truth values are undefined)
+
+        Raises:
+            KeyError: A referenced column does not exist
+            FallbackRequired: Every row must be evaluated row by row
+        """
+        n_rows = len(data)
+        if n_rows == 0:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64)
+        row_dtype = data.iloc[:1].to_numpy().dtype
+        columns = {}
+        odd_nulls = np.zeros(n_rows, dtype=bool)
+        for col in self.columns:
+            if cache is not None and col in cache:
+                values, nones, other_nulls = cache[col]
+            else:
+                values = _row_values(data[col], row_dtype)
+                nones, other_nulls = _odd_nulls(values)
+                if cache is not None:
+                    cache[col] = values, nones, other_nulls
+            odd_nulls |= other_nulls
+            if col in self.none_unsafe:
+                odd_nulls |= nones
+            columns[col] = values
+        try:
+            with np.errstate(all="ignore"):
+                result = _Evaluator(columns).visit(self.tree)
+        except FallbackRequired:
+            raise
+        except Exception as e:
+            # Python would typically raise for some row as well; let the caller find out
+            raise FallbackRequired(str(e)) from e
+        return np.asarray(result, dtype=bool), np.flatnonzero(odd_nulls)
+
+
+@lru_cache(maxsize=256)
+def compile_row_condition(condition: str) -> Optional[VectorizedCondition]:
+    """
+    Compile a row-level rule condition
+
+    Args:
+        condition: Python expression over the row dict ``data``
+
+    Returns:
+        The compiled condition, or None if it cannot be compiled
+    """
+    try:
+        tree = ast.parse(condition.strip(), mode="eval").body
+        checker = _Checker()
+        if checker.visit(tree) != "bool":
+            raise UnsupportedCondition("condition is not a boolean expression")
+    except (SyntaxError, UnsupportedCondition) as e:
+        logger.debug(f"Evaluating condition row by row ({e}): {condition}")
+        return None
+    return VectorizedCondition(condition, tree, sorted(checker.columns), sorted(checker.none_unsafe))
+
+
+def _row_values(series: pd.Series, row_dtype: np.dtype) -> pd.Series:
+    """Column values as DataFrame.iterrows would give them in each row"""
+    if row_dtype.kind in "biuf":
+        # Every column is numeric: rows share one NumPy type
+        return series.astype(row_dtype)
+    if row_dtype == object and isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        return series
+    # Extension, categorical and datetime values become Python objects
+    return series.astype(object)
+
+
+def _odd_nulls(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nulls other than float NaN, which Python operators treat unlike pandas
+
+    Returns:
+        (mask of None values, mask of other non-NaN nulls such as pd.NA and NaT)
+    """
+    nones = np.zeros(len(values), dtype=bool)
+    others = np.zeros(len(values), dtype=bool)
+    if values.dtype == object:
+        array = values.to_numpy()
+        for i in np.flatnonzero(values.isna().to_numpy()):
+            if array[i] is None:
+                nones[i] = True
+            elif not isinstance(array[i], float):
+                others[i] = True
+    return nones, others
+
+
+def _is_data_lookup(node: ast.AST) -> Optional[str]:
+    """The column name if node is data['col'], otherwise None"""
+    if (isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == "data"
+            and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str)):
+        return node.slice.value
+    return None
+
+
+def _is_regex_call(node: ast.AST) -> bool:
+    """Whether a node calls a function of the re module"""
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == "re")
+
+
+def _is_none(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and node.value is None
+
+
+def _literal_collection(node: ast.AST) -> Optional[list]:
+    """Elements of a literal list, tuple or set without nulls, otherwise None"""
+    if not isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return None
+    values = []
+    for element in node.elts:
+        if not isinstance(element, ast.Constant) or element.value is None or element.value != element.value:
+            return None
+        values.append(element.value)
+    return values
+
+
+class _Checker(ast.NodeVisitor):
+    """Checks that a condition is supported and classifies each node as "bool", "str" or "value\""""
+
+    def __init__(self):
+        self.columns = set()
+        self.none_unsafe = set()
+
+    def _visit_none_safe(self, node: ast.AST) -> str:
+        """Visit an operand where None behaves the same in Python and pandas"""
+        column = _is_data_lookup(node)
+        if column is None:
+            return self.visit(node)
+        self.columns.add(column)
+        return "value"
+
+    def generic_visit(self, node: ast.AST) -> str:
+        raise UnsupportedCondition(type(node).__name__)
+
+    def visit_Constant(self, node: ast.Constant) -> str:
+        if node.value is None or not isinstance(node.value, (str, int, float, bool)):
+            raise UnsupportedCondition("constant")
+        return "value"
+
+    def visit_Subscript(self, node: ast.Subscript) -> str:
+        column = _is_data_lookup(node)
+        if column is None:
+            raise UnsupportedCondition("subscript")
+        self.columns.add(column)
+        self.none_unsafe.add(column)
+        return "value"
+
+    def visit_Compare(self, node: ast.Compare) -> str:
+        operands = [node.left] + node.comparators
+        for op, left, right in zip(node.ops, operands[:-1], operands[1:]):
+            if isinstance(op, (ast.Is, ast.IsNot)):
+                if not _is_none(right) or _is_none(left):
+                    raise UnsupportedCondition("identity comparison")
+                self._visit_none_safe(left)
+            elif isinstance(op, (ast.In, ast.NotIn)):
+                if _literal_collection(right) is None:
+                    raise UnsupportedCondition("membership test")
+                self._visit_none_safe(left)
+            elif type(op) in COMPARISONS:
+                self.visit(left)
+                self.visit(right)
+            else:
+                raise UnsupportedCondition("comparison")
+        return "bool"
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> str:
+        if any(self.visit(value) != "bool" for value in node.values):
+            raise UnsupportedCondition("and/or over non-boolean values")
+        return "bool"
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> str:
+        kind = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            if kind != "bool":
+                raise UnsupportedCondition("not over a non-boolean value")
+            return "bool"
+        if isinstance(node.op, (ast.USub, ast.UAdd)) and kind == "value":
+            return "value"
+        raise UnsupportedCondition("unary operator")
+
+    def visit_BinOp(self, node: ast.BinOp) -> str:
+        if type(node.op) not in ARITHMETIC:
+            raise UnsupportedCondition("operator")
+        if self.visit(node.left) == "bool" or self.visit(node.right) == "bool":
+            raise UnsupportedCondition("arithmetic on a boolean expression")
+        return "value"
+
+    def visit_Call(self, node: ast.Call) -> str:
+        if node.keywords:
+            raise UnsupportedCondition("keyword arguments")
+        func = node.func
+        if isinstance(func, ast.Name) and len(node.args) == 1:
+            kind = self._visit_none_safe(node.args[0]) if func.id == "str" else self.visit(node.args[0])
+            if func.id == "str" and kind != "bool":
+                return "str"
+            if func.id == "len" and kind == "str":
+                return "value"
+            if func.id == "abs" and kind == "value":
+                return "value"
+        elif isinstance(func, ast.Attribute):
+            if isinstance(func.value, ast.Name) and func.value.id == "re":
+                if (func.attr in REGEX_FUNCTIONS and len(node.args) == 2
+                        and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)
+                        and self.visit(node.args[1]) == "str"):
+                    return "bool"
+            elif self.visit(func.value) == "str":
+                if func.attr in STRING_METHODS and not node.args:
+                    return "str"
+                if (func.attr in STRING_PREDICATES and len(node.args) == 1
+                        and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                    return "bool"
+        raise UnsupportedCondition("call")
+
+
+class _Evaluator(ast.NodeVisitor):
+    """Evaluates a checked condition over whole columns"""
+
+    def __init__(self, columns: Dict[str, pd.Series]):
+        self.columns = columns
+
+    def visit_Constant(self, node: ast.Constant) -> Any:
+        return node.value
+
+    def visit_Subscript(self, node: ast.Subscript) -> pd.Series:
+        return self.columns[_is_data_lookup(node)]
+
+    def visit_Compare(self, node: ast.Compare) -> pd.Series:
+        result = None
+        left_node, left = node.left, self.visit(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.Is, ast.IsNot)):
+                # re functions are evaluated to whether they matched; Python gives None when they did not
+                outcome = ~_as_series(left) if _is_regex_call(left_node) else _equals_none(left)
+                right = None
+                if isinstance(op, ast.IsNot):
+                    outcome = ~outcome
+            elif isinstance(op, (ast.In, ast.NotIn)):
+                right = _literal_collection(comparator)
+                outcome = _as_series(left).isin(right)
+                if isinstance(op, ast.NotIn):
+                    outcome = ~outcome
+            else:
+                right = self.visit(comparator)
+                outcome = _as_series(COMPARISONS[type(op)](left, right))
+            result = outcome if result is None else result & outcome
+            left_node, left = comparator, right
+        return result
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> pd.Series:
+        values = [self.visit(value) for value in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        result = values[0]
+        for value in values[1:]:
+            result = combine(result, value)
+        return result
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> Any:
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return ~operand
+        return -operand if isinstance(node.op, ast.USub) else +operand
+
+    def visit_BinOp(self, node: ast.BinOp) -> Any:
+        left, right = self.visit(node.left), self.visit(node.right)
+        if isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)) and np.any(np.asarray(right == 0)):
+            raise FallbackRequired("division by zero")
+        if isinstance(node.op, ast.Pow) and np.any(np.asarray((left == 0) & (right < 0)) |
+                                                   np.asarray((left < 0) & (right % 1 != 0))):
+            # Python raises ZeroDivisionError or returns a complex number here
+            raise FallbackRequired("power outside the real numbers")
+        return ARITHMETIC[type(node.op)](left, right)
+
+    def visit_Call(self, node: ast.Call) -> Any:
+        func = node.func
+        if isinstance(func, ast.Name):
+            argument = self.visit(node.args[0])
+            if func.id == "str":
+                return _as_series(argument).map(str).astype(object)
+            if func.id == "len":
+                return argument.str.len()
+            return abs(argument)
+        if isinstance(func.value, ast.Name) and func.value.id == "re":
+            pattern = node.args[0].value
+            return getattr(self.visit(node.args[1]).str, REGEX_FUNCTIONS[func.attr])(pattern).astype(bool)
+        values = self.visit(func.value)
+        if func.attr in STRING_METHODS:
+            return getattr(values.str, func.attr)()
+        return getattr(values.str, func.attr)(node.args[0].value).astype(bool)
+
+
+def _as_series(value: Any) -> pd.Series:
+    if isinstance(value, pd.Series):
+        return value
+    raise FallbackRequired("expression without a column")
+
+
+def _equals_none(values: Any) -> pd.Series:
+    """Whether each value is None"""
+    values = _as_series(values)
+    result = np.zeros(len(values), dtype=bool)
+    if values.dtype == object:
+        array = values.to_numpy()
+        null_positions = np.flatnonzero(values.isna().to_numpy())
+        result[null_positions] = [array[i] is None for i in null_positions]
+    return pd.Series(result, index=values.index)
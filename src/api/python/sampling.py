@@ -0,0 +1,279 @@
+
+"""
+Dataset Sampling Module
+
+This module draws seeded, reproducible row samples from datasets that may
+be larger than memory, for analyses that only need a representative sample
+(such as schema detection):
+- CSV, JSON-lines and SQL sources are read once in chunks into a
+  reservoir: every row gets a random key and the rows with the smallest
+  keys are kept, which is a uniform sample without replacement
+- stratified samples keep a reservoir per value of a column and allocate
+  the sample to the values in proportion to their counts, with at least
+  one row for every value
+- Parquet files are sampled by row group from the file metadata, reading
+  only the chosen row groups
+
+Samples keep the rows in their original order. The same seed gives the same
+sample of the same data, whatever the chunk size.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CSV_EXTENSIONS = (".csv", ".tsv", ".txt")
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+class Reservoir:
+    """
+    Bottom-k reservoir: keeps the rows with the smallest random keys
+
+    Keys come from one seeded generator in row order, so the sample does
+    not depend on how the rows are split into chunks.
+    """
+
+    def __init__(self, sample_size: int, seed: int = 0, stratify_by: Optional[str] = None):
+        """
+        Initialize the reservoir
+
+        Args:
+            sample_size: Number of rows to sample
+            seed: Seed of the row keys
+            stratify_by: Column to stratify the sample by (None for a uniform sample);
+                up to sample_size rows are kept per value, so it should have few values
+        """
+        self.sample_size = sample_size
+        self.stratify_by = stratify_by
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.kept: Optional[pd.DataFrame] = None
+        self.keys = np.empty(0)
+        self.positions = np.empty(0, dtype=np.int64)
+        self.strata_counts = pd.Series(dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Offer the next rows of the dataset"""
+        keys = self.rng.random(len(chunk))
+        positions = np.arange(self.rows, self.rows + len(chunk))
+        self.rows += len(chunk)
+        if self.kept is None:
+            self.kept = chunk.iloc[:0]
+        if len(chunk) == 0 or self.sample_size <= 0:
+            return
+
+        if self.stratify_by is None:
+            if len(self.keys) >= self.sample_size:
+                # Only rows with a key below the largest kept key can enter
+                candidates = keys < self.keys.max()
+                chunk, keys, positions = chunk[candidates], keys[candidates], positions[candidates]
+        else:
+            counts = chunk[self.stratify_by].value_counts(dropna=False)
+            self.strata_counts = self.strata_counts.add(counts, fill_value=0).astype(np.int64)
+        self._merge(chunk, keys, positions)
+
+    def _merge(self, chunk: pd.DataFrame, keys: np.ndarray, positions: np.ndarray) -> None:
+        if len(chunk) == 0:
+            return
+        frame = chunk if len(self.kept) == 0 else pd.concat([self.kept, chunk])
+        keys = np.concatenate([self.keys, keys])
+        positions = np.concatenate([self.positions, positions])
+        if self.stratify_by is None:
+            if len(keys) > self.sample_size:
+                keep = np.argpartition(keys, self.sample_size - 1)[:self.sample_size]
+            else:
+                keep = np.arange(len(keys))
+        else:
+            # The sample_size smallest keys of each stratum
+            strata = pd.factorize(frame[self.stratify_by], use_na_sentinel=False)[0]
+            order = np.lexsort((keys, strata))
+            rank = pd.Series(strata[order]).groupby(strata[order]).cumcount().to_numpy()
+            keep = order[rank < self.sample_size]
+        self.kept = frame.iloc[keep]
+        self.keys = keys[keep]
+        self.positions = positions[keep]
+
+    def sample(self) -> pd.DataFrame:
+        """The sampled rows, in their original order"""
+        if self.kept is None:
+            return pd.DataFrame()
+        if self.stratify_by is None:
+            keep = np.arange(len(self.kept))
+        else:
+            keep = self._stratified_selection()
+        keep = keep[np.argsort(self.positions[keep], kind="stable")]
+        return self.kept.iloc[keep].reset_index(drop=True)
+
+    def _stratified_selection(self) -> np.ndarray:
+        """Positions in the reservoir of a sample allocated to strata in proportion to their counts"""
+        counts = self.strata_counts
+        if counts.sum() <= self.sample_size:
+            return np.arange(len(self.kept))
+        # Largest remainder allocation, with one row for each stratum when there is room
+        shares = counts.to_numpy() * self.sample_size / counts.sum()
+        allocation = np.floor(shares).astype(np.int64)
+        if len(counts) <= self.sample_size:
+            allocation = np.maximum(allocation, 1)
+        remainder = self.sample_size - allocation.sum()
+        if remainder > 0:
+            allocation[np.argsort(allocation - shares, kind="stable")[:remainder]] += 1
+        elif remainder < 0:
+            # The minimum of one row took more than the sample: trim the largest strata
+            for i in np.argsort(-allocation, kind="stable"):
+                take = min(-remainder, allocation[i] - 1)
+                allocation[i] -= take
+                remainder += take
+                if remainder == 0:
+                    break
+        allocation = np.minimum(allocation, counts.to_numpy())
+
+        strata_values = pd.Series(self.kept[self.stratify_by].to_numpy())
+        selected = []
+        for value, n in zip(counts.index, allocation):
+            members = np.flatnonzero(strata_values.isna().to_numpy() if pd.isna(value)
+                                     else (strata_values == value).to_numpy())
+            selected.append(members[np.argsort(self.keys[members], kind="stable")[:n]])
+        return np.concatenate(selected) if selected else np.empty(0, dtype=np.int64)
+
+
+class DatasetSampler:
+    """Seeded row samples of files, databases and DataFrames in one streaming pass"""
+
+    def __init__(self, chunksize: int = 100_000, row_group_oversampling: int = 10, min_row_groups: int = 4):
+        """
+        Initialize the sampler
+
+        Args:
+            chunksize: Rows read at a time from CSV, JSON-lines and SQL sources
+            row_group_oversampling: Parquet row groups are read until they hold
+                this many times the sample size
+            min_row_groups: Parquet row groups read at least (when the file has them),
+                so a sample is not drawn from one row group of sorted data
+        """
+        self.chunksize = chunksize
+        self.row_group_oversampling = row_group_oversampling
+        self.min_row_groups = min_row_groups
+
+    def sample_chunks(self, chunks: Iterable[pd.DataFrame], sample_size: int, seed: int = 0,
+                      stratify_by: Optional[str] = None) -> pd.DataFrame:
+        """
+        Sample rows from a sequence of DataFrame chunks in one pass
+
+        Args:
+            chunks: Consecutive chunks of the dataset
+            sample_size: Number of rows to sample
+            seed: Seed of the sample
+            stratify_by: Column to stratify the sample by
+
+        Returns:
+            Sampled rows in their original order, with a new index
+        """
+        reservoir = Reservoir(sample_size, seed, stratify_by)
+        for chunk in chunks:
+            reservoir.update(chunk)
+        return reservoir.sample()
+
+    def sample_frame(self, data: pd.DataFrame, sample_size: int, seed: int = 0,
+                     stratify_by: Optional[str] = None) -> pd.DataFrame:
+        """Sample rows of an in-memory DataFrame, the same rows as streaming it would give"""
+        return self.sample_chunks([data], sample_size, seed, stratify_by)
+
+    def sample_csv(self, path: str, sample_size: int, seed: int = 0, stratify_by: Optional[str] = None,
+                   **read_csv_kwargs) -> pd.DataFrame:
+        """Sample rows of a CSV file, reading it once in chunks"""
+        with pd.read_csv(path, chunksize=self.chunksize, **read_csv_kwargs) as chunks:
+            return self.sample_chunks(chunks, sample_size, seed, stratify_by)
+
+    def sample_json_lines(self, path: str, sample_size: int, seed: int = 0,
+                          stratify_by: Optional[str] = None) -> pd.DataFrame:
+        """Sample rows of a JSON-lines file, reading it once in chunks"""
+        with pd.read_json(path, lines=True, chunksize=self.chunksize) as chunks:
+            return self.sample_chunks(chunks, sample_size, seed, stratify_by)
+
+    def sample_sql(self, query: str, connection: Any, sample_size: int, seed: int = 0,
+                   stratify_by: Optional[str] = None, **read_sql_kwargs) -> pd.DataFrame:
+        """
+        Sample rows of a query result, fetching it once in chunks
+
+        The sample is reproducible when the query returns rows in a stable
+        order (use ORDER BY).
+        """
+        chunks = pd.read_sql(query, connection, chunksize=self.chunksize, **read_sql_kwargs)
+        return self.sample_chunks(chunks, sample_size, seed, stratify_by)
+
+    def sample_parquet(self, path: str, sample_size: int, seed: int = 0,
+                       columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Sample rows of a Parquet file, reading only some of its row groups
+
+        Row groups are chosen at random until they hold row_group_oversampling
+        times the sample size (and at least min_row_groups of them), and the
+        rows are sampled uniformly from the chosen groups.
+        """
+        if pq is None:
+            logger.warning("pyarrow is not installed; reading the whole Parquet file to sample it")
+            return self.sample_frame(pd.read_parquet(path, columns=columns), sample_size, seed)
+
+        parquet_file = pq.ParquetFile(path)
+        metadata = parquet_file.metadata
+        sizes = np.array([metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)], dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        if sizes.sum() <= sample_size:
+            return parquet_file.read(columns=columns).to_pandas()
+
+        order = rng.permutation(len(sizes))
+        covered = np.cumsum(sizes[order])
+        enough = int(np.searchsorted(covered, sample_size * self.row_group_oversampling)) + 1
+        chosen = np.sort(order[:max(enough, min(self.min_row_groups, len(sizes)))])
+        table = parquet_file.read_row_groups(chosen.tolist(), columns=columns)
+        rows = np.sort(rng.choice(table.num_rows, size=min(sample_size, table.num_rows), replace=False))
+        return table.take(rows).to_pandas()
+
+    def sample_file(self, path: str, sample_size: int, seed: int = 0,
+                    stratify_by: Optional[str] = None) -> pd.DataFrame:
+        """
+        Sample rows of a data file, choosing the reader by its extension
+
+        JSON documents and Excel files cannot be read in chunks; they are read
+        whole and then sampled.
+
+        Args:
+            path: CSV, TSV, JSON-lines, JSON, Parquet or Excel file
+            sample_size: Number of rows to sample
+            seed: Seed of the sample
+            stratify_by: Column to stratify the sample by (Parquet samples are not stratified)
+
+        Returns:
+            Sampled rows
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension in CSV_EXTENSIONS:
+            options: Dict[str, Any] = {"sep": "\t"} if extension == ".tsv" else {}
+            return self.sample_csv(path, sample_size, seed, stratify_by, **options)
+        if extension in JSON_LINES_EXTENSIONS:
+            return self.sample_json_lines(path, sample_size, seed, stratify_by)
+        if extension in PARQUET_EXTENSIONS:
+            return self.sample_parquet(path, sample_size, seed)
+        if extension == ".json":
+            return self.sample_frame(pd.read_json(path), sample_size, seed, stratify_by)
+        if extension in (".xlsx", ".xls"):
+            return self.sample_frame(pd.read_excel(path), sample_size, seed, stratify_by)
+        raise ValueError(f"Unsupported file format: {path}")
+
+
+# Shared sampler used by schema detection
+dataset_sampler = DatasetSampler()
@@ -0,0 +1,414 @@
+
+"""
+Schema Registry Module
+
+This module keeps the latest detected schema of each dataset lineage (the
+successive uploads of one feed) and checks new uploads against it cheaply:
+- each column gets a profile: its fingerprint, dtype, null share and a
+  distribution sketch (a t-digest for numeric and datetime columns, the
+  shares of its most frequent values otherwise)
+- a new upload is compared column by column with the stored profiles:
+  columns with the same fingerprint are unchanged, the others are compared
+  by the population stability index (PSI) and, for numeric columns, the
+  Kolmogorov-Smirnov (KS) statistic of the two sketches
+- only drifted, retyped and added columns need full schema detection; the
+  stored schemas of the other columns are reused
+- every check that finds a change produces a drift report, which is logged
+  and kept with the lineage
+
+Entries are saved as JSON files in a directory, one per lineage.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .fingerprint import fingerprint_column
+    from .sketches import TDigest
+except ImportError:
+    from fingerprint import fingerprint_column
+    from sketches import TDigest
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Share given to empty PSI bins, so the index stays finite
+PSI_EPSILON = 1e-4
+
+# Key of the share of values outside the stored most frequent values
+OTHER_VALUES = "__other__"
+
+# Column statuses whose schema must be detected again
+REANALYZE_STATUSES = ("drifted", "type_changed", "added")
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoding of NumPy scalars, arrays and other values in stored schemas"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """PSI of two distributions given as shares of the same bins"""
+    expected = np.maximum(np.asarray(expected, dtype=float), PSI_EPSILON)
+    actual = np.maximum(np.asarray(actual, dtype=float), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_critical_value(n: int, m: int, alpha: float) -> float:
+    """KS statistic above which two samples of sizes n and m differ at significance alpha"""
+    if n == 0 or m == 0:
+        return math.inf
+    return math.sqrt(-0.5 * math.log(alpha / 2)) * math.sqrt((n + m) / (n * m))
+
+
+class ColumnProfile:
+    """Fingerprint, null share and distribution sketch of a column"""
+
+    def __init__(self, kind: str, dtype: str, fingerprint: str, rows: int, nulls: int,
+                 digest: Optional[TDigest] = None, shares: Optional[Dict[str, float]] = None):
+        self.kind = kind
+        self.dtype = dtype
+        self.fingerprint = fingerprint
+        self.rows = rows
+        self.nulls = nulls
+        self.digest = digest
+        self.shares = shares
+
+    @classmethod
+    def from_series(cls, series: pd.Series, compression: float = 100,
+                    max_categories: int = 100) -> "ColumnProfile":
+        """
+        Profile a column
+
+        Args:
+            series: Column to profile
+            compression: t-digest compression of numeric columns
+            max_categories: Most frequent values kept for other columns
+
+        Returns:
+            The column's profile
+        """
+        dtype = series.dtype
+        values = series.dropna()
+        fingerprint = fingerprint_column(series)
+        nulls = len(series) - len(values)
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            digest = TDigest(compression).update(values.to_numpy(dtype=float))
+            return cls("numeric", str(dtype), fingerprint, len(series), nulls, digest=digest)
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            nanoseconds = values.to_numpy(dtype="datetime64[ns]").view(np.int64).astype(float)
+            digest = TDigest(compression).update(nanoseconds)
+            return cls("datetime", str(dtype), fingerprint, len(series), nulls, digest=digest)
+
+        try:
+            counts = values.value_counts()
+        except TypeError:
+            # Unhashable objects, e.g. lists
+            counts = values.astype(str).value_counts()
+        shares: Dict[str, float] = {}
+        if len(values):
+            for value, count in counts.iloc[:max_categories].items():
+                key = str(value)
+                shares[key] = shares.get(key, 0.0) + count / len(values)
+            shares[OTHER_VALUES] = max(0.0, 1.0 - sum(shares.values()))
+        return cls("categorical", str(dtype), fingerprint, len(series), nulls, shares=shares)
+
+    @property
+    def non_null(self) -> int:
+        return self.rows - self.nulls
+
+    @property
+    def null_share(self) -> float:
+        return self.nulls / self.rows if self.rows else 0.0
+
+    def psi(self, other: "ColumnProfile", bins: int = 10) -> float:
+        """PSI of another profile of the same column against this one"""
+        if self.kind == "categorical":
+            keys = sorted(set(self.shares) | set(other.shares))
+            return population_stability_index([self.shares.get(key, 0.0) for key in keys],
+                                              [other.shares.get(key, 0.0) for key in keys])
+        if self.digest.count == 0 or other.digest.count == 0:
+            return 0.0
+        # Bins are this profile's quantiles, so each holds about 1 / bins of its values
+        edges = np.unique(self.digest.quantiles([i / bins for i in range(1, bins)]))
+        expected = np.diff(np.concatenate([[0.0], self.digest.cdf(edges), [1.0]]))
+        actual = np.diff(np.concatenate([[0.0], other.digest.cdf(edges), [1.0]]))
+        return population_stability_index(expected, actual)
+
+    def ks(self, other: "ColumnProfile") -> Optional[float]:
+        """KS statistic of another profile of the same column against this one (numeric columns only)"""
+        if self.kind == "categorical":
+            return None
+        if self.digest.count == 0 or other.digest.count == 0:
+            return 0.0
+        points = np.unique(np.concatenate([self.digest.means, other.digest.means,
+                                           [self.digest.min, self.digest.max, other.digest.min, other.digest.max]]))
+        return float(np.max(np.abs(self.digest.cdf(points) - other.digest.cdf(points))))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"kind": self.kind, "dtype": self.dtype, "fingerprint": self.fingerprint,
+                "rows": self.rows, "nulls": self.nulls}
+        if self.digest is not None:
+            data["digest"] = {
+                "compression": self.digest.compression,
+                "means": self.digest.means.tolist(),
+                "weights": self.digest.weights.tolist(),
+                "min": self.digest.min if self.digest.count else None,
+                "max": self.digest.max if self.digest.count else None
+            }
+        if self.shares is not None:
+            data["shares"] = self.shares
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnProfile":
+        digest = None
+        if "digest" in data:
+            stored = data["digest"]
+            digest = TDigest(stored["compression"])
+            digest.means = np.asarray(stored["means"], dtype=float)
+            digest.weights = np.asarray(stored["weights"], dtype=float)
+            if stored["min"] is not None:
+                digest.min, digest.max = stored["min"], stored["max"]
+        return cls(data["kind"], data["dtype"], data["fingerprint"], data["rows"], data["nulls"],
+                   digest=digest, shares=data.get("shares"))
+
+
+class SchemaRegistry:
+    """Latest schema and column profiles of each dataset lineage, with drift checks"""
+
+    def __init__(self, psi_threshold: float = 0.2, ks_alpha: float = 0.01, null_threshold: float = 0.05,
+                 psi_bins: int = 10, compression: float = 100, max_categories: int = 100,
+                 max_reports: int = 20):
+        """
+        Initialize the registry
+
+        Args:
+            psi_threshold: PSI at or above which a column has drifted (0.2 is a significant shift)
+            ks_alpha: Significance of the KS test of numeric columns
+            null_threshold: Change of a column's null share at or above which it has drifted
+            psi_bins: Quantile bins of the PSI of numeric columns
+            compression: t-digest compression of numeric column profiles
+            max_categories: Most frequent values kept in other column profiles
+            max_reports: Drift reports kept per lineage
+        """
+        self.psi_threshold = psi_threshold
+        self.ks_alpha = ks_alpha
+        self.null_threshold = null_threshold
+        self.psi_bins = psi_bins
+        self.compression = compression
+        self.max_categories = max_categories
+        self.max_reports = max_reports
+        self.directory: Optional[str] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def load(self, directory: str) -> None:
+        """Keep entries in a directory, loading those saved there before"""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.directory = directory
+            for name in os.listdir(directory):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(directory, name), "r") as f:
+                        entry = json.load(f)
+                    entry["profiles"] = {column: ColumnProfile.from_dict(profile)
+                                         for column, profile in entry["profiles"].items()}
+                    self._entries[entry["lineage"]] = entry
+                except Exception as e:
+                    logger.error(f"Error loading schema registry entry {name}: {str(e)}")
+        logger.info(f"Loaded schemas of {len(self._entries)} dataset lineages")
+
+    def _path(self, lineage: str) -> str:
+        name = hashlib.blake2b(str(lineage).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _save(self, lineage: str) -> None:
+        if self.directory is None:
+            return
+        entry = dict(self._entries[lineage])
+        entry["profiles"] = {column: profile.to_dict() for column, profile in entry["profiles"].items()}
+        path = self._path(lineage)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(entry, f, default=_json_default)
+        os.replace(f"{path}.tmp", path)
+
+    def get(self, lineage: str) -> Optional[Dict[str, Any]]:
+        """Stored entry of a lineage: its fingerprint, column schemas, column profiles and drift reports"""
+        with self._lock:
+            return self._entries.get(lineage)
+
+    def reports(self, lineage: str) -> List[Dict[str, Any]]:
+        """Drift reports of a lineage, oldest first"""
+        entry = self.get(lineage)
+        return list(entry["reports"]) if entry else []
+
+    def remove(self, lineage: str) -> None:
+        """Forget a lineage"""
+        with self._lock:
+            self._entries.pop(lineage, None)
+            if self.directory is not None and os.path.exists(self._path(lineage)):
+                os.remove(self._path(lineage))
+
+    def profile(self, data: pd.DataFrame, lineage: Optional[str] = None,
+                fingerprints: Optional[List[str]] = None) -> Dict[str, ColumnProfile]:
+        """
+        Profile the columns of a DataFrame
+
+        Columns whose fingerprint matches the stored profile of the lineage
+        reuse it instead of being sketched again.
+
+        Args:
+            data: DataFrame to profile
+            lineage: Lineage whose stored profiles can be reused
+            fingerprints: Column fingerprints, if already computed
+
+        Returns:
+            Profile of each column, by column name
+        """
+        entry = self.get(lineage) if lineage is not None else None
+        stored = entry["profiles"] if entry else {}
+        if fingerprints is None:
+            fingerprints = [fingerprint_column(data.iloc[:, i]) for i in range(data.shape[1])]
+        profiles = {}
+        for i, column in enumerate(data.columns):
+            previous = stored.get(str(column))
+            if previous is not None and previous.fingerprint == fingerprints[i]:
+                profiles[str(column)] = previous
+            else:
+                profiles[str(column)] = ColumnProfile.from_series(data.iloc[:, i], self.compression,
+                                                                  self.max_categories)
+        return profiles
+
+    def check(self, lineage: str, profiles: Dict[str, ColumnProfile]) -> Optional[Dict[str, Any]]:
+        """
+        Compare an upload's column profiles with the stored ones of its lineage
+
+        Args:
+            lineage: Dataset lineage
+            profiles: Column profiles of the upload (see profile())
+
+        Returns:
+            Drift report, or None when the lineage has no stored schema. Each
+            column gets a status: "unchanged" (same values), "stable",
+            "drifted", "type_changed" or "added"; drifted columns list the
+            reasons. Columns no longer present are listed under "removed".
+        """
+        entry = self.get(lineage)
+        if entry is None:
+            return None
+        stored = entry["profiles"]
+        columns = {}
+        for column, profile in profiles.items():
+            reference = stored.get(column)
+            if reference is None:
+                columns[column] = {"status": "added"}
+            elif reference.fingerprint == profile.fingerprint:
+                columns[column] = {"status": "unchanged"}
+            elif reference.kind != profile.kind or reference.dtype != profile.dtype:
+                columns[column] = {"status": "type_changed", "previous_dtype": reference.dtype, "dtype": profile.dtype}
+            else:
+                columns[column] = self._compare(reference, profile)
+
+        report = {
+            "lineage": lineage,
+            "checked_at": datetime.now().isoformat(),
+            "columns": columns,
+            "removed": [column for column in stored if column not in profiles]
+        }
+        for status in ("unchanged", "stable", "drifted", "type_changed", "added"):
+            report[status] = [column for column, result in columns.items() if result["status"] == status]
+        report["has_drift"] = bool(report["drifted"] or report["type_changed"] or report["added"] or report["removed"])
+        return report
+
+    def _compare(self, reference: ColumnProfile, profile: ColumnProfile) -> Dict[str, Any]:
+        """Drift statistics of a changed column"""
+        result = {
+            "psi": reference.psi(profile, self.psi_bins),
+            "null_share": profile.null_share,
+            "previous_null_share": reference.null_share
+        }
+        reasons = []
+        if result["psi"] >= self.psi_threshold:
+            reasons.append("psi")
+        ks = reference.ks(profile)
+        if ks is not None:
+            result["ks"] = ks
+            result["ks_critical"] = ks_critical_value(reference.non_null, profile.non_null, self.ks_alpha)
+            if ks > result["ks_critical"]:
+                reasons.append("ks")
+        if abs(profile.null_share - reference.null_share) >= self.null_threshold \
+                or (reference.nulls == 0) != (profile.nulls == 0):
+            reasons.append("null_share")
+        result["status"] = "drifted" if reasons else "stable"
+        result["reasons"] = reasons
+        return result
+
+    def columns_to_analyze(self, lineage: str, report: Optional[Dict[str, Any]],
+                           columns: List[Any]) -> List[Any]:
+        """Columns whose schema must be detected again, given a drift report (all without one)"""
+        entry = self.get(lineage)
+        if report is None or entry is None:
+            return list(columns)
+        return [column for column in columns
+                if report["columns"][str(column)]["status"] in REANALYZE_STATUSES
+                or str(column) not in entry["columns"]]
+
+    def register(self, lineage: str, fingerprint: str, profiles: Dict[str, ColumnProfile],
+                 column_schemas: Dict[str, Any], report: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store the schema of a lineage's latest upload
+
+        The drift report is logged and kept when it shows a change. Nothing
+        is written when the upload is the stored one.
+
+        Args:
+            lineage: Dataset lineage
+            fingerprint: Fingerprint of the upload
+            profiles: Its column profiles
+            column_schemas: Its detected column schemas
+            report: Drift report of the upload against the stored schema
+        """
+        with self._lock:
+            entry = self._entries.get(lineage)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                return
+            reports = list(entry["reports"]) if entry else []
+            if report is not None and (report["has_drift"] or report["stable"]):
+                if report["has_drift"]:
+                    logger.warning(
+                        f"Schema drift in lineage {lineage}: drifted {report['drifted']}, "
+                        f"type changed {report['type_changed']}, added {report['added']}, "
+                        f"removed {report['removed']}"
+                    )
+                reports = (reports + [report])[-self.max_reports:]
+            self._entries[lineage] = {
+                "lineage": lineage,
+                "fingerprint": fingerprint,
+                "updated_at": datetime.now().isoformat(),
+                "columns": {str(column): copy.deepcopy(schema) for column, schema in column_schemas.items()},
+                "profiles": profiles,
+                "reports": reports
+            }
+            self._save(lineage)
+
+
+# Shared registry used by schema detection and dataset processing
+schema_registry = SchemaRegistry()
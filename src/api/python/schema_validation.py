@@ -15,6 +15,11 @@ import logging
 from pydantic import BaseModel, ValidationError, create_model, validator
 from datetime import datetime
 
+try:
+    from .columnar_validation import schema_engine
+except ImportError:
+    from columnar_validation import schema_engine
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,48 +45,19 @@ class SchemaValidator:
             Dictionary containing validation results
         """
         try:
-            # Generate a Pydantic model from the schema definition
-            model = self._create_pydantic_model(schema_def)
-            
-            # Track validation results
-            valid_rows = 0
-            invalid_rows = 0
-            validation_errors = []
+            # Validate all columns at once; the compiled schema is cached by hash
+            result = schema_engine.validate(data, schema_def)
+            valid_rows = result.valid_rows
             
-            # Validate each row
-            for index, row in data.iterrows():
-                try:
-                    # Convert row to dict and validate
-                    row_dict = row.to_dict()
-                    model(**row_dict)
-                    valid_rows += 1
-                except ValidationError as e:
-                    invalid_rows += 1
-                    
-                    # Format error for easier consumption
-                    errors = []
-                    for error in e.errors():
-                        errors.append({
-                            "field": ".".join(str(loc) for loc in error["loc"]),
-                            "error": error["msg"],
-                            "value": str(error.get("input", ""))
-                        })
-                    
-                    validation_errors.append({
-                        "row_index": int(index),
-                        "errors": errors
-                    })
-                    
-                    # Limit to 100 errors for performance
-                    if len(validation_errors) >= 100:
-                        break
+            # Materialize detailed errors for failing rows only, limited to 100 for performance
+            validation_errors = result.row_errors(limit=100)
             
             return {
                 "success": True,
                 "summary": {
                     "total_rows": len(data),
                     "valid_rows": valid_rows,
-                    "invalid_rows": invalid_rows,
+                    "invalid_rows": result.invalid_rows,
                     "validation_rate": (valid_rows / len(data) * 100) if len(data) > 0 else 0
                 },
                 "errors": validation_errors,
@@ -96,85 +72,8 @@ class SchemaValidator:
             }
     
     def _create_pydantic_model(self, schema_def: Dict[str, Any]) -> Type[BaseModel]:
-        """Create a Pydantic model from a schema definition"""
-        field_types = {}
-        validators = {}
-        
-        for field_name, field_config in schema_def.items():
-            # Get field type
-            field_type = self._get_python_type(field_config.get("type", "string"))
-            
-            # Handle required vs optional fields
-            if not field_config.get("required", True):
-                field_type = Optional[field_type]
-                
-            # Add field to model
-            field_types[field_name] = (field_type, ...)
-            
-            # Add constraints as validators
-            constraints = field_config.get("constraints", {})
-            if constraints:
-                validator_name = f"validate_{field_name}"
-                
-                # Create validator function dynamically
-                def make_validator(field, constraints):
-                    def validate_field(cls, value):
-                        if value is None and not field_config.get("required", True):
-                            return None
-                            
-                        if "min" in constraints and value < constraints["min"]:
-                            raise ValueError(
-                                f"Value must be >= {constraints['min']}"
-                            )
-                            
-                        if "max" in constraints and value > constraints["max"]:
-                            raise ValueError(
-                                f"Value must be <= {constraints['max']}"
-                            )
-                            
-                        if "min_length" in constraints and len(str(value)) < constraints["min_length"]:
-                            raise ValueError(
-                                f"Length must be >= {constraints['min_length']}"
-                            )
-                            
-                        if "max_length" in constraints and len(str(value)) > constraints["max_length"]:
-                            raise ValueError(
-                                f"Length must be <= {constraints['max_length']}"
-                            )
-                            
-                        if "regex" in constraints:
-                            import re
-                            pattern = constraints["regex"]
-                            if not re.match(pattern, str(value)):
-                                raise ValueError(
-                                    f"Value must match pattern: {pattern}"
-                                )
-                                
-                        if "allowed_values" in constraints and value not in constraints["allowed_values"]:
-                            raise ValueError(
-                                f"Value must be one of: {constraints['allowed_values']}"
-                            )
-                            
-                        return value
-                    
-                    return validate_field
-                
-                validators[validator_name] = validator(field_name)(make_validator(field_name, constraints))
-        
-        # Create model dynamically
-        model_name = schema_def.get("name", "DataModel")
-        
-        # Create the model class
-        model = create_model(
-            model_name,
-            **field_types
-        )
-        
-        # Add validators to the model
-        for name, func in validators.items():
-            setattr(model, name, func)
-            
-        return model
+        """Get the (cached) Pydantic model for a schema definition"""
+        return schema_engine.compile(schema_def).model
     
     def _get_python_type(self, type_str: str) -> Type:
         """Convert schema type string to Python type"""
@@ -0,0 +1,445 @@
+
+"""
+Streaming Sketches Module
+
+This module provides small mergeable summaries for computing column
+statistics over data that is processed in chunks: running moments,
+pairwise co-moments for correlations, a t-digest for quantiles, a
+Misra-Gries summary for frequent values and a HyperLogLog counter for
+distinct values. Each sketch can be updated chunk by chunk and merged with another sketch
+of the same kind, so statistics can be built per chunk or per worker and
+combined afterwards.
+"""
+
+import math
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """Count, mean, variance, min and max, merged with Chan's parallel update"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: Any) -> "RunningMoments":
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        other = RunningMoments()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        return self.merge(other)
+
+    def add_constant(self, value: float, count: int) -> "RunningMoments":
+        """Account for count copies of one value, e.g. an imputed fill value"""
+        if count <= 0:
+            return self
+        other = RunningMoments()
+        other.count = int(count)
+        other.mean = float(value)
+        other.min = other.max = float(value)
+        return self.merge(other)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.count - ddof) if self.count > ddof else float("nan")
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(self.variance(ddof))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "std": self.std() if self.count > 1 else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+
+class PairwiseMoments:
+    """
+    Co-moments of every pair of columns, for Pearson correlations
+
+    Each pair is summarized over the rows where both of its values are
+    finite, as DataFrame.corr does. Chunks are reduced with matrix products,
+    centred on the chunk's column means, and merged with Chan's update.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.n = np.zeros((k, k))
+        self.mean_x = np.zeros((k, k))
+        self.mean_y = np.zeros((k, k))
+        self.cxx = np.zeros((k, k))
+        self.cyy = np.zeros((k, k))
+        self.cxy = np.zeros((k, k))
+
+    def update(self, values: np.ndarray, positions: Optional[List[int]] = None) -> "PairwiseMoments":
+        """
+        Add rows of a float matrix
+
+        Args:
+            values: Matrix with one column per variable; NaN and infinite values are missing
+            positions: Variable of each matrix column (all variables, in order, by default)
+        """
+        values = np.asarray(values, dtype=float)
+        if positions is None:
+            positions = list(range(self.k))
+        if values.shape[0] == 0 or len(positions) == 0:
+            return self
+        finite = np.isfinite(values)
+        present = finite.astype(float)
+        counts = present.sum(axis=0)
+        shift = np.divide(np.where(finite, values, 0).sum(axis=0), counts,
+                          out=np.zeros(len(positions)), where=counts > 0)
+        centred = np.where(finite, values - shift, 0)
+
+        # [i, j] entries are sums over the rows where both i and j are finite
+        n = present.T @ present
+        sum_x = centred.T @ present
+        sum_xx = (centred * centred).T @ present
+        sum_xy = centred.T @ centred
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x = np.where(n > 0, sum_x / n, 0)
+            mean_y = mean_x.T.copy()
+            cxx = np.maximum(sum_xx - sum_x * mean_x, 0)
+            cyy = cxx.T.copy()
+            cxy = sum_xy - sum_x * mean_y
+
+        other = PairwiseMoments(self.k)
+        index = np.ix_(positions, positions)
+        other.n[index] = n
+        other.mean_x[index] = np.where(n > 0, mean_x + shift[:, None], 0)
+        other.mean_y[index] = np.where(n > 0, mean_y + shift[None, :], 0)
+        other.cxx[index], other.cyy[index], other.cxy[index] = cxx, cyy, cxy
+        return self.merge(other)
+
+    def merge(self, other: "PairwiseMoments") -> "PairwiseMoments":
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge co-moments of {other.k} and {self.k} variables")
+        n = self.n + other.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(n > 0, other.n / n, 0)
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        factor = self.n * weight
+        self.cxx += other.cxx + dx * dx * factor
+        self.cyy += other.cyy + dy * dy * factor
+        self.cxy += other.cxy + dx * dy * factor
+        self.mean_x += dx * weight
+        self.mean_y += dy * weight
+        self.n = n
+        return self
+
+    def correlation(self) -> np.ndarray:
+        """Pearson correlation matrix (NaN for pairs without variance)"""
+        divisor = np.sqrt(self.cxx * self.cyy)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where((self.n > 0) & (divisor > 0), self.cxy / divisor, np.nan)
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles
+
+    Values are kept as weighted centroids. Centroids are grouped with the
+    arcsine scale function, so they are small near the tails and large near
+    the median, which keeps extreme quantiles accurate with a bounded number
+    of centroids (about compression / 2).
+    """
+
+    def __init__(self, compression: float = 200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: Any) -> "TDigest":
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if len(other.means) == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]),
+                       np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Scale function k(q) = delta / (2 pi) * asin(2q - 1); a centroid spans at most one unit of k
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.diff(groups, prepend=-1))
+        group_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / group_weights
+        self.weights = group_weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile, interpolating between centroid centres"""
+        if len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, positions, values))
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        return [self.quantile(q) for q in qs]
+
+    def cdf(self, x: Any) -> Any:
+        """Approximate share of values at most x; the inverse of quantile()"""
+        if len(self.means) == 0:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else float("nan")
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(x, values, positions) / total
+
+
+class TopK:
+    """
+    Misra-Gries frequent-items summary
+
+    Keeps at most capacity counters. Counts are exact while a column has at
+    most capacity distinct values; otherwise every value occurring more than
+    n / (capacity + 1) times is retained with its count underestimated by at
+    most that amount.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counters: Dict[Any, int] = {}
+        self.count = 0
+
+    def update(self, values: Any) -> "TopK":
+        counts = pd.Series(values).value_counts(dropna=True)
+        self.count += int(counts.sum())
+        if len(counts) > self.capacity:
+            # Reduce the chunk to a summary of its own first; merging summaries keeps the error bound
+            cut = counts.iat[self.capacity]
+            counts = counts[counts > cut] - cut
+        return self._merge_counts(zip(counts.index.tolist(), counts.tolist()))
+
+    def merge(self, other: "TopK") -> "TopK":
+        self.count += other.count
+        return self._merge_counts(other.counters.items())
+
+    def _merge_counts(self, items) -> "TopK":
+        counters = self.counters
+        for value, count in items:
+            counters[value] = counters.get(value, 0) + int(count)
+        if len(counters) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count and keep the positive remainders
+            cut = sorted(counters.values(), reverse=True)[self.capacity]
+            counters = {v: c - cut for v, c in counters.items() if c > cut}
+        self.counters = counters
+        return self
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Any, int]]:
+        items = sorted(self.counters.items(), key=lambda item: -item[1])
+        return items if n is None else items[:n]
+
+    def mode(self) -> Any:
+        """Most frequent value; ties are broken by the smallest value, as in Series.mode()"""
+        if not self.counters:
+            return None
+        top = max(self.counters.values())
+        candidates = [v for v, c in self.counters.items() if c == top]
+        try:
+            return sorted(candidates)[0]
+        except TypeError:
+            return candidates[0]
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-value counter
+
+    Values are hashed to 64 bits; the first precision bits pick one of
+    2^precision registers, which keeps the longest run of leading zeros seen
+    in the remaining bits. The relative error is about 1.04 / sqrt(2^precision).
+    Until more than exact_limit distinct hashes are seen, the hashes are kept
+    themselves and the count is exact.
+    """
+
+    def __init__(self, precision: int = 12, exact_limit: Optional[int] = None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.exact_limit = 1 << precision if exact_limit is None else exact_limit
+        self.hashes: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+        self.registers: Optional[np.ndarray] = None
+
+    def update(self, values: Any) -> "HyperLogLog":
+        """Add the non-null values of an array or Series"""
+        return self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        """Add values already hashed with hash_values"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if self.registers is None:
+            # Insert the new hashes into the sorted ones, without re-sorting those
+            new = np.unique(hashes)
+            if len(self.hashes):
+                found = np.searchsorted(self.hashes, new)
+                seen = self.hashes[np.minimum(found, len(self.hashes) - 1)] == new
+                new, found = new[~seen], found[~seen]
+                self.hashes = np.insert(self.hashes, found, new)
+            else:
+                self.hashes = new
+            if len(self.hashes) > self.exact_limit:
+                self._densify()
+        else:
+            self._add_to_registers(hashes)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog precisions {other.precision} and {self.precision}")
+        if other.registers is None:
+            return self.update_hashes(other.hashes)
+        if self.registers is None:
+            self._densify()
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct values"""
+        if self.registers is None:
+            return len(self.hashes)
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def _densify(self):
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        self._add_to_registers(self.hashes)
+        self.hashes = None
+
+    def _add_to_registers(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Position of the first 1 bit in the remaining bits (width + 1 if all are 0)
+        rank = (width + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Number of bits needed for each unsigned 64-bit integer"""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        length[high] += shift
+        values[high] >>= np.uint64(shift)
+    return length + (values > 0)
+
+
+def mix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: spreads 64-bit keys evenly over all bits"""
+    with np.errstate(over="ignore"):
+        values = np.asarray(values, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def hash_values(values: Any, dropna: bool = True) -> np.ndarray:
+    """
+    64-bit hashes of values, equal for values that compare equal
+
+    Integers and whole floats hash alike (1 and 1.0), as do 0.0 and -0.0,
+    so a column hashes consistently when chunks are read with different
+    numeric dtypes. Strings and other objects are hashed by pandas.
+
+    Args:
+        values: Array or Series
+        dropna: Leave out missing values; otherwise they all get the hash 0
+
+    Returns:
+        Array of uint64 hashes
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    nulls = series.isna().to_numpy()
+    present = series[~nulls] if nulls.any() else series
+    dtype = present.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        keys = present.to_numpy(dtype=np.uint64)
+    elif pd.api.types.is_integer_dtype(dtype):
+        keys = present.to_numpy(dtype=np.int64).view(np.uint64)
+    elif pd.api.types.is_float_dtype(dtype):
+        floats = present.to_numpy(dtype=np.float64) + 0.0
+        with np.errstate(invalid="ignore"):
+            whole = (floats == np.floor(floats)) & (np.abs(floats) < 2.0 ** 63)
+        keys = floats.view(np.uint64).copy()
+        keys[whole] = floats[whole].astype(np.int64).view(np.uint64)
+    elif isinstance(dtype, np.dtype) and dtype.kind in "mM":
+        keys = present.to_numpy().view(np.int64).view(np.uint64)
+    else:
+        try:
+            keys = pd.util.hash_pandas_object(present, index=False).to_numpy()
+        except TypeError:
+            # Unhashable objects, e.g. lists
+            keys = pd.util.hash_pandas_object(present.astype(str), index=False).to_numpy()
+    hashes = mix64(keys)
+    if dropna or not nulls.any():
+        return hashes
+    full = np.zeros(len(series), dtype=np.uint64)
+    full[~nulls] = hashes
+    return full
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from business_rules import RuleEngine
+from violation_store import ViolationRun, ViolationSet
+
+RULES = [
+    {"id": 1, "name": "Positive amount", "condition": "data['amount'] > 0"},
+    {"id": 2, "name": "Known status", "condition": "data['status'] in ('open', 'closed')"},
+    {"id": 3, "name": "Small amount", "condition": "data['amount'] < 90"},
+]
+
+
+def make_frame(rows=2_500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "amount": rng.normal(50, 30, size=rows),
+        "status": rng.choice(["open", "closed", "lost"], size=rows, p=[0.45, 0.45, 0.1]),
+    }, index=np.arange(rows) * 2)
+
+
+def test_chunked_rules_match_row_by_row_evaluation():
+    df = make_frame()
+    engine = RuleEngine()
+    engine.load_rules(RULES)
+    result = engine.apply_rules(df, page_size=10_000, chunk_size=300)
+
+    run = engine.violation_store.get(result["run_id"])
+    records = df.to_dict(orient="records")
+    for rule in RULES:
+        evaluate = engine._compile_condition(rule["condition"])
+        expected = np.flatnonzero([not evaluate(row) for row in records])
+        np.testing.assert_array_equal(run.violation_sets[str(rule["id"])].positions(), expected)
+    assert result["violation_count"] == len(result["violations"])
+    assert {v["row_index"] for v in result["violations"]} <= set(df.index)
+
+
+def test_chunk_size_does_not_change_results():
+    df = make_frame()
+    engine = RuleEngine()
+    engine.load_rules(RULES)
+    whole = engine.apply_rules(df, chunk_size=len(df))
+    chunked = engine.apply_rules(df, chunk_size=7)
+
+    assert whole["rule_summary"] == chunked["rule_summary"]
+    assert whole["violations"] == chunked["violations"]
+
+
+def test_violation_run_keeps_its_dataset():
+    run = ViolationRun(10, dataset_id=7)
+    run.add({"id": 1, "name": "rule"}, ViolationSet.from_mask(np.arange(10) % 3 == 0))
+    restored = ViolationRun.from_dict(run.to_dict())
+
+    assert restored.belongs_to("7") and restored.belongs_to(7)
+    assert not restored.belongs_to(8)
+    assert not ViolationRun(10).belongs_to(7)
+    np.testing.assert_array_equal(restored.violation_sets["1"].positions(), [0, 3, 6, 9])
+
+
+def test_sampled_columns_use_the_full_distinct_ratio():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"code": rng.integers(0, 50_000, size=200_000)})
+    stats = RuleEngine().compute_column_stats(df, {"sample_threshold": 10_000, "sample_size": 10_000,
+                                                   "random_state": 0})
+
+    summary = stats["columns"]["code"]
+    assert stats["sampled"]
+    assert summary["unique_ratio"] == pytest.approx(df["code"].nunique() / len(df), rel=0.03)
+    assert not summary["skip"]
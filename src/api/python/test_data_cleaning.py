@@ -0,0 +1,95 @@
+import copy
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import DataCleaningAgent, DataValidationAgent, chunk_row_hashes
+from fingerprint import result_cache
+
+
+def test_row_hashes_do_not_depend_on_inferred_dtypes():
+    as_int = pd.DataFrame({"id": [1, 2, 0], "name": ["a", "b", "c"]})
+    as_float = pd.DataFrame({"id": [1.0, 2.0, -0.0], "name": ["a", "b", "c"]})
+    as_text = pd.DataFrame({"id": ["1", "2", "0"], "name": ["a", "b", "c"]})
+
+    np.testing.assert_array_equal(chunk_row_hashes(as_int), chunk_row_hashes(as_float))
+    np.testing.assert_array_equal(chunk_row_hashes(as_int), chunk_row_hashes(as_text))
+    assert len(set(chunk_row_hashes(as_int))) == 3
+
+
+def test_csv_duplicates_are_found_across_chunks(tmp_path):
+    # Chunk 1 reads "amount" as integers, chunk 2 as floats (it has a missing
+    # value) and chunk 3 as text; "code" is integers, then text
+    rows = [(i, i * 10, str(i)) for i in range(5)]
+    rows += [(0, 0, "0"), (1, 10, "1"), (9, None, "9"), (3, 30, "3"), (4, 40, "4")]
+    rows += [(2, "20", "x"), (2, 20, "2"), (1, "10", "1"), (7, "unknown", "7"), (0, 0, "0")]
+    path = tmp_path / "data.csv"
+    pd.DataFrame(rows, columns=["id", "amount", "code"]).to_csv(path, index=False)
+
+    agent = DataCleaningAgent()
+    agent.config["missing_values"]["strategy"] = "none"
+    agent.config["outliers"]["strategy"] = "none"
+    result = agent.clean_csv(str(path), str(tmp_path / "clean.parquet"), chunksize=5)
+
+    removed = [op for op in result["summary"]["operations"] if op["operation"] == "remove_duplicates"]
+    assert result["success"]
+    assert removed[0]["rows_affected"] == 7
+    assert result["summary"]["rows_after"] == len(rows) - 7
+    # One 8-byte hash is kept per distinct row of the file
+    assert result["summary"]["row_hash_bytes"] == 8 * (len(rows) - 7)
+
+    # Within chunks only: memory stays bounded, and these chunks have no repeats of their own
+    agent.config["duplicate_rows"]["across_chunks"] = False
+    result = agent.clean_csv(str(path), str(tmp_path / "clean.parquet"), chunksize=5)
+    assert result["summary"]["rows_after"] == len(rows)
+    assert result["summary"]["row_hash_bytes"] == 0
+
+
+def make_dirty_frame(rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "amount": rng.normal(100, 10, size=rows),
+        "count": rng.integers(0, 50, size=rows).astype(float),
+        "city": rng.choice(["Oslo", "oslo ", "Lima"], size=rows).astype(object),
+    })
+    df.loc[rng.choice(rows, 30, replace=False), "amount"] = np.nan
+    df.loc[rng.choice(rows, 20, replace=False), "city"] = None
+    df.loc[:4, "amount"] = 10_000.0
+    return pd.concat([df, df.iloc[:20]], ignore_index=True)
+
+
+@pytest.mark.parametrize("outliers", ["clip", "remove"])
+def test_cleaning_leaves_the_input_and_pandas_options_unchanged(outliers, monkeypatch):
+    df = make_dirty_frame()
+    original = df.copy()
+    options = []
+    monkeypatch.setattr(pd, "option_context", lambda *args: options.append(args))
+
+    agent = DataCleaningAgent()
+    agent.config["outliers"]["strategy"] = outliers
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        result = agent.clean_dataset(df)
+
+    assert result["success"], result.get("error")
+    assert result["summary"]["cells_changed"] > 0
+    pd.testing.assert_frame_equal(df, original)
+    assert options == []
+
+
+def test_cached_validation_results_are_copies():
+    result_cache.clear()
+    df = pd.DataFrame({"amount": [1.0, 2.0, None], "email": ["a@b.com", "bad", None]})
+    agent = DataValidationAgent()
+
+    first = agent.validate_dataset(df)
+    expected = copy.deepcopy(first)
+    first["validated_at"] = "now"
+    first.pop("summary")
+    first["checks"].clear()
+    cached = agent.validate_dataset(df)
+    assert cached == expected
+    cached["checks"].append({"name": "extra"})
+    assert agent.validate_dataset(df) == expected
@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_profiling import DataProfiler
+from fingerprint import result_cache
+
+
+class FakeReportProfiler(DataProfiler):
+    """Builds a small report instead of a ydata-profiling one, once released"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+        # Reports of earlier tests would be served from the shared cache
+        result_cache.clear()
+
+    def _build_report(self, data, settings):
+        self.release.wait(timeout=10)
+        return {"success": True, "summary": self.summarize(data)}
+
+
+def make_frame(seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"a": rng.normal(size=50), "b": rng.integers(0, 5, size=50)})
+
+
+def wait_for(profiler, report_id, dataset_id):
+    for future in list(profiler._reports.values()):
+        future.result(timeout=10)
+    return profiler.report_status(report_id, dataset_id=dataset_id)
+
+
+def test_reports_are_only_served_to_their_dataset():
+    profiler = FakeReportProfiler()
+    profiler.release.set()
+    report_id = profiler.start_report(make_frame(0), dataset_id=1)
+
+    assert wait_for(profiler, report_id, 1)["status"] == "complete"
+    assert profiler.report_status(report_id, dataset_id=2)["status"] == "unknown"
+    assert profiler.report_status(report_id)["status"] == "unknown"
+
+    # The same data uploaded as another dataset shares the report
+    assert profiler.start_report(make_frame(0), dataset_id=2) == report_id
+    assert profiler.report_status(report_id, dataset_id=2)["status"] == "complete"
+
+
+def test_full_queue_rejects_new_reports():
+    profiler = FakeReportProfiler(max_pending_reports=2)
+    first = profiler.start_report(make_frame(0), dataset_id=1)
+    second = profiler.start_report(make_frame(1), dataset_id=2)
+
+    assert profiler.start_report(make_frame(2), dataset_id=3) is None
+    result = profiler.profile_summary(make_frame(2), dataset_id=3)
+    assert result["success"] and result["report"]["status"] == "rejected"
+    assert result["summary"]["row_count"] == 50
+    # Reports already building can still be requested again
+    assert profiler.start_report(make_frame(0), dataset_id=1) == first
+
+    profiler.release.set()
+    assert wait_for(profiler, second, 2)["status"] == "complete"
+    assert profiler.start_report(make_frame(2), dataset_id=3) is not None
+
+
+def test_report_ids_are_bounded():
+    profiler = FakeReportProfiler(max_reports=3)
+    profiler.release.set()
+    report_ids = []
+    for seed in range(6):
+        report_ids.append(profiler.start_report(make_frame(seed), dataset_id=seed))
+        wait_for(profiler, report_ids[-1], seed)
+
+    assert len(profiler._report_keys) == 3
+    assert profiler.report_status(report_ids[0], dataset_id=0)["status"] == "unknown"
+    assert profiler.report_status(report_ids[-1], dataset_id=5)["status"] == "complete"
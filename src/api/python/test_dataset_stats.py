@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_stats import DatasetStatsService
+
+
+def make_frame(rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "a": rng.normal(size=rows),
+        "b": rng.integers(0, 50, size=rows),
+        "c": rng.choice(["x", "y", "z"], size=rows),
+    })
+    df.loc[::17, "a"] = np.nan
+    df.loc[::23, "c"] = None
+    return df
+
+
+def test_statistics_match_pandas():
+    df = make_frame()
+    stats = DatasetStatsService().get(df)
+
+    pd.testing.assert_series_equal(stats.null_counts(), df.isna().sum())
+    for col in df.columns:
+        assert stats.unique_count(col) == df[col].nunique()
+        pd.testing.assert_series_equal(stats.value_counts(col), df[col].value_counts())
+    moments = stats.column_moments(["a", "b"])
+    for col in ["a", "b"]:
+        assert moments[col]["mean"] == pytest.approx(df[col].mean())
+        assert moments[col]["std"] == pytest.approx(df[col].std())
+        assert moments[col]["min"] == df[col].min()
+        assert moments[col]["max"] == df[col].max()
+        assert stats.quantiles(col, [0.25, 0.75]) == pytest.approx(
+            df[col].quantile([0.25, 0.75]).tolist())
+        assert stats.median(col) == pytest.approx(df[col].median())
+    pd.testing.assert_frame_equal(stats.correlation(), df[["a", "b"]].corr())
+
+
+def test_duplicates_match_pandas():
+    df = make_frame()
+    df = pd.concat([df, df.iloc[[3, 5, 5, 900]]], ignore_index=True)
+    stats = DatasetStatsService().get(df)
+
+    np.testing.assert_array_equal(stats.duplicated(), df.duplicated().to_numpy())
+    assert stats.duplicate_count() == int(df.duplicated().sum())
+
+
+def test_same_data_shares_statistics():
+    service = DatasetStatsService()
+    df = make_frame()
+
+    assert service.get(df) is service.get(df.copy())
+
+
+def test_frame_modified_in_place_gets_fresh_statistics():
+    service = DatasetStatsService()
+    df = make_frame().dropna()
+    assert service.get(df).duplicate_count() == 0
+    assert service.get(df).unique_count("b") == 50
+
+    df.iloc[10] = df.iloc[20]
+    df.iloc[11] = df.iloc[20]
+    df.loc[df["b"] == 7, "b"] = 8
+    stats = service.get(df)
+
+    assert stats.duplicate_count() == int(df.duplicated().sum()) == 2
+    assert stats.unique_count("b") == 49
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from data_cleaning import DataCleaningAgent, DataValidationAgent
+from dedup import DedupEngine
+
+
+def make_frame(rows=100, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "value": rng.normal(size=rows),
+        "label": rng.choice(["a", "b", "c"], size=rows),
+    })
+
+
+def duplicate_rows_check(data):
+    results = DataValidationAgent().validate_dataset(data)
+    return next(check for check in results["checks"] if check["name"] == "Duplicate Rows")
+
+
+def test_duplicated_matches_pandas():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "a": rng.integers(0, 5, size=2000),
+        "b": rng.choice(["x", "y", None], size=2000),
+        "c": rng.choice([0.0, -0.0, 1.5, np.nan], size=2000),
+    })
+    engine = DedupEngine()
+
+    np.testing.assert_array_equal(engine.duplicated(df), df.duplicated().to_numpy())
+    assert engine.count_duplicates(df) == int(df.duplicated().sum())
+
+
+def test_duplicate_groups_are_groups_of_equal_rows():
+    df = make_frame(rows=10).drop(columns="id")
+    df = pd.concat([df, df.iloc[[2, 2, 7]]], ignore_index=True)
+    groups = sorted(sorted(group.tolist()) for group in DedupEngine().duplicate_groups(df))
+
+    assert groups == [[2, 10, 11], [7, 12]]
+
+
+def test_cleaning_and_validation_see_duplicates_added_in_place():
+    df = make_frame().drop(columns="id")
+    cleaner = DataCleaningAgent()
+    assert cleaner.clean_dataset(df)["cleaned_data"].shape == df.shape
+    assert duplicate_rows_check(df)["passed"]
+
+    df.iloc[10] = df.iloc[0]
+    df.iloc[11] = df.iloc[0]
+    result = cleaner.clean_dataset(df)
+
+    assert len(result["cleaned_data"]) == len(df) - 2
+    assert result["cleaned_data"].index.equals(df.drop_duplicates().index)
+    check = duplicate_rows_check(df)
+    assert not check["passed"]
+    assert check["score"] == 0.98
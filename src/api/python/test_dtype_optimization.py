@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from dtype_optimization import DtypeOptimizer
+
+
+def make_frame():
+    return pd.DataFrame({
+        "qty": [1.0, 2.0, 5.0],
+        "ret": [3.0, 0.0, 1.0],
+        "count": np.array([4, 200, 7], dtype=np.int64),
+        "partial": [1.0, np.nan, 3.0],
+        "city": ["Oslo", "Oslo", "Oslo"],
+    })
+
+
+def test_numeric_columns_are_kept_by_default():
+    df = make_frame()
+    optimized, report = DtypeOptimizer().optimize(df)
+
+    for column in ("qty", "ret", "count", "partial"):
+        assert optimized[column].dtype == df[column].dtype
+    assert isinstance(optimized["city"].dtype, pd.CategoricalDtype)
+    assert list(report["columns"]) == ["city"]
+    assert (optimized.qty - optimized.ret).tolist() == [-2.0, 2.0, 4.0]
+
+
+def test_opt_in_integer_conversions_are_signed():
+    df = make_frame()
+    optimized, _ = DtypeOptimizer(downcast_integers=True, integer_floats=True).optimize(df)
+
+    assert optimized["qty"].dtype == np.int8 and optimized["ret"].dtype == np.int8
+    assert optimized["count"].dtype == np.int16
+    assert optimized["partial"].dtype == pd.Int8Dtype()
+    assert (optimized.qty - optimized.ret).tolist() == [-2, 2, 4]
+
+
+def test_unsigned_columns_are_not_downcast():
+    series = pd.Series(np.array([1, 2], dtype=np.uint64))
+    assert DtypeOptimizer(downcast_integers=True).optimize_column(series) is series
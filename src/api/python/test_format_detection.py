@@ -0,0 +1,22 @@
+import warnings
+
+import pandas as pd
+import pytest
+
+from format_detection import FormatDetectionEngine
+
+
+@pytest.mark.parametrize("values, date_format", [
+    # Most values read either way, but only day-first parses them all
+    (["12/01/2023", "11/01/2023", "13/01/2023"], "%d/%m/%Y"),
+    (["01/12/2023", "01/11/2023", "01/13/2023"], "%m/%d/%Y"),
+    (["2023-01-12", "2023-01-13"], "%Y-%m-%d"),
+])
+def test_dates_are_parsed_with_the_format_that_fits_them(values, date_format):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        result = FormatDetectionEngine().detect(pd.Series(values * 20))
+
+    assert not caught
+    assert result["format"] == "datetime" and result["date_format"] == date_format
+    assert result["ratio"] == 1.0 and result["passed"]
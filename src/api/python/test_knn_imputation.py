@@ -0,0 +1,55 @@
+import types
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+from sklearn.neighbors import KDTree
+
+import knn_imputation
+from knn_imputation import KNNImputationEngine
+
+
+class ShortHNSWIndex:
+    """Exact search that, like HNSW, finds too few neighbours for some rows and pads them with -1"""
+
+    def __init__(self, dims, links):
+        self.reference = None
+
+    def add(self, reference):
+        self.reference = reference
+
+    def search(self, rows, k):
+        distances, neighbors = KDTree(self.reference).query(rows, k=k)
+        neighbors[::3, k - 2:] = -1
+        return distances.astype(np.float32), neighbors
+
+
+def make_frame(rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=rows)
+    df = pd.DataFrame({"x": x, "y": 2 * x + rng.normal(scale=0.1, size=rows), "z": rng.normal(size=rows)})
+    df.loc[rng.choice(rows, 60, replace=False), "y"] = np.nan
+    return df
+
+
+def test_matches_exact_knn_on_complete_features():
+    df = make_frame()
+    engine = KNNImputationEngine(n_neighbors=5, backend="kd_tree")
+    positions, values = engine.impute(df, ["y"], ["x", "z"])["y"]
+
+    # The engine measures distance on standardized features
+    features = (df[["x", "z"]] - df[["x", "z"]].mean()) / df[["x", "z"]].std(ddof=0)
+    expected = KNNImputer(n_neighbors=5).fit_transform(np.column_stack([features, df["y"]]))[:, 2]
+    np.testing.assert_allclose(values, expected[positions], rtol=1e-4, atol=1e-4)
+
+
+def test_faiss_rows_with_missing_neighbours_use_the_tree(monkeypatch):
+    df = make_frame()
+    monkeypatch.setattr(knn_imputation, "faiss", types.SimpleNamespace(IndexHNSWFlat=ShortHNSWIndex), raising=False)
+    monkeypatch.setattr(knn_imputation, "FAISS_AVAILABLE", True)
+
+    positions, values = KNNImputationEngine(n_neighbors=5, backend="faiss").impute(df, ["y"], ["x", "z"])["y"]
+    expected = KNNImputationEngine(n_neighbors=5, backend="kd_tree").impute(df, ["y"], ["x", "z"])["y"]
+
+    np.testing.assert_array_equal(positions, expected[0])
+    np.testing.assert_allclose(values, expected[1])
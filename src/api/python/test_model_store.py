@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+from fingerprint import fingerprint_dataframe
+from model_store import FittedModel, ModelStore, resolved_params
+
+
+def make_frame(rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"a": rng.normal(size=rows), "b": rng.normal(size=rows)})
+
+
+def test_callers_with_different_defaults_do_not_share_models():
+    df = make_frame()
+    fingerprint = fingerprint_dataframe(df)
+    store = ModelStore()
+
+    # The anomaly detector defaults contamination to "auto"
+    forest = IsolationForest(n_estimators=100, contamination="auto", random_state=42).fit(df)
+    params = resolved_params(forest, {})
+    store.put(FittedModel("isolation_forest", params, forest, df.columns, fingerprint, len(df)))
+
+    # The analytics service resolves the same request parameters to another forest
+    other = IsolationForest(contamination=0.05, n_estimators=100, random_state=42, n_jobs=-1)
+    assert store.get(fingerprint, "isolation_forest", resolved_params(other, {})) is None
+
+    same = IsolationForest(contamination="auto", n_estimators=100, random_state=42, n_jobs=-1)
+    assert store.get(fingerprint, "isolation_forest", resolved_params(same, {})).estimator is forest
+
+
+def test_runtime_parameters_do_not_change_the_key():
+    one = resolved_params(IsolationForest(n_jobs=-1), {"n_estimators": 100, "max_estimators": 200})
+    other = resolved_params(IsolationForest(n_jobs=None, verbose=1), {"n_estimators": 100, "max_estimators": 200})
+    assert one == other
+    assert one["contamination"] == "auto" and one["max_estimators"] == 200
@@ -0,0 +1,85 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from profile_sketch import ProfileSketch, sketch_csv, sketch_dataframe
+from test_profiling_engine import make_frame, reference_profile
+
+
+def assert_same_exact_parts(profile, expected):
+    """Compare everything a sketch computes exactly; histograms come from a t-digest and are checked loosely"""
+    summary = profile["summary"]
+    for name in ("row_count", "column_count", "missing_cells", "duplicate_rows"):
+        assert summary[name] == expected[name]
+
+    variables = profile["detailed_profile"]["variables"]
+    assert list(variables) == list(expected["variables"])
+    for column, col_expected in expected["variables"].items():
+        col_stats = variables[column]
+        for name in ("type", "count", "n_missing", "n_unique", "n", "value_counts"):
+            assert col_stats.get(name) == col_expected.get(name), (column, name)
+        for name in ("mean", "std", "min", "max"):
+            if name in col_expected:
+                assert col_stats[name] == pytest.approx(col_expected[name], rel=1e-9, abs=1e-12)
+        if "histogram_data" in col_expected:
+            bins = [entry["bin"] for entry in col_expected["histogram_data"]]
+            counts = np.array([entry["count"] for entry in col_stats["histogram_data"]])
+            expected_counts = np.array([entry["count"] for entry in col_expected["histogram_data"]])
+            assert [entry["bin"] for entry in col_stats["histogram_data"]] == bins
+            assert counts.sum() == expected_counts.sum()
+            assert np.abs(counts - expected_counts).max() <= 0.01 * summary["row_count"]
+
+    pearson = profile["detailed_profile"]["correlations"].get("pearson", {})
+    assert pearson == pytest.approx(expected["correlations"]["pearson"], rel=1e-9)
+
+
+@pytest.mark.parametrize("chunk_size", [137, 1_000, 10_000])
+def test_chunked_sketch_matches_pandas(chunk_size):
+    df = make_frame()
+    assert_same_exact_parts(sketch_dataframe(df, chunk_size=chunk_size).to_profile(), reference_profile(df))
+
+
+def test_parallel_sketch_matches_pandas():
+    df = make_frame()
+    assert_same_exact_parts(sketch_dataframe(df, chunk_size=300, n_jobs=2).to_profile(), reference_profile(df))
+
+
+def test_merged_sketches_equal_one_sketch():
+    df = make_frame()
+    whole = ProfileSketch().update(df)
+    merged = ProfileSketch().update(df.iloc[:700]).merge(ProfileSketch().update(df.iloc[700:1500]))
+    merged.merge(pickle.loads(pickle.dumps(ProfileSketch().update(df.iloc[1500:]))))
+
+    merged_profile, whole_profile = merged.to_profile(), whole.to_profile()
+    # Memory usage counts each chunk's index
+    assert {**merged_profile["summary"], "memory_usage": 0} == {**whole_profile["summary"], "memory_usage": 0}
+    for column, col_stats in whole_profile["detailed_profile"]["variables"].items():
+        merged_stats = merged_profile["detailed_profile"]["variables"][column]
+        for name in ("type", "count", "n_missing", "n_unique", "value_counts"):
+            assert merged_stats.get(name) == col_stats.get(name)
+        for name in ("mean", "std", "min", "max"):
+            if name in col_stats:
+                assert merged_stats[name] == pytest.approx(col_stats[name], rel=1e-9)
+    # Rows appended later are duplicates of rows profiled earlier
+    merged.update(df.iloc[:10])
+    assert merged.to_profile()["summary"]["duplicate_rows"] == whole_profile["summary"]["duplicate_rows"] + 10
+
+
+def test_csv_sketch_with_changing_chunk_dtypes(tmp_path):
+    # The first chunk reads "code" as integers, the second as text
+    df = pd.DataFrame({"code": [1, 2, 3, 1, "x", 2], "value": [0.5, 1.5, 0.5, 0.5, 2.0, 1.5]})
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+
+    profile = sketch_csv(str(path), chunksize=3).to_profile()
+    assert profile["summary"]["duplicate_rows"] == 2
+    assert profile["detailed_profile"]["variables"]["code"]["type"] == "categorical"
+    assert "pearson" not in profile["detailed_profile"]["correlations"]
+
+
+def test_columns_must_match():
+    sketch = ProfileSketch().update(pd.DataFrame({"a": [1]}))
+    with pytest.raises(ValueError):
+        sketch.update(pd.DataFrame({"b": [1]}))
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fingerprint import ResultCache
+from profiling_engine import ProfilingEngine, infer_column_type, spearman_matrix
+
+
+def reference_profile(df):
+    """Profile computed one statistic at a time with pandas, as the analytics service did"""
+    row_count, column_count = len(df), len(df.columns)
+    missing_cells = int(df.isna().sum().sum())
+    duplicate_rows = int(df.duplicated().sum())
+
+    variables = {}
+    for column in df.columns:
+        col_data = df[column]
+        col_type = infer_column_type(col_data)
+        col_stats = {"type": col_type, "count": len(col_data), "n_missing": int(col_data.isna().sum()),
+                     "n_unique": int(col_data.nunique()), "n": len(col_data)}
+        if col_type == "numeric":
+            for name in ("mean", "std", "min", "max"):
+                value = getattr(col_data, name)()
+                col_stats[name] = None if pd.isna(value) else float(value)
+            hist, edges = np.histogram(col_data.dropna(), bins=6)
+            col_stats["histogram_data"] = [{"bin": f"{edges[i]:.1f}-{edges[i+1]:.1f}", "count": int(hist[i])}
+                                           for i in range(len(hist))]
+        elif col_type == "categorical":
+            col_stats["value_counts"] = {str(k): int(v) for k, v in col_data.value_counts().head(10).items()}
+        variables[column] = col_stats
+
+    correlations = {}
+    numeric_columns = df.select_dtypes(include=["number"]).columns
+    for method in ("pearson", "spearman"):
+        matrix = df[numeric_columns].corr(method=method)
+        correlations[method] = {f"{a}_{b}": float(matrix.iloc[i, j])
+                                for i, a in enumerate(numeric_columns) for j, b in enumerate(numeric_columns)
+                                if i < j and abs(matrix.iloc[i, j]) >= 0.5}
+    return {"row_count": row_count, "column_count": column_count, "missing_cells": missing_cells,
+            "duplicate_rows": duplicate_rows, "variables": variables, "correlations": correlations}
+
+
+def make_frame(rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=rows)
+    df = pd.DataFrame({
+        "x": x,
+        "y": -3 * x + rng.normal(scale=0.5, size=rows),
+        "rank": np.round(x * 2),
+        "count": rng.integers(0, 20, size=rows),
+        "city": rng.choice(["Paris", "Oslo", "Lima", "Pune"], size=rows),
+        "flag": rng.random(size=rows) < 0.3,
+        "when": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 30, size=rows), unit="D"),
+    })
+    df.loc[rng.choice(rows, 200, replace=False), "y"] = np.nan
+    df.loc[rng.choice(rows, 100, replace=False), "city"] = None
+    # Exact duplicate rows, and rows that only differ in one column
+    df = pd.concat([df, df.iloc[:50], df.iloc[50:60].assign(count=99)], ignore_index=True)
+    return df
+
+
+def assert_matches(actual, expected):
+    if isinstance(expected, dict):
+        assert list(actual) == list(expected)
+        for key in expected:
+            assert_matches(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_matches(a, e)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+    else:
+        assert actual == expected
+
+
+@pytest.mark.parametrize("cache", [None, ResultCache()])
+def test_profile_matches_pandas(cache):
+    df = make_frame()
+    profile = ProfilingEngine(cache=cache).profile(df)
+    expected = reference_profile(df)
+
+    summary = profile["summary"]
+    for name in ("row_count", "column_count", "missing_cells", "duplicate_rows"):
+        assert summary[name] == expected[name]
+    assert profile["detailed_profile"]["table"]["n_duplicates"] == expected["duplicate_rows"]
+    assert_matches(profile["detailed_profile"]["variables"], expected["variables"])
+    assert_matches(profile["detailed_profile"]["correlations"], expected["correlations"])
+
+
+def test_changed_column_is_reprofiled():
+    engine = ProfilingEngine(cache=ResultCache())
+    df = make_frame()
+    engine.profile(df)
+    changed = df.assign(count=df["count"] + 1)
+
+    assert_matches(engine.profile(changed)["detailed_profile"]["variables"], reference_profile(changed)["variables"])
+
+
+def test_spearman_matches_pandas_with_ties_and_missing_values():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 6, size=(300, 4)).astype(float)
+    values[rng.random(size=values.shape) < 0.1] = np.nan
+    values[:5, 3] = np.inf
+
+    expected = pd.DataFrame(values).corr(method="spearman").to_numpy()
+    actual = spearman_matrix(values)
+    upper = np.triu_indices(4, k=1)
+    np.testing.assert_allclose(actual[upper], expected[upper], rtol=1e-12)
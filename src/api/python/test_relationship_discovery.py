@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from relationship_discovery import ColumnSignature, RelationshipEngine
+
+
+def customers_and_orders(seed, customers=50_000, orders=80_000):
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(10**9, size=customers, replace=False)
+    customer_frame = pd.DataFrame({"id": ids, "region": rng.integers(0, 20, size=customers)})
+    order_frame = pd.DataFrame({
+        "order_id": np.arange(orders) + 10**10,
+        "customer_id": rng.choice(ids, size=orders),
+    })
+    return customer_frame, order_frame
+
+
+def found(dependencies, dependent, referenced):
+    return any((d["dependent"]["dataset_id"], d["dependent"]["column"]) == dependent
+               and (d["referenced"]["dataset_id"], d["referenced"]["column"]) == referenced
+               for d in dependencies)
+
+
+def test_large_key_columns_are_exactly_unique():
+    for seed in range(10):
+        customers, orders = customers_and_orders(seed)
+        engine = RelationshipEngine()
+        engine.add_dataset("customers", customers)
+        engine.add_dataset("orders", orders)
+
+        assert engine.signatures("customers")["id"].uniqueness() == 1.0
+        assert engine.signatures("orders")["order_id"].uniqueness() == 1.0
+        assert found(engine.discover("orders"), ("orders", "customer_id"), ("customers", "id"))
+
+
+def test_distinct_count_is_exact():
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.integers(0, 20_000, size=30_000))
+    signature = ColumnSignature().update(series)
+
+    assert signature.distinct_count() == series.nunique()
+    assert signature.non_null == len(series)
+
+
+def test_appended_rows():
+    keys = pd.Series(np.arange(20_000))
+    signature = ColumnSignature().update(keys[:15_000]).update(keys[15_000:])
+    assert signature.distinct_count() == 20_000
+    assert signature.uniqueness() == 1.0
+
+    signature.update(keys[:5_000])
+    assert signature.uniqueness() < 0.9
+    assert abs(signature.distinct_count() - 20_000) < 2_000
+
+
+def test_small_columns_merge_exactly():
+    signature = ColumnSignature().update(pd.Series([1, 2, 3, 4])).update(pd.Series([3, 4, 5]))
+
+    assert signature.distinct_count() == 5
+    assert signature.non_null == 7
+
+
+def test_saved_signatures_keep_distinct_counts(tmp_path):
+    customers, orders = customers_and_orders(0, customers=5_000, orders=8_000)
+    engine = RelationshipEngine()
+    engine.load(str(tmp_path))
+    engine.add_dataset("customers", customers)
+    engine.add_dataset("orders", orders)
+
+    loaded = RelationshipEngine()
+    loaded.load(str(tmp_path))
+
+    assert loaded.signatures("customers")["id"].distinct_count() == 5_000
+    assert found(loaded.discover("orders"), ("orders", "customer_id"), ("customers", "id"))
@@ -0,0 +1,72 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rule_compiler import FallbackRequired, compile_row_condition
+
+CONDITIONS = [
+    "data['age'] >= 0 and data['age'] < 120",
+    "0 <= data['score'] <= 1",
+    "not data['score'] > 0.5 or data['age'] > 30",
+    "data['status'] in ['active', 'inactive']",
+    "data['status'] is None or str(data['status']).lower() == 'active'",
+    "str(data['status']).strip() != ''",
+    "len(str(data['email'])) > 5",
+    "data['email'] is not None and str(data['email']).endswith('.com')",
+    "re.match(r'^[a-z]+@[a-z]+\\.com$', str(data['email'])) is not None",
+    "re.search(r'@', str(data['email'])) is None or re.fullmatch(r'[a-z@.]+', str(data['email']))",
+    "abs(data['age'] - 40) * 2 < 50",
+    "data['age'] % 7 != 3",
+]
+
+
+def make_frame(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "age": rng.integers(-5, 130, size=rows),
+        "score": rng.random(size=rows),
+        "status": rng.choice(["active", "inactive", "Active", " ", "other"], size=rows).astype(object),
+        "email": rng.choice(["a@b.com", "bad", "x@y.org", "joe@mail.com"], size=rows).astype(object),
+    })
+    df.loc[rng.choice(rows, 40, replace=False), "score"] = np.nan
+    df.loc[rng.choice(rows, 40, replace=False), "status"] = None
+    df.loc[rng.choice(rows, 40, replace=False), "email"] = None
+    return df
+
+
+def evaluate_rows(data, condition):
+    """Truth value of a condition per row, evaluated the way the validation agent does row by row"""
+    code = compile(f"result = {condition}", "<rule>", "exec")
+    results = []
+    for _, row in data.iterrows():
+        local_vars = {"data": row.to_dict(), "re": re, "np": np}
+        exec(code, {}, local_vars)
+        results.append(bool(local_vars["result"]))
+    return np.array(results, dtype=bool)
+
+
+@pytest.mark.parametrize("condition", CONDITIONS)
+def test_compiled_conditions_match_row_by_row_evaluation(condition):
+    df = make_frame()
+    compiled = compile_row_condition(condition)
+    assert compiled is not None
+
+    passed, fallback_rows = compiled.evaluate(df)
+    vectorized = np.ones(len(df), dtype=bool)
+    vectorized[:] = passed
+    vectorized[fallback_rows] = evaluate_rows(df.iloc[fallback_rows], condition)
+
+    np.testing.assert_array_equal(vectorized, evaluate_rows(df, condition))
+
+
+def test_unsupported_conditions_are_not_compiled():
+    assert compile_row_condition("data['age'].bit_length() > 2") is None
+    assert compile_row_condition("data['age'] +") is None
+
+
+def test_errors_python_would_raise_need_row_by_row_evaluation():
+    df = pd.DataFrame({"a": [1, 2], "b": [1, 0]})
+    with pytest.raises(FallbackRequired):
+        compile_row_condition("data['a'] // data['b'] > 0").evaluate(df)
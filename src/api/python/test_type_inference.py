@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from type_inference import TypeInferenceEngine
+
+
+def _dates(n):
+    return pd.Series(pd.date_range("2023-01-01", periods=n, freq="min").strftime("%Y-%m-%d %H:%M").astype(object))
+
+
+def test_parse_type_of_dates():
+    engine = TypeInferenceEngine()
+    assert engine.infer_parse_type(_dates(10_000)) == "datetime"
+
+
+def test_cache_sees_edits_outside_the_sample():
+    engine = TypeInferenceEngine()
+    series = _dates(100_000)
+    assert engine.infer_parse_type(series) == "datetime"
+
+    # Edit rows the stratified sample does not contain
+    sampled = set(engine._sample(series).index)
+    unsampled = np.array([i for i in range(len(series)) if i not in sampled][:500])
+    edited = series.copy()
+    edited.iloc[unsampled] = "not a date"
+
+    assert engine.infer_parse_type(edited) == TypeInferenceEngine().infer_parse_type(edited)
+    parse_type, converted = engine.convert_column(edited)
+    assert parse_type != "datetime"
+    assert converted.isna().sum() == 0
+
+
+def test_cache_hit_for_unchanged_column():
+    engine = TypeInferenceEngine()
+    series = _dates(10_000)
+    engine.infer_parse_type(series)
+    engine.infer_parse_type(series.copy())
+    assert engine.cache_info()["hits"] >= 1
@@ -0,0 +1,288 @@
+
+"""
+Type Inference Module
+
+This module infers column types from a stratified sample instead of scanning
+every value of every column. Each test is a rate (or mean) compared with a
+threshold; when the confidence interval computed from the sample lies
+entirely on one side of the threshold the sample decides, and only ambiguous
+columns are checked on the full column. Tests that require every value to
+pass are rejected by a single failing sample value and confirmed on the full
+column otherwise.
+
+Results are cached by a fingerprint of the column content, so inferring the
+types of an unchanged column again is nearly free. Fingerprints cover every
+value, because full-column checks depend on values outside the sample.
+"""
+
+import logging
+import math
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .fingerprint import fingerprint_column
+except ImportError:
+    from fingerprint import fingerprint_column
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Values accepted as booleans when converting text columns
+BOOLEAN_STRINGS = {
+    'true': True, 'yes': True, 'y': True, 't': True, '1': True,
+    'false': False, 'no': False, 'n': False, 'f': False, '0': False
+}
+
+EMAIL_PATTERN = r'@.*\.'
+PHONE_PATTERN = r'^\+?[\d\s\-\(\)]+$'
+URL_PATTERN = r'http|www\..*\.'
+
+
+class TypeInferenceEngine:
+    """Sampled column type inference with a per-column fingerprint cache"""
+
+    def __init__(self, sample_size: int = 2000, strata: int = 20, z: float = 3.0,
+                 cache_size: int = 4096, random_state: int = 0):
+        self.sample_size = sample_size
+        self.strata = strata
+        self.z = z
+        self.cache_size = cache_size
+        self.random_state = random_state
+        self._cache: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.full_scans = 0
+
+    # Public API
+
+    def infer_semantic_type(self, series: pd.Series) -> str:
+        """
+        Classify a column as integer, float, datetime, boolean, categorical,
+        email, phone, url or text
+        """
+        key = (self._fingerprint(series), "semantic")
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        result = self._semantic_type(series)
+        self._cache_put(key, result)
+        return result
+
+    def infer_column_types(self, data: pd.DataFrame) -> Dict[str, str]:
+        """Semantic type of every column of a DataFrame"""
+        return {col: self.infer_semantic_type(data[col]) for col in data.columns}
+
+    def infer_parse_type(self, series: pd.Series) -> Optional[str]:
+        """
+        Type an object column should be parsed as: "datetime" if every value
+        parses as a date, "numeric" if more than 80% of values are numbers,
+        "boolean" if every value is a boolean string, otherwise None
+        """
+        return self._parse(series, convert=False)[0]
+
+    def convert_column(self, series: pd.Series) -> Tuple[Optional[str], pd.Series]:
+        """Parse an object column into its inferred type; returns (parse type, column)"""
+        return self._parse(series, convert=True)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            "size": len(self._cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "full_scans": self.full_scans
+        }
+
+    # Inference
+
+    def _semantic_type(self, series: pd.Series) -> str:
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            # Check if values are mostly integers
+            if pd.api.types.is_integer_dtype(series):
+                return "integer"
+            is_integer = self._rate_above(
+                series, 0.8,
+                lambda values: np.mod(values.dropna().to_numpy(dtype=float), 1) == 0
+            )
+            return "integer" if is_integer else "float"
+
+        if pd.api.types.is_datetime64_dtype(series):
+            return "datetime"
+
+        if pd.api.types.is_bool_dtype(series):
+            return "boolean"
+
+        # Categorical: few distinct values (nulls count as one), relative to the column length
+        if len(series) > 0:
+            sample = self._sample(series)
+            if len(sample) == len(series) or sample.nunique(dropna=False) < 50:
+                unique_count = series.nunique(dropna=False)
+                if unique_count / len(series) < 0.1 and unique_count < 50:
+                    return "categorical"
+
+        if self._rate_above(series, 0.5, lambda values: _as_text(values).str.contains(EMAIL_PATTERN, regex=True)):
+            return "email"
+
+        digit_counts = lambda values: _as_text(values).str.count(r'\d')
+        if self._mean_above(series, 7, digit_counts):
+            if self._rate_above(series, 0.8, lambda values: _as_text(values).str.match(PHONE_PATTERN)):
+                return "phone"
+            return "text"
+
+        if self._rate_above(series, 0.5, lambda values: _as_text(values).str.contains(URL_PATTERN, regex=True)):
+            return "url"
+
+        return "text"
+
+    def _parse(self, series: pd.Series, convert: bool) -> Tuple[Optional[str], pd.Series]:
+        if series.dtype != object:
+            return None, series
+
+        key = (self._fingerprint(series), "parse")
+        cached = self._cache_get(key)
+        if cached is not None:
+            parse_type = cached[0]
+            return parse_type, (_convert(series, parse_type) if convert else series)
+
+        parse_type, converted = self._parse_type(series, convert)
+        self._cache_put(key, (parse_type,))
+        return parse_type, converted
+
+    def _parse_type(self, series: pd.Series, convert: bool) -> Tuple[Optional[str], pd.Series]:
+        sample = self._sample(series)
+        non_null = series.notna()
+
+        # Datetime: every non-null value must parse; one failing sample value rules it out
+        sample_dates = pd.to_datetime(sample, errors="coerce")
+        if not (sample_dates.isna() & sample.notna()).any():
+            if len(sample) == len(series):
+                return "datetime", sample_dates
+            self.full_scans += 1
+            dates = pd.to_datetime(series, errors="coerce")
+            if not (dates.isna() & non_null).any():
+                return "datetime", dates
+
+        # Numeric: more than 80% of all values (nulls included) must be numbers
+        is_numeric = self._rate_above(
+            series, 0.8,
+            lambda values: pd.to_numeric(values, errors="coerce").notna(),
+            dropna=False
+        )
+        if is_numeric:
+            return "numeric", (pd.to_numeric(series, errors="coerce") if convert else series)
+
+        # Boolean: every value must be a boolean string
+        sample_bools = sample.astype(str).str.lower().isin(BOOLEAN_STRINGS.keys())
+        if sample_bools.all():
+            self.full_scans += int(len(sample) < len(series))
+            lowered = series.astype(str).str.lower()
+            if lowered.isin(BOOLEAN_STRINGS.keys()).all():
+                return "boolean", (lowered.map(BOOLEAN_STRINGS) if convert else series)
+
+        return None, series
+
+    # Sampling and decisions
+
+    def _fingerprint(self, series: pd.Series) -> str:
+        """Fingerprint of a column's dtype and values (position-sensitive, index-independent)"""
+        return fingerprint_column(series)
+
+    def _sample(self, series: pd.Series) -> pd.Series:
+        """Stratified sample: equal numbers of rows from contiguous blocks of the column"""
+        n = len(series)
+        if n <= self.sample_size:
+            return series
+        rng = np.random.default_rng(self.random_state)
+        bounds = np.linspace(0, n, self.strata + 1).astype(np.int64)
+        per_stratum = self.sample_size // self.strata
+        positions = np.concatenate([
+            lo + rng.choice(hi - lo, min(per_stratum, hi - lo), replace=False)
+            for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+        ])
+        positions.sort()
+        return series.iloc[positions]
+
+    def _rate_above(self, series: pd.Series, threshold: float,
+                    test: Callable[[pd.Series], Any], dropna: bool = True) -> bool:
+        """Whether the fraction of values passing test exceeds threshold"""
+        sample = self._sample(series)
+        outcomes = np.asarray(test(sample.dropna() if dropna else sample), dtype=float)
+        outcomes = np.nan_to_num(outcomes, nan=0.0)
+        if len(sample) == len(series):
+            return len(outcomes) > 0 and outcomes.mean() > threshold
+        if len(outcomes) > 0:
+            lower, upper = _wilson_interval(outcomes.mean(), len(outcomes), self.z)
+            if lower > threshold:
+                return True
+            if upper <= threshold:
+                return False
+        # Ambiguous: decide on the full column
+        self.full_scans += 1
+        outcomes = np.asarray(test(series.dropna() if dropna else series), dtype=float)
+        outcomes = np.nan_to_num(outcomes, nan=0.0)
+        return len(outcomes) > 0 and outcomes.mean() > threshold
+
+    def _mean_above(self, series: pd.Series, threshold: float, measure: Callable[[pd.Series], Any]) -> bool:
+        """Whether the mean of measure over non-null values exceeds threshold"""
+        sample = self._sample(series)
+        values = np.asarray(measure(sample.dropna()), dtype=float)
+        if len(sample) == len(series):
+            return len(values) > 0 and values.mean() > threshold
+        if len(values) > 1:
+            margin = self.z * values.std(ddof=1) / math.sqrt(len(values))
+            if values.mean() - margin > threshold:
+                return True
+            if values.mean() + margin <= threshold:
+                return False
+        self.full_scans += 1
+        values = np.asarray(measure(series.dropna()), dtype=float)
+        return len(values) > 0 and values.mean() > threshold
+
+    # Cache
+
+    def _cache_get(self, key: Tuple[str, str]) -> Any:
+        result = self._cache.get(key)
+        if result is None:
+            self.cache_misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        return result
+
+    def _cache_put(self, key: Tuple[str, str], result: Any):
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    return values if pd.api.types.infer_dtype(values, skipna=True) == "string" else values.astype(str)
+
+
+def _convert(series: pd.Series, parse_type: Optional[str]) -> pd.Series:
+    if parse_type == "datetime":
+        return pd.to_datetime(series, errors="coerce")
+    if parse_type == "numeric":
+        return pd.to_numeric(series, errors="coerce")
+    if parse_type == "boolean":
+        return series.astype(str).str.lower().map(BOOLEAN_STRINGS)
+    return series
+
+
+def _wilson_interval(rate: float, n: int, z: float) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion"""
+    denominator = 1 + z * z / n
+    center = (rate + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / denominator
+    return center - margin, center + margin
+
+
+# Shared engine used by the cleaning agent and the pipeline data loader
+type_engine = TypeInferenceEngine()
@@ -0,0 +1,253 @@
+
+"""
+Violation Storage Module
+
+This module stores rule violations compactly: one row set per rule, kept as a
+compressed bitmap when violations are dense and as a compressed delta-encoded
+integer array when they are sparse. Counts are available immediately and
+violating rows are materialized page by page on demand, instead of building
+one dict per violating row up front.
+"""
+
+import base64
+import logging
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Above this fraction of violating rows a bitmap is smaller than a delta array
+BITMAP_DENSITY_THRESHOLD = 1 / 16
+
+
+class ViolationSet:
+    """Compressed set of violating row positions for one rule"""
+
+    def __init__(self, total_rows: int, count: int, encoding: str, payload: bytes):
+        self.total_rows = total_rows
+        self.count = count
+        self.encoding = encoding
+        self.payload = payload
+
+    @classmethod
+    def from_mask(cls, mask: Any) -> "ViolationSet":
+        """Build from a boolean mask where True marks a violating row"""
+        mask = np.asarray(mask, dtype=bool)
+        count = int(mask.sum())
+        if count and count / len(mask) >= BITMAP_DENSITY_THRESHOLD:
+            return cls(len(mask), count, "bitmap", zlib.compress(np.packbits(mask).tobytes()))
+        return cls.from_positions(np.flatnonzero(mask), len(mask))
+
+    @classmethod
+    def from_positions(cls, positions: Any, total_rows: int) -> "ViolationSet":
+        """Build from sorted positional row indices"""
+        positions = np.asarray(positions, dtype=np.int64)
+        deltas = np.diff(positions, prepend=0).astype(np.uint32)
+        return cls(total_rows, len(positions), "delta", zlib.compress(deltas.tobytes()))
+
+    def positions(self) -> np.ndarray:
+        """Decode to sorted positional row indices"""
+        if self.count == 0:
+            return np.empty(0, dtype=np.int64)
+        raw = zlib.decompress(self.payload)
+        if self.encoding == "bitmap":
+            bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), count=self.total_rows)
+            return np.flatnonzero(bits)
+        return np.cumsum(np.frombuffer(raw, dtype=np.uint32), dtype=np.int64)
+
+    def page(self, offset: int = 0, limit: int = 100) -> np.ndarray:
+        return self.positions()[offset:offset + limit]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.payload)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for storage alongside a run record"""
+        return {
+            "total_rows": self.total_rows,
+            "count": self.count,
+            "encoding": self.encoding,
+            "payload": base64.b64encode(self.payload).decode("ascii")
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ViolationSet":
+        payload = data["payload"]
+        if isinstance(payload, str):
+            payload = base64.b64decode(payload)
+        return cls(data["total_rows"], data["count"], data["encoding"], bytes(payload))
+
+
+class ViolationRun:
+    """Violations of one rule run, one compressed row set per rule"""
+
+    def __init__(self, total_rows: int, run_id: Optional[str] = None, dataset_id: Optional[Any] = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.total_rows = total_rows
+        # Dataset the rules ran on; runs are only served for it
+        self.dataset_id = dataset_id
+        self.created_at = datetime.now().isoformat()
+        self.rules: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.violation_sets: Dict[str, ViolationSet] = {}
+        self.errors: Dict[str, str] = {}
+
+    def add(self, rule: Dict[str, Any], violations: ViolationSet):
+        rule_id = str(rule["id"])
+        self.rules[rule_id] = {
+            "rule_id": rule["id"],
+            "rule_name": rule.get("name"),
+            "severity": rule.get("severity", "medium"),
+            "message": rule.get("message", f"Violated rule: {rule.get('name')}")
+        }
+        self.violation_sets[rule_id] = violations
+
+    def add_error(self, rule: Dict[str, Any], error: str):
+        rule_id = str(rule["id"])
+        self.rules[rule_id] = {
+            "rule_id": rule["id"],
+            "rule_name": rule.get("name"),
+            "severity": "error",
+            "message": f"Error evaluating rule: {error}"
+        }
+        self.errors[rule_id] = error
+
+    @property
+    def violation_count(self) -> int:
+        return sum(v.count for v in self.violation_sets.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-rule violation counts, available without decoding any row set"""
+        rules = []
+        for rule_id, info in self.rules.items():
+            violations = self.violation_sets.get(rule_id)
+            rules.append({
+                **info,
+                "violation_count": violations.count if violations else 0,
+                "error": self.errors.get(rule_id)
+            })
+        return {
+            "run_id": self.run_id,
+            "dataset_id": self.dataset_id,
+            "created_at": self.created_at,
+            "total_rows": self.total_rows,
+            "violation_count": self.violation_count,
+            "rules": rules
+        }
+
+    def belongs_to(self, dataset_id: Any) -> bool:
+        """Whether the run was made on a dataset (IDs are compared as strings)"""
+        return self.dataset_id is not None and str(self.dataset_id) == str(dataset_id)
+
+    def page(self, rule_id: Optional[str] = None, offset: int = 0, limit: int = 100,
+             data: Optional[pd.DataFrame] = None, columns: Optional[List[str]] = None,
+             index: Optional[pd.Index] = None) -> Dict[str, Any]:
+        """
+        Page through violating rows, for one rule or across all rules in order
+
+        Args:
+            rule_id: Restrict to one rule's violations
+            offset: Number of violations to skip
+            limit: Maximum number of violations to return
+            data: The validated DataFrame, to include row values
+            columns: Columns to project when data is given (all columns if None)
+            index: Index used to report row labels (defaults to data's index,
+                positional indices are reported without either)
+
+        Returns:
+            Dict with the page of violation records and paging information
+        """
+        rule_ids = [str(rule_id)] if rule_id is not None else list(self.rules)
+        if index is None and data is not None:
+            index = data.index
+        records = []
+        skip = offset
+        total = 0
+        for rid in rule_ids:
+            violations = self.violation_sets.get(rid)
+            if violations is None:
+                continue
+            total += violations.count
+            if len(records) >= limit or skip >= violations.count:
+                skip = max(skip - violations.count, 0)
+                continue
+            positions = violations.page(skip, limit - len(records))
+            skip = 0
+            info = self.rules[rid]
+            rows = None
+            if data is not None:
+                projected = data if columns is None else data[columns]
+                rows = projected.iloc[positions].to_dict(orient="records")
+            for i, pos in enumerate(positions):
+                record = {
+                    "rule_id": info["rule_id"],
+                    "rule_name": info["rule_name"],
+                    "row_index": int(pos) if index is None else _to_python(index[pos]),
+                    "severity": info["severity"],
+                    "message": info["message"]
+                }
+                if rows is not None:
+                    record["row"] = rows[i]
+                records.append(record)
+
+        return {
+            "run_id": self.run_id,
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "has_more": offset + len(records) < total,
+            "violations": records
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "dataset_id": self.dataset_id,
+            "created_at": self.created_at,
+            "total_rows": self.total_rows,
+            "rules": list(self.rules.values()),
+            "errors": self.errors,
+            "violation_sets": {rid: v.to_dict() for rid, v in self.violation_sets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ViolationRun":
+        run = cls(data["total_rows"], data["run_id"], data.get("dataset_id"))
+        run.created_at = data.get("created_at", run.created_at)
+        for info in data["rules"]:
+            run.rules[str(info["rule_id"])] = info
+        run.errors = dict(data.get("errors", {}))
+        run.violation_sets = {
+            rid: ViolationSet.from_dict(v) for rid, v in data.get("violation_sets", {}).items()
+        }
+        return run
+
+
+class ViolationStore:
+    """Bounded in-memory store of recent violation runs"""
+
+    def __init__(self, max_runs: int = 50):
+        self.max_runs = max_runs
+        self._runs: "OrderedDict[str, ViolationRun]" = OrderedDict()
+
+    def put(self, run: ViolationRun) -> str:
+        self._runs[run.run_id] = run
+        self._runs.move_to_end(run.run_id)
+        while len(self._runs) > self.max_runs:
+            self._runs.popitem(last=False)
+        return run.run_id
+
+    def get(self, run_id: str) -> Optional[ViolationRun]:
+        return self._runs.get(run_id)
+
+
+def _to_python(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value